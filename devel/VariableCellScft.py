@@ -1,75 +1,11 @@
 import os
 import numpy as np
 import time
-from scipy.io import savemat
-import scipy.optimize
 from langevinfts import *
+from variable_cell_scft import *
 
-def find_saddle_point(lx):
-
-    # set box size
-    sb.set_lx(lx)
-    # update bond parameters using new lx
-    pseudo.update()
-
-    # assign large initial value for the energy and error
-    energy_total = 1.0e20
-    error_level = 1.0e20
-
-    # reset Anderson mixing module
-    am.reset_count()
-
-    # iteration begins here
-    print("iteration, mass error, total_partition, energy_total, error_level")
-    for scft_iter in range(1,max_scft_iter+1):
-        # for the given fields find the polymer statistics
-        phi_a, phi_b, Q = pseudo.find_phi(q1_init,q2_init,w[0],w[1])
-
-        # calculate the total energy
-        energy_old = energy_total
-        w_minus = (w[0]-w[1])/2
-        w_plus  = (w[0]+w[1])/2
-
-        energy_total  = -np.log(Q/sb.get_volume())
-        energy_total += sb.inner_product(w_minus,w_minus)/pc.get_chi_n()/sb.get_volume()
-        energy_total -= sb.integral(w_plus)/sb.get_volume()
-
-        # calculate pressure field for the new field calculation, the method is modified from Fredrickson's
-        xi = 0.5*(w[0]+w[1]-chi_n)
-
-        # calculate output fields
-        w_out[0] = chi_n*phi_b + xi
-        w_out[1] = chi_n*phi_a + xi
-        sb.zero_mean(w_out[0])
-        sb.zero_mean(w_out[1])
-
-        # error_level measures the "relative distance" between the input and output fields
-        old_error_level = error_level
-        w_diff = w_out - w
-        multi_dot = sb.inner_product(w_diff[0],w_diff[0]) + sb.inner_product(w_diff[1],w_diff[1])
-        multi_dot /= sb.inner_product(w[0],w[0]) + sb.inner_product(w[1],w[1]) + 1.0
-        error_level = np.sqrt(multi_dot)
-
-        # print iteration # and error levels and check the mass conservation
-        mass_error = (sb.integral(phi_a) + sb.integral(phi_b))/sb.get_volume() - 1.0
-        print( "%8d %12.3E %15.7E %13.9f %15.11f" %
-            (scft_iter, mass_error, Q, energy_total, error_level) )
-
-        # conditions to end the iteration
-        if error_level < tolerance:
-            break
-        # calculte new fields using simple and Anderson mixing
-        am.caculate_new_fields(
-            np.reshape(w,      2*sb.get_n_grid()),
-            np.reshape(w_out,  2*sb.get_n_grid()),
-            np.reshape(w_diff, 2*sb.get_n_grid()),
-            old_error_level, error_level)
-    
-    if use_stress:
-        stress_array = np.array(pseudo.dq_dl()[-sb.get_dim():])/Q
-        return stress_array
-    else:
-        return energy_total
+# The fields and the unit cell are found in the same SCFT iteration, instead
+# of finding the root of the stress over converged fields with scipy.optimize.
 
 # -------------- initialize ------------
 
@@ -79,7 +15,8 @@ os.environ["OMP_STACKSIZE"] = "1G"
 os.environ["OMP_MAX_ACTIVE_LEVELS"] = "2"  # 0, 1 or 2
 
 max_scft_iter = 2000
-tolerance = 1e-11
+field_tolerance = 1e-11
+stress_tolerance = 1e-9
 
 # Major Simulation Parameters
 f = 0.30              # A-fraction, f
@@ -97,9 +34,6 @@ am_start_error = 1e-1    # when switch to AM from simple mixing
 am_mix_min = 0.1         # minimum mixing rate of simple mixing
 am_mix_init = 0.1        # initial mixing rate of simple mixing
 
-# use stress for finding unit cell
-use_stress = True
-
 # choose platform among [cuda, cpu-mkl]
 if "cuda" in PlatformSelector.avail_platforms():
     platform = "cuda"
@@ -130,7 +64,6 @@ print("Volume: %f" % (sb.get_volume()) )
 # free end initial condition. q1 is q and q2 is qdagger.
 # q1 starts from A end and q2 starts from B end.
 w       = np.zeros([2]+list(sb.get_nx()), dtype=np.float64)
-w_out   = np.zeros([2, sb.get_n_grid()],  dtype=np.float64)
 q1_init = np.ones (    sb.get_n_grid(),   dtype=np.float64)
 q2_init = np.ones (    sb.get_n_grid(),   dtype=np.float64)
 
@@ -159,14 +92,11 @@ print("---------- Run ----------")
 time_start = time.time()
 
 # find the natural period of gyroid
-if (use_stress):
-    res = scipy.optimize.root(find_saddle_point, lx, tol=1e-6)
-    print('Unit cell that make the stress zero: ', res.x, '(aN^1/2)')
-    print('Stress in each direction: ', res.fun, )
-else:
-    res = scipy.optimize.minimize(find_saddle_point, lx, tol=1e-6, options={'disp':True})
-    print('Unit cell that minimizes the free energy: ', res.x, '(aN^1/2)')
-    print('Free energy per chain: ', res.fun, 'kT')
+print("iteration, mass error, total_partition, energy_total, error_level, stress")
+phi_a, phi_b, Q, energy_total, lx, n_iter = find_saddle_point_variable_cell(pc, sb, pseudo, am, lx,
+    q1_init, q2_init, w, max_scft_iter, field_tolerance, stress_tolerance)
+print('Unit cell that make the stress zero: ', lx, '(aN^1/2)')
+print('Free energy per chain: ', energy_total, 'kT')
 
 # estimate execution time
 time_duration = time.time() - time_start
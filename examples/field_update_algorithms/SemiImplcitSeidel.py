@@ -42,6 +42,9 @@ langevin_dt = 1.0     # langevin step interval, delta tau*N
 langevin_nbar = 1000  # invariant polymerization index
 langevin_max_step = 2000
 
+# Semi-Implicit Seidel
+sis_lambda_plus = 100.0  # relaxation rate of w_plus, the RPA response is treated implicitly
+
 # -------------- initialize ------------
 # choose platform among [cuda, cpu-mkl]
 if "cuda" in PlatformSelector.avail_platforms():
@@ -57,6 +60,7 @@ sb     = factory.create_simulation_box(nx, lx)
 pseudo = factory.create_pseudo(sb, pc)
 am     = factory.create_anderson_mixing(am_n_var,
             am_max_hist, am_start_error, am_mix_min, am_mix_init)
+sis    = factory.create_semi_implicit_seidel(sb, pc, pseudo)
 
 # standard deviation of normal noise
 langevin_sigma = np.sqrt(2*langevin_dt*sb.get_n_grid()/ 
@@ -65,10 +69,6 @@ langevin_sigma = np.sqrt(2*langevin_dt*sb.get_n_grid()/
 # random seed for MT19937
 np.random.seed(5489)
 
-# arrays for semi implicit Seidel
-kernel_minus = langevin_dt/(1.0 + 2/pc.get_chi_n()*langevin_dt)
-kernel_noise = 1/(1.0 + 2/pc.get_chi_n()*langevin_dt)
-
 # -------------- print simulation parameters ------------
 print("---------- Simulation Parameters ----------")
 print("Box Dimension: %d"  % (sb.get_dim()) )
@@ -109,10 +109,10 @@ print("iteration, mass error, total_partition, energy_total, error_level")
 for langevin_step in range(1, langevin_max_step+1):
     
     print("langevin step: ", langevin_step)
-    # update w_minus
+    # update w_minus, and then w_plus with the RPA response to the new w_minus
     normal_noise = np.random.normal(0.0, langevin_sigma, sb.get_n_grid())
-    g_minus = phi_a-phi_b + 2*w_minus/pc.get_chi_n()
-    w_minus += -kernel_minus*g_minus + kernel_noise*normal_noise
+    sis.update_fields(w_plus, w_minus, phi_a, phi_b, normal_noise,
+        sis_lambda_plus, langevin_dt)
     phi_a, phi_b, Q = find_saddle_point(pc, sb, pseudo, am,
         q1_init, q2_init, w_plus, w_minus, 
         saddle_max_iter, saddle_tolerance, verbose_level)
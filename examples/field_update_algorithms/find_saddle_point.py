@@ -29,7 +29,7 @@ def find_saddle_point(pc, sb, pseudo, am,
 
         # error_level measures the "relative distance" between the input and output fields
         old_error_level = error_level
-        error_level = np.sqrt(sb.inner_product(phi_plus-1.0,phi_plus-1.0)/sb.get_volume())
+        error_level = np.sqrt(sb.inner_product(g_plus,g_plus)/sb.get_volume())
 
         # print iteration # and error levels
         if(verbose_level == 2 or
@@ -38,13 +38,15 @@ def find_saddle_point(pc, sb, pseudo, am,
              
             # calculate the total energy
             energy_old = energy_total
+            ww_minus, int_w_plus, int_phi_plus = sb.reduce_many(
+                [w_minus, w_plus, phi_plus], [(0,0), (1,), (2,)])
             energy_total  = -np.log(Q/sb.get_volume())
-            energy_total += sb.inner_product(w_minus,w_minus)/pc.get_chi_n()/sb.get_volume()
+            energy_total += ww_minus/pc.get_chi_n()/sb.get_volume()
             energy_total += pc.get_chi_n()/4
-            energy_total -= sb.integral(w_plus)/sb.get_volume()
+            energy_total -= int_w_plus/sb.get_volume()
 
             # check the mass conservation
-            mass_error = sb.integral(phi_plus)/sb.get_volume() - 1.0
+            mass_error = int_phi_plus/sb.get_volume() - 1.0
             print("%8d %12.3E %15.7E %15.9f %15.7E" %
                 (saddle_iter, mass_error, Q, energy_total, error_level))
         # conditions to end the iteration
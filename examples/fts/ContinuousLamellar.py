@@ -8,6 +8,8 @@ import numpy as np
 from scipy.io import savemat
 from langevinfts import *
 from find_saddle_point import *
+from trajectory_writer import *
+from checkpoint import *
 
 # -------------- simulation parameters ------------
 
@@ -59,6 +61,9 @@ sb     = factory.create_simulation_box(nx, lx)
 pseudo = factory.create_pseudo(sb, pc)
 am     = factory.create_anderson_mixing(am_n_var,
             am_max_hist, am_start_error, am_mix_min, am_mix_init)
+# Jacobian-free Newton-Krylov method with RPA preconditioning can be used instead of Anderson mixing
+#am     = factory.create_newton_krylov(sb, pc, pseudo, am_n_var,
+#            am_max_hist, am_start_error, am_mix_min, am_mix_init)
 
 # standard deviation of normal noise
 langevin_sigma = np.sqrt(2*langevin_dt*sb.get_n_grid()/
@@ -87,26 +92,44 @@ print("Random Number Generator: ", np.random.RandomState().get_state()[0])
 q1_init = np.ones(sb.get_n_grid(), dtype=np.float64)
 q2_init = np.ones(sb.get_n_grid(), dtype=np.float64)
 
-print("w_minus and w_plus are initialized to random")
-w_plus  = np.random.normal(0.0, langevin_sigma, sb.get_n_grid())
-w_minus = np.random.normal(0.0, langevin_sigma, sb.get_n_grid())
+# the run continues from the checkpoint if it exists (delete it to start a new run)
+checkpoint_file = "checkpoint.lfts"
+if os.path.exists(checkpoint_file):
+    print("w_minus and w_plus are read from", checkpoint_file)
+    state = load_langevin_checkpoint(checkpoint_file, pc, sb, pseudo)
+    w_plus, w_minus = state["w_plus"], state["w_minus"]
+    phi_a, phi_b = state["phi_a"], state["phi_b"]
+    langevin_start_step = state["langevin_step"]+1
+else:
+    print("w_minus and w_plus are initialized to random")
+    w_plus  = np.random.normal(0.0, langevin_sigma, sb.get_n_grid())
+    w_minus = np.random.normal(0.0, langevin_sigma, sb.get_n_grid())
+
+    # keep the level of field value
+    sb.zero_mean(w_plus)
+
+    phi_a, phi_b, _ = find_saddle_point(pc, sb, pseudo, am,
+        q1_init, q2_init, w_plus, w_minus,
+        saddle_max_iter, saddle_tolerance, verbose_level)
+    langevin_start_step = 1
 
-# keep the level of field value
-sb.zero_mean(w_plus)
+# init structure function, running mean and variance of |w_minus(k)|^2
+sf = factory.create_structure_function(sb)
+nx_complex = list(sb.get_nx()[:-1]) + [sb.get_nx(2)//2+1]
 
-phi_a, phi_b, _ = find_saddle_point(pc, sb, pseudo, am,
-    q1_init, q2_init, w_plus, w_minus,
-    saddle_max_iter, saddle_tolerance, verbose_level)
-    
-# init structure function
-sf_average = np.zeros_like(np.fft.rfftn(np.reshape(w_minus, sb.get_nx())),np.float64)
+# trajectory of the fields, frames are appended to "fields_<first step>/<name>.bin"
+# (see trajectory_writer.py, "fields.h5" for HDF5 with h5py)
+writer = TrajectoryWriter("fields_%06d" % (langevin_start_step), {"w_plus":sb.get_nx(), "w_minus":sb.get_nx(), "phi_a":sb.get_nx(), "phi_b":sb.get_nx()},
+    attributes={"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(),
+    "N":pc.get_n_segment(), "f":pc.get_f(), "chi_n":pc.get_chi_n(), "epsilon":pc.get_epsilon(),
+    "chain_model":pc.get_model_name(), "dt":langevin_dt, "nbar":langevin_nbar})
 
 #------------------ run ----------------------
 print("---------- Run ----------")
 time_start = time.time()
 
 print("iteration, mass error, total_partition, energy_total, error_level")
-for langevin_step in range(1, langevin_max_step+1):
+for langevin_step in range(langevin_start_step, langevin_max_step+1):
 
     print("langevin step: ", langevin_step)
     # update w_minus: predict step
@@ -127,31 +150,39 @@ for langevin_step in range(1, langevin_max_step+1):
         
     # calcaluate structure function
     if langevin_step % 10 == 0:
-        sf_average += np.absolute(np.fft.rfftn(np.reshape(w_minus, sb.get_nx()))/sb.get_n_grid())**2
+        sf.accumulate(w_minus)
 
     # save structure function
     if langevin_step % 1000 == 0:
-        sf_average *= 10/1000*sb.get_volume()*np.sqrt(langevin_nbar)/pc.get_chi_n()**2
-        sf_average -= 1.0/(2*pc.get_chi_n())
+        sf_scale = sb.get_volume()*np.sqrt(langevin_nbar)/pc.get_chi_n()**2
+        sf_average = np.reshape(sf.get_mean(), nx_complex)*sf_scale - 1.0/(2*pc.get_chi_n())
+        sf_variance = np.reshape(sf.get_variance(), nx_complex)*sf_scale**2
+        # spherical average, the shell width is the smallest wave number
+        k, sf_k, sf_k_variance, n_modes = sf.get_spherical_average(2*np.pi/np.max(sb.get_lx()))
         mdic = {"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(),
         "N":pc.get_n_segment(), "f":pc.get_f(), "chi_n":pc.get_chi_n(), "epsilon":pc.get_epsilon(),
         "chain_model":pc.get_model_name(),
-        "dt":langevin_dt, "nbar":langevin_nbar,
-        "structure_function":sf_average}
+        "dt":langevin_dt, "nbar":langevin_nbar, "n_samples":sf.get_n_samples(),
+        "structure_function":sf_average, "structure_function_variance":sf_variance,
+        "k":k, "structure_function_k":np.array(sf_k)*sf_scale - 1.0/(2*pc.get_chi_n()),
+        "structure_function_k_variance":np.array(sf_k_variance)*sf_scale**2, "n_modes":n_modes}
         savemat( "structure_function_%06d.mat" % (langevin_step), mdic)
-        sf_average[:,:,:] = 0.0
+        sf.reset()
 
-    # write density and field data
+    # write density and field data, in the background thread of the writer
     if langevin_step % 1000 == 0:
-        mdic = {"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(),
-            "N":pc.get_n_segment(), "f":pc.get_f(), "chi_n":pc.get_chi_n(), "epsilon":pc.get_epsilon(),
-            "chain_model":pc.get_model_name(), "nbar":langevin_nbar,
-            "random_generator":np.random.RandomState().get_state()[0],
-            "random_seed":np.random.RandomState().get_state()[1],
-            "w_plus":w_plus, "w_minus":w_minus, "phi_a":phi_a, "phi_b":phi_b}
-        savemat( "fields_%06d.mat" % (langevin_step), mdic)
+        writer.write(langevin_step, w_plus=w_plus, w_minus=w_minus, phi_a=phi_a, phi_b=phi_b)
+
+    # full state of the run, including the random number generator
+    # (Anderson mixing is reset at each saddle point search, so it is not stored)
+    if langevin_step % 1000 == 0:
+        save_langevin_checkpoint(checkpoint_file, langevin_step, pc, sb,
+            w_plus, w_minus, phi_a, phi_b)
+
+# wait for the pending frames
+writer.close()
 
 # estimate execution time
 time_duration = time.time() - time_start
 print("total time: %f, time per step: %f" %
-    (time_duration, time_duration/langevin_max_step) )
+    (time_duration, time_duration/max(langevin_max_step-langevin_start_step+1, 1)) )
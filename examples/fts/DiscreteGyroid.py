@@ -7,9 +7,11 @@ import os
 import time
 import pathlib
 import numpy as np
-from scipy.io import loadmat, savemat
+from scipy.io import savemat
 from langevinfts import *
 from find_saddle_point import *
+from trajectory_writer import *
+from field_io import *
 
 # -------------- simulation parameters ------------
 # Cuda environment variables
@@ -23,7 +25,7 @@ os.environ["OMP_MAX_ACTIVE_LEVELS"] = "2"  # 0, 1 or 2
 verbose_level = 1  # 1 : print at each langevin step.
                    # 2 : print at each saddle point iteration.
 
-input_data = loadmat("GyroidInput.mat", squeeze_me=True)
+input_data = load_fields("GyroidInput.lfts")
 
 # Simulation Box
 nx = [64, 64, 64,]
@@ -104,8 +106,16 @@ phi_a, phi_b, _ = find_saddle_point(pc, sb, pseudo, am,
     q1_init, q2_init, w_plus, w_minus,
     saddle_max_iter, saddle_tolerance, verbose_level)
     
-# init structure function
-sf_average = np.zeros_like(np.fft.rfftn(np.reshape(w_minus, sb.get_nx())),np.float64)
+# init structure function, running mean and variance of |w_minus(k)|^2
+sf = factory.create_structure_function(sb)
+nx_complex = list(sb.get_nx()[:-1]) + [sb.get_nx(2)//2+1]
+
+# trajectory of the fields, frames are appended to "fields/<name>.bin"
+# (see trajectory_writer.py, "fields.h5" for HDF5 with h5py)
+writer = TrajectoryWriter("fields", {"w_plus":sb.get_nx(), "w_minus":sb.get_nx(), "phi_a":sb.get_nx(), "phi_b":sb.get_nx()},
+    attributes={"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(),
+    "N":pc.get_n_segment(), "f":pc.get_f(), "chi_n":pc.get_chi_n(), "epsilon":pc.get_epsilon(),
+    "chain_model":pc.get_model_name(), "dt":langevin_dt, "nbar":langevin_nbar})
 
 #------------------ run ----------------------
 print("---------- Run ----------")
@@ -133,29 +143,31 @@ for langevin_step in range(1, langevin_max_step+1):
 
     # calcaluate structure function
     if langevin_step % 10 == 0:
-        sf_average += np.absolute(np.fft.rfftn(np.reshape(w_minus, sb.get_nx()))/sb.get_n_grid())**2
+        sf.accumulate(w_minus)
 
     # save structure function
     if langevin_step % 100 == 0:
-        sf_average *= 10/100*sb.get_volume()*np.sqrt(langevin_nbar)/pc.get_chi_n()**2
-        sf_average -= 1.0/(2*pc.get_chi_n())
+        sf_scale = sb.get_volume()*np.sqrt(langevin_nbar)/pc.get_chi_n()**2
+        sf_average = np.reshape(sf.get_mean(), nx_complex)*sf_scale - 1.0/(2*pc.get_chi_n())
+        sf_variance = np.reshape(sf.get_variance(), nx_complex)*sf_scale**2
+        # spherical average, the shell width is the smallest wave number
+        k, sf_k, sf_k_variance, n_modes = sf.get_spherical_average(2*np.pi/np.max(sb.get_lx()))
         mdic = {"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(),
         "N":pc.get_n_segment(), "f":pc.get_f(), "chi_n":pc.get_chi_n(), "epsilon":pc.get_epsilon(),
         "chain_model":pc.get_model_name(),
-        "dt":langevin_dt, "nbar":langevin_nbar,
-        "structure_function":sf_average}
+        "dt":langevin_dt, "nbar":langevin_nbar, "n_samples":sf.get_n_samples(),
+        "structure_function":sf_average, "structure_function_variance":sf_variance,
+        "k":k, "structure_function_k":np.array(sf_k)*sf_scale - 1.0/(2*pc.get_chi_n()),
+        "structure_function_k_variance":np.array(sf_k_variance)*sf_scale**2, "n_modes":n_modes}
         savemat( "structure_function_%06d.mat" % (langevin_step), mdic)
-        sf_average[:,:,:] = 0.0
+        sf.reset()
 
-    # write density and field data
+    # write density and field data, in the background thread of the writer
     if langevin_step % 100 == 0:
-        mdic = {"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(),
-            "N":pc.get_n_segment(), "f":pc.get_f(), "chi_n":pc.get_chi_n(), "epsilon":pc.get_epsilon(),
-            "chain_model":pc.get_model_name(), "nbar":langevin_nbar,
-            "random_generator":np.random.RandomState().get_state()[0],
-            "random_seed":np.random.RandomState().get_state()[1],
-            "w_plus":w_plus, "w_minus":w_minus, "phi_a":phi_a, "phi_b":phi_b}
-        savemat( "fields_%06d.mat" % (langevin_step), mdic)
+        writer.write(langevin_step, w_plus=w_plus, w_minus=w_minus, phi_a=phi_a, phi_b=phi_b)
+
+# wait for the pending frames
+writer.close()
 
 # estimate execution time
 time_duration = time.time() - time_start
@@ -0,0 +1,39 @@
+# Independent Langevin FTS trajectories of lamellar phase with different
+# random seeds, run concurrently on one node. The cores are partitioned among
+# the trajectories, and the time averages of the observables are gathered
+# with their standard errors into a single file.
+
+import time
+import numpy as np
+from ensemble_runner import *
+
+# the worker processes import this file again
+if __name__ == "__main__":
+    # -------------- simulation parameters ------------
+    params = {
+        # Simulation Box
+        "nx":[32, 32, 32], "lx":[8.0, 8.0, 8.0],
+        # Polymer Chain
+        "f":0.5, "n_segment":16, "chi_n":20, "epsilon":1.0, "chain_model":"Continuous",
+        # Langevin Dynamics
+        "langevin_dt":0.8, "langevin_nbar":1024,
+        # Anderson Mixing
+        "saddle_tolerance":1e-4, "saddle_max_iter":100}
+    seeds = list(range(1,17))
+    langevin_max_step = 2000
+    sample_interval = 10
+
+    #------------------ run ----------------------
+    print("---------- Run ----------")
+    time_start = time.time()
+    runner = EnsembleRunner(params, seeds, langevin_max_step, sample_interval)
+    print("Core groups: ", runner.core_groups)
+    results = runner.run()
+    for name in DEFAULT_OBSERVABLES:
+        print("%s: %f +- %f" % (name, results[name + "_mean"], results[name + "_error"]))
+    runner.save("ensemble.mat")
+
+    # estimate execution time
+    time_duration = time.time() - time_start
+    print("total time: %f, time per step and trajectory: %f" %
+        (time_duration, time_duration/langevin_max_step/len(seeds)) )
@@ -10,40 +10,11 @@ import os
 import time
 import pathlib
 import numpy as np
-import scipy.special as sp
-from scipy.io import loadmat, savemat
 from langevinfts import *
 from find_saddle_point import *
-
-def renormal_psum(lx, nx, n_segment, nbar, summax=100):
-
-    # cell volume * rho_0
-    dx = np.array(lx)/np.array(nx)
-    dv = np.prod(dx)
-    vcellrho = n_segment*np.sqrt(nbar)*dv
-
-    # z_infinity
-    sum_p_i = 0.0
-    prod_alpha = lambda i, dx, n_segment: \
-        dx*np.sqrt(3*n_segment/(2*np.pi*i))*sp.erf(np.pi/dx*np.sqrt(i/6/n_segment))
-    prod_alpha_array = np.zeros(summax)
-    for i in range(0,summax):
-        prod_alpha_array[i] = prod_alpha(i+1,lx[0]/nx[0],n_segment) \
-                               *prod_alpha(i+1,lx[1]/nx[1],n_segment) \
-                               *prod_alpha(i+1,lx[2]/nx[2],n_segment)
-        sum_p_i += prod_alpha_array[i]
-    sum_p_i += np.power(3*n_segment/(2*np.pi),1.5)*dv*2/np.sqrt(0.5+summax)
-    z_inf = 1-(1+2*sum_p_i)/vcellrho
-    
-    # d(z_infinity)/dl
-    sum_p_i = np.array([0.0, 0.0, 0.0])
-    for i in range(0,summax):
-        for n in range(0,3):
-            sum_p_i[n] += np.exp(-(i+1)*np.pi**2/(6*dx[n]**2*n_segment)) \
-                *prod_alpha_array[i]/prod_alpha(i+1,dx[n],n_segment)
-    dz_inf_dl = (1+2*sum_p_i)/vcellrho/np.array(lx)
-    
-    return z_inf, dz_inf_dl
+from renormalization import *
+from box_altering_move import *
+from field_io import *
 
 # -------------- simulation parameters ------------
 # Cuda environment variables
@@ -57,7 +28,7 @@ os.environ["OMP_MAX_ACTIVE_LEVELS"] = "2"  # 0, 1 or 2
 verbose_level = 1  # 1 : print at each langevin step.
                    # 2 : print at each saddle point iteration.
 
-input_data = loadmat("LamellarInput.mat", squeeze_me=True)
+input_data = load_fields("LamellarInput.lfts")
 
 # Simulation Box
 nx = [40, 40, 40]
@@ -94,7 +65,8 @@ print("platform :", platform)
 factory = PlatformSelector.create_factory(platform)
 
 # calculate bare chi_n
-z_inf, dz_inf_dl = renormal_psum(lx, nx, n_segment, langevin_nbar)
+renormal = get_renormalization(nx, n_segment, langevin_nbar, chain_model, f)
+z_inf, dz_inf_dl = renormal.get_z_inf(lx)
 chi_n = effective_chi_n/z_inf
 
 # create instances
@@ -145,20 +117,15 @@ phi_a, phi_b, _ = find_saddle_point(pc, sb, pseudo, am,
     q1_init, q2_init, w_plus, w_minus,
     saddle_max_iter, saddle_tolerance, verbose_level)
 
-# for box move
-init_lx = sb.get_lx()
-box_lambda = 1.0
+# box move, volume conserving
+box_move = BoxAlteringMove(sb, pc, pseudo, renormal, effective_chi_n,
+    mode="volume", step_size=0.01)
 #------------------ run ----------------------
 print("---------- Run ----------")
 time_start = time.time()
 print("iteration, mass error, total_partition, energy_total, error_level")
 for langevin_step in range(1, langevin_max_step+1):
 
-    # calculate bare chi_n
-    z_inf, dz_inf_dl = renormal_psum(sb.get_lx(), sb.get_nx(), pc.get_n_segment(), langevin_nbar)
-    chi_n = effective_chi_n/z_inf
-    pc.set_chi_n(chi_n)
-
     print("langevin step: ", langevin_step)
     # update w_minus: predict step
     w_minus_copy = w_minus.copy()
@@ -174,7 +141,7 @@ for langevin_step in range(1, langevin_max_step+1):
     w_minus = w_minus_copy - 0.5*(lambda1+lambda2)*langevin_dt + normal_noise
     phi_a, phi_b, Q = find_saddle_point(pc, sb, pseudo, am,
         q1_init, q2_init, w_plus, w_minus,
-        saddle_max_iter, saddle_tolerance, verbose_level)
+        saddle_max_iter, saddle_tolerance, verbose_level, is_stress_caching=True)
 
     # write density and field data
     if langevin_step % 100 == 0:
@@ -184,24 +151,13 @@ for langevin_step in range(1, langevin_max_step+1):
             "random_generator":np.random.RandomState().get_state()[0],
             "random_seed":np.random.RandomState().get_state()[1],
             "w_plus":w_plus, "w_minus":w_minus, "phi_a":phi_a, "phi_b":phi_b}
-        savemat( "fields_%06d.mat" % (langevin_step), mdic)
+        save_fields("fields_%06d.lfts" % (langevin_step), mdic)
         
-    # caculate stress
-    dlogQ_dl = np.array(pseudo.dq_dl())/Q
-    dfield_dchin = 1/4 - sb.inner_product(w_minus,w_minus)/pc.get_chi_n()**2/sb.get_volume()
-    dfield_dl = -dfield_dchin*pc.get_chi_n()/z_inf*dz_inf_dl
-    dH_dl = -dlogQ_dl + dfield_dl
-    #print(-dlogQ_dl, dfield_dl)
-
-    # box move
-    box_lambda = box_lambda - 0.01*(dH_dl[0]*sb.get_lx(0)-dH_dl[1]*sb.get_lx(1)/2-dH_dl[2]*sb.get_lx(2)/2)/box_lambda
-    new_lx = np.array([init_lx[0]*box_lambda, init_lx[1]/np.sqrt(box_lambda), init_lx[2]/np.sqrt(box_lambda)])
+    # box move using the stress of the last saddle point iteration, which is
+    # cached by its find_phi() (is_stress_caching=True of the correct step),
+    # and update bond parameters and chi_n using new lx
+    new_lx = box_move.move(w_minus, Q)
     print("new Lx:", new_lx)
-    
-    # change box size
-    sb.set_lx(new_lx)
-    # update bond parameters using new lx
-    pseudo.update()
 
 # estimate execution time
 time_duration = time.time() - time_start
@@ -0,0 +1,77 @@
+# Parallel tempering of lamellar phase near the ODT.
+# Replicas at different chi_n run concurrently, and their chi_n are swapped.
+# For test purpose, this program stops after 1000 Langevin steps.
+
+import os
+import time
+import numpy as np
+
+# -------------- simulation parameters ------------
+n_replicas = 4
+
+# OpenMP environment variables, the cores are shared by the replicas
+os.environ["OMP_STACKSIZE"] = "1G"
+os.environ["MKL_NUM_THREADS"] = "1"  # always 1
+os.environ["OMP_MAX_ACTIVE_LEVELS"] = "1"
+os.environ["OMP_NUM_THREADS"] = str(max(1, os.cpu_count()//n_replicas))
+
+from langevinfts import *
+from langevin_replica import *
+from parallel_tempering import *
+from field_io import *
+
+# Simulation Box
+nx = [32, 32, 32]
+lx = [8.0, 8.0, 8.0]
+
+# Polymer Chain
+f = 0.5
+n_segment = 16
+chi_n_list = [17.0, 17.5, 18.0, 18.5]
+epsilon = 1.0
+chain_model = "Continuous"
+
+# Langevin Dynamics
+langevin_dt = 0.8
+langevin_nbar = 1024
+langevin_max_step = 1000
+swap_interval = 10
+
+# -------------- initialize ------------
+# choose platform among [cuda, cpu-mkl]
+if "cuda" in PlatformSelector.avail_platforms():
+    platform = "cuda"
+else:
+    platform = PlatformSelector.avail_platforms()[0]
+print("platform :", platform)
+factory = PlatformSelector.create_factory(platform)
+
+# one replica per chi_n, with different random seeds
+replicas = [LangevinReplica(factory, nx, lx, f, n_segment, chi_n, chain_model, epsilon,
+    langevin_dt=langevin_dt, langevin_nbar=langevin_nbar, seed=i)
+    for i, chi_n in enumerate(chi_n_list)]
+pt = ParallelTempering(replicas, chi_n_list, swap_interval)
+
+# write the fields at each chi_n
+def write_fields(pt, langevin_step):
+    print("langevin step: ", langevin_step, "chi_n of replicas: ", pt.get_chi_n_of_replicas())
+    if langevin_step % 500 == 0:
+        for k, chi_n in enumerate(pt.chi_n_list):
+            replica = pt.replicas[pt.replica_of_label[k]]
+            mdic = {"dim":replica.sb.get_dim(), "nx":replica.sb.get_nx(), "lx":replica.sb.get_lx(),
+                "N":replica.pc.get_n_segment(), "f":replica.pc.get_f(), "chi_n":chi_n,
+                "epsilon":replica.pc.get_epsilon(), "chain_model":replica.pc.get_model_name(),
+                "nbar":langevin_nbar, "w_plus":replica.w_plus, "w_minus":replica.w_minus,
+                "phi_a":replica.phi_a, "phi_b":replica.phi_b}
+            save_fields("fields_chin%d_%06d.lfts" % (k, langevin_step), mdic)
+
+#------------------ run ----------------------
+print("---------- Run ----------")
+time_start = time.time()
+pt.run(langevin_max_step, write_fields)
+pt.print_acceptance_rates()
+
+# estimate execution time
+time_duration = time.time() - time_start
+print("total time: %f, time per step: %f" %
+    (time_duration, time_duration/langevin_max_step) )
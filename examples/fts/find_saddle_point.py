@@ -3,18 +3,33 @@ from langevinfts import *
 
 def find_saddle_point(pc, sb, pseudo, am, 
     q1_init, q2_init, w_plus, w_minus, 
-    saddle_max_iter, saddle_tolerance, verbose_level):
+    saddle_max_iter, saddle_tolerance, verbose_level, is_stress_caching=False):
+
+    # is_stress_caching : if True, find_phi() keeps the Fourier transforms of the
+    # propagators in the iteration that is expected to be the last one, so that
+    # dq_dl() after the saddle point iteration needs no FFTs (discrete chain
+    # model on CPU, see Pseudo.set_stress_caching()). The last iteration is
+    # predicted from the ratio of the last two error levels, and dq_dl()
+    # computes the stress with FFTs if the prediction fails.
         
     # assign large initial value for the energy and error
     energy_total = 1e20
     error_level = 1e20
+    old_error_level = 1e20
 
     # reset Anderson mixing module
     am.reset_count()
+    # Newton-Krylov solver evaluates the residual for the given w_minus
+    if isinstance(am, NewtonKrylov):
+        am.set_w_minus(w_minus)
 
     # saddle point iteration begins here
     for saddle_iter in range(1,saddle_max_iter+1):
-        
+
+        # keep the Fourier transforms if the error level is expected to reach the tolerance
+        pseudo.set_stress_caching(is_stress_caching and
+            error_level*error_level < saddle_tolerance*old_error_level)
+
         # for the given fields find the polymer statistics
         phi_a, phi_b, Q = pseudo.find_phi(
             q1_init, q2_init,
@@ -29,7 +44,7 @@ def find_saddle_point(pc, sb, pseudo, am,
 
         # error_level measures the "relative distance" between the input and output fields
         old_error_level = error_level
-        error_level = np.sqrt(sb.inner_product(phi_plus-1.0,phi_plus-1.0)/sb.get_volume())
+        error_level = np.sqrt(sb.inner_product(g_plus,g_plus)/sb.get_volume())
 
         # print iteration # and error levels
         if(verbose_level == 2 or
@@ -38,13 +53,15 @@ def find_saddle_point(pc, sb, pseudo, am,
              
             # calculate the total energy
             energy_old = energy_total
+            ww_minus, int_w_plus, int_phi_plus = sb.reduce_many(
+                [w_minus, w_plus, phi_plus], [(0,0), (1,), (2,)])
             energy_total  = -np.log(Q/sb.get_volume())
-            energy_total += sb.inner_product(w_minus,w_minus)/pc.get_chi_n()/sb.get_volume()
+            energy_total += ww_minus/pc.get_chi_n()/sb.get_volume()
             energy_total += pc.get_chi_n()/4
-            energy_total -= sb.integral(w_plus)/sb.get_volume()
+            energy_total -= int_w_plus/sb.get_volume()
 
             # check the mass conservation
-            mass_error = sb.integral(phi_plus)/sb.get_volume() - 1.0
+            mass_error = int_phi_plus/sb.get_volume() - 1.0
             print("%8d %12.3E %15.7E %15.9f %15.7E" %
                 (saddle_iter, mass_error, Q, energy_total, error_level))
         # conditions to end the iteration
@@ -1,9 +1,10 @@
 import os
 import numpy as np
 import time
-from scipy.io import loadmat, savemat
-from scipy.ndimage.filters import gaussian_filter
 from langevinfts import *
+from field_io import *
+from initial_fields import *
+from space_group import *
 from find_saddle_point import *
 
 # -------------- initialize ------------
@@ -26,8 +27,11 @@ nx = [64,64,64]   # grid numbers
 lx = [4.,4.,4.]   # as aN^(1/2) unit, a = sqrt(f*a_A^2 + (1-f)*a_B^2)
 chain_model = "Continuous"    # choose among [Continuous, Discrete]
 
+# Space group symmetry, fields are symmetrized and Anderson mixing is performed on the reduced basis
+space_group = SpaceGroup(nx, "Pm-3n")
+
 # Anderson mixing
-am_n_var = 2*np.prod(nx)+len(lx)  # w_a (w[0]) and w_b (w[1]) + lx
+am_n_var = 2*space_group.get_n_reduced_basis()+len(lx)  # w_a (w[0]) and w_b (w[1]) + lx
 am_max_hist= 20                   # maximum number of history
 am_start_error = 1e-2             # when switch to AM from simple mixing
 am_mix_min = 0.1                  # minimum mixing rate of simple mixing
@@ -62,21 +66,13 @@ print("Volume: %f" % (sb.get_volume()) )
 #-------------- allocate array ------------
 # free end initial condition. q1 is q and q2 is qdagger.
 # q1 starts from A end and q2 starts from B end.
-w       = np.zeros([2]+list(sb.get_nx()), dtype=np.float64)
 w_out   = np.zeros([2, sb.get_n_grid()],  dtype=np.float64)
 q1_init = np.ones (    sb.get_n_grid(),   dtype=np.float64)
 q2_init = np.ones (    sb.get_n_grid(),   dtype=np.float64)
 
 # Initial Fields
 print("w_A and w_B are initialized to A15 phase.")
-sphere_positions = [[0,0,0],[1/2,1/2,1/2],
-[1/4,1/2,0],[3/4,1/2,0],[1/2,0,1/4],[1/2,0,3/4],[0,1/4,1/2],[0,3/4,1/2]]
-
-for x,y,z in sphere_positions:
-    mx, my, mz = np.round((np.array([x, y, z])*sb.get_nx())).astype(np.int32)
-    w[0,mx,my,mz] = -1/np.prod(sb.get_dx())
-w[0] = gaussian_filter(w[0], sigma=np.min(sb.get_nx())/15, mode='wrap')
-w = np.reshape(w, [2, sb.get_n_grid()])
+w = np.array([a15(sb), np.zeros(sb.get_n_grid())])
 
 # keep the level of field value
 sb.zero_mean(w[0])
@@ -86,8 +82,8 @@ sb.zero_mean(w[1])
 print("---------- Run ----------")
 time_start = time.time()
 
-phi_a, phi_b, Q, energy_total = find_saddle_point(pc, sb, pseudo, am, lx,
-    q1_init, q2_init, w, max_scft_iter, tolerance, is_box_altering=True)
+phi_a, phi_b, Q, energy_total, _, _ = find_saddle_point(pc, sb, pseudo, am, lx,
+    q1_init, q2_init, w, max_scft_iter, tolerance, is_box_altering=True, space_group=space_group)
 
 # estimate execution time
 time_duration = time.time() - time_start
@@ -97,4 +93,4 @@ print("total time: %f " % time_duration)
 mdic = {"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(),
         "N":pc.get_n_segment(), "f":pc.get_f(), "chi_n":pc.get_chi_n(), "epsilon":pc.get_epsilon(),
         "chain_model":chain_model, "w_a":w[0], "w_b":w[1], "phi_a":phi_a, "phi_b":phi_b}
-savemat("fields.mat", mdic)
\ No newline at end of file
+save_fields("fields.lfts", mdic)
\ No newline at end of file
@@ -3,10 +3,10 @@
 import os
 import numpy as np
 import time
-from scipy.io import savemat
-from scipy.ndimage.filters import gaussian_filter
 from langevinfts import *
-from find_saddle_point import *
+from field_io import *
+from initial_fields import *
+from dimension_reduction import *
 
 # -------------- initialize ------------
 
@@ -63,22 +63,13 @@ print("Volume: %f" % (sb.get_volume()) )
 #-------------- allocate array ------------
 # free end initial condition. q1 is q and q2 is qdagger.
 # q1 starts from A end and q2 starts from B end.
-w       = np.zeros([2]+list(sb.get_nx()), dtype=np.float64)
 q1_init = np.ones (    sb.get_n_grid(),   dtype=np.float64)
 q2_init = np.ones (    sb.get_n_grid(),   dtype=np.float64)
 
 # Initial Fields
 print("w_A and w_B are initialized to cylindrical phase.")
-cylinder_positions = [
-[0.0,0.0],[0.0,1/3],[0.0,2/3],
-[1/2,0.0],[1/2,1/3],[1/2,2/3],
-[1/4,1/6],[1/4,3/6],[1/4,5/6],
-[3/4,1/6],[3/4,3/6],[3/4,5/6]]
-for y,z in cylinder_positions:
-    _, my, mz = np.round((np.array([0, y, z])*sb.get_nx())).astype(np.int32)
-    w[0,:,my,mz] = -1/np.prod(sb.get_dx())
-w[0] = gaussian_filter(w[0], sigma=np.min(sb.get_nx())/15, mode='wrap')
-w = np.reshape(w, [2, sb.get_n_grid()])
+# 2x3 rectangular cells of the hexagonal lattice in the y-z plane
+w = np.array([cylinder_hexagonal(sb, n_cells=[2,3]), np.zeros(sb.get_n_grid())])
 
 # keep the level of field value
 sb.zero_mean(w[0])
@@ -88,8 +79,13 @@ sb.zero_mean(w[1])
 print("---------- Run ----------")
 time_start = time.time()
 
-phi_a, phi_b, Q, energy_total = find_saddle_point(pc, sb, pseudo, am, lx,
-    q1_init, q2_init, w, max_scft_iter, tolerance, is_box_altering=True)
+# the fields are uniform along some axes, so the saddle point is found
+# in the reduced box first, and then checked on the full grid
+phi_a, phi_b, Q, energy_total, lx, n_iters = find_saddle_point_reduced_dimension(
+    factory, pc, sb, pseudo, am, lx, q1_init, q2_init, w, max_scft_iter, tolerance,
+    is_box_altering=True, am_max_hist=am_max_hist, am_start_error=am_start_error,
+    am_mix_min=am_mix_min, am_mix_init=am_mix_init)
+print("iterations of reduced and full grids: ", n_iters)
 
 # estimate execution time
 time_duration = time.time() - time_start
@@ -99,4 +95,4 @@ print("total time: %f " % time_duration)
 mdic = {"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(),
         "N":pc.get_n_segment(), "f":pc.get_f(), "chi_n":pc.get_chi_n(), "epsilon":pc.get_epsilon(),
         "chain_model":chain_model, "w_a":w[0], "w_b":w[1], "phi_a":phi_a, "phi_b":phi_b}
-savemat("fields.mat", mdic)
\ No newline at end of file
+save_fields("fields.lfts", mdic)
\ No newline at end of file
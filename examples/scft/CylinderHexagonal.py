@@ -0,0 +1,106 @@
+# Hexagonal cylinder phase in the primitive (rhombic) unit cell.
+# The two lattice vectors have the same length and the angle between them
+# is 120 degrees, so that the cell contains one cylinder and has half of
+# the grid points of the rectangular cell with two cylinders.
+import os
+import numpy as np
+import time
+from langevinfts import *
+from field_io import *
+from grid_sequencing import iterate_saddle_point
+
+# -------------- initialize ------------
+
+# OpenMP environment variables
+os.environ["MKL_NUM_THREADS"] = "1"  # always 1
+os.environ["OMP_STACKSIZE"] = "1G"
+os.environ["OMP_MAX_ACTIVE_LEVELS"] = "2"  # 0, 1 or 2
+
+max_scft_iter = 2000
+tolerance = 1e-8
+
+# Major Simulation Parameters
+f = 0.3             # A-fraction, f
+n_segment = 50      # segment number, N
+chi_n = 20.0        # Flory-Huggins Parameters * N
+epsilon = 1.0       # a_A/a_B, conformational asymmetry
+nx = [32,32]        # grid numbers
+lx = [1.7,1.7]      # as aN^(1/2) unit, a = sqrt(f*a_A^2 + (1-f)*a_B^2)
+angles = [120.0]    # angle between the two lattice vectors in degrees
+chain_model = "Continuous" # choose among [Continuous, Discrete]
+
+# Anderson mixing
+am_n_var = 2*np.prod(nx)+len(lx)  # w_a (w[0]) and w_b (w[1]) + lx
+am_max_hist= 20                   # maximum number of history
+am_start_error = 1e-2             # when switch to AM from simple mixing
+am_mix_min = 0.1                  # minimum mixing rate of simple mixing
+am_mix_init = 0.1                 # initial mixing rate of simple mixing
+
+# choose platform among [cuda, cpu-mkl]
+if "cuda" in PlatformSelector.avail_platforms():
+    platform = "cuda"
+else:
+    platform = PlatformSelector.avail_platforms()[0]
+print("platform :", platform)
+factory = PlatformSelector.create_factory(platform)
+
+# create instances
+pc     = factory.create_polymer_chain(f, n_segment, chi_n, chain_model, epsilon)
+sb     = factory.create_simulation_box(nx, lx, angles)
+pseudo = factory.create_pseudo(sb, pc)
+am     = factory.create_anderson_mixing(am_n_var,
+            am_max_hist, am_start_error, am_mix_min, am_mix_init)
+
+# -------------- print simulation parameters ------------
+print("---------- Simulation Parameters ----------")
+print("Box Dimension: %d" % (sb.get_dim()))
+print("chi_n: %f, f: %f, N: %d" % (pc.get_chi_n(), pc.get_f(), pc.get_n_segment()) )
+print("%s chain model" % (pc.get_model_name()) )
+print("Conformational asymmetry (epsilon): %f" % (pc.get_epsilon()) )
+print("Nx: %d, %d" % (sb.get_nx(1), sb.get_nx(2)) )
+print("Lx: %f, %f" % (sb.get_lx(1), sb.get_lx(2)) )
+print("Angles: %s" % (str(sb.get_angles())) )
+print("Volume: %f" % (sb.get_volume()) )
+
+#-------------- allocate array ------------
+# free end initial condition. q1 is q and q2 is qdagger.
+# q1 starts from A end and q2 starts from B end.
+q1_init = np.ones(sb.get_n_grid(), dtype=np.float64)
+q2_init = np.ones(sb.get_n_grid(), dtype=np.float64)
+
+# Initial Fields
+print("w_A and w_B are initialized to a cylinder at the origin.")
+# Cartesian distance from the cylinder, including the periodic images
+gamma = np.radians(angles[0])
+a1 = np.array([lx[0], 0.0])
+a2 = np.array([lx[1]*np.cos(gamma), lx[1]*np.sin(gamma)])
+x1, x2 = np.meshgrid(np.arange(nx[0])/nx[0], np.arange(nx[1])/nx[1], indexing='ij')
+w_a = np.zeros(nx, dtype=np.float64)
+for s1 in [-1,0,1]:
+    for s2 in [-1,0,1]:
+        r = np.outer((x1+s1).ravel(), a1) + np.outer((x2+s2).ravel(), a2)
+        w_a -= np.reshape(np.exp(-np.sum(r**2, axis=1)/0.1), nx)
+w = np.array([np.reshape(w_a, -1), -np.reshape(w_a, -1)])
+
+# keep the level of field value
+sb.zero_mean(w[0])
+sb.zero_mean(w[1])
+
+#------------------ run ----------------------
+print("---------- Run ----------")
+print("iteration, mass error, total_partition, energy_total, error_level")
+time_start = time.time()
+
+# the angle is fixed, and the two lengths are determined by the stress
+phi_a, phi_b, Q, energy_total, lx, n_iter, _ = iterate_saddle_point(pc, sb, pseudo, am, lx,
+    q1_init, q2_init, w, max_scft_iter, tolerance, is_box_altering=True)
+
+# estimate execution time
+time_duration = time.time() - time_start
+print("total time: %f, time per step: %f" % (time_duration, time_duration/n_iter) )
+
+# save final results
+mdic = {"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(), "angles":sb.get_angles(),
+        "N":pc.get_n_segment(), "f":pc.get_f(), "chi_n":pc.get_chi_n(), "epsilon":pc.get_epsilon(),
+        "chain_model":chain_model, "w_a":w[0], "w_b":w[1], "phi_a":phi_a, "phi_b":phi_b}
+save_fields("fields.lfts", mdic)
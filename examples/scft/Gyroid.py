@@ -3,8 +3,11 @@
 import os
 import numpy as np
 import time
-from scipy.io import savemat
 from langevinfts import *
+from field_io import *
+from initial_fields import *
+from space_group import *
+from solution_cache import *
 from find_saddle_point import *
 
 # -------------- initialize ------------
@@ -26,8 +29,11 @@ nx = [32,32,32]     # grid numbers
 lx = [3.3,3.3,3.3]  # as aN^(1/2) unit, a = sqrt(f*a_A^2 + (1-f)*a_B^2)
 chain_model = "Continuous" # choose among [Continuous, Discrete]
 
+# Space group symmetry, fields are symmetrized and Anderson mixing is performed on the reduced basis
+space_group = SpaceGroup(nx, "Ia-3d")
+
 # Anderson mixing
-am_n_var = 2*np.prod(nx)+len(lx)  # w_a (w[0]) and w_b (w[1]) + lx
+am_n_var = 2*space_group.get_n_reduced_basis()+len(lx)  # w_a (w[0]) and w_b (w[1]) + lx
 am_max_hist= 20                   # maximum number of history
 am_start_error = 1e-2             # when switch to AM from simple mixing
 am_mix_min = 0.1                  # minimum mixing rate of simple mixing
@@ -62,28 +68,25 @@ print("Volume: %f" % (sb.get_volume()) )
 #-------------- allocate array ------------
 # free end initial condition. q1 is q and q2 is qdagger.
 # q1 starts from A end and q2 starts from B end.
-w       = np.zeros([2]+list(sb.get_nx()), dtype=np.float64)
 q1_init = np.ones (    sb.get_n_grid(),   dtype=np.float64)
 q2_init = np.ones (    sb.get_n_grid(),   dtype=np.float64)
 
 # Initial Fields
-print("w_A and w_B are initialized to gyroid phase.")
-# [Ref: https://pubs.acs.org/doi/pdf/10.1021/ma951138i]
-for i in range(0,sb.get_nx(0)):
-    xx = (i+1)*2*np.pi/sb.get_nx(0)
-    for j in range(0,sb.get_nx(1)):
-        yy = (j+1)*2*np.pi/sb.get_nx(1)
-        for k in range(0,sb.get_nx(2)):
-            zz = (k+1)*2*np.pi/sb.get_nx(2)
-            c1 = np.sqrt(8.0/3.0)*(np.cos(xx)*np.sin(yy)*np.sin(2.0*zz) +
-                np.cos(yy)*np.sin(zz)*np.sin(2.0*xx)+np.cos(zz)*np.sin(xx)*np.sin(2.0*yy))
-            c2 = np.sqrt(4.0/3.0)*(np.cos(2.0*xx)*np.cos(2.0*yy)+
-                np.cos(2.0*yy)*np.cos(2.0*zz)+np.cos(2.0*zz)*np.cos(2.0*xx))
-            idx = i*sb.get_nx(1)*sb.get_nx(2) + j*sb.get_nx(2) + k
-            w[0,i,j,k] = -0.3164*c1 +0.1074*c2
-            w[1,i,j,k] =  0.3164*c1 -0.1074*c2
-
-w = np.reshape(w, [2, sb.get_n_grid()])
+# start from the nearest converged solution of the previous runs, if there is one
+cache = SolutionCache("scft_cache")
+params = {"f":f, "chi_n":chi_n, "n_segment":n_segment, "epsilon":epsilon, "chain_model":chain_model}
+cached = cache.lookup("Gyroid", params, nx, max_distance=5.0)
+if cached is not None:
+    print("w_A and w_B are initialized to the cached solution of", cached["params"])
+    w = cached["w"]
+    lx = cached["lx"]
+    sb.set_lx(lx)
+    pseudo.update()
+else:
+    print("w_A and w_B are initialized to gyroid phase.")
+    # [Ref: https://pubs.acs.org/doi/pdf/10.1021/ma951138i]
+    w_a = gyroid(sb)
+    w = np.array([w_a, -w_a])
 
 # keep the level of field value
 sb.zero_mean(w[0])
@@ -93,8 +96,8 @@ sb.zero_mean(w[1])
 print("---------- Run ----------")
 time_start = time.time()
 
-phi_a, phi_b, Q, energy_total = find_saddle_point(pc, sb, pseudo, am, lx,
-    q1_init, q2_init, w, max_scft_iter, tolerance, is_box_altering=True)
+phi_a, phi_b, Q, energy_total, scft_iter, error_level = find_saddle_point(pc, sb, pseudo, am, lx,
+    q1_init, q2_init, w, max_scft_iter, tolerance, is_box_altering=True, space_group=space_group)
 
 # estimate execution time
 time_duration = time.time() - time_start
@@ -104,4 +107,7 @@ print("total time: %f " % time_duration)
 mdic = {"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(),
         "N":pc.get_n_segment(), "f":pc.get_f(), "chi_n":pc.get_chi_n(), "epsilon":pc.get_epsilon(),
         "chain_model":chain_model, "w_a":w[0], "w_b":w[1], "phi_a":phi_a, "phi_b":phi_b}
-savemat("fields.mat", mdic)
\ No newline at end of file
+save_fields("fields.lfts", mdic)
+# only the converged solutions are used as initial fields
+if error_level < tolerance:
+    cache.store("Gyroid", params, nx, sb.get_lx(), w, energy_total, n_iter=scft_iter)
\ No newline at end of file
@@ -0,0 +1,113 @@
+# For the start, change "Major Simulation Parameters", currently in lines 20-27
+# and "Initial Fields", currently in lines 70-84
+import os
+import numpy as np
+import time
+from langevinfts import *
+from field_io import *
+from grid_sequencing import *
+
+# -------------- initialize ------------
+
+# OpenMP environment variables
+os.environ["MKL_NUM_THREADS"] = "1"  # always 1
+os.environ["OMP_STACKSIZE"] = "1G"
+os.environ["OMP_MAX_ACTIVE_LEVELS"] = "2"  # 0, 1 or 2
+
+max_scft_iter = 1000
+tolerance = 1e-8
+
+# Major Simulation Parameters
+f = 0.36            # A-fraction, f
+n_segment = 100     # segment number, N
+chi_n = 20          # Flory-Huggins Parameters * N
+epsilon = 1.0       # a_A/a_B, conformational asymmetry
+nx = [64,64,64]     # grid numbers of the target grid
+lx = [3.3,3.3,3.3]  # as aN^(1/2) unit, a = sqrt(f*a_A^2 + (1-f)*a_B^2)
+chain_model = "Continuous" # choose among [Continuous, Discrete]
+
+# Anderson mixing
+am_n_var = 2*np.prod(nx)+len(lx)  # w_a (w[0]) and w_b (w[1]) + lx
+am_max_hist= 20                   # maximum number of history
+am_start_error = 1e-2             # when switch to AM from simple mixing
+am_mix_min = 0.1                  # minimum mixing rate of simple mixing
+am_mix_init = 0.1                 # initial mixing rate of simple mixing
+
+# choose platform among [cuda, cpu-mkl]
+if "cuda" in PlatformSelector.avail_platforms():
+    platform = "cuda"
+else:
+    platform = PlatformSelector.avail_platforms()[0]
+print("platform :", platform)
+factory = PlatformSelector.create_factory(platform)
+
+# create instances
+pc     = factory.create_polymer_chain(f, n_segment, chi_n, chain_model, epsilon)
+sb     = factory.create_simulation_box(nx, lx)
+pseudo = factory.create_pseudo(sb, pc)
+am     = factory.create_anderson_mixing(am_n_var,
+            am_max_hist, am_start_error, am_mix_min, am_mix_init)
+
+# -------------- print simulation parameters ------------
+print("---------- Simulation Parameters ----------")
+print("Box Dimension: %d" % (sb.get_dim()))
+print("chi_n: %f, f: %f, N: %d" % (pc.get_chi_n(), pc.get_f(), pc.get_n_segment()) )
+print("%s chain model" % (pc.get_model_name()) )
+print("Conformational asymmetry (epsilon): %f" % (pc.get_epsilon()) )
+print("Nx: %d, %d, %d" % (sb.get_nx(0), sb.get_nx(1), sb.get_nx(2)) )
+print("Lx: %f, %f, %f" % (sb.get_lx(0), sb.get_lx(1), sb.get_lx(2)) )
+print("dx: %f, %f, %f" % (sb.get_dx(0), sb.get_dx(1), sb.get_dx(2)) )
+print("Volume: %f" % (sb.get_volume()) )
+
+#-------------- allocate array ------------
+# free end initial condition. q1 is q and q2 is qdagger.
+# q1 starts from A end and q2 starts from B end.
+w       = np.zeros([2]+list(sb.get_nx()), dtype=np.float64)
+q1_init = np.ones (    sb.get_n_grid(),   dtype=np.float64)
+q2_init = np.ones (    sb.get_n_grid(),   dtype=np.float64)
+
+# Initial Fields
+print("w_A and w_B are initialized to gyroid phase.")
+# [Ref: https://pubs.acs.org/doi/pdf/10.1021/ma951138i]
+for i in range(0,sb.get_nx(0)):
+    xx = (i+1)*2*np.pi/sb.get_nx(0)
+    for j in range(0,sb.get_nx(1)):
+        yy = (j+1)*2*np.pi/sb.get_nx(1)
+        for k in range(0,sb.get_nx(2)):
+            zz = (k+1)*2*np.pi/sb.get_nx(2)
+            c1 = np.sqrt(8.0/3.0)*(np.cos(xx)*np.sin(yy)*np.sin(2.0*zz) +
+                np.cos(yy)*np.sin(zz)*np.sin(2.0*xx)+np.cos(zz)*np.sin(xx)*np.sin(2.0*yy))
+            c2 = np.sqrt(4.0/3.0)*(np.cos(2.0*xx)*np.cos(2.0*yy)+
+                np.cos(2.0*yy)*np.cos(2.0*zz)+np.cos(2.0*zz)*np.cos(2.0*xx))
+            idx = i*sb.get_nx(1)*sb.get_nx(2) + j*sb.get_nx(2) + k
+            w[0,i,j,k] = -0.3164*c1 +0.1074*c2
+            w[1,i,j,k] =  0.3164*c1 -0.1074*c2
+
+w = np.reshape(w, [2, sb.get_n_grid()])
+
+# keep the level of field value
+sb.zero_mean(w[0])
+sb.zero_mean(w[1])
+
+#------------------ run ----------------------
+print("---------- Run ----------")
+time_start = time.time()
+
+# the fields are solved on [16,16,16] and [32,32,32] grids first,
+# and then prolonged to the target grid
+phi_a, phi_b, Q, energy_total, lx, n_iters = find_saddle_point_grid_sequencing(
+    factory, pc, sb, pseudo, am, lx, q1_init, q2_init, w, max_scft_iter, tolerance,
+    is_box_altering=True, levels=grid_sequencing_levels(nx, min_nx=16),
+    am_max_hist=am_max_hist, am_start_error=am_start_error,
+    am_mix_min=am_mix_min, am_mix_init=am_mix_init)
+print("iterations of each level: ", n_iters)
+
+# estimate execution time
+time_duration = time.time() - time_start
+print("total time: %f " % time_duration)
+
+# save final results
+mdic = {"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(),
+        "N":pc.get_n_segment(), "f":pc.get_f(), "chi_n":pc.get_chi_n(), "epsilon":pc.get_epsilon(),
+        "chain_model":chain_model, "w_a":w[0], "w_b":w[1], "phi_a":phi_a, "phi_b":phi_b}
+save_fields("fields.lfts", mdic)
\ No newline at end of file
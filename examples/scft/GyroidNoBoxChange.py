@@ -3,8 +3,8 @@
 import os
 import numpy as np
 import time
-from scipy.io import savemat
 from langevinfts import *
+from field_io import *
 from find_saddle_point import *
 
 # -------------- initialize ------------
@@ -93,7 +93,7 @@ sb.zero_mean(w[1])
 print("---------- Run ----------")
 time_start = time.time()
 
-phi_a, phi_b, Q, energy_total = find_saddle_point(pc, sb, pseudo, am, lx,
+phi_a, phi_b, Q, energy_total, _, _ = find_saddle_point(pc, sb, pseudo, am, lx,
     q1_init, q2_init, w, max_scft_iter, tolerance, is_box_altering=False)
 
 # estimate execution time
@@ -104,4 +104,4 @@ print("total time: %f " % time_duration)
 mdic = {"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(),
         "N":pc.get_n_segment(), "f":pc.get_f(), "chi_n":pc.get_chi_n(), "epsilon":pc.get_epsilon(),
         "chain_model":chain_model, "w_a":w[0], "w_b":w[1], "phi_a":phi_a, "phi_b":phi_b}
-savemat("fields.mat", mdic)
\ No newline at end of file
+save_fields("fields.lfts", mdic)
\ No newline at end of file
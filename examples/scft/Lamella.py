@@ -3,9 +3,10 @@
 import os
 import numpy as np
 import time
-from scipy.io import savemat
 from langevinfts import *
-from find_saddle_point import *
+from field_io import *
+from initial_fields import *
+from dimension_reduction import *
 
 # -------------- initialize ------------
 
@@ -62,16 +63,13 @@ print("Volume: %f" % (sb.get_volume()) )
 #-------------- allocate array ------------
 # free end initial condition. q1 is q and q2 is qdagger.
 # q1 starts from A end and q2 starts from B end.
-w       = np.zeros([2]+list(sb.get_nx()), dtype=np.float64)
 q1_init = np.ones (    sb.get_n_grid(),   dtype=np.float64)
 q2_init = np.ones (    sb.get_n_grid(),   dtype=np.float64)
 
 # Initial Fields
 print("w_A and w_B are initialized to lamellar phase.")
-for i in range(0,sb.get_nx(2)):
-    w[0,:,:,i] =  np.cos(3*2*np.pi*i/sb.get_nx(2))
-    w[1,:,:,i] = -np.cos(3*2*np.pi*i/sb.get_nx(2))
-w = np.reshape(w, [2, sb.get_n_grid()])
+w_a = lamella(sb, n_periods=3)
+w = np.array([w_a, -w_a])
 
 # keep the level of field value
 sb.zero_mean(w[0])
@@ -81,8 +79,13 @@ sb.zero_mean(w[1])
 print("---------- Run ----------")
 time_start = time.time()
 
-phi_a, phi_b, Q, energy_total = find_saddle_point(pc, sb, pseudo, am, lx,
-    q1_init, q2_init, w, max_scft_iter, tolerance, is_box_altering=True)
+# the fields are uniform along some axes, so the saddle point is found
+# in the reduced box first, and then checked on the full grid
+phi_a, phi_b, Q, energy_total, lx, n_iters = find_saddle_point_reduced_dimension(
+    factory, pc, sb, pseudo, am, lx, q1_init, q2_init, w, max_scft_iter, tolerance,
+    is_box_altering=True, am_max_hist=am_max_hist, am_start_error=am_start_error,
+    am_mix_min=am_mix_min, am_mix_init=am_mix_init)
+print("iterations of reduced and full grids: ", n_iters)
 
 # estimate execution time
 time_duration = time.time() - time_start
@@ -92,4 +95,4 @@ print("total time: %f " % time_duration)
 mdic = {"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(),
         "N":pc.get_n_segment(), "f":pc.get_f(), "chi_n":pc.get_chi_n(), "epsilon":pc.get_epsilon(),
         "chain_model":chain_model, "w_a":w[0], "w_b":w[1], "phi_a":phi_a, "phi_b":phi_b}
-savemat("fields.mat", mdic)
\ No newline at end of file
+save_fields("fields.lfts", mdic)
\ No newline at end of file
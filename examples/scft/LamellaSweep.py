@@ -0,0 +1,45 @@
+# Free energy of the lamellar phase along chi_n for several f, by continuation.
+# Each f is a branch, and the branches run concurrently on groups of cores.
+import os
+import numpy as np
+import time
+from field_io import *
+from parameter_sweep import *
+
+# the worker processes import this file again
+if __name__ == "__main__":
+    # OpenMP environment variables, the numbers of threads are set by run_sweeps()
+    os.environ["OMP_STACKSIZE"] = "1G"
+
+    max_scft_iter = 1000
+    tolerance = 1e-8
+
+    # Major Simulation Parameters
+    f_list = [0.5, 0.45, 0.4]   # A-fraction of each branch
+    chi_n_path = [12.0, 30.0]   # chi_n from the first to the last point
+    n_segment = 100             # segment number, N
+    epsilon = 1.0               # a_A/a_B, conformational asymmetry
+    nx = [64]                   # grid numbers
+    lx = [4.0]                  # as aN^(1/2) unit, a = sqrt(f*a_A^2 + (1-f)*a_B^2)
+    chain_model = "Continuous"  # choose among [Continuous, Discrete]
+
+    # Initial Fields, lamella of one period
+    w_a = 5.0*np.cos(2*np.pi*np.arange(nx[0])/nx[0])
+    w_init = np.array([w_a, -w_a])
+
+    sweeps = [ParameterSweep([{"chi_n":chi_n_path[0], "f":f, "epsilon":epsilon}, {"chi_n":chi_n_path[1]}],
+        n_segment, chain_model, nx, lx, w_init, max_iter=max_scft_iter, tolerance=tolerance,
+        label="f=%g" % (f)) for f in f_list]
+
+    #------------------ run ----------------------
+    print("---------- Run ----------")
+    time_start = time.time()
+    results = run_sweeps(sweeps)
+    print("total time: %f " % (time.time() - time_start))
+
+    # save the free energy and the box size along each branch
+    for result in results:
+        print("%s: %d points, %d iterations" % (result["label"], len(result["s"]), np.sum(result["n_iter"])))
+        save_fields("sweep_%s.lfts" % (result["label"]), {"chi_n":result["chi_n"], "f":result["f"],
+            "epsilon":result["epsilon"], "energy":result["energy"], "n_iter":result["n_iter"],
+            "lx":result["lx"], "w":result["w"], "completed":result["completed"]})
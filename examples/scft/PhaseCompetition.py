@@ -0,0 +1,35 @@
+# Free energies of the candidate phases at one set of parameters.
+# The candidates run concurrently on groups of cores, and those whose energy is
+# clearly above the lowest converged energy are abandoned.
+import os
+import numpy as np
+from phase_competition import *
+
+# the worker processes import this file again
+if __name__ == "__main__":
+    # OpenMP environment variables, the numbers of threads are set by PhaseCompetition
+    os.environ["OMP_STACKSIZE"] = "1G"
+
+    # Major Simulation Parameters
+    params = {
+        "f":0.3,                    # A-fraction, f
+        "n_segment":100,            # segment number, N
+        "chi_n":25.0,               # Flory-Huggins Parameters * N
+        "epsilon":1.0,              # a_A/a_B, conformational asymmetry
+        "chain_model":"Continuous", # choose among [Continuous, Discrete]
+        "max_iter":2000,
+        "tolerance":1e-8}
+
+    # candidates, the likely winners first
+    candidates = [
+        {"label":"Cylinder", "nx":[48,28],    "lx":[np.sqrt(3)*3.7,3.7], "initial_field":"cylinder_hexagonal"},
+        {"label":"BCC",      "nx":[32,32,32], "lx":[3.3,3.3,3.3],       "initial_field":"sphere_bcc"},
+        {"label":"A15",      "nx":[32,32,32], "lx":[4.0,4.0,4.0],       "initial_field":"a15"},
+        {"label":"Sigma",    "nx":[64,64,32], "lx":[7.0,7.0,4.0],       "initial_field":"sigma_phase"},
+        {"label":"Gyroid",   "nx":[32,32,32], "lx":[3.8,3.8,3.8],       "initial_field":"gyroid"},
+        {"label":"Lamella",  "nx":[64],       "lx":[3.5],               "initial_field":"lamella"}]
+
+    #------------------ run ----------------------
+    competition = PhaseCompetition(params, candidates)
+    results = competition.run()
+    competition.report()
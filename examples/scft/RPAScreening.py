@@ -0,0 +1,37 @@
+# Screening of (f, chi_n, epsilon) by RPA before SCFT runs.
+# The spinodal chi_n and k* are computed for the whole grid at once, and the
+# ordered points are given a mean-field phase and the size of its unit cell,
+# which are used as the initial box of the SCFT examples.
+import numpy as np
+import time
+from field_io import *
+from rpa import *
+
+# Major Simulation Parameters
+n_segment = 100             # segment number, N
+chain_model = "Discrete"    # choose among [Continuous, Discrete]
+f = np.arange(5, 96)/n_segment          # A-fraction, f (N*f must be an integer)
+chi_n = np.linspace(5.0, 60.0, 56)      # Flory-Huggins Parameters * N
+epsilon = np.array([1.0, 1.5, 2.0])     # a_A/a_B, conformational asymmetry
+
+# the grid of [epsilon, chi_n, f]
+f_grid = f[None,None,:]
+chi_n_grid = chi_n[None,:,None]
+epsilon_grid = epsilon[:,None,None]
+
+time_start = time.time()
+chi_n_s, k_star = spinodal(f_grid, epsilon_grid, n_segment, chain_model)
+phase = estimate_phase(f_grid, chi_n_grid, epsilon_grid, n_segment, chain_model)
+print("%d points, time: %f" % (phase.size, time.time() - time_start))
+
+for label in ["Disordered", "BCC", "Cylinder", "Gyroid", "Lamella"]:
+    print("%-10s: %6d points" % (label, np.sum(phase == label)))
+
+# the spinodal and the initial box of a point
+i, j = 1, 15
+print("f: %f, epsilon: %f, chi_n_s: %f, k*: %f" % (f[j], epsilon[i], chi_n_s[i,0,j], k_star[i,0,j]))
+for label in ["BCC", "Cylinder", "Gyroid", "Lamella"]:
+    print("%-10s unit cell size: %f" % (label, unit_cell_size(label, k_star[i,0,j])))
+
+save_fields("rpa_screening.lfts", {"f":f, "chi_n":chi_n, "epsilon":epsilon,
+    "chi_n_s":chi_n_s[:,0,:], "k_star":k_star[:,0,:], "n_segment":n_segment, "chain_model":chain_model})
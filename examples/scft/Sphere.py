@@ -3,9 +3,9 @@
 import os
 import numpy as np
 import time
-from scipy.io import savemat
-from scipy.ndimage.filters import gaussian_filter
 from langevinfts import *
+from field_io import *
+from initial_fields import *
 from find_saddle_point import *
 
 # -------------- initialize ------------
@@ -63,24 +63,13 @@ print("Volume: %f" % (sb.get_volume()) )
 #-------------- allocate array ------------
 # free end initial condition. q1 is q and q2 is qdagger.
 # q1 starts from A end and q2 starts from B end.
-w       = np.zeros([2]+list(sb.get_nx()), dtype=np.float64)
 q1_init = np.ones (    sb.get_n_grid(),   dtype=np.float64)
 q2_init = np.ones (    sb.get_n_grid(),   dtype=np.float64)
 
 # Initial Fields
-print("w_A and w_B are initialized to cylindrical phase.")
+print("w_A and w_B are initialized to BCC phase.")
 n_unitcell = 3 # number of unit cell for each direction. the number of total unit cells is n_unitcell^3
-sphere_positions = []
-for i in range(0,n_unitcell):
-    for j in range(0,n_unitcell):
-        for k in range(0,n_unitcell):
-            sphere_positions.append([i/n_unitcell,j/n_unitcell,k/n_unitcell])
-            sphere_positions.append([(i+1/2)/n_unitcell,(j+1/2)/n_unitcell,(k+1/2)/n_unitcell])
-for x,y,z in sphere_positions:
-    mx, my, mz = np.round((np.array([x, y, z])*sb.get_nx())).astype(np.int32)
-    w[0,mx,my,mz] = -1/np.prod(sb.get_dx())
-w[0] = gaussian_filter(w[0], sigma=np.min(sb.get_nx())/15, mode='wrap')
-w = np.reshape(w, [2, sb.get_n_grid()])
+w = np.array([sphere_bcc(sb, n_cells=n_unitcell), np.zeros(sb.get_n_grid())])
 
 # keep the level of field value
 sb.zero_mean(w[0])
@@ -90,7 +79,7 @@ sb.zero_mean(w[1])
 print("---------- Run ----------")
 time_start = time.time()
 
-phi_a, phi_b, Q, energy_total = find_saddle_point(pc, sb, pseudo, am, lx,
+phi_a, phi_b, Q, energy_total, _, _ = find_saddle_point(pc, sb, pseudo, am, lx,
     q1_init, q2_init, w, max_scft_iter, tolerance, is_box_altering=True)
 
 # estimate execution time
@@ -101,4 +90,4 @@ print("total time: %f " % time_duration)
 mdic = {"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(),
         "N":pc.get_n_segment(), "f":pc.get_f(), "chi_n":pc.get_chi_n(), "epsilon":pc.get_epsilon(),
         "chain_model":chain_model, "w_a":w[0], "w_b":w[1], "phi_a":phi_a, "phi_b":phi_b}
-savemat("fields.mat", mdic)
\ No newline at end of file
+save_fields("fields.lfts", mdic)
\ No newline at end of file
@@ -3,7 +3,12 @@ import numpy as np
 from langevinfts import *
 
 def find_saddle_point(pc, sb, pseudo, am, lx,
-    q1_init, q2_init, w, max_iter, tolerance, is_box_altering=True):
+    q1_init, q2_init, w, max_iter, tolerance, is_box_altering=True, space_group=None):
+
+    # space_group : SpaceGroup instance (optional). If it is given, the fields are
+    # symmetrized, and Anderson mixing is performed on the reduced basis, i.e.,
+    # 'n_var' of Anderson mixing must be 2*space_group.get_n_reduced_basis() (+dim).
+    # The iteration is converged if the returned error_level is less than tolerance.
 
     # assign large initial value for the energy and error
     energy_total = 1.0e20
@@ -12,6 +17,11 @@ def find_saddle_point(pc, sb, pseudo, am, lx,
     # reset Anderson mixing module
     am.reset_count()
 
+    # remove the symmetry-breaking components of the initial fields
+    if space_group is not None:
+        w[0] = space_group.symmetrize(w[0])
+        w[1] = space_group.symmetrize(w[1])
+
     # array for output fields
     w_out = np.zeros([2, sb.get_n_grid()], dtype=np.float64)
 
@@ -23,14 +33,9 @@ def find_saddle_point(pc, sb, pseudo, am, lx,
     for scft_iter in range(1,max_iter+1):
         # for the given fields find the polymer statistics
         phi_a, phi_b, Q = pseudo.find_phi(q1_init,q2_init,w[0],w[1])
-
-        # calculate the total energy
-        w_minus = (w[0]-w[1])/2
-        w_plus  = (w[0]+w[1])/2
-
-        energy_total  = -np.log(Q/sb.get_volume())
-        energy_total += sb.inner_product(w_minus,w_minus)/pc.get_chi_n()/sb.get_volume()
-        energy_total -= sb.integral(w_plus)/sb.get_volume()
+        if space_group is not None:
+            phi_a = space_group.symmetrize(phi_a)
+            phi_b = space_group.symmetrize(phi_b)
 
         # calculate pressure field for the new field calculation, the method is modified from Fredrickson's
         xi = 0.5*(w[0]+w[1]-pc.get_chi_n())
@@ -44,11 +49,21 @@ def find_saddle_point(pc, sb, pseudo, am, lx,
         # error_level measures the "relative distance" between the input and output fields
         old_error_level = error_level
         w_diff = w_out - w
-        multi_dot = sb.inner_product(w_diff[0],w_diff[0]) + sb.inner_product(w_diff[1],w_diff[1])
-        multi_dot /= sb.inner_product(w[0],w[0]) + sb.inner_product(w[1],w[1]) + 1.0
+
+        # integrals for the energy, error level and mass error in one pass over the fields
+        ww_aa, ww_bb, ww_ab, int_w_a, int_w_b, diff_aa, diff_bb, int_phi_a, int_phi_b = sb.reduce_many(
+            [w[0], w[1], w_diff[0], w_diff[1], phi_a, phi_b],
+            [(0,0), (1,1), (0,1), (0,), (1,), (2,2), (3,3), (4,), (5,)])
+
+        # calculate the total energy, w_minus = (w_a-w_b)/2 and w_plus = (w_a+w_b)/2
+        energy_total  = -np.log(Q/sb.get_volume())
+        energy_total += (ww_aa - 2*ww_ab + ww_bb)/4/pc.get_chi_n()/sb.get_volume()
+        energy_total -= (int_w_a + int_w_b)/2/sb.get_volume()
+
+        multi_dot = (diff_aa + diff_bb)/(ww_aa + ww_bb + 1.0)
 
         # print iteration # and error levels and check the mass conservation
-        mass_error = (sb.integral(phi_a) + sb.integral(phi_b))/sb.get_volume() - 1.0
+        mass_error = (int_phi_a + int_phi_b)/sb.get_volume() - 1.0
         error_level = np.sqrt(multi_dot)
         
         if (is_box_altering):
@@ -67,24 +82,33 @@ def find_saddle_point(pc, sb, pseudo, am, lx,
             break
 
         # calculte new fields using simple and Anderson mixing
+        if space_group is not None:
+            # Anderson mixing on the reduced basis
+            am_new  = np.concatenate([space_group.to_reduced_basis(x) for x in w])
+            am_out  = np.concatenate([space_group.to_reduced_basis(x) for x in w_out])
+            am_diff = np.concatenate([space_group.to_reduced_basis(x) for x in w_diff])
+        else:
+            am_new  = np.reshape(w,      2*sb.get_n_grid())
+            am_out  = np.reshape(w_out,  2*sb.get_n_grid())
+            am_diff = np.reshape(w_diff, 2*sb.get_n_grid())
         if (is_box_altering):
-            am_new  = np.concatenate((np.reshape(w,      2*sb.get_n_grid()), lx))
-            am_out  = np.concatenate((np.reshape(w_out,  2*sb.get_n_grid()), lx + stress_array))
-            am_diff = np.concatenate((np.reshape(w_diff, 2*sb.get_n_grid()), stress_array))
-            am.caculate_new_fields(am_new, am_out, am_diff, old_error_level, error_level)
+            am_new  = np.concatenate((am_new,  lx))
+            am_out  = np.concatenate((am_out,  lx + stress_array))
+            am_diff = np.concatenate((am_diff, stress_array))
+        am.caculate_new_fields(am_new, am_out, am_diff, old_error_level, error_level)
 
-            # set box size
+        if space_group is not None:
+            n_reduced = space_group.get_n_reduced_basis()
+            w[0] = space_group.from_reduced_basis(am_new[0:n_reduced])
+            w[1] = space_group.from_reduced_basis(am_new[n_reduced:2*n_reduced])
+        else:
             w[0] = am_new[0:sb.get_n_grid()]
             w[1] = am_new[sb.get_n_grid():2*sb.get_n_grid()]
+        if (is_box_altering):
+            # set box size
             lx = am_new[-sb.get_dim():]
             sb.set_lx(lx)
             # update bond parameters using new lx
             pseudo.update()
-        else:
-            am.caculate_new_fields(
-            np.reshape(w,      2*sb.get_n_grid()),
-            np.reshape(w_out,  2*sb.get_n_grid()),
-            np.reshape(w_diff, 2*sb.get_n_grid()),
-            old_error_level, error_level)
 
-    return phi_a, phi_b, Q, energy_total
\ No newline at end of file
+    return phi_a, phi_b, Q, energy_total, scft_iter, error_level
\ No newline at end of file
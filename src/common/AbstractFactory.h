@@ -11,6 +11,9 @@
 #include "SimulationBox.h"
 #include "Pseudo.h"
 #include "AndersonMixing.h"
+#include "NewtonKrylov.h"
+#include "SemiImplicitSeidel.h"
+#include "StructureFunction.h"
 
 // Design Pattern : Abstract Factory
 
@@ -23,13 +26,22 @@ public :
         std::string model_name, double epsilon=1.0) = 0;
     virtual SimulationBox* create_simulation_box(
         std::vector<int> nx,
-        std::vector<double> lx) = 0;
+        std::vector<double> lx,
+        std::vector<double> angles={}) = 0;
     virtual Pseudo* create_pseudo(
         SimulationBox *sb,
         PolymerChain *pc) = 0; 
     virtual AndersonMixing* create_anderson_mixing(
         int n_var, int max_hist, double start_error,
         double mix_min, double mix_init) = 0;
+    virtual NewtonKrylov* create_newton_krylov(
+        SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo,
+        int n_var, int max_hist, double start_error,
+        double mix_min, double mix_init) = 0;
+    virtual SemiImplicitSeidel* create_semi_implicit_seidel(
+        SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo) = 0;
+    virtual StructureFunction* create_structure_function(
+        SimulationBox *sb) = 0;
     virtual void display_info() = 0;
 };
 #endif
@@ -16,6 +16,18 @@ AndersonMixing::AndersonMixing(int n_var, int max_hist,
     this->mix_init = mix_init;
 }
 
+int AndersonMixing::get_n_hist()
+{
+    throw_with_line_number("Checkpointing of the history is not supported by this class");
+}
+void AndersonMixing::get_hist(double *w_out_hist, double *w_deriv_hist, double *w_deriv_dots_hist)
+{
+    throw_with_line_number("Checkpointing of the history is not supported by this class");
+}
+void AndersonMixing::set_hist(int n_hist, double *w_out_hist, double *w_deriv_hist, double *w_deriv_dots_hist)
+{
+    throw_with_line_number("Checkpointing of the history is not supported by this class");
+}
 void AndersonMixing::find_an(double **u, double *v, double *a, int n)
 {
     int i,j,k;
@@ -31,6 +31,12 @@ public:
         double *w, double *w_out, double *w_deriv,
         double old_error_level, double error_level)=0;
 
+    // history of the iteration for checkpointing, the oldest first.
+    // w_out_hist and w_deriv_hist are [n_hist][n_var], and w_deriv_dots_hist is [n_hist][max_hist+1].
+    virtual int get_n_hist();
+    virtual void get_hist(double *w_out_hist, double *w_deriv_hist, double *w_deriv_dots_hist);
+    virtual void set_hist(int n_hist, double *w_out_hist, double *w_deriv_hist, double *w_deriv_dots_hist);
+
     // Methods for pybind11
     void caculate_new_fields(py::array_t<double> w, py::array_t<double> w_out, py::array_t<double> w_deriv,
                              double old_error_level, double error_level)
@@ -47,6 +53,7 @@ public:
             if (buf_w_deriv.size != n_var)
                 throw_with_line_number("Size of input w_deriv (" + std::to_string(buf_w_deriv.size) + ") and 'n_var' (" + std::to_string(n_var) + ") must match");
 
+            py::gil_scoped_release release;
             caculate_new_fields((double *) buf_w.ptr, (double *) buf_w_out.ptr, (double *) buf_w_deriv.ptr, old_error_level, error_level);
         }
         catch(std::exception& exc)
@@ -54,6 +61,58 @@ public:
             throw_without_line_number(exc.what());
         }
     };
+    py::dict get_state()
+    {
+        try{
+            const int n_hist = get_n_hist();
+            py::array_t<double> w_out_hist({n_hist, n_var});
+            py::array_t<double> w_deriv_hist({n_hist, n_var});
+            py::array_t<double> w_deriv_dots_hist({n_hist, max_hist+1});
+            get_hist((double *) w_out_hist.request().ptr, (double *) w_deriv_hist.request().ptr,
+                     (double *) w_deriv_dots_hist.request().ptr);
 
+            py::dict state;
+            state["n_anderson"] = n_anderson;
+            state["mix"] = mix;
+            state["w_out_hist"] = w_out_hist;
+            state["w_deriv_hist"] = w_deriv_hist;
+            state["w_deriv_dots_hist"] = w_deriv_dots_hist;
+            return state;
+        }
+        catch(std::exception& exc)
+        {
+            throw_without_line_number(exc.what());
+        }
+    };
+    void set_state(py::dict state)
+    {
+        try{
+            typedef py::array_t<double, py::array::c_style | py::array::forcecast> array_type;
+            array_type w_out_hist = state["w_out_hist"].cast<array_type>();
+            array_type w_deriv_hist = state["w_deriv_hist"].cast<array_type>();
+            array_type w_deriv_dots_hist = state["w_deriv_dots_hist"].cast<array_type>();
+            py::buffer_info buf_w_out_hist = w_out_hist.request();
+            py::buffer_info buf_w_deriv_hist = w_deriv_hist.request();
+            py::buffer_info buf_w_deriv_dots_hist = w_deriv_dots_hist.request();
+
+            const int n_hist = buf_w_out_hist.size/n_var;
+            if (n_hist > max_hist+1)
+                throw_with_line_number("Number of histories (" + std::to_string(n_hist) + ") must not exceed 'max_hist+1' (" + std::to_string(max_hist+1) + ")");
+            if (buf_w_out_hist.size != n_hist*n_var)
+                throw_with_line_number("Size of input w_out_hist (" + std::to_string(buf_w_out_hist.size) + ") must be a multiple of 'n_var' (" + std::to_string(n_var) + ")");
+            if (buf_w_deriv_hist.size != n_hist*n_var)
+                throw_with_line_number("Size of input w_deriv_hist (" + std::to_string(buf_w_deriv_hist.size) + ") and 'n_hist*n_var' (" + std::to_string(n_hist*n_var) + ") must match");
+            if (buf_w_deriv_dots_hist.size != n_hist*(max_hist+1))
+                throw_with_line_number("Size of input w_deriv_dots_hist (" + std::to_string(buf_w_deriv_dots_hist.size) + ") and 'n_hist*(max_hist+1)' (" + std::to_string(n_hist*(max_hist+1)) + ") must match");
+
+            set_hist(n_hist, (double *) buf_w_out_hist.ptr, (double *) buf_w_deriv_hist.ptr, (double *) buf_w_deriv_dots_hist.ptr);
+            n_anderson = state["n_anderson"].cast<int>();
+            mix = state["mix"].cast<double>();
+        }
+        catch(std::exception& exc)
+        {
+            throw_without_line_number(exc.what());
+        }
+    };
 };
 #endif
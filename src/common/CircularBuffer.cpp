@@ -21,6 +21,10 @@ void CircularBuffer::reset()
     start = 0;
     n_items = 0;
 }
+int CircularBuffer::get_n_items()
+{
+    return n_items;
+}
 void CircularBuffer::insert(double* new_arr)
 {
     int i = (start+n_items)%length;
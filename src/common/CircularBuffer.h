@@ -20,6 +20,7 @@ public:
     CircularBuffer(int length, int width);
     ~CircularBuffer();
     void reset();
+    int get_n_items();
     void insert(double* new_arr);
     double* get_array(int n);
     double* operator[] (int n);
@@ -0,0 +1,545 @@
+#include <iostream>
+#include <algorithm>
+#include <cmath>
+#include <cfloat>
+#include "NewtonKrylov.h"
+
+NewtonKrylov::NewtonKrylov(SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo,
+    int n_var, int max_hist, double start_error, double mix_min, double mix_init)
+    :AndersonMixing(n_var, max_hist, start_error, mix_min, mix_init)
+{
+    try
+    {
+        if (sb == nullptr)
+            throw_with_line_number("SimulationBox *sb is null pointer");
+        if (pc == nullptr)
+            throw_with_line_number("PolymerChain *pc is null pointer");
+        if (pseudo == nullptr)
+            throw_with_line_number("Pseudo *pseudo is null pointer");
+
+        const int M = sb->get_n_grid();
+        const int DIM = sb->get_dim();
+
+        this->sb = sb;
+        this->pc = pc;
+        this->pseudo = pseudo;
+        this->n_complex_grid = sb->get_nx(0)*sb->get_nx(1)*(sb->get_nx(2)/2+1);
+
+        // determine the layout of the fields
+        if (n_var == M)
+        {
+            is_fts = true;
+            is_box_altering = false;
+        }
+        else if (n_var == 2*M)
+        {
+            is_fts = false;
+            is_box_altering = false;
+        }
+        else if (n_var == 2*M+DIM)
+        {
+            is_fts = false;
+            is_box_altering = true;
+        }
+        else
+        {
+            throw_with_line_number("'n_var' (" + std::to_string(n_var) + ") must be one of n_grid ("
+                + std::to_string(M) + "), 2*n_grid, or 2*n_grid+dim");
+        }
+        if (max_hist < 1)
+            throw_with_line_number("'max_hist' (" + std::to_string(max_hist) + ") must be a positive integer");
+
+        // Krylov basis and Hessenberg matrix
+        this->v_krylov = new double[(max_hist+1)*n_var];
+        this->h_nm = new double*[max_hist+1];
+        for(int i=0; i<max_hist+1; i++)
+            this->h_nm[i] = new double[max_hist];
+        this->givens_c = new double[max_hist];
+        this->givens_s = new double[max_hist];
+        this->g_n = new double[max_hist+1];
+        this->y_n = new double[max_hist];
+
+        // temporary arrays
+        this->x_0    = new double[n_var];
+        this->f_0    = new double[n_var];
+        this->x_pert = new double[n_var];
+        this->f_pert = new double[n_var];
+        this->z_temp = new double[n_var];
+        this->u_temp = new double[n_var];
+        this->delta  = new double[n_var];
+
+        this->phi_a   = new double[M];
+        this->phi_b   = new double[M];
+        this->q1_init = new double[M];
+        this->q2_init = new double[M];
+        this->w_minus = new double[M];
+        this->w_a_temp = new double[M];
+        this->w_b_temp = new double[M];
+        this->r_plus   = new double[M];
+        this->u_plus   = new double[M];
+        this->r_minus  = new double[M];
+        this->u_minus  = new double[M];
+        this->u_temp_m = new double[M];
+
+        for(int i=0; i<M; i++)
+        {
+            q1_init[i] = 1.0;
+            q2_init[i] = 1.0;
+            w_minus[i] = 0.0;
+        }
+
+        this->rpa_kernel = new double[3*n_complex_grid];
+        this->rpa_metric = {0.0, 0.0, 0.0, 0.0, 0.0, 0.0};
+        this->rpa_chi_n = 0.0;
+
+        reset_count();
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+NewtonKrylov::~NewtonKrylov()
+{
+    delete[] v_krylov;
+    for(int i=0; i<max_hist+1; i++)
+        delete[] h_nm[i];
+    delete[] h_nm;
+    delete[] givens_c;
+    delete[] givens_s;
+    delete[] g_n;
+    delete[] y_n;
+
+    delete[] x_0;
+    delete[] f_0;
+    delete[] x_pert;
+    delete[] f_pert;
+    delete[] z_temp;
+    delete[] u_temp;
+    delete[] delta;
+
+    delete[] phi_a;
+    delete[] phi_b;
+    delete[] q1_init;
+    delete[] q2_init;
+    delete[] w_minus;
+    delete[] w_a_temp;
+    delete[] w_b_temp;
+    delete[] r_plus;
+    delete[] u_plus;
+    delete[] r_minus;
+    delete[] u_minus;
+    delete[] u_temp_m;
+
+    delete[] rpa_kernel;
+}
+void NewtonKrylov::set_w_minus(double *w_minus)
+{
+    for(int i=0; i<sb->get_n_grid(); i++)
+        this->w_minus[i] = w_minus[i];
+}
+void NewtonKrylov::reset_count()
+{
+    // initialize mixing parameter
+    mix = mix_init;
+    is_newton = false;
+    is_rpa_precond = true;
+    step_length = 1.0;
+    eta = 0.1;
+}
+double NewtonKrylov::dot_product(double *a, double *b)
+{
+    double sum{0.0};
+    for(int i=0; i<n_var; i++)
+        sum += a[i]*b[i];
+    return sum;
+}
+void NewtonKrylov::update_rpa_kernel()
+{
+    try
+    {
+        const double CHI_N = pc->get_chi_n();
+        double *g_aa = new double[n_complex_grid];
+        double *g_ab = new double[n_complex_grid];
+        double *g_bb = new double[n_complex_grid];
+        double *k_pp = &rpa_kernel[0];
+        double *k_pm = &rpa_kernel[n_complex_grid];
+        double *k_mm = &rpa_kernel[2*n_complex_grid];
+
+        pseudo->get_debye_function(g_aa, g_ab, g_bb);
+
+        for(int i=0; i<n_complex_grid; i++)
+        {
+            double s_plus  = g_aa[i] + 2.0*g_ab[i] + g_bb[i];
+            double s_minus = g_aa[i] - 2.0*g_ab[i] + g_bb[i];
+            double d_ab    = g_aa[i] - g_bb[i];
+            if (is_fts)
+            {
+                // linear response of the residual, dR(k) = -S(k)*dw_plus(k)
+                k_pp[i] = -1.0/s_plus;
+            }
+            else
+            {
+                // linear response of the residual in terms of w_plus and w_minus
+                // |dR_plus |   | -chi_n*S_plus    -chi_n*D            | |dw_plus |
+                // |dR_minus| = | -chi_n*D         2 - chi_n*S_minus   | |dw_minus|
+                // The determinant changes its sign beyond the spinodal,
+                // so it is bounded away from zero to keep the preconditioner stable.
+                double det = -2.0*CHI_N*s_plus + 4.0*CHI_N*CHI_N*(g_aa[i]*g_bb[i]-g_ab[i]*g_ab[i]);
+                det = std::min(det, -0.2*CHI_N*s_plus);
+                if (CHI_N > 0.0)
+                {
+                    k_pp[i] = (2.0 - CHI_N*s_minus)/det;
+                    k_pm[i] = CHI_N*d_ab/det;
+                    k_mm[i] = -CHI_N*s_plus/det;
+                }
+                else
+                {
+                    k_pp[i] = -0.5;
+                    k_pm[i] = 0.0;
+                    k_mm[i] = 0.5;
+                }
+            }
+        }
+        // k = 0 : w_plus is determined up to a constant in L-FTS,
+        // and the mean of the residual is simply removed in SCFT.
+        if (is_fts)
+        {
+            k_pp[0] = 0.0;
+        }
+        else
+        {
+            k_pp[0] = -0.5;
+            k_pm[0] = 0.0;
+            k_mm[0] = 0.5;
+        }
+        rpa_metric = sb->get_recip_metric();
+        rpa_chi_n = CHI_N;
+
+        delete[] g_aa;
+        delete[] g_ab;
+        delete[] g_bb;
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+void NewtonKrylov::compute_residual(double *x, double *f_out)
+{
+    try
+    {
+        const int M = sb->get_n_grid();
+        const int DIM = sb->get_dim();
+        const double CHI_N = pc->get_chi_n();
+        double Q;
+
+        if (is_fts)
+        {
+            for(int i=0; i<M; i++)
+            {
+                w_a_temp[i] = x[i] + w_minus[i];
+                w_b_temp[i] = x[i] - w_minus[i];
+            }
+            pseudo->find_phi(phi_a, phi_b, q1_init, q2_init, w_a_temp, w_b_temp, Q);
+            for(int i=0; i<M; i++)
+                f_out[i] = phi_a[i] + phi_b[i] - 1.0;
+        }
+        else
+        {
+            if (is_box_altering)
+            {
+                std::vector<double> new_lx(DIM);
+                for(int d=0; d<DIM; d++)
+                    new_lx[d] = x[2*M+d];
+                sb->set_lx(new_lx);
+                pseudo->update();
+            }
+            pseudo->find_phi(phi_a, phi_b, q1_init, q2_init, &x[0], &x[M], Q);
+
+            // calculate output fields
+            for(int i=0; i<M; i++)
+            {
+                double xi = 0.5*(x[i]+x[i+M]-CHI_N);
+                f_out[i]   = CHI_N*phi_b[i] + xi;
+                f_out[i+M] = CHI_N*phi_a[i] + xi;
+            }
+            sb->zero_mean(&f_out[0]);
+            sb->zero_mean(&f_out[M]);
+            for(int i=0; i<2*M; i++)
+                f_out[i] -= x[i];
+
+            if (is_box_altering)
+            {
+                std::array<double,3> stress = pseudo->dq_dl();
+                for(int d=0; d<DIM; d++)
+                    f_out[2*M+d] = stress[3-DIM+d]/Q;
+            }
+        }
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+void NewtonKrylov::jacobian_vector(double *v, double *jv)
+{
+    // With fixed box size, the exact product is obtained from find_phi_jvp().
+    if (!is_box_altering)
+    {
+        const int M = sb->get_n_grid();
+        const double CHI_N = pc->get_chi_n();
+        double Q, dQ;
+
+        if (is_fts)
+        {
+            for(int i=0; i<M; i++)
+            {
+                w_a_temp[i] = x_0[i] + w_minus[i];
+                w_b_temp[i] = x_0[i] - w_minus[i];
+            }
+            pseudo->find_phi_jvp(phi_a, phi_b, q1_init, q2_init, w_a_temp, w_b_temp, v, v, Q, dQ);
+            for(int i=0; i<M; i++)
+                jv[i] = phi_a[i] + phi_b[i];
+        }
+        else
+        {
+            pseudo->find_phi_jvp(phi_a, phi_b, q1_init, q2_init, &x_0[0], &x_0[M], &v[0], &v[M], Q, dQ);
+            for(int i=0; i<M; i++)
+            {
+                double dxi = 0.5*(v[i]+v[i+M]);
+                jv[i]   = CHI_N*phi_b[i] + dxi;
+                jv[i+M] = CHI_N*phi_a[i] + dxi;
+            }
+            sb->zero_mean(&jv[0]);
+            sb->zero_mean(&jv[M]);
+            for(int i=0; i<2*M; i++)
+                jv[i] -= v[i];
+        }
+        return;
+    }
+
+    // Otherwise, finite difference is used, since the stress depends on the box size.
+    double norm_v = sqrt(dot_product(v, v));
+    if (norm_v == 0.0)
+    {
+        for(int i=0; i<n_var; i++)
+            jv[i] = 0.0;
+        return;
+    }
+    double norm_x = sqrt(dot_product(x_0, x_0));
+    double h = sqrt(DBL_EPSILON*(1.0+norm_x))/norm_v;
+
+    for(int i=0; i<n_var; i++)
+        x_pert[i] = x_0[i] + h*v[i];
+    compute_residual(x_pert, f_pert);
+    for(int i=0; i<n_var; i++)
+        jv[i] = (f_pert[i] - f_0[i])/h;
+}
+void NewtonKrylov::precondition(double *r, double *z)
+{
+    const int M = sb->get_n_grid();
+    if (is_fts)
+    {
+        apply_kernel(0, r, z);
+    }
+    else if (!is_rpa_precond)
+    {
+        for(int i=0; i<n_var; i++)
+            z[i] = -r[i];
+    }
+    else
+    {
+        // solve the 2x2 linear response of the melt for each wavevector,
+        // R_plus = R_a + R_b and R_minus = R_b - R_a
+        for(int i=0; i<M; i++)
+        {
+            r_plus[i]  = r[i] + r[i+M];
+            r_minus[i] = r[i+M] - r[i];
+        }
+        // dw_plus = K_pp*R_plus + K_pm*R_minus
+        apply_kernel(0, r_plus,  u_plus);
+        apply_kernel(1, r_minus, u_temp_m);
+        for(int i=0; i<M; i++)
+            u_plus[i] += u_temp_m[i];
+        // dw_minus = K_pm*R_plus + K_mm*R_minus
+        apply_kernel(1, r_plus,  u_minus);
+        apply_kernel(2, r_minus, u_temp_m);
+        for(int i=0; i<M; i++)
+        {
+            u_minus[i] += u_temp_m[i];
+            z[i]   = u_plus[i] + u_minus[i];
+            z[i+M] = u_plus[i] - u_minus[i];
+        }
+        for(int i=2*M; i<n_var; i++)
+            z[i] = -r[i];
+    }
+}
+double NewtonKrylov::gmres(double *delta)
+{
+    // right-preconditioned GMRES, the initial guess is zero
+    double beta = sqrt(dot_product(f_0, f_0));
+    int k = 0;
+
+    for(int i=0; i<n_var; i++)
+        delta[i] = 0.0;
+    if (beta == 0.0)
+        return 0.0;
+
+    for(int i=0; i<n_var; i++)
+        v_krylov[i] = -f_0[i]/beta;
+    for(int j=0; j<max_hist+1; j++)
+        g_n[j] = 0.0;
+    g_n[0] = beta;
+
+    for(int j=0; j<max_hist; j++)
+    {
+        double *v_j  = &v_krylov[j*n_var];
+        double *v_j1 = &v_krylov[(j+1)*n_var];
+
+        precondition(v_j, z_temp);
+        jacobian_vector(z_temp, v_j1);
+
+        // modified Gram-Schmidt
+        for(int i=0; i<=j; i++)
+        {
+            double *v_i = &v_krylov[i*n_var];
+            h_nm[i][j] = dot_product(v_j1, v_i);
+            for(int l=0; l<n_var; l++)
+                v_j1[l] -= h_nm[i][j]*v_i[l];
+        }
+        h_nm[j+1][j] = sqrt(dot_product(v_j1, v_j1));
+        if (h_nm[j+1][j] > 0.0)
+        {
+            for(int l=0; l<n_var; l++)
+                v_j1[l] /= h_nm[j+1][j];
+        }
+
+        // apply previous Givens rotations
+        for(int i=0; i<j; i++)
+        {
+            double temp  =  givens_c[i]*h_nm[i][j] + givens_s[i]*h_nm[i+1][j];
+            h_nm[i+1][j] = -givens_s[i]*h_nm[i][j] + givens_c[i]*h_nm[i+1][j];
+            h_nm[i][j]   = temp;
+        }
+        // new Givens rotation
+        double denom = sqrt(h_nm[j][j]*h_nm[j][j] + h_nm[j+1][j]*h_nm[j+1][j]);
+        if (denom == 0.0)
+            break;
+        bool is_breakdown = (h_nm[j+1][j] == 0.0);
+        givens_c[j] = h_nm[j][j]/denom;
+        givens_s[j] = h_nm[j+1][j]/denom;
+        h_nm[j][j] = denom;
+        h_nm[j+1][j] = 0.0;
+        g_n[j+1] = -givens_s[j]*g_n[j];
+        g_n[j]   =  givens_c[j]*g_n[j];
+
+        k = j+1;
+        if (std::abs(g_n[j+1]) <= eta*beta || is_breakdown)
+            break;
+    }
+
+    // back substitution
+    for(int i=k-1; i>=0; i--)
+    {
+        double sum = g_n[i];
+        for(int l=i+1; l<k; l++)
+            sum -= h_nm[i][l]*y_n[l];
+        y_n[i] = sum/h_nm[i][i];
+    }
+    // delta = P^-1 V y
+    for(int l=0; l<n_var; l++)
+        u_temp[l] = 0.0;
+    for(int i=0; i<k; i++)
+    {
+        double *v_i = &v_krylov[i*n_var];
+        for(int l=0; l<n_var; l++)
+            u_temp[l] += y_n[i]*v_i[l];
+    }
+    precondition(u_temp, delta);
+
+    // relative residual of the linear system
+    return std::abs(g_n[k])/beta;
+}
+void NewtonKrylov::caculate_new_fields(
+    double *w,
+    double *w_out,
+    double *w_deriv,
+    double old_error_level,
+    double error_level)
+{
+    try
+    {
+        // condition to start Newton iteration
+        if (error_level < start_error && !is_newton)
+        {
+            is_newton = true;
+            step_length = 1.0;
+            eta = 0.1;
+        }
+        // conditions to apply the simple mixing method
+        else if (!is_newton)
+        {
+            // dynamically change mixing parameter
+            if (old_error_level < error_level)
+                mix = std::max(mix*0.7, mix_min);
+            else
+                mix = mix*1.01;
+
+            // make a simple mixing of input and output fields for the next iteration
+            for(int i=0; i<n_var; i++)
+                w[i] = (1.0-mix)*w[i] + mix*w_out[i];
+            return;
+        }
+        else
+        {
+            // damping of Newton step
+            if (old_error_level < error_level)
+                step_length = std::max(step_length*0.5, mix_min);
+            else
+                step_length = std::min(step_length*2.0, 1.0);
+
+            // Eisenstat-Walker forcing term with safeguard
+            double eta_new = 0.9*(error_level/old_error_level)*(error_level/old_error_level);
+            if (0.9*eta*eta > 0.1)
+                eta_new = std::max(eta_new, 0.9*eta*eta);
+            eta = std::max(std::min(eta_new, 0.1), 1e-6);
+        }
+
+        // update preconditioner if chi_n or box size has been changed
+        std::array<double,3> lx = sb->get_lx();
+        if (sb->get_recip_metric() != rpa_metric || pc->get_chi_n() != rpa_chi_n)
+            update_rpa_kernel();
+
+        for(int i=0; i<n_var; i++)
+        {
+            x_0[i] = w[i];
+            f_0[i] = w_deriv[i];
+        }
+
+        // The RPA response of the homogeneous melt can be a poor approximation
+        // for strongly segregated structures in SCFT. If GMRES stagnates,
+        // the scaling of simple mixing is used as the preconditioner from then on.
+        double reduction = gmres(delta);
+        if (!is_fts && is_rpa_precond && reduction > 0.5)
+        {
+            is_rpa_precond = false;
+            gmres(delta);
+        }
+
+        // restore the box size
+        if (is_box_altering)
+        {
+            std::vector<double> old_lx(lx.begin()+3-sb->get_dim(), lx.end());
+            sb->set_lx(old_lx);
+            pseudo->update();
+        }
+
+        for(int i=0; i<n_var; i++)
+            w[i] += step_length*delta[i];
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
@@ -0,0 +1,97 @@
+/*-------------------------------------------------------------
+* This is an abstract NewtonKrylov class.
+* Jacobian-free Newton-Krylov (JFNK) method that finds the saddle
+* point of SCFT or the pressure field of L-FTS. The Newton step is
+* obtained with right-preconditioned GMRES, and the Jacobian-vector
+* products are computed exactly with Pseudo::find_phi_jvp(), or with
+* finite differences through find_phi() when the box size is a variable.
+* The preconditioner is the RPA (Debye function) response of the
+* homogeneous melt, which is diagonal in Fourier space.
+* This class has the same interface as AndersonMixing, so that it
+* can replace AndersonMixing in the saddle point iteration.
+*
+* The layout of the fields is determined by n_var:
+*   n_var == 2*n_grid     : SCFT, w = [w_a, w_b]
+*   n_var == 2*n_grid+dim : SCFT with box altering, w = [w_a, w_b, lx]
+*   n_var == n_grid       : L-FTS, w = w_plus (w_minus is set by set_w_minus())
+*------------------------------------------------------------*/
+
+#ifndef NEWTON_KRYLOV_H_
+#define NEWTON_KRYLOV_H_
+
+#include <array>
+#include <vector>
+
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+
+#include "SimulationBox.h"
+#include "PolymerChain.h"
+#include "Pseudo.h"
+#include "AndersonMixing.h"
+#include "Exception.h"
+
+namespace py = pybind11;
+
+class NewtonKrylov : public AndersonMixing
+{
+protected:
+    SimulationBox *sb;
+    PolymerChain *pc;
+    Pseudo *pseudo;
+    int n_complex_grid;
+
+    bool is_fts, is_box_altering;
+    bool is_newton;     // true after switching from simple mixing to Newton iteration
+    bool is_rpa_precond; // false if GMRES stagnates with the RPA preconditioner
+    double step_length; // damping factor of Newton step
+    double eta;         // forcing term, relative tolerance of GMRES
+
+    // Krylov basis and Hessenberg matrix
+    double *v_krylov, **h_nm;
+    double *givens_c, *givens_s, *g_n, *y_n;
+    // temporary arrays
+    double *x_0, *f_0, *x_pert, *f_pert, *z_temp, *u_temp, *delta;
+    double *phi_a, *phi_b, *q1_init, *q2_init, *w_minus;
+    double *w_a_temp, *w_b_temp, *r_plus, *u_plus, *r_minus, *u_minus, *u_temp_m;
+
+    // RPA kernels for the preconditioner, [K_pp, K_pm, K_mm] in Fourier space,
+    // and the box size and chi_n used for them
+    double *rpa_kernel;
+    std::array<double,6> rpa_metric;
+    double rpa_chi_n;
+
+    double dot_product(double *a, double *b);
+    void update_rpa_kernel();
+    // evaluate residual for given fields (and box size)
+    void compute_residual(double *x, double *f_out);
+    // Jacobian-vector product
+    void jacobian_vector(double *v, double *jv);
+    // apply inverse of the preconditioner
+    void precondition(double *r, double *z);
+    // multiply n-th rpa_kernel to a real field in Fourier space (platform specific)
+    virtual void apply_kernel(int n, double *r_in, double *r_out) = 0;
+    // solve J*delta = -F, and return the relative residual
+    double gmres(double *delta);
+public:
+    NewtonKrylov(SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo,
+        int n_var, int max_hist, double start_error, double mix_min, double mix_init);
+    virtual ~NewtonKrylov();
+
+    void set_w_minus(double *w_minus);
+
+    void reset_count() override;
+    void caculate_new_fields(
+        double *w, double *w_out, double *w_deriv,
+        double old_error_level, double error_level) override;
+
+    // Methods for pybind11
+    void set_w_minus(py::array_t<double> w_minus)
+    {
+        py::buffer_info buf = w_minus.request();
+        if (buf.size != sb->get_n_grid())
+            throw_with_line_number("Size of input w_minus (" + std::to_string(buf.size) + ") and 'n_grid' (" + std::to_string(sb->get_n_grid()) + ") must match");
+        set_w_minus((double*) buf.ptr);
+    };
+};
+#endif
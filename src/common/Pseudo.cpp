@@ -1,7 +1,9 @@
 
 #include <iostream>
 #include "cmath"
+#include <vector>
 #include "Pseudo.h"
+#include "WaveNumber.h"
 
 Pseudo::Pseudo(
     SimulationBox *sb,
@@ -15,81 +17,284 @@ Pseudo::Pseudo(
     this->sb = sb;
     this->pc = pc;
     this->n_complex_grid = sb->get_nx(0)*sb->get_nx(1)*(sb->get_nx(2)/2+1);
+
+    this->is_stress_caching = false;
+    this->is_stress_cached = false;
+    this->n_boltz_rescale = -1;
+}
+void Pseudo::set_stress_caching(bool is_stress_caching)
+{
+    this->is_stress_caching = is_stress_caching;
+    this->is_stress_cached = false;
+}
+bool Pseudo::get_stress_caching()
+{
+    return is_stress_caching;
 }
 //----------------- get_boltz_bond -------------------
 void Pseudo::get_boltz_bond(double *boltz_bond, double bond_length_variance,
-                            std::array<int,3> nx, std::array<double,3> dx, double ds)
+                            std::array<int,3> nx, std::array<double,6> recip_metric, double ds)
 {
     int itemp, jtemp, ktemp, idx;
-    double xfactor[3];
+
+    for(int i=0; i<nx[0]; i++)
+    {
+        itemp = WaveNumber::signed_mode(i, nx[0]);
+        for(int j=0; j<nx[1]; j++)
+        {
+            jtemp = WaveNumber::signed_mode(j, nx[1]);
+            for(int k=0; k<nx[2]/2+1; k++)
+            {
+                ktemp = k;
+                idx = i* nx[1]*(nx[2]/2+1) + j*(nx[2]/2+1) + k;
+                boltz_bond[idx] = exp(-bond_length_variance*
+                                      WaveNumber::wave_number_square(itemp, jtemp, ktemp, nx, recip_metric)*ds/6.0);
+            }
+        }
+    }
+}
+
+//----------------- incremental update of get_boltz_bond -------------------
+bool Pseudo::is_boltz_bond_rescalable(std::array<double,6> new_metric)
+{
+    const int MAX_BOLTZ_RESCALE = 100;
+    // off-diagonal components are zero up to rounding errors of cos(90 degrees)
+    auto is_diagonal = [](std::array<double,6> g) -> bool
+    {
+        const double tol = 1e-14;
+        return std::abs(g[3]) <= tol*sqrt(g[0]*g[1])
+            && std::abs(g[4]) <= tol*sqrt(g[0]*g[2])
+            && std::abs(g[5]) <= tol*sqrt(g[1]*g[2]);
+    };
+    return n_boltz_rescale >= 0 && n_boltz_rescale < MAX_BOLTZ_RESCALE
+        && is_diagonal(boltz_metric) && is_diagonal(new_metric);
+}
+void Pseudo::rescale_boltz_bond(double *boltz_bond, double bond_length_variance,
+                                std::array<int,3> nx, std::array<double,6> old_metric, std::array<double,6> new_metric, double ds)
+{
     const double PI{3.14159265358979323846};
+    std::vector<double> factor[3];
 
-    // calculate the exponential factor
+    // exp(-b^2*ds/6*(2*pi*m)^2*dG*_dd) along each axis
     for(int d=0; d<3; d++)
-        xfactor[d] = -std::pow(2*PI/(nx[d]*dx[d]),2)*ds/6.0;
+    {
+        const int n_modes = (d < 2) ? nx[d] : nx[2]/2+1;
+        factor[d].resize(n_modes);
+        for(int i=0; i<n_modes; i++)
+        {
+            const int m = (d < 2) ? WaveNumber::signed_mode(i, nx[d]) : i;
+            factor[d][i] = exp(-bond_length_variance*4*PI*PI*m*m*(new_metric[d]-old_metric[d])*ds/6.0);
+        }
+    }
+    for(int i=0; i<nx[0]; i++)
+    {
+        for(int j=0; j<nx[1]; j++)
+        {
+            const double factor_ij = factor[0][i]*factor[1][j];
+            double *boltz_bond_ij = &boltz_bond[(i*nx[1]+j)*(nx[2]/2+1)];
+            for(int k=0; k<nx[2]/2+1; k++)
+                boltz_bond_ij[k] *= factor_ij*factor[2][k];
+        }
+    }
+}
+
+void Pseudo::get_weighted_fourier_basis(double *fourier_basis, std::array<int,3> nx)
+{
+    int itemp, jtemp, ktemp, idx;
+    const int M_COMPLEX = nx[0]*nx[1]*(nx[2]/2+1);
+    const double PI{3.14159265358979323846};
 
     for(int i=0; i<nx[0]; i++)
     {
-        if( i > nx[0]/2)
-            itemp = nx[0]-i;
-        else
-            itemp = i;
+        itemp = WaveNumber::signed_mode(i, nx[0]);
         for(int j=0; j<nx[1]; j++)
         {
-            if( j > nx[1]/2)
-                jtemp = nx[1]-j;
-            else
-                jtemp = j;
+            jtemp = WaveNumber::signed_mode(j, nx[1]);
             for(int k=0; k<nx[2]/2+1; k++)
             {
                 ktemp = k;
                 idx = i* nx[1]*(nx[2]/2+1) + j*(nx[2]/2+1) + k;
-                boltz_bond[idx] = exp(bond_length_variance*
-                                      (pow(itemp,2)*xfactor[0]+pow(jtemp,2)*xfactor[1]+pow(ktemp,2)*xfactor[2]));
+                fourier_basis[0*M_COMPLEX+idx] = 4*PI*PI*itemp*itemp;
+                fourier_basis[1*M_COMPLEX+idx] = 4*PI*PI*jtemp*jtemp;
+                fourier_basis[2*M_COMPLEX+idx] = 4*PI*PI*ktemp*ktemp;
+                fourier_basis[3*M_COMPLEX+idx] = 4*PI*PI*WaveNumber::cross_mode(itemp,nx[0])*WaveNumber::cross_mode(jtemp,nx[1]);
+                fourier_basis[4*M_COMPLEX+idx] = 4*PI*PI*WaveNumber::cross_mode(itemp,nx[0])*WaveNumber::cross_mode(ktemp,nx[2]);
+                fourier_basis[5*M_COMPLEX+idx] = 4*PI*PI*WaveNumber::cross_mode(jtemp,nx[1])*WaveNumber::cross_mode(ktemp,nx[2]);
+                if (k != 0 && 2*k != nx[2])
+                {
+                    for(int c=0; c<6; c++)
+                        fourier_basis[c*M_COMPLEX+idx] *= 2;
+                }
             }
         }
     }
 }
+//----------------- dq_dl and dq_dangle -------------------
+// Chain rule from the reciprocal metric tensor G* = g^-1 to the cell
+// parameters, dG*/dp = -G* (dg/dp) G*, where g_ij = l_i*l_j*cos(angle_ij).
+std::array<double,3> Pseudo::dq_dl()
+{
+    try
+    {
+        std::array<double,6> dq_dg = dq_dmetric();
+        std::array<double,3> lx = sb->get_lx();
+        std::array<double,3> c = sb->get_cos_angles();
+        std::array<double,3> dq_dl;
+        double cos_angle[3][3] = {{1.0, c[2], c[1]}, {c[2], 1.0, c[0]}, {c[1], c[0], 1.0}};
+
+        for(int d=0; d<3; d++)
+        {
+            double dg[3][3];
+            for(int i=0; i<3; i++)
+                for(int j=0; j<3; j++)
+                    dg[i][j] = ((i==d ? lx[j] : 0.0) + (j==d ? lx[i] : 0.0))*cos_angle[i][j];
+            dq_dl[d] = contract_metric_derivative(dq_dg, dg);
+        }
+        return dq_dl;
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+std::vector<double> Pseudo::dq_dangle()
+{
+    try
+    {
+        const int DIM = sb->get_dim();
+        const double PI{3.14159265358979323846};
+        std::array<double,6> dq_dg = dq_dmetric();
+        std::array<double,3> lx = sb->get_lx();
+        std::vector<double> angles = sb->get_angles();
+        std::vector<double> dq_dangle;
 
-void Pseudo::get_weighted_fourier_basis(
-    double *fourier_basis_x,
-    double *fourier_basis_y,
-    double *fourier_basis_z,
-    std::array<int,3> nx,
-    std::array<double,3> dx)
+        // axes pairs of alpha, beta and gamma
+        const int pairs[3][2] = {{1,2}, {0,2}, {0,1}};
+        for(int a=0; a<(int) angles.size(); a++)
+        {
+            double dg[3][3] = {{0.0}};
+            // angle between the last two axes in 2D
+            const int p = (DIM == 3) ? a : 0;
+            const int i = pairs[p][0], j = pairs[p][1];
+            dg[i][j] = dg[j][i] = -lx[i]*lx[j]*sin(angles[a]*PI/180.0)*PI/180.0;
+            dq_dangle.push_back(contract_metric_derivative(dq_dg, dg));
+        }
+        return dq_dangle;
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+double Pseudo::contract_metric_derivative(std::array<double,6> dq_dg, double dg[3][3])
 {
+    // dQ/dp = sum_ij dQ/dG*_ij dG*_ij/dp
+    std::array<double,6> gr = sb->get_recip_metric();
+    double g_inv[3][3] = {{gr[0], gr[3], gr[4]}, {gr[3], gr[1], gr[5]}, {gr[4], gr[5], gr[2]}};
+    double dq_dg_mat[3][3] = {{dq_dg[0], dq_dg[3], dq_dg[4]}, {dq_dg[3], dq_dg[1], dq_dg[5]}, {dq_dg[4], dq_dg[5], dq_dg[2]}};
+    double sum{0.0};
+    for(int i=0; i<3; i++)
+        for(int j=0; j<3; j++)
+        {
+            double dg_inv{0.0};
+            for(int k=0; k<3; k++)
+                for(int l=0; l<3; l++)
+                    dg_inv -= g_inv[i][k]*dg[k][l]*g_inv[l][j];
+            sum += dq_dg_mat[i][j]*dg_inv;
+        }
+    return sum;
+}
+//----------------- get_debye_function -------------------
+// Debye functions g_ij(k) of a homogeneous melt in Fourier space.
+// The linear response of the concentrations to small fields is
+// delta phi_a(k) = -g_aa(k)*delta w_a(k) - g_ab(k)*delta w_b(k), and
+// delta phi_b(k) = -g_ab(k)*delta w_a(k) - g_bb(k)*delta w_b(k).
+void Pseudo::get_debye_function(double *g_aa, double *g_ab, double *g_bb)
+{
+    std::array<int,3> nx = sb->get_nx();
+    std::array<double,6> recip_metric = sb->get_recip_metric();
+    const int N   = pc->get_n_segment();
+    const int N_A = pc->get_n_segment_a();
+    const int N_B = pc->get_n_segment_b();
+    const double f = pc->get_f();
+    const double eps = pc->get_epsilon();
+    const double bond_length_a = eps*eps/(f*eps*eps + (1.0-f));
+    const double bond_length_b = 1.0/(f*eps*eps + (1.0-f));
+    const double bond_length_ab = 0.5*bond_length_a + 0.5*bond_length_b;
+    const bool is_discrete = (pc->get_model_name() == "discrete");
+
     int itemp, jtemp, ktemp, idx;
-    double xfactor[3];
-    const double PI{3.14159265358979323846};
+    double k2, x_a, x_b;
 
-    // calculate the exponential factor
-    for(int d=0; d<3; d++)
-        xfactor[d] = std::pow(2*PI/(nx[d]*dx[d]),2);
+    // auto-correlation of a continuous block with n (=f or 1-f) and x (=k^2*b^2/6)
+    auto debye_continuous = [](double n, double x) -> double
+    {
+        double nx = n*x;
+        if (nx < 1e-4)
+            return n*n*(1.0 - nx/3.0 + nx*nx/12.0);
+        return 2.0*(nx + exp(-nx) - 1.0)/(x*x);
+    };
+    // end-to-segment correlation of a continuous block
+    auto end_continuous = [](double n, double x) -> double
+    {
+        double nx = n*x;
+        if (nx < 1e-4)
+            return n*(1.0 - nx/2.0 + nx*nx/6.0);
+        return (1.0 - exp(-nx))/x;
+    };
+    // auto-correlation of a discrete block with n segments and bond factor beta
+    auto debye_discrete = [](int n, double beta) -> double
+    {
+        double sum{0.0};
+        if (1.0-beta < 1e-6)
+        {
+            for(int d=1; d<n; d++)
+                sum += (n-d)*pow(beta,d);
+        }
+        else
+            sum = beta*(n*(1.0-beta) - (1.0-pow(beta,n)))/((1.0-beta)*(1.0-beta));
+        return n + 2.0*sum;
+    };
+    // end-to-segment correlation of a discrete block
+    auto end_discrete = [](int n, double beta) -> double
+    {
+        if (1.0-beta < 1e-6)
+        {
+            double sum{0.0};
+            for(int d=0; d<n; d++)
+                sum += pow(beta,d);
+            return sum;
+        }
+        return (1.0-pow(beta,n))/(1.0-beta);
+    };
 
     for(int i=0; i<nx[0]; i++)
     {
-        if( i > nx[0]/2)
-            itemp = nx[0]-i;
-        else
-            itemp = i;
+        itemp = WaveNumber::signed_mode(i, nx[0]);
         for(int j=0; j<nx[1]; j++)
         {
-            if( j > nx[1]/2)
-                jtemp = nx[1]-j;
-            else
-                jtemp = j;
+            jtemp = WaveNumber::signed_mode(j, nx[1]);
             for(int k=0; k<nx[2]/2+1; k++)
             {
                 ktemp = k;
                 idx = i* nx[1]*(nx[2]/2+1) + j*(nx[2]/2+1) + k;
-                fourier_basis_x[idx] = pow(itemp,2)*xfactor[0];
-                fourier_basis_y[idx] = pow(jtemp,2)*xfactor[1];
-                fourier_basis_z[idx] = pow(ktemp,2)*xfactor[2];
-                if (k != 0 && 2*k != nx[2])
+                k2 = WaveNumber::wave_number_square(itemp, jtemp, ktemp, nx, recip_metric);
+                x_a = k2*bond_length_a/6.0;
+                x_b = k2*bond_length_b/6.0;
+                if (is_discrete)
+                {
+                    double beta_a  = exp(-x_a/N);
+                    double beta_b  = exp(-x_b/N);
+                    double beta_ab = exp(-k2*bond_length_ab/6.0/N);
+                    g_aa[idx] = debye_discrete(N_A, beta_a)/(N*N);
+                    g_bb[idx] = debye_discrete(N_B, beta_b)/(N*N);
+                    g_ab[idx] = beta_ab*end_discrete(N_A, beta_a)*end_discrete(N_B, beta_b)/(N*N);
+                }
+                else
                 {
-                    fourier_basis_x[idx] *= 2;
-                    fourier_basis_y[idx] *= 2;
-                    fourier_basis_z[idx] *= 2;
+                    g_aa[idx] = debye_continuous(f,     x_a);
+                    g_bb[idx] = debye_continuous(1.0-f, x_b);
+                    g_ab[idx] = end_continuous(f, x_a)*end_continuous(1.0-f, x_b);
                 }
             }
         }
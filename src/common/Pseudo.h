@@ -1,5 +1,7 @@
 /*-------------------------------------------------------------
 * This is an abstract Pseudo class
+* The wave vectors are given by the reciprocal metric tensor of the
+* simulation box, so that non-orthogonal cells are also supported.
 *------------------------------------------------------------*/
 
 #ifndef PSEUDO_H_
@@ -26,12 +28,31 @@ protected:
     PolymerChain *pc;
     int n_complex_grid;
 
+    // Fourier transforms of the propagators kept by find_phi() for the stress,
+    // valid until update() or find_phi_jvp()
+    bool is_stress_caching;
+    bool is_stress_cached;
+
+    // reciprocal metric tensor of the current Boltzmann factors of the bonds,
+    // and the number of successive incremental updates (-1 if not computed)
+    std::array<double,6> boltz_metric;
+    int n_boltz_rescale;
+
     void get_boltz_bond(double *boltz_bond, double bond_length_variance,
-        std::array<int,3> nx, std::array<double,3> dx, double ds);
+        std::array<int,3> nx, std::array<double,6> recip_metric, double ds);
+    // If the cell is orthogonal before and after the change of the box, the
+    // change of the Boltzmann factors is separable, and they are updated by
+    // multiplying 1D factors instead of computing exp() for every wave vector.
+    // The factors are recomputed from scratch after every MAX_BOLTZ_RESCALE updates.
+    bool is_boltz_bond_rescalable(std::array<double,6> new_metric);
+    void rescale_boltz_bond(double *boltz_bond, double bond_length_variance,
+        std::array<int,3> nx, std::array<double,6> old_metric, std::array<double,6> new_metric, double ds);
 
-    void get_weighted_fourier_basis(
-        double *fourier_basis_x, double *fourier_basis_y, double *fourier_basis_z,
-        std::array<int,3> nx, std::array<double,3> dx);
+    // (2*pi)^2*m_i*m_j for the six components (xx, yy, zz, xy, xz, yz),
+    // fourier_basis[c*n_complex_grid+i], weighted for the real-to-complex FFT
+    void get_weighted_fourier_basis(double *fourier_basis, std::array<int,3> nx);
+    // sum_ij dQ/dG*_ij * d(G*_ij), where dG* = -G* dg G*
+    double contract_metric_derivative(std::array<double,6> dq_dg, double dg[3][3]);
 public:
     Pseudo(SimulationBox *sb, PolymerChain *pc);
     virtual ~Pseudo() {};
@@ -42,12 +63,39 @@ public:
         double *phi_a,  double *phi_b,
         double *q1_init, double *q2_init,
         double *w_a, double *w_b, double &single_partition) = 0;
+
+    // Tangent-linear (Jacobian-vector) product of find_phi().
+    // Propagators and their derivatives along dw are advanced together
+    // with the same operator splitting, and dphi_a, dphi_b and
+    // d_single_partition are the exact derivatives of phi_a, phi_b and
+    // single_partition in the direction of (dw_a, dw_b).
+    virtual void find_phi_jvp(
+        double *dphi_a, double *dphi_b,
+        double *q1_init, double *q2_init,
+        double *w_a, double *w_b,
+        double *dw_a, double *dw_b,
+        double &single_partition, double &d_single_partition) = 0;
         
     virtual void get_partition(
         double *q1, int n1,
         double *q2, int n2) = 0;
         
-    virtual std::array<double,3> dq_dl() = 0;
+    // derivatives of the single partition function with respect to the
+    // reciprocal metric tensor (xx, yy, zz, xy, xz, yz), i.e., stress tensor
+    virtual std::array<double,6> dq_dmetric() = 0;
+    // derivatives with respect to the box lengths and the angles (in degrees)
+    std::array<double,3> dq_dl();
+    std::vector<double> dq_dangle();
+
+    // If enabled, find_phi() keeps the Fourier transforms of the propagators
+    // that are computed during the propagation, and dq_dmetric() computes the
+    // stress from them without FFTs (discrete chain model on CPU).
+    // Otherwise, dq_dmetric() transforms all the propagators again.
+    void set_stress_caching(bool is_stress_caching);
+    bool get_stress_caching();
+
+    // Debye functions of the homogeneous melt (RPA linear response)
+    void get_debye_function(double *g_aa, double *g_ab, double *g_bb);
 
     // Methods for pybind11
     std::tuple<py::array_t<double>, py::array_t<double>, double>
@@ -75,9 +123,13 @@ public:
             py::buffer_info buf_phi_a = phi_a.request();
             py::buffer_info buf_phi_b = phi_b.request();
 
-            find_phi((double*) buf_phi_a.ptr,   (double*) buf_phi_b.ptr,
-                    (double*) buf_q1_init.ptr, (double*) buf_q2_init.ptr,
-                    (double*) buf_w_a.ptr,     (double*) buf_w_b.ptr, single_partition);
+            // release the GIL, so that Python threads can run other instances concurrently
+            {
+                py::gil_scoped_release release;
+                find_phi((double*) buf_phi_a.ptr,   (double*) buf_phi_b.ptr,
+                        (double*) buf_q1_init.ptr, (double*) buf_q2_init.ptr,
+                        (double*) buf_w_a.ptr,     (double*) buf_w_b.ptr, single_partition);
+            }
             
             return std::make_tuple(std::move(phi_a), std::move(phi_b), single_partition);
         }
@@ -86,6 +138,55 @@ public:
             throw_without_line_number(exc.what());
         }
     };
+    std::tuple<py::array_t<double>, py::array_t<double>, double>
+    find_phi_jvp(py::array_t<double> q1_init, py::array_t<double> q2_init,
+                 py::array_t<double> w_a, py::array_t<double> w_b,
+                 py::array_t<double> dw_a, py::array_t<double> dw_b)
+    {
+        const int M = sb->get_n_grid();
+        py::buffer_info buf_q1_init = q1_init.request();
+        py::buffer_info buf_q2_init = q2_init.request();
+        py::buffer_info buf_w_a = w_a.request();
+        py::buffer_info buf_w_b = w_b.request();
+        py::buffer_info buf_dw_a = dw_a.request();
+        py::buffer_info buf_dw_b = dw_b.request();
+
+        if (buf_q1_init.size != M)
+            throw_with_line_number("Size of input q1_init (" + std::to_string(buf_q1_init.size) + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+        if (buf_q2_init.size != M)
+            throw_with_line_number("Size of input q2_init (" + std::to_string(buf_q2_init.size) + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+        if (buf_w_a.size != M)
+            throw_with_line_number("Size of input w_a ("     + std::to_string(buf_w_a.size)     + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+        if (buf_w_b.size != M)
+            throw_with_line_number("Size of input w_b ("     + std::to_string(buf_w_b.size)     + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+        if (buf_dw_a.size != M)
+            throw_with_line_number("Size of input dw_a ("    + std::to_string(buf_dw_a.size)    + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+        if (buf_dw_b.size != M)
+            throw_with_line_number("Size of input dw_b ("    + std::to_string(buf_dw_b.size)    + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+
+        try{
+            double single_partition, d_single_partition;
+            py::array_t<double> dphi_a = py::array_t<double>(M);
+            py::array_t<double> dphi_b = py::array_t<double>(M);
+            py::buffer_info buf_dphi_a = dphi_a.request();
+            py::buffer_info buf_dphi_b = dphi_b.request();
+
+            {
+                py::gil_scoped_release release;
+                find_phi_jvp((double*) buf_dphi_a.ptr,  (double*) buf_dphi_b.ptr,
+                            (double*) buf_q1_init.ptr, (double*) buf_q2_init.ptr,
+                            (double*) buf_w_a.ptr,     (double*) buf_w_b.ptr,
+                            (double*) buf_dw_a.ptr,    (double*) buf_dw_b.ptr,
+                            single_partition, d_single_partition);
+            }
+
+            return std::make_tuple(std::move(dphi_a), std::move(dphi_b), d_single_partition);
+        }
+        catch(std::exception& exc)
+        {
+            throw_without_line_number(exc.what());
+        }
+    };
     std::tuple<py::array_t<double>, py::array_t<double>> get_partition(int n1, int n2)
     {
         try{
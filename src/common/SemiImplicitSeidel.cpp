@@ -0,0 +1,157 @@
+#include <iostream>
+#include <cmath>
+#include "SemiImplicitSeidel.h"
+
+SemiImplicitSeidel::SemiImplicitSeidel(SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo)
+{
+    try
+    {
+        if (sb == nullptr)
+            throw_with_line_number("SimulationBox *sb is null pointer");
+        if (pc == nullptr)
+            throw_with_line_number("PolymerChain *pc is null pointer");
+        if (pseudo == nullptr)
+            throw_with_line_number("Pseudo *pseudo is null pointer");
+
+        const int M = sb->get_n_grid();
+
+        this->sb = sb;
+        this->pc = pc;
+        this->pseudo = pseudo;
+        this->n_complex_grid = sb->get_nx(0)*sb->get_nx(1)*(sb->get_nx(2)/2+1);
+
+        this->s_plus = new double[n_complex_grid];
+        this->d_ab   = new double[n_complex_grid];
+        this->kernel_plus     = new double[n_complex_grid];
+        this->kernel_coupling = new double[n_complex_grid];
+
+        this->r_plus   = new double[M];
+        this->dw_minus = new double[M];
+        this->dw_plus  = new double[M];
+
+        // kernels are computed at the first update
+        this->debye_metric = {0.0, 0.0, 0.0, 0.0, 0.0, 0.0};
+        this->kernel_lambda = 0.0;
+        this->is_kernel_changed = true;
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+SemiImplicitSeidel::~SemiImplicitSeidel()
+{
+    delete[] s_plus;
+    delete[] d_ab;
+    delete[] kernel_plus;
+    delete[] kernel_coupling;
+    delete[] r_plus;
+    delete[] dw_minus;
+    delete[] dw_plus;
+}
+void SemiImplicitSeidel::update_kernel(double lambda_plus)
+{
+    try
+    {
+        bool is_debye_changed = (sb->get_recip_metric() != debye_metric);
+
+        // Debye functions depend only on the box geometry for a given chain
+        if (is_debye_changed)
+        {
+            double *g_aa = new double[n_complex_grid];
+            double *g_ab = new double[n_complex_grid];
+            double *g_bb = new double[n_complex_grid];
+
+            pseudo->get_debye_function(g_aa, g_ab, g_bb);
+            for(int i=0; i<n_complex_grid; i++)
+            {
+                s_plus[i] = g_aa[i] + 2.0*g_ab[i] + g_bb[i];
+                d_ab[i]   = g_aa[i] - g_bb[i];
+            }
+            debye_metric = sb->get_recip_metric();
+
+            delete[] g_aa;
+            delete[] g_ab;
+            delete[] g_bb;
+        }
+        if (is_debye_changed || lambda_plus != kernel_lambda)
+        {
+            for(int i=0; i<n_complex_grid; i++)
+            {
+                kernel_plus[i]     =  lambda_plus/(1.0 + lambda_plus*s_plus[i]);
+                kernel_coupling[i] = -lambda_plus*d_ab[i]/(1.0 + lambda_plus*s_plus[i]);
+            }
+            // keep the level of w_plus
+            kernel_plus[0] = 0.0;
+            kernel_coupling[0] = 0.0;
+
+            kernel_lambda = lambda_plus;
+            is_kernel_changed = true;
+        }
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+void SemiImplicitSeidel::update_w_plus(
+    double *w_plus, double *phi_a, double *phi_b, double lambda_plus)
+{
+    try
+    {
+        const int M = sb->get_n_grid();
+
+        if (lambda_plus <= 0.0)
+            throw_with_line_number("'lambda_plus' (" + std::to_string(lambda_plus) + ") must be a positive number");
+
+        update_kernel(lambda_plus);
+        for(int i=0; i<M; i++)
+            r_plus[i] = phi_a[i] + phi_b[i] - 1.0;
+        fourier_update(r_plus, nullptr, dw_plus);
+        for(int i=0; i<M; i++)
+            w_plus[i] += dw_plus[i];
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+void SemiImplicitSeidel::update_fields(
+    double *w_plus, double *w_minus,
+    double *phi_a, double *phi_b, double *normal_noise,
+    double lambda_plus, double lambda_minus)
+{
+    try
+    {
+        const int M = sb->get_n_grid();
+        const double CHI_N = pc->get_chi_n();
+
+        if (lambda_plus <= 0.0)
+            throw_with_line_number("'lambda_plus' (" + std::to_string(lambda_plus) + ") must be a positive number");
+        if (lambda_minus <= 0.0)
+            throw_with_line_number("'lambda_minus' (" + std::to_string(lambda_minus) + ") must be a positive number");
+
+        // w_minus, 2*w_minus/chi_n is treated implicitly
+        for(int i=0; i<M; i++)
+        {
+            double g_minus = phi_a[i] - phi_b[i] + 2.0*w_minus[i]/CHI_N;
+            dw_minus[i] = -lambda_minus*g_minus;
+            if (normal_noise != nullptr)
+                dw_minus[i] += normal_noise[i];
+            dw_minus[i] /= 1.0 + 2.0*lambda_minus/CHI_N;
+            w_minus[i] += dw_minus[i];
+        }
+
+        // w_plus, with the RPA response to the new w_minus
+        update_kernel(lambda_plus);
+        for(int i=0; i<M; i++)
+            r_plus[i] = phi_a[i] + phi_b[i] - 1.0;
+        fourier_update(r_plus, dw_minus, dw_plus);
+        for(int i=0; i<M; i++)
+            w_plus[i] += dw_plus[i];
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
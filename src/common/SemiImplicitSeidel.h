@@ -0,0 +1,120 @@
+/*-------------------------------------------------------------
+* This is an abstract SemiImplicitSeidel class.
+* Semi-implicit Seidel (SIS) update of w_plus and w_minus.
+* The linear terms of the forces are treated implicitly:
+*   w_minus : 2*w_minus/chi_n, which is exact and local in real space
+*   w_plus  : RPA response of the homogeneous melt, which is diagonal
+*             in Fourier space,
+*             d(phi_a+phi_b)(k) = -S(k)*dw_plus(k) - D(k)*dw_minus(k)
+*             S(k) = g_aa(k) + 2*g_ab(k) + g_bb(k)
+*             D(k) = g_aa(k) - g_bb(k)
+* w_minus is updated first, and the change of w_minus is used in
+* the update of w_plus (Seidel).
+* The Debye functions are cached, and recomputed if the box size is
+* changed by SimulationBox::set_lx() or set_angles().
+*------------------------------------------------------------*/
+
+#ifndef SEMI_IMPLICIT_SEIDEL_H_
+#define SEMI_IMPLICIT_SEIDEL_H_
+
+#include <array>
+
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+
+#include "SimulationBox.h"
+#include "PolymerChain.h"
+#include "Pseudo.h"
+#include "Exception.h"
+
+namespace py = pybind11;
+
+class SemiImplicitSeidel
+{
+protected:
+    SimulationBox *sb;
+    PolymerChain *pc;
+    Pseudo *pseudo;
+    int n_complex_grid;
+
+    // Debye functions, S(k) and D(k), and the box geometry used for them
+    double *s_plus, *d_ab;
+    std::array<double,6> debye_metric;
+    // kernels for w_plus, lambda/(1+lambda*S(k)) and -lambda*D(k)/(1+lambda*S(k))
+    double *kernel_plus, *kernel_coupling;
+    double kernel_lambda;
+    bool is_kernel_changed;
+
+    // temporary arrays
+    double *r_plus, *dw_minus, *dw_plus;
+
+    void update_kernel(double lambda_plus);
+    // dw_plus = kernel_plus*r_plus + kernel_coupling*dw_minus in Fourier space,
+    // dw_minus can be NULL (platform specific)
+    virtual void fourier_update(double *r_plus, double *dw_minus, double *dw_plus) = 0;
+public:
+    SemiImplicitSeidel(SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo);
+    virtual ~SemiImplicitSeidel();
+
+    // relax w_plus for fixed w_minus
+    void update_w_plus(double *w_plus, double *phi_a, double *phi_b, double lambda_plus);
+    // update w_minus with normal_noise (can be NULL), and then w_plus
+    void update_fields(double *w_plus, double *w_minus,
+        double *phi_a, double *phi_b, double *normal_noise,
+        double lambda_plus, double lambda_minus);
+
+    // Methods for pybind11
+    void update_w_plus(py::array_t<double> w_plus,
+        py::array_t<double> phi_a, py::array_t<double> phi_b, double lambda_plus)
+    {
+        const int M = sb->get_n_grid();
+        py::buffer_info buf_w_plus = w_plus.request();
+        py::buffer_info buf_phi_a = phi_a.request();
+        py::buffer_info buf_phi_b = phi_b.request();
+
+        if (buf_w_plus.size != M)
+            throw_with_line_number("Size of input w_plus (" + std::to_string(buf_w_plus.size) + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+        if (buf_phi_a.size != M)
+            throw_with_line_number("Size of input phi_a ("  + std::to_string(buf_phi_a.size)  + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+        if (buf_phi_b.size != M)
+            throw_with_line_number("Size of input phi_b ("  + std::to_string(buf_phi_b.size)  + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+
+        update_w_plus((double*) buf_w_plus.ptr,
+            (double*) buf_phi_a.ptr, (double*) buf_phi_b.ptr, lambda_plus);
+    };
+    void update_fields(py::array_t<double> w_plus, py::array_t<double> w_minus,
+        py::array_t<double> phi_a, py::array_t<double> phi_b, py::object normal_noise,
+        double lambda_plus, double lambda_minus)
+    {
+        // normal_noise can be None
+        const int M = sb->get_n_grid();
+        py::buffer_info buf_w_plus = w_plus.request();
+        py::buffer_info buf_w_minus = w_minus.request();
+        py::buffer_info buf_phi_a = phi_a.request();
+        py::buffer_info buf_phi_b = phi_b.request();
+        py::array_t<double> array_normal_noise;
+        double *ptr_normal_noise = nullptr;
+
+        if (buf_w_plus.size != M)
+            throw_with_line_number("Size of input w_plus ("  + std::to_string(buf_w_plus.size)  + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+        if (buf_w_minus.size != M)
+            throw_with_line_number("Size of input w_minus (" + std::to_string(buf_w_minus.size) + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+        if (buf_phi_a.size != M)
+            throw_with_line_number("Size of input phi_a ("   + std::to_string(buf_phi_a.size)   + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+        if (buf_phi_b.size != M)
+            throw_with_line_number("Size of input phi_b ("   + std::to_string(buf_phi_b.size)   + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+        if (!normal_noise.is_none())
+        {
+            array_normal_noise = normal_noise.cast<py::array_t<double>>();
+            py::buffer_info buf_normal_noise = array_normal_noise.request();
+            if (buf_normal_noise.size != M)
+                throw_with_line_number("Size of input normal_noise (" + std::to_string(buf_normal_noise.size) + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+            ptr_normal_noise = (double*) buf_normal_noise.ptr;
+        }
+
+        update_fields((double*) buf_w_plus.ptr, (double*) buf_w_minus.ptr,
+            (double*) buf_phi_a.ptr, (double*) buf_phi_b.ptr, ptr_normal_noise,
+            lambda_plus, lambda_minus);
+    };
+};
+#endif
@@ -1,10 +1,97 @@
 
 #include <iostream>
 #include <sstream>
+#include <cmath>
+#include <vector>
+#ifdef _OPENMP
+#include <omp.h>
+#endif
 #include "SimulationBox.h"
 
+//----------------- Reductions -----------------------------
+// The elements are summed in blocks by vectorized loops, which run in
+// parallel, and the block sums are added by pairwise summation. The rounding
+// error grows as O(log n) instead of O(n), and the result does not depend on
+// the number of threads. (Compensated summation is not used, because it is
+// removed by -ffast-math.)
+namespace
+{
+    const int REDUCTION_BLOCK = 256;
+    // the number of blocks to use OpenMP threads
+    const int REDUCTION_PARALLEL_BLOCKS = 32;
+
+    double pairwise_sum(const double *x, const int n)
+    {
+        if (n <= 8)
+        {
+            double sum{0.0};
+            for(int i=0; i<n; i++)
+                sum += x[i];
+            return sum;
+        }
+        return pairwise_sum(x, n/2) + pairwise_sum(x+n/2, n-n/2);
+    }
+    // sums in a block with independent partial sums, which are vectorized
+    // and hide the latency of the additions
+    const int N_PARTIAL = 8;
+    inline double sum_block(const double *g, const int start, const int end)
+    {
+        double s[N_PARTIAL] = {0.0};
+        int i = start;
+        for(; i+N_PARTIAL<=end; i+=N_PARTIAL)
+            for(int k=0; k<N_PARTIAL; k++)
+                s[k] += g[i+k];
+        for(; i<end; i++)
+            s[0] += g[i];
+        return ((s[0]+s[1])+(s[2]+s[3]))+((s[4]+s[5])+(s[6]+s[7]));
+    }
+    inline double dot_block(const double *g, const double *h, const int start, const int end)
+    {
+        double s[N_PARTIAL] = {0.0};
+        int i = start;
+        for(; i+N_PARTIAL<=end; i+=N_PARTIAL)
+            for(int k=0; k<N_PARTIAL; k++)
+                s[k] += g[i+k]*h[i+k];
+        for(; i<end; i++)
+            s[0] += g[i]*h[i];
+        return ((s[0]+s[1])+(s[2]+s[3]))+((s[4]+s[5])+(s[6]+s[7]));
+    }
+    bool use_threads(const int n_blocks)
+    {
+        #ifdef _OPENMP
+        return n_blocks >= REDUCTION_PARALLEL_BLOCKS && !omp_in_parallel();
+        #else
+        return false;
+        #endif
+    }
+    // sum of g[i]
+    double block_sum(const double *g, const int n)
+    {
+        const int n_blocks = (n+REDUCTION_BLOCK-1)/REDUCTION_BLOCK;
+        std::vector<double> sum(n_blocks);
+        #pragma omp parallel for schedule(static) if(use_threads(n_blocks))
+        for(int b=0; b<n_blocks; b++)
+        {
+            sum[b] = sum_block(g, b*REDUCTION_BLOCK, std::min(n, (b+1)*REDUCTION_BLOCK));
+        }
+        return pairwise_sum(sum.data(), n_blocks);
+    }
+    // sum of g[i]*h[i]
+    double block_sum(const double *g, const double *h, const int n)
+    {
+        const int n_blocks = (n+REDUCTION_BLOCK-1)/REDUCTION_BLOCK;
+        std::vector<double> sum(n_blocks);
+        #pragma omp parallel for schedule(static) if(use_threads(n_blocks))
+        for(int b=0; b<n_blocks; b++)
+        {
+            sum[b] = dot_block(g, h, b*REDUCTION_BLOCK, std::min(n, (b+1)*REDUCTION_BLOCK));
+        }
+        return pairwise_sum(sum.data(), n_blocks);
+    }
+}
+
 //----------------- Constructor -----------------------------
-SimulationBox::SimulationBox(std::vector<int> new_nx, std::vector<double> new_lx)
+SimulationBox::SimulationBox(std::vector<int> new_nx, std::vector<double> new_lx, std::vector<double> new_angles)
 {
     if ( new_nx.size() != new_lx.size() )
         throw_with_line_number("The sizes of nx (" + std::to_string(new_nx.size()) + ") and lx (" + std::to_string(new_lx.size()) + ") must match.");
@@ -50,20 +137,22 @@ SimulationBox::SimulationBox(std::vector<int> new_nx, std::vector<double> new_lx
     }
     // the number of grids
     n_grid = nx[0]*nx[1]*nx[2];
-    // weight factor for integral
-    dv = new double[n_grid];
-    for(int i=0; i<n_grid; i++)
-        dv[i] = dx[0]*dx[1]*dx[2];
-    // system polymer
-    volume = lx[0]*lx[1]*lx[2];
+
+    // orthogonal cell by default
+    const double PI{3.14159265358979323846};
+    angles = {PI/2, PI/2, PI/2};
+    if (new_angles.size() > 0)
+        set_angles(new_angles);
+    else
+        update_geometry();
 }
 //----------------- Destructor -----------------------------
 SimulationBox::~SimulationBox()
 {
-    delete[] dv;
 }
 
 double dv_at(int i);
+
 //----------------- get methods-------------------------------------
 int SimulationBox::get_dim()
 {
@@ -93,9 +182,14 @@ std::array<double,3> SimulationBox::get_dx()
 {
     return {dx[0],dx[1],dx[2]};
 }
+double SimulationBox::get_dv()
+{
+    return dv;
+}
 double SimulationBox::get_dv(int i)
 {
-    return dv[i];
+    assert(0 <= i && i < n_grid);
+    return dv;
 }
 int SimulationBox::get_n_grid()
 {
@@ -105,6 +199,28 @@ double SimulationBox::get_volume()
 {
     return volume;
 }
+std::vector<double> SimulationBox::get_angles()
+{
+    const double PI{3.14159265358979323846};
+    if (dim == 3)
+        return {angles[0]*180.0/PI, angles[1]*180.0/PI, angles[2]*180.0/PI};
+    else if (dim == 2)
+        return {angles[0]*180.0/PI};
+    return {};
+}
+std::array<double,3> SimulationBox::get_cos_angles()
+{
+    return {cos(angles[0]), cos(angles[1]), cos(angles[2])};
+}
+std::array<double,6> SimulationBox::get_recip_metric()
+{
+    return recip_metric;
+}
+bool SimulationBox::is_orthogonal()
+{
+    std::array<double,3> cos_angles = get_cos_angles();
+    return std::all_of(cos_angles.begin(), cos_angles.end(), [](double c) { return std::abs(c) < 1e-14;});
+}
 //----------------- set methods-------------------------------------
 void SimulationBox::set_lx(std::vector<double> new_lx)
 {
@@ -137,46 +253,124 @@ void SimulationBox::set_lx(std::vector<double> new_lx)
         lx[1] = 1.0;
         dx[1] = 1.0;
     }
-    // weight factor for integral
-    for(int i=0; i<n_grid; i++)
-        dv[i] = dx[0]*dx[1]*dx[2];
-    volume = lx[0]*lx[1]*lx[2];
+    update_geometry();
+}
+void SimulationBox::set_angles(std::vector<double> new_angles)
+{
+    const double PI{3.14159265358979323846};
+    const unsigned int n_angles = (dim == 3) ? 3 : ((dim == 2) ? 1 : 0);
+
+    if ( new_angles.size() != n_angles )
+        throw_with_line_number("The number of angles (" + std::to_string(new_angles.size()) + ") must be " + std::to_string(n_angles) + " in " + std::to_string(dim) + "D.");
+    if (std::any_of(new_angles.begin(), new_angles.end(), [](double a) { return a <= 0.0 || a >= 180.0;}))
+        throw_with_line_number("angles must be in the range of (0, 180) degrees");
+
+    std::array<double,3> old_angles = angles;
+    for(unsigned int i=0; i<n_angles; i++)
+        angles[i] = new_angles[i]*PI/180.0;
+
+    // the angles must form a cell with a positive volume
+    std::array<double,3> c = get_cos_angles();
+    if (1.0 - c[0]*c[0] - c[1]*c[1] - c[2]*c[2] + 2.0*c[0]*c[1]*c[2] <= 0.0)
+    {
+        angles = old_angles;
+        throw_with_line_number("angles do not form a valid cell");
+    }
+    update_geometry();
+}
+void SimulationBox::update_geometry()
+{
+    // metric tensor, g_ij = l_i*l_j*cos(angle_ij)
+    std::array<double,3> c = get_cos_angles();
+    double g[3][3];
+    g[0][0] = lx[0]*lx[0];
+    g[1][1] = lx[1]*lx[1];
+    g[2][2] = lx[2]*lx[2];
+    g[1][2] = g[2][1] = lx[1]*lx[2]*c[0];
+    g[0][2] = g[2][0] = lx[0]*lx[2]*c[1];
+    g[0][1] = g[1][0] = lx[0]*lx[1]*c[2];
+
+    double det = g[0][0]*(g[1][1]*g[2][2]-g[1][2]*g[2][1])
+               - g[0][1]*(g[1][0]*g[2][2]-g[1][2]*g[2][0])
+               + g[0][2]*(g[1][0]*g[2][1]-g[1][1]*g[2][0]);
+
+    // reciprocal metric tensor, inverse of g
+    recip_metric[0] = (g[1][1]*g[2][2]-g[1][2]*g[2][1])/det;
+    recip_metric[1] = (g[0][0]*g[2][2]-g[0][2]*g[2][0])/det;
+    recip_metric[2] = (g[0][0]*g[1][1]-g[0][1]*g[1][0])/det;
+    recip_metric[3] = (g[0][2]*g[2][1]-g[0][1]*g[2][2])/det;
+    recip_metric[4] = (g[0][1]*g[1][2]-g[0][2]*g[1][1])/det;
+    recip_metric[5] = (g[0][2]*g[1][0]-g[0][0]*g[1][2])/det;
+
+    // system volume and weight factor for integral
+    if (is_orthogonal())
+    {
+        volume = lx[0]*lx[1]*lx[2];
+        dv = dx[0]*dx[1]*dx[2];
+    }
+    else
+    {
+        volume = sqrt(det);
+        dv = volume/n_grid;
+    }
 }
 //-----------------------------------------------------------
-// This method calculates inner product g and h
+// This method calculates integral of g
 double SimulationBox::integral(double *g)
 {
-    double sum{0.0};
-    for(int i=0; i<n_grid; i++)
-        sum += dv[i]*g[i];
-    return sum;
+    return dv*block_sum(g, n_grid);
 }
 // This method calculates inner product g and h
 double SimulationBox::inner_product(double *g, double *h)
 {
-    double sum{0.0};
-    for(int i=0; i<n_grid; i++)
-        sum += dv[i]*g[i]*h[i];
-    return sum;
+    return dv*block_sum(g, h, n_grid);
 }
 //-----------------------------------------------------------
 double SimulationBox::multi_inner_product(int n_comp, double *g, double *h)
 {
-    double sum{0.0};
-    for(int n=0; n < n_comp; n++)
-    {
-        for(int i=0; i<n_grid; i++)
-            sum += dv[i]*g[i+n*n_grid]*h[i+n*n_grid];
-    }
-    return sum;
+    return dv*block_sum(g, h, n_comp*n_grid);
 }
 //-----------------------------------------------------------
 // This method makes the input a zero-meaned matrix
 void SimulationBox::zero_mean(double *g)
 {
-    double sum{0.0};
-    for(int i=0; i<n_grid; i++)
-        sum += dv[i]*g[i];
+    const double mean = block_sum(g, n_grid)/n_grid;
+    #pragma omp parallel for simd schedule(static) if(use_threads(n_grid/REDUCTION_BLOCK))
     for(int i=0; i<n_grid; i++)
-        g[i] -= sum/volume;
+        g[i] -= mean;
+}
+//-----------------------------------------------------------
+// The requests are computed block by block, so that each block of the
+// fields is read from memory once and reused from L1 cache by the other
+// requests (256 doubles of six fields take 12 KB).
+std::vector<double> SimulationBox::reduce_many(std::vector<double *> fields, std::vector<std::array<int,2>> requests)
+{
+    const int n_fields = fields.size();
+    const int n_requests = requests.size();
+    for(int r=0; r<n_requests; r++)
+    {
+        if (requests[r][0] < 0 || requests[r][0] >= n_fields || requests[r][1] < -1 || requests[r][1] >= n_fields)
+            throw_with_line_number("Request " + std::to_string(r) + " (" + std::to_string(requests[r][0]) + ", " + std::to_string(requests[r][1]) + ") is out of the range of fields (" + std::to_string(n_fields) + ")");
+    }
+
+    const int n_blocks = (n_grid+REDUCTION_BLOCK-1)/REDUCTION_BLOCK;
+    std::vector<double> sum(n_requests*n_blocks);
+    #pragma omp parallel for schedule(static) if(use_threads(n_blocks))
+    for(int b=0; b<n_blocks; b++)
+    {
+        const int start = b*REDUCTION_BLOCK;
+        const int end = std::min(n_grid, (b+1)*REDUCTION_BLOCK);
+        for(int r=0; r<n_requests; r++)
+        {
+            if (requests[r][1] < 0)
+                sum[r*n_blocks+b] = sum_block(fields[requests[r][0]], start, end);
+            else
+                sum[r*n_blocks+b] = dot_block(fields[requests[r][0]], fields[requests[r][1]], start, end);
+        }
+    }
+
+    std::vector<double> results(n_requests);
+    for(int r=0; r<n_requests; r++)
+        results[r] = dv*pairwise_sum(&sum[r*n_blocks], n_blocks);
+    return results;
 }
@@ -2,6 +2,10 @@
 * This is an abstract SimulationBox class.
 * This class defines simulation box parameters and provide
 * methods that compute inner product in a given geometry.
+* The cell can be non-orthogonal (triclinic). The angles are given in
+* degrees, {alpha, beta, gamma} in 3D and {gamma} in 2D, where alpha is
+* the angle between the 2nd and 3rd axes, beta between the 1st and 3rd,
+* and gamma between the 1st and 2nd (the last two axes in 2D).
 *--------------------------------------------------------------*/
 #ifndef SIMULATION_BOX_H_
 #define SIMULATION_BOX_H_
@@ -24,12 +28,16 @@ protected:
     std::array<int,3> nx;  // the number of grid in each direction
     std::array<double,3> lx;  // length of the block copolymer in each direction (in units of aN^1/2)
     std::array<double,3> dx;  // grid interval in each direction
+    std::array<double,3> angles;  // angles (in radians) between axes (1,2), (0,2) and (0,1)
+    std::array<double,6> recip_metric;  // reciprocal metric tensor (xx, yy, zz, xy, xz, yz)
     int n_grid;  // the number of grid
-    double *dv; // dV, simple integral weight,
+    double dv; // dV, integral weight, which is the same for every grid point
     double volume; // volume of the system.
 
+    // update volume, dv and reciprocal metric tensor using lx and angles
+    void update_geometry();
 public:
-    SimulationBox(std::vector<int> nx, std::vector<double> lx);
+    SimulationBox(std::vector<int> nx, std::vector<double> lx, std::vector<double> angles={});
     virtual ~SimulationBox();
 
     int get_dim();
@@ -39,16 +47,26 @@ public:
     double get_lx(int i);
     std::array<double,3> get_dx();
     double get_dx(int i);
+    double get_dv();
     double get_dv(int i);
     int get_n_grid();
     double get_volume();
+    std::vector<double> get_angles();
+    std::array<double,3> get_cos_angles();
+    std::array<double,6> get_recip_metric();
+    bool is_orthogonal();
 
     virtual void set_lx(std::vector<double> new_lx);
+    virtual void set_angles(std::vector<double> new_angles);
 
     double integral(double *g);
     double inner_product(double *g, double *h);
     double multi_inner_product(int n_comp, double *g, double *h);
     void zero_mean(double *g);
+    // integrals and inner products of several fields in one pass over the grid,
+    // request {i,-1} is the integral of fields[i], and {i,j} is the inner
+    // product of fields[i] and fields[j]
+    std::vector<double> reduce_many(std::vector<double *> fields, std::vector<std::array<int,2>> requests);
 
     // Methods for pybind11
     double integral(py::array_t<double> g) {
@@ -76,6 +94,28 @@ public:
             throw_with_line_number("Size of input h (" + std::to_string(buf2.size) + ") and 'n_comp x n_grid' (" + std::to_string(n_comp*n_grid) + ") must match");
         return multi_inner_product(n_comp, (double*) buf1.ptr, (double*) buf2.ptr);
     };
+    std::vector<double> reduce_many(std::vector<py::array_t<double>> fields, std::vector<std::vector<int>> requests) {
+        // requests are tuples, (i,) for integral and (i,j) for inner product
+        std::vector<double *> field_ptrs;
+        std::vector<std::array<int,2>> field_requests;
+        for(size_t i=0; i<fields.size(); i++)
+        {
+            py::buffer_info buf = fields[i].request();
+            if (buf.size != n_grid)
+                throw_with_line_number("Size of input fields[" + std::to_string(i) + "] (" + std::to_string(buf.size) + ") and 'n_grid' (" + std::to_string(n_grid) + ") must match");
+            field_ptrs.push_back((double*) buf.ptr);
+        }
+        for(size_t r=0; r<requests.size(); r++)
+        {
+            if (requests[r].size() == 1)
+                field_requests.push_back({requests[r][0], -1});
+            else if (requests[r].size() == 2)
+                field_requests.push_back({requests[r][0], requests[r][1]});
+            else
+                throw_with_line_number("Request " + std::to_string(r) + " must be (i,) or (i,j), but its length is " + std::to_string(requests[r].size()));
+        }
+        return reduce_many(field_ptrs, field_requests);
+    };
     void zero_mean(py::array_t<double> g) {
         py::buffer_info buf = g.request();
         if (buf.size != n_grid) {
@@ -0,0 +1,152 @@
+#include <iostream>
+#include <cmath>
+#include <algorithm>
+#include "StructureFunction.h"
+#include "WaveNumber.h"
+
+StructureFunction::StructureFunction(SimulationBox *sb)
+{
+    try
+    {
+        if (sb == nullptr)
+            throw_with_line_number("SimulationBox *sb is null pointer");
+
+        this->sb = sb;
+        this->n_complex_grid = sb->get_nx(0)*sb->get_nx(1)*(sb->get_nx(2)/2+1);
+
+        this->sf_mean = new double[n_complex_grid];
+        this->sf_m2   = new double[n_complex_grid];
+        this->power   = new double[n_complex_grid];
+        reset();
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+StructureFunction::~StructureFunction()
+{
+    delete[] sf_mean;
+    delete[] sf_m2;
+    delete[] power;
+}
+void StructureFunction::reset()
+{
+    n_samples = 0;
+    for(int i=0; i<n_complex_grid; i++)
+    {
+        sf_mean[i] = 0.0;
+        sf_m2[i] = 0.0;
+    }
+}
+void StructureFunction::accumulate(double *field)
+{
+    try
+    {
+        compute_power_spectrum(field, power);
+
+        // Welford's algorithm
+        n_samples++;
+        const double inv_n = 1.0/static_cast<double>(n_samples);
+        for(int i=0; i<n_complex_grid; i++)
+        {
+            double delta = power[i] - sf_mean[i];
+            sf_mean[i] += delta*inv_n;
+            sf_m2[i] += delta*(power[i] - sf_mean[i]);
+        }
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+long int StructureFunction::get_n_samples()
+{
+    return n_samples;
+}
+void StructureFunction::get_mean(double *mean)
+{
+    for(int i=0; i<n_complex_grid; i++)
+        mean[i] = sf_mean[i];
+}
+void StructureFunction::get_variance(double *variance)
+{
+    const double inv_n = (n_samples > 1) ? 1.0/static_cast<double>(n_samples-1) : 0.0;
+    for(int i=0; i<n_complex_grid; i++)
+        variance[i] = sf_m2[i]*inv_n;
+}
+void StructureFunction::get_wave_number(double *k)
+{
+    std::array<int,3> nx = sb->get_nx();
+    std::array<double,6> g = sb->get_recip_metric();
+
+    for(int i=0; i<nx[0]; i++)
+    {
+        const int m0 = WaveNumber::signed_mode(i, nx[0]);
+        for(int j=0; j<nx[1]; j++)
+        {
+            const int m1 = WaveNumber::signed_mode(j, nx[1]);
+            for(int m2=0; m2<nx[2]/2+1; m2++)
+            {
+                const int idx = i*nx[1]*(nx[2]/2+1) + j*(nx[2]/2+1) + m2;
+                k[idx] = sqrt(WaveNumber::wave_number_square(m0, m1, m2, nx, g));
+            }
+        }
+    }
+}
+std::tuple<std::vector<double>, std::vector<double>, std::vector<double>, std::vector<int>>
+    StructureFunction::get_spherical_average(double bin_width)
+{
+    try
+    {
+        if (bin_width <= 0.0)
+            throw_with_line_number("bin_width (" + std::to_string(bin_width) + ") must be positive");
+
+        const int NZ_COMPLEX = sb->get_nx(2)/2+1;
+        double *k = new double[n_complex_grid];
+        double *variance = new double[n_complex_grid];
+        get_wave_number(k);
+        get_variance(variance);
+
+        double k_max = 0.0;
+        for(int i=0; i<n_complex_grid; i++)
+            k_max = std::max(k_max, k[i]);
+        const int n_bins = static_cast<int>(k_max/bin_width)+1;
+
+        std::vector<double> k_sum(n_bins, 0.0), sf_sum(n_bins, 0.0), var_sum(n_bins, 0.0);
+        std::vector<int> count(n_bins, 0);
+        for(int i=0; i<n_complex_grid; i++)
+        {
+            // exclude k=0
+            if (i == 0)
+                continue;
+            const int m2 = i % NZ_COMPLEX;
+            const int weight = (m2 == 0 || 2*m2 == sb->get_nx(2)) ? 1 : 2;
+            const int bin = static_cast<int>(k[i]/bin_width);
+            k_sum[bin]   += weight*k[i];
+            sf_sum[bin]  += weight*sf_mean[i];
+            var_sum[bin] += weight*variance[i];
+            count[bin]   += weight;
+        }
+        delete[] k;
+        delete[] variance;
+
+        // non-empty shells
+        std::vector<double> k_out, sf_out, var_out;
+        std::vector<int> count_out;
+        for(int b=0; b<n_bins; b++)
+        {
+            if (count[b] == 0)
+                continue;
+            k_out.push_back(k_sum[b]/count[b]);
+            sf_out.push_back(sf_sum[b]/count[b]);
+            var_out.push_back(var_sum[b]/count[b]);
+            count_out.push_back(count[b]);
+        }
+        return std::make_tuple(k_out, sf_out, var_out, count_out);
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
@@ -0,0 +1,98 @@
+/*-------------------------------------------------------------
+* This is an abstract StructureFunction class.
+* Online accumulation of the power spectrum of a field, e.g., the
+* composition field phi_a-phi_b or w_minus during Langevin FTS.
+* For each sample, the power spectrum |psi(k)|^2 is computed with the
+* real-to-complex FFT of the platform, psi(k) = FFT(psi)/n_grid, and the
+* running mean and variance of each Fourier mode are updated by Welford's
+* algorithm. The spherical average over shells of |k| is computed from
+* the running mean for the current box.
+*------------------------------------------------------------*/
+
+#ifndef STRUCTURE_FUNCTION_H_
+#define STRUCTURE_FUNCTION_H_
+
+#include <array>
+#include <vector>
+#include <tuple>
+
+#include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
+
+#include "SimulationBox.h"
+#include "Exception.h"
+
+namespace py = pybind11;
+
+class StructureFunction
+{
+protected:
+    SimulationBox *sb;
+    int n_complex_grid;
+
+    // number of samples, running mean and sum of squared deviations of |psi(k)|^2
+    long int n_samples;
+    double *sf_mean, *sf_m2;
+    // power spectrum of the current sample
+    double *power;
+
+    // power[i] = |FFT(field)[i]/n_grid|^2 (platform specific)
+    virtual void compute_power_spectrum(double *field, double *power) = 0;
+public:
+    StructureFunction(SimulationBox *sb);
+    virtual ~StructureFunction();
+
+    void reset();
+    void accumulate(double *field);
+    long int get_n_samples();
+    // mean and unbiased variance of |psi(k)|^2 on the complex grid
+    void get_mean(double *mean);
+    void get_variance(double *variance);
+    // |k| of the complex grid, k = 2*pi*sqrt(m^T G* m)
+    void get_wave_number(double *k);
+    // average over the shells [n*bin_width, (n+1)*bin_width) of |k|, excluding k=0.
+    // The modes of the halved axis other than 0 and the Nyquist mode are counted twice.
+    // returns mean |k|, mean S(k), mean variance of S(k), and number of modes of each shell
+    std::tuple<std::vector<double>, std::vector<double>, std::vector<double>, std::vector<int>>
+        get_spherical_average(double bin_width);
+
+    // Methods for pybind11
+    void accumulate(py::array_t<double> field)
+    {
+        const int M = sb->get_n_grid();
+        py::buffer_info buf_field = field.request();
+
+        if (buf_field.size != M)
+            throw_with_line_number("Size of input field (" + std::to_string(buf_field.size) + ") and 'n_grid' (" + std::to_string(M) + ") must match");
+        try{
+            py::gil_scoped_release release;
+            accumulate((double*) buf_field.ptr);
+        }
+        catch(std::exception& exc)
+        {
+            throw_without_line_number(exc.what());
+        }
+    };
+    py::array_t<double> get_mean()
+    {
+        py::array_t<double> mean = py::array_t<double>(n_complex_grid);
+        py::buffer_info buf_mean = mean.request();
+        get_mean((double*) buf_mean.ptr);
+        return mean;
+    };
+    py::array_t<double> get_variance()
+    {
+        py::array_t<double> variance = py::array_t<double>(n_complex_grid);
+        py::buffer_info buf_variance = variance.request();
+        get_variance((double*) buf_variance.ptr);
+        return variance;
+    };
+    py::array_t<double> get_wave_number()
+    {
+        py::array_t<double> k = py::array_t<double>(n_complex_grid);
+        py::buffer_info buf_k = k.request();
+        get_wave_number((double*) buf_k.ptr);
+        return k;
+    };
+};
+#endif
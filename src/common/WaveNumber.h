@@ -0,0 +1,39 @@
+/*-------------------------------------------------------------
+* Wave numbers of the real-to-complex FFT, shared by Pseudo and
+* StructureFunction.
+* The mode numbers are signed, m = i for i <= n/2 and i-n otherwise,
+* and the last axis has only m = 0, 1, ..., n/2. The sign of the
+* Nyquist mode of an even grid is ambiguous, and it is excluded from
+* the cross terms of k^2 to keep the Hermitian symmetry.
+*------------------------------------------------------------*/
+
+#ifndef WAVE_NUMBER_H_
+#define WAVE_NUMBER_H_
+
+#include <array>
+
+class WaveNumber
+{
+public:
+    // signed mode number of the i-th grid of an axis with n grids
+    static inline int signed_mode(int i, int n)
+    {
+        return (i > n/2) ? i-n : i;
+    }
+    // mode number in the cross terms, zero for the Nyquist mode
+    static inline int cross_mode(int m, int n)
+    {
+        return (2*m == n) ? 0 : m;
+    }
+    // k^2 = (2*pi)^2 * m^T G* m, where G* is the reciprocal metric tensor
+    static inline double wave_number_square(int m0, int m1, int m2, std::array<int,3> nx, std::array<double,6> g)
+    {
+        const double PI{3.14159265358979323846};
+        const int c0 = cross_mode(m0, nx[0]);
+        const int c1 = cross_mode(m1, nx[1]);
+        const int c2 = cross_mode(m2, nx[2]);
+        return 4*PI*PI*(g[0]*m0*m0 + g[1]*m1*m1 + g[2]*m2*m2
+                      + 2*g[3]*c0*c1 + 2*g[4]*c0*c2 + 2*g[5]*c1*c2);
+    }
+};
+#endif
@@ -65,6 +65,39 @@ void CpuAndersonMixing::reset_count()
         throw_without_line_number(exc.what());
     }
 }
+int CpuAndersonMixing::get_n_hist()
+{
+    return cb_w_out_hist->get_n_items();
+}
+void CpuAndersonMixing::get_hist(double *w_out_hist, double *w_deriv_hist, double *w_deriv_dots_hist)
+{
+    const int n_hist = get_n_hist();
+    for(int h=0; h<n_hist; h++)
+    {
+        double *w_out = cb_w_out_hist->get_array(n_hist-1-h);
+        double *w_deriv = cb_w_deriv_hist->get_array(n_hist-1-h);
+        double *w_deriv_dots = cb_w_deriv_dots->get_array(n_hist-1-h);
+        for(int i=0; i<n_var; i++)
+        {
+            w_out_hist[h*n_var+i] = w_out[i];
+            w_deriv_hist[h*n_var+i] = w_deriv[i];
+        }
+        for(int i=0; i<max_hist+1; i++)
+            w_deriv_dots_hist[h*(max_hist+1)+i] = w_deriv_dots[i];
+    }
+}
+void CpuAndersonMixing::set_hist(int n_hist, double *w_out_hist, double *w_deriv_hist, double *w_deriv_dots_hist)
+{
+    cb_w_out_hist->reset();
+    cb_w_deriv_hist->reset();
+    cb_w_deriv_dots->reset();
+    for(int h=0; h<n_hist; h++)
+    {
+        cb_w_out_hist->insert(&w_out_hist[h*n_var]);
+        cb_w_deriv_hist->insert(&w_deriv_hist[h*n_var]);
+        cb_w_deriv_dots->insert(&w_deriv_dots_hist[h*(max_hist+1)]);
+    }
+}
 double CpuAndersonMixing::dot_product(double *a, double *b)
 {
     double sum{0.0};
@@ -31,5 +31,9 @@ public:
     void caculate_new_fields(
         double *w, double *w_out, double *w_deriv,
         double old_error_level, double error_level) override;
+
+    int get_n_hist() override;
+    void get_hist(double *w_out_hist, double *w_deriv_hist, double *w_deriv_dots_hist) override;
+    void set_hist(int n_hist, double *w_out_hist, double *w_deriv_hist, double *w_deriv_dots_hist) override;
 };
 #endif
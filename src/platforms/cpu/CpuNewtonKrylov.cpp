@@ -0,0 +1,23 @@
+#include "CpuNewtonKrylov.h"
+
+CpuNewtonKrylov::CpuNewtonKrylov(
+    SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo, FFT *fft,
+    int n_var, int max_hist, double start_error, double mix_min, double mix_init)
+    :NewtonKrylov(sb, pc, pseudo, n_var, max_hist, start_error, mix_min, mix_init)
+{
+    this->fft = fft;
+    this->k_temp = new std::complex<double>[n_complex_grid];
+}
+CpuNewtonKrylov::~CpuNewtonKrylov()
+{
+    delete fft;
+    delete[] k_temp;
+}
+void CpuNewtonKrylov::apply_kernel(int n, double *r_in, double *r_out)
+{
+    double *kernel = &rpa_kernel[n*n_complex_grid];
+    fft->forward(r_in, k_temp);
+    for(int i=0; i<n_complex_grid; i++)
+        k_temp[i] *= kernel[i];
+    fft->backward(k_temp, r_out);
+}
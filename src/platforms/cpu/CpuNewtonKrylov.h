@@ -0,0 +1,26 @@
+/*-------------------------------------------------------------
+* This is a derived CpuNewtonKrylov class
+*------------------------------------------------------------*/
+
+#ifndef CPU_NEWTON_KRYLOV_H_
+#define CPU_NEWTON_KRYLOV_H_
+
+#include <complex>
+#include "SimulationBox.h"
+#include "PolymerChain.h"
+#include "Pseudo.h"
+#include "NewtonKrylov.h"
+#include "FFT.h"
+
+class CpuNewtonKrylov : public NewtonKrylov
+{
+private:
+    FFT *fft;
+    std::complex<double> *k_temp;
+    void apply_kernel(int n, double *r_in, double *r_out) override;
+public:
+    CpuNewtonKrylov(SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo, FFT *fft,
+        int n_var, int max_hist, double start_error, double mix_min, double mix_init);
+    ~CpuNewtonKrylov();
+};
+#endif
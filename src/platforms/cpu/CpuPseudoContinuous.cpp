@@ -19,6 +19,8 @@ CpuPseudoContinuous::CpuPseudoContinuous(
         this->boltz_bond_b_half = new double[n_complex_grid];
         this->q_1 = new double[M*(N+1)];
         this->q_2 = new double[M*(N+1)];
+        this->dq_1 = nullptr;
+        this->dq_2 = nullptr;
 
         update();
     }
@@ -33,6 +35,8 @@ CpuPseudoContinuous::~CpuPseudoContinuous()
     delete[] boltz_bond_a, boltz_bond_a_half;
     delete[] boltz_bond_b, boltz_bond_b_half;
     delete[] q_1, q_2;
+    delete[] dq_1;
+    delete[] dq_2;
 }
 void CpuPseudoContinuous::update()
 {
@@ -45,10 +49,27 @@ void CpuPseudoContinuous::update()
         bond_length_a = eps*eps/(f*eps*eps + (1.0-f));
         bond_length_b = 1.0/(f*eps*eps + (1.0-f));
 
-        get_boltz_bond(boltz_bond_a,      bond_length_a,   sb->get_nx(), sb->get_dx(), pc->get_ds());
-        get_boltz_bond(boltz_bond_b,      bond_length_b,   sb->get_nx(), sb->get_dx(), pc->get_ds());
-        get_boltz_bond(boltz_bond_a_half, bond_length_a/2, sb->get_nx(), sb->get_dx(), pc->get_ds());
-        get_boltz_bond(boltz_bond_b_half, bond_length_b/2, sb->get_nx(), sb->get_dx(), pc->get_ds());
+        std::array<double,6> recip_metric = sb->get_recip_metric();
+        if (recip_metric != boltz_metric || n_boltz_rescale < 0)
+        {
+            if (is_boltz_bond_rescalable(recip_metric))
+            {
+                rescale_boltz_bond(boltz_bond_a,      bond_length_a,   sb->get_nx(), boltz_metric, recip_metric, pc->get_ds());
+                rescale_boltz_bond(boltz_bond_b,      bond_length_b,   sb->get_nx(), boltz_metric, recip_metric, pc->get_ds());
+                rescale_boltz_bond(boltz_bond_a_half, bond_length_a/2, sb->get_nx(), boltz_metric, recip_metric, pc->get_ds());
+                rescale_boltz_bond(boltz_bond_b_half, bond_length_b/2, sb->get_nx(), boltz_metric, recip_metric, pc->get_ds());
+                n_boltz_rescale++;
+            }
+            else
+            {
+                get_boltz_bond(boltz_bond_a,      bond_length_a,   sb->get_nx(), recip_metric, pc->get_ds());
+                get_boltz_bond(boltz_bond_b,      bond_length_b,   sb->get_nx(), recip_metric, pc->get_ds());
+                get_boltz_bond(boltz_bond_a_half, bond_length_a/2, sb->get_nx(), recip_metric, pc->get_ds());
+                get_boltz_bond(boltz_bond_b_half, bond_length_b/2, sb->get_nx(), recip_metric, pc->get_ds());
+                n_boltz_rescale = 0;
+            }
+            boltz_metric = recip_metric;
+        }
     }
     catch(std::exception& exc)
     {
@@ -56,7 +77,7 @@ void CpuPseudoContinuous::update()
     }
 }
 
-std::array<double,3> CpuPseudoContinuous::dq_dl()
+std::array<double,6> CpuPseudoContinuous::dq_dmetric()
 {
     // This method should be invoked after invoking find_phi().
 
@@ -75,72 +96,48 @@ std::array<double,3> CpuPseudoContinuous::dq_dl()
         const double f = pc->get_f();
         const double bond_length_a = eps*eps/(f*eps*eps + (1.0-f));
         const double bond_length_b = 1.0/(f*eps*eps + (1.0-f));
-        double bond_length;
 
-        std::array<double,3> dq_dl;
+        // components (xx, yy, zz, xy, xz, yz) and their axes
+        const int axes[6][2] = {{0,0}, {1,1}, {2,2}, {0,1}, {0,2}, {1,2}};
+
+        std::array<double,6> dq_dg;
         std::complex<double> k_q_1[M_COMPLEX];
         std::complex<double> k_q_2[M_COMPLEX];
 
         double simpson_rule_coeff_a[N_A+1];
         double simpson_rule_coeff_b[N-N_A+1];
-        double fourier_basis_x[M_COMPLEX];
-        double fourier_basis_y[M_COMPLEX];
-        double fourier_basis_z[M_COMPLEX];
+        double *fourier_basis = new double[6*M_COMPLEX];
 
-        get_weighted_fourier_basis(fourier_basis_x, fourier_basis_y, fourier_basis_z, sb->get_nx(), sb->get_dx());
+        get_weighted_fourier_basis(fourier_basis, sb->get_nx());
 
-        for(int i=0; i<3; i++)
-            dq_dl[i] = 0.0;
+        for(int c=0; c<6; c++)
+            dq_dg[c] = 0.0;
 
         SimpsonQuadrature::init_coeff(simpson_rule_coeff_a, N_A);
-        for(int n=0; n<=N_A; n++)
-        {
-            fft->forward(&q_1[n*M],k_q_1);
-            fft->forward(&q_2[n*M],k_q_2);
-
-            if ( DIM >= 3 )
-            {
-                for(int i=0; i<M_COMPLEX; i++)
-                    dq_dl[0] += simpson_rule_coeff_a[n]*bond_length_a*(k_q_1[i]*std::conj(k_q_2[i])).real()*fourier_basis_x[i];
-            }
-            if ( DIM >= 2 )
-            {
-                for(int i=0; i<M_COMPLEX; i++)
-                    dq_dl[1] += simpson_rule_coeff_a[n]*bond_length_a*(k_q_1[i]*std::conj(k_q_2[i])).real()*fourier_basis_y[i];
-            }
-            if ( DIM >= 1 )
-            {
-                for(int i=0; i<M_COMPLEX; i++)
-                    dq_dl[2] += simpson_rule_coeff_a[n]*bond_length_a*(k_q_1[i]*std::conj(k_q_2[i])).real()*fourier_basis_z[i];
-            }
-        }
-        
         SimpsonQuadrature::init_coeff(simpson_rule_coeff_b, N-N_A);
-        for(int n=N_A; n<=N; n++)
+        for(int n=0; n<=N; n++)
         {
             fft->forward(&q_1[n*M],k_q_1);
             fft->forward(&q_2[n*M],k_q_2);
-            if ( DIM >= 3 )
-            {
-                for(int i=0; i<M_COMPLEX; i++)
-                    dq_dl[0] += simpson_rule_coeff_b[n-N_A]*bond_length_b*(k_q_1[i]*std::conj(k_q_2[i])).real()*fourier_basis_x[i];
-            }
-            if ( DIM >= 2 )
-            {
-                for(int i=0; i<M_COMPLEX; i++)
-                    dq_dl[1] += simpson_rule_coeff_b[n-N_A]*bond_length_b*(k_q_1[i]*std::conj(k_q_2[i])).real()*fourier_basis_y[i];
-            }
-            if ( DIM >= 1 )
+
+            // the junction is counted by both blocks
+            double coeff_a = (n <= N_A) ? simpson_rule_coeff_a[n]*bond_length_a : 0.0;
+            double coeff_b = (n >= N_A) ? simpson_rule_coeff_b[n-N_A]*bond_length_b : 0.0;
+            for(int c=0; c<6; c++)
             {
+                // only the axes of the simulation box
+                if (axes[c][0] < 3-DIM || axes[c][1] < 3-DIM)
+                    continue;
+                double *basis = &fourier_basis[c*M_COMPLEX];
                 for(int i=0; i<M_COMPLEX; i++)
-                    dq_dl[2] += simpson_rule_coeff_b[n-N_A]*bond_length_b*(k_q_1[i]*std::conj(k_q_2[i])).real()*fourier_basis_z[i];
+                    dq_dg[c] += (coeff_a+coeff_b)*(k_q_1[i]*std::conj(k_q_2[i])).real()*basis[i];
             }
         }
-        
-        for(int d=0; d<3; d++)
-            dq_dl[d] /= 3.0*sb->get_lx(d)*M*M*N/sb->get_volume();
+        for(int c=0; c<6; c++)
+            dq_dg[c] *= -sb->get_volume()/(6.0*M*M*N);
 
-        return dq_dl;
+        delete[] fourier_basis;
+        return dq_dg;
     }
     catch(std::exception& exc)
     {
@@ -253,6 +250,127 @@ void CpuPseudoContinuous::find_phi(double *phi_a,  double *phi_b,
         throw_without_line_number(exc.what());
     }
 }
+void CpuPseudoContinuous::calculate_dphi_one_type(
+    double *dphi, const int N_START, const int N_END)
+{
+    try
+    {
+        const int M = sb->get_n_grid();
+        double simpson_rule_coeff[N_END-N_START+1];
+
+        SimpsonQuadrature::init_coeff(simpson_rule_coeff, N_END-N_START);
+
+        // Compute derivative of segment concentration
+        for(int i=0; i<M; i++)
+            dphi[i] = simpson_rule_coeff[0]*(dq_1[i+N_START*M]*q_2[i+N_START*M] + q_1[i+N_START*M]*dq_2[i+N_START*M]);
+        for(int n=N_START+1; n<=N_END; n++)
+        {
+            for(int i=0; i<M; i++)
+                dphi[i] += simpson_rule_coeff[n-N_START]*(dq_1[i+n*M]*q_2[i+n*M] + q_1[i+n*M]*dq_2[i+n*M]);
+        }
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+
+void CpuPseudoContinuous::find_phi_jvp(double *dphi_a, double *dphi_b,
+                                 double *q_1_init, double *q_2_init,
+                                 double *w_a, double *w_b,
+                                 double *dw_a, double *dw_b,
+                                 double &single_partition, double &d_single_partition)
+{
+    try
+    {
+        const int M     = sb->get_n_grid();
+        const int N     = pc->get_n_segment();
+        const int N_A   = pc->get_n_segment_a();
+        const double ds = pc->get_ds();
+
+        double exp_dw_a[M];
+        double exp_dw_b[M];
+        double exp_dw_a_half[M];
+        double exp_dw_b_half[M];
+        double phi_a[M], phi_b[M];
+
+        if (dq_1 == nullptr)
+        {
+            dq_1 = new double[M*(N+1)];
+            dq_2 = new double[M*(N+1)];
+        }
+
+        for(int i=0; i<M; i++)
+        {
+            exp_dw_a     [i] = exp(-w_a[i]*ds*0.5);
+            exp_dw_b     [i] = exp(-w_b[i]*ds*0.5);
+            exp_dw_a_half[i] = exp(-w_a[i]*ds*0.25);
+            exp_dw_b_half[i] = exp(-w_b[i]*ds*0.25);
+        }
+
+        #pragma omp parallel sections num_threads(2)
+        {
+            #pragma omp section
+            {
+                for(int i=0; i<M; i++)
+                {
+                    q_1[i] = q_1_init[i];
+                    dq_1[i] = 0.0;
+                }
+                // diffusion of A chain
+                for(int n=1; n<=N_A; n++)
+                    one_step_jvp(&q_1[(n-1)*M],&dq_1[(n-1)*M],&q_1[n*M],&dq_1[n*M],
+                            boltz_bond_a,boltz_bond_a_half,
+                            exp_dw_a,exp_dw_a_half,dw_a);
+                // diffusion of B chain
+                for(int n=N_A+1; n<=N; n++)
+                    one_step_jvp(&q_1[(n-1)*M],&dq_1[(n-1)*M],&q_1[n*M],&dq_1[n*M],
+                            boltz_bond_b,boltz_bond_b_half,
+                            exp_dw_b,exp_dw_b_half,dw_b);
+            }
+            #pragma omp section
+            {
+                for(int i=0; i<M; i++)
+                {
+                    q_2[i+N*M] = q_2_init[i];
+                    dq_2[i+N*M] = 0.0;
+                }
+                // diffusion of B chain
+                for(int n=N; n>=N_A+1; n--)
+                    one_step_jvp(&q_2[n*M],&dq_2[n*M],&q_2[(n-1)*M],&dq_2[(n-1)*M],
+                            boltz_bond_b,boltz_bond_b_half,
+                            exp_dw_b,exp_dw_b_half,dw_b);
+                // diffusion of A chain
+                for(int n=N_A; n>=1; n--)
+                    one_step_jvp(&q_2[n*M],&dq_2[n*M],&q_2[(n-1)*M],&dq_2[(n-1)*M],
+                            boltz_bond_a,boltz_bond_a_half,
+                            exp_dw_a,exp_dw_a_half,dw_a);
+            }
+        }
+
+        // segment concentration and its derivative
+        calculate_phi_one_type(phi_a, 0, N_A);
+        calculate_phi_one_type(phi_b, N_A, N);
+        calculate_dphi_one_type(dphi_a, 0, N_A);
+        calculate_dphi_one_type(dphi_b, N_A, N);
+
+        // single chain partition function and its derivative
+        single_partition = sb->inner_product(&q_1[N_A*M],&q_2[N_A*M]);
+        d_single_partition = sb->inner_product(&dq_1[N_A*M],&q_2[N_A*M])
+                           + sb->inner_product(&q_1[N_A*M],&dq_2[N_A*M]);
+
+        // derivative of the normalized concentration
+        for(int i=0; i<M; i++)
+        {
+            dphi_a[i] = (dphi_a[i] - phi_a[i]*d_single_partition/single_partition)*sb->get_volume()/single_partition/N;
+            dphi_b[i] = (dphi_b[i] - phi_b[i]*d_single_partition/single_partition)*sb->get_volume()/single_partition/N;
+        }
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
 void CpuPseudoContinuous::one_step(double *q_in, double *q_out,
                                  double *boltz_bond, double *boltz_bond_half,
                                  double *exp_dw, double *exp_dw_half)
@@ -318,6 +436,101 @@ void CpuPseudoContinuous::one_step(double *q_in, double *q_out,
         throw_without_line_number(exc.what());
     }
 }
+void CpuPseudoContinuous::one_step_jvp(double *q_in, double *dq_in,
+                                 double *q_out, double *dq_out,
+                                 double *boltz_bond, double *boltz_bond_half,
+                                 double *exp_dw, double *exp_dw_half, double *dw)
+{
+    // Same splitting as one_step(). Each factor e^(-w*ds/2) contributes
+    // -dw*ds/2 times its output to the derivative, and the diffusion
+    // operator is linear, so dq is transformed with the same kernels.
+    try
+    {
+        const int M = sb->get_n_grid();
+        const int M_COMPLEX = this->n_complex_grid;
+        const double ds = pc->get_ds();
+        double q_out1[M], q_out2[M];
+        double dq_out1[M], dq_out2[M];
+        std::complex<double> k_q_in1[M_COMPLEX], k_q_in2[M_COMPLEX];
+
+        #pragma omp parallel sections num_threads(2)
+        {
+            #pragma omp section
+            {
+                // step 1
+                for(int i=0; i<M; i++)
+                {
+                    q_out1[i] = exp_dw[i]*q_in[i];
+                    dq_out1[i] = exp_dw[i]*(dq_in[i] - 0.5*ds*dw[i]*q_in[i]);
+                }
+                // diffusion of q and dq
+                fft->forward(q_out1,k_q_in1);
+                for(int i=0; i<M_COMPLEX; i++)
+                    k_q_in1[i] *= boltz_bond[i];
+                fft->backward(k_q_in1,q_out1);
+                fft->forward(dq_out1,k_q_in1);
+                for(int i=0; i<M_COMPLEX; i++)
+                    k_q_in1[i] *= boltz_bond[i];
+                fft->backward(k_q_in1,dq_out1);
+                // evaluate e^(-w*ds/2) in real space
+                for(int i=0; i<M; i++)
+                {
+                    q_out1[i] *= exp_dw[i];
+                    dq_out1[i] = exp_dw[i]*dq_out1[i] - 0.5*ds*dw[i]*q_out1[i];
+                }
+            }
+            #pragma omp section
+            {
+                // step 2
+                // evaluate e^(-w*ds/4) in real space
+                for(int i=0; i<M; i++)
+                {
+                    q_out2[i] = exp_dw_half[i]*q_in[i];
+                    dq_out2[i] = exp_dw_half[i]*(dq_in[i] - 0.25*ds*dw[i]*q_in[i]);
+                }
+                // diffusion of q and dq
+                fft->forward(q_out2,k_q_in2);
+                for(int i=0; i<M_COMPLEX; i++)
+                    k_q_in2[i] *= boltz_bond_half[i];
+                fft->backward(k_q_in2,q_out2);
+                fft->forward(dq_out2,k_q_in2);
+                for(int i=0; i<M_COMPLEX; i++)
+                    k_q_in2[i] *= boltz_bond_half[i];
+                fft->backward(k_q_in2,dq_out2);
+                // evaluate e^(-w*ds/2) in real space
+                for(int i=0; i<M; i++)
+                {
+                    dq_out2[i] = exp_dw[i]*(dq_out2[i] - 0.5*ds*dw[i]*q_out2[i]);
+                    q_out2[i] *= exp_dw[i];
+                }
+                // diffusion of q and dq
+                fft->forward(q_out2,k_q_in2);
+                for(int i=0; i<M_COMPLEX; i++)
+                    k_q_in2[i] *= boltz_bond_half[i];
+                fft->backward(k_q_in2,q_out2);
+                fft->forward(dq_out2,k_q_in2);
+                for(int i=0; i<M_COMPLEX; i++)
+                    k_q_in2[i] *= boltz_bond_half[i];
+                fft->backward(k_q_in2,dq_out2);
+                // evaluate e^(-w*ds/4) in real space
+                for(int i=0; i<M; i++)
+                {
+                    q_out2[i] *= exp_dw_half[i];
+                    dq_out2[i] = exp_dw_half[i]*dq_out2[i] - 0.25*ds*dw[i]*q_out2[i];
+                }
+            }
+        }
+        for(int i=0; i<M; i++)
+        {
+            q_out[i] = (4.0*q_out2[i] - q_out1[i])/3.0;
+            dq_out[i] = (4.0*dq_out2[i] - dq_out1[i])/3.0;
+        }
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
 void CpuPseudoContinuous::get_partition(double *q_1_out, int n1, double *q_2_out, int n2)
 {
     // This method should be invoked after invoking find_phi().
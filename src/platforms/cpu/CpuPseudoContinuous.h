@@ -15,22 +15,32 @@ class CpuPseudoContinuous : public Pseudo
 private:
     FFT *fft;
     double *q_1, *q_2;
+    double *dq_1, *dq_2; // derivatives of propagators, allocated by find_phi_jvp()
     double *boltz_bond_a, *boltz_bond_a_half;
     double *boltz_bond_b, *boltz_bond_b_half;
     void one_step(double *q_in, double *q_out, 
                   double *boltz_bond, double *boltz_bond_half,
                   double *exp_dw, double *exp_dw_half);
+    void one_step_jvp(double *q_in, double *dq_in, double *q_out, double *dq_out,
+                      double *boltz_bond, double *boltz_bond_half,
+                      double *exp_dw, double *exp_dw_half, double *dw);
     void calculate_phi_one_type(double *phi, const int N_START, const int N_END);
+    void calculate_dphi_one_type(double *dphi, const int N_START, const int N_END);
     void init_simpson_rule_coeff(double *coeff, const int N);
 public:
     CpuPseudoContinuous(SimulationBox *sb, PolymerChain *pc, FFT *ff);
     ~CpuPseudoContinuous();
     
     void update() override;
-    std::array<double,3> dq_dl() override;
+    std::array<double,6> dq_dmetric() override;
     void find_phi(double *phi_a,  double *phi_b,
                   double *q_1_init, double *q_2_init,
                   double *w_a, double *w_b, double &single_partition) override;
+    void find_phi_jvp(double *dphi_a, double *dphi_b,
+                      double *q_1_init, double *q_2_init,
+                      double *w_a, double *w_b,
+                      double *dw_a, double *dw_b,
+                      double &single_partition, double &d_single_partition) override;
     void get_partition(double *q_1_out, int n1, double *q_2_out, int n2) override;
 };
 #endif
@@ -17,6 +17,11 @@ CpuPseudoDiscrete::CpuPseudoDiscrete(
         this->boltz_bond_ab = new double[n_complex_grid];
         this->q_1 = new double[M*N];
         this->q_2 = new double[M*N];
+        this->dq_1 = nullptr;
+        this->dq_2 = nullptr;
+        this->k_q_1 = nullptr;
+        this->k_q_2 = nullptr;
+        this->fourier_basis = nullptr;
 
         update();
     }
@@ -31,6 +36,11 @@ CpuPseudoDiscrete::~CpuPseudoDiscrete()
     delete[] boltz_bond_a, boltz_bond_b, boltz_bond_ab;
     delete[] q_1;
     delete[] q_2;
+    delete[] dq_1;
+    delete[] dq_2;
+    delete[] k_q_1;
+    delete[] k_q_2;
+    delete[] fourier_basis;
 }
 void CpuPseudoDiscrete::update()
 {
@@ -44,16 +54,78 @@ void CpuPseudoDiscrete::update()
         bond_length_b = 1.0/(f*eps*eps + (1.0-f));
         bond_length_ab = 0.5*bond_length_a + 0.5*bond_length_b;
 
-        get_boltz_bond(boltz_bond_a,  bond_length_a,  sb->get_nx(), sb->get_dx(), pc->get_ds());
-        get_boltz_bond(boltz_bond_b,  bond_length_b,  sb->get_nx(), sb->get_dx(), pc->get_ds());
-        get_boltz_bond(boltz_bond_ab, bond_length_ab, sb->get_nx(), sb->get_dx(), pc->get_ds());
+        std::array<double,6> recip_metric = sb->get_recip_metric();
+        if (recip_metric != boltz_metric || n_boltz_rescale < 0)
+        {
+            if (is_boltz_bond_rescalable(recip_metric))
+            {
+                rescale_boltz_bond(boltz_bond_a,  bond_length_a,  sb->get_nx(), boltz_metric, recip_metric, pc->get_ds());
+                rescale_boltz_bond(boltz_bond_b,  bond_length_b,  sb->get_nx(), boltz_metric, recip_metric, pc->get_ds());
+                rescale_boltz_bond(boltz_bond_ab, bond_length_ab, sb->get_nx(), boltz_metric, recip_metric, pc->get_ds());
+                n_boltz_rescale++;
+            }
+            else
+            {
+                get_boltz_bond(boltz_bond_a,  bond_length_a,  sb->get_nx(), recip_metric, pc->get_ds());
+                get_boltz_bond(boltz_bond_b,  bond_length_b,  sb->get_nx(), recip_metric, pc->get_ds());
+                get_boltz_bond(boltz_bond_ab, bond_length_ab, sb->get_nx(), recip_metric, pc->get_ds());
+                n_boltz_rescale = 0;
+            }
+            boltz_metric = recip_metric;
+        }
+        is_stress_cached = false;
     }
     catch(std::exception& exc)
     {
         throw_without_line_number(exc.what());
     }
 }
-std::array<double,3> CpuPseudoDiscrete::dq_dl()
+std::tuple<double, double*> CpuPseudoDiscrete::get_bond(int n)
+{
+    const int N_A  = pc->get_n_segment_a();
+    const double eps = pc->get_epsilon();
+    const double f = pc->get_f();
+    const double bond_length_a = eps*eps/(f*eps*eps + (1.0-f));
+    const double bond_length_b = 1.0/(f*eps*eps + (1.0-f));
+
+    if ( n < N_A)
+        return std::make_tuple(bond_length_a, boltz_bond_a);
+    else if ( n == N_A)
+        return std::make_tuple(0.5*bond_length_a + 0.5*bond_length_b, boltz_bond_ab);
+    else
+        return std::make_tuple(bond_length_b, boltz_bond_b);
+}
+void CpuPseudoDiscrete::add_bond_stress(std::array<double,6> &dq_dg, int n,
+                                        std::complex<double> *k_q_1, std::complex<double> *k_q_2)
+{
+    const int DIM  = sb->get_dim();
+    const int M_COMPLEX = this->n_complex_grid;
+    // components (xx, yy, zz, xy, xz, yz) and their axes
+    const int axes[6][2] = {{0,0}, {1,1}, {2,2}, {0,1}, {0,2}, {1,2}};
+
+    double bond_length, *boltz_bond;
+    std::tie(bond_length, boltz_bond) = get_bond(n);
+
+    // only the axes of the simulation box
+    int n_comp{0};
+    int comps[6];
+    for(int c=0; c<6; c++)
+    {
+        if (axes[c][0] >= 3-DIM && axes[c][1] >= 3-DIM)
+            comps[n_comp++] = c;
+    }
+    // all the components in one pass over the Fourier transforms
+    double sum[6] = {0.0};
+    for(int i=0; i<M_COMPLEX; i++)
+    {
+        const double coeff = boltz_bond[i]*(k_q_1[i].real()*k_q_2[i].real() + k_q_1[i].imag()*k_q_2[i].imag());
+        for(int j=0; j<n_comp; j++)
+            sum[j] += coeff*fourier_basis[comps[j]*M_COMPLEX+i];
+    }
+    for(int j=0; j<n_comp; j++)
+        dq_dg[comps[j]] += bond_length*sum[j];
+}
+std::array<double,6> CpuPseudoDiscrete::dq_dmetric()
 {
     // This method should be invoked after invoking find_phi().
 
@@ -62,93 +134,182 @@ std::array<double,3> CpuPseudoDiscrete::dq_dl()
 
     try
     {
-        const int DIM  = sb->get_dim();
         const int M    = sb->get_n_grid();
         const int N    = pc->get_n_segment();
-        const int N_A  = pc->get_n_segment_a();
         const int M_COMPLEX = this->n_complex_grid;
 
-        const double eps = pc->get_epsilon();
-        const double f = pc->get_f();
-        const double bond_length_a = eps*eps/(f*eps*eps + (1.0-f));
-        const double bond_length_b = 1.0/(f*eps*eps + (1.0-f));
-        const double bond_length_ab = 0.5*bond_length_a + 0.5*bond_length_b;
-        double temp, bond_length, *boltz_bond;
-
-        std::array<double,3> dq_dl;
-        std::complex<double> k_q_1[M_COMPLEX];
-        std::complex<double> k_q_2[M_COMPLEX];
+        std::array<double,6> dq_dg;
+        std::complex<double> k_q_1_n[M_COMPLEX];
+        std::complex<double> k_q_2_n[M_COMPLEX];
 
-        double fourier_basis_x[M_COMPLEX];
-        double fourier_basis_y[M_COMPLEX];
-        double fourier_basis_z[M_COMPLEX];
+        if (fourier_basis == nullptr)
+            fourier_basis = new double[6*M_COMPLEX];
+        get_weighted_fourier_basis(fourier_basis, sb->get_nx());
 
-        get_weighted_fourier_basis(fourier_basis_x, fourier_basis_y, fourier_basis_z, sb->get_nx(), sb->get_dx());
-
-        for(int i=0; i<3; i++)
-            dq_dl[i] = 0.0;
+        for(int c=0; c<6; c++)
+            dq_dg[c] = 0.0;
 
         for(int n=1; n<N; n++)
         {
-            fft->forward(&q_1[(n-1)*M],k_q_1);
-            fft->forward(&q_2[ n   *M],k_q_2);
-
-            if ( n < N_A)
+            // the Fourier transforms kept by find_phi(), if stress caching is enabled
+            if (is_stress_cached)
+                add_bond_stress(dq_dg, n, &k_q_1[(n-1)*M_COMPLEX], &k_q_2[n*M_COMPLEX]);
+            else
             {
-                bond_length = bond_length_a;
-                boltz_bond = boltz_bond_a;
-            }
-            else if ( n == N_A)
-            {
-                bond_length = bond_length_ab;
-                boltz_bond = boltz_bond_ab;
-            }
-            else if ( n < N)
-            {
-                bond_length = bond_length_b;
-                boltz_bond = boltz_bond_b;
+                fft->forward(&q_1[(n-1)*M],k_q_1_n);
+                fft->forward(&q_2[ n   *M],k_q_2_n);
+                add_bond_stress(dq_dg, n, k_q_1_n, k_q_2_n);
             }
+        }
+        for(int c=0; c<6; c++)
+            dq_dg[c] *= -sb->get_volume()/(6.0*M*M*N);
+
+        return dq_dg;
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+void CpuPseudoDiscrete::find_phi(double *phi_a,  double *phi_b,
+                                 double *q_1_init, double *q_2_init,
+                                 double *w_a, double *w_b, double &single_partition)
+{
+    try
+    {
+        const int M    = sb->get_n_grid();
+        const int N    = pc->get_n_segment();
+        const int N_A  = pc->get_n_segment_a();
+        //const int N_B  = pc->get_n_segment_b();
+        const double ds = pc->get_ds();
+
+        double h_a[M];
+        double h_b[M];
 
-            if ( DIM >= 3 )
+        for(int i=0; i<M; i++)
+        {
+            h_a[i] = exp(-w_a[i]*ds);
+            h_b[i] = exp(-w_b[i]*ds);
+        }
+
+        if (is_stress_caching)
+        {
+            // The Fourier transforms of q_1 and q_2 at the ends of every bond
+            // are computed by one_step(), and they are kept for dq_dmetric().
+            const int M_COMPLEX = this->n_complex_grid;
+            if (k_q_1 == nullptr)
             {
-                for(int i=0; i<M_COMPLEX; i++)
-                    dq_dl[0] += bond_length*boltz_bond[i]*(k_q_1[i]*std::conj(k_q_2[i])).real()*fourier_basis_x[i];
+                k_q_1 = new std::complex<double>[N*M_COMPLEX];
+                k_q_2 = new std::complex<double>[N*M_COMPLEX];
             }
-            if ( DIM >= 2 )
+
+            #pragma omp parallel sections num_threads(2)
             {
-                for(int i=0; i<M_COMPLEX; i++)
-                    dq_dl[1] += bond_length*boltz_bond[i]*(k_q_1[i]*std::conj(k_q_2[i])).real()*fourier_basis_y[i];
+                #pragma omp section
+                {
+                    for(int i=0; i<M; i++)
+                        q_1[i] = h_a[i]*q_1_init[i];
+                    for(int n=1; n<N; n++)
+                        one_step(&q_1[(n-1)*M],&q_1[n*M],std::get<1>(get_bond(n)), n >= N_A ? h_b : h_a, &k_q_1[(n-1)*M_COMPLEX]);
+                }
+                #pragma omp section
+                {
+                    for(int i=0; i<M; i++)
+                        q_2[i+(N-1)*M] = h_b[i]*q_2_init[i];
+                    for(int n=N-1; n>0; n--)
+                        one_step(&q_2[n*M],&q_2[(n-1)*M],std::get<1>(get_bond(n)), n > N_A ? h_b : h_a, &k_q_2[n*M_COMPLEX]);
+                }
             }
-            if ( DIM >= 1 )
+            is_stress_cached = true;
+        }
+        else
+        {
+            is_stress_cached = false;
+            #pragma omp parallel sections num_threads(2)
             {
-                for(int i=0; i<M_COMPLEX; i++)
-                    dq_dl[2] += bond_length*boltz_bond[i]*(k_q_1[i]*std::conj(k_q_2[i])).real()*fourier_basis_z[i];
+                #pragma omp section
+                {
+                    for(int i=0; i<M; i++)
+                        q_1[i] = h_a[i]*q_1_init[i];
+                    // diffusion of A segment
+                    for(int n=1; n<N_A; n++)
+                        one_step(&q_1[(n-1)*M],&q_1[n*M],boltz_bond_a, h_a);
+                    // diffusion of B from A segment
+                    one_step(&q_1[(N_A-1)*M],&q_1[N_A*M],boltz_bond_ab,h_b);
+                    // diffusion of B segment
+                    for(int n=N_A+1; n<N; n++)
+                        one_step(&q_1[(n-1)*M],&q_1[n*M],boltz_bond_b, h_b);
+                }
+                #pragma omp section
+                {
+                    for(int i=0; i<M; i++)
+                        q_2[i+(N-1)*M] = h_b[i]*q_2_init[i];
+                    // diffusion of B segment
+                    for(int n=N-1; n>N_A; n--)
+                        one_step(&q_2[n*M],&q_2[(n-1)*M],boltz_bond_b, h_b);
+                    // diffusion of A from B segment
+                    one_step(&q_2[N_A*M],&q_2[(N_A-1)*M],boltz_bond_ab,h_a);
+                    // diffusion of A segment
+                    for(int n=N_A-1; n>0; n--)
+                        one_step(&q_2[n*M],&q_2[(n-1)*M],boltz_bond_a, h_a);
+                }
             }
         }
-        for(int d=0; d<3; d++)
-            dq_dl[d] /= 3.0*sb->get_lx(d)*M*M*N/sb->get_volume();
+        // Compute segment concentration A
+        for(int i=0; i<M; i++)
+            phi_a[i] = q_1[i]*q_2[i];
+        for(int n=1; n<N_A; n++)
+        {
+            for(int i=0; i<M; i++)
+                phi_a[i] += q_1[i+n*M]*q_2[i+n*M];
+        }
+        // Compute segment concentration B
+        for(int i=0; i<M; i++)
+            phi_b[i] = q_1[i+N_A*M]*q_2[i+N_A*M];
+        for(int n=N_A+1; n<N; n++)
+        {
+            for(int i=0; i<M; i++)
+                phi_b[i] += q_1[i+n*M]*q_2[i+n*M];
+        }
+        // calculates the single chain partition function
+        single_partition = sb->inner_product(&q_1[(N-1)*M], q_1_init);
 
-        return dq_dl;
+        // normalize the concentration
+        for(int i=0; i<M; i++)
+        {
+            phi_a[i] *= sb->get_volume()/h_a[i]/single_partition/N;
+            phi_b[i] *= sb->get_volume()/h_b[i]/single_partition/N;
+        }
     }
     catch(std::exception& exc)
     {
         throw_without_line_number(exc.what());
     }
 }
-void CpuPseudoDiscrete::find_phi(double *phi_a,  double *phi_b,
+void CpuPseudoDiscrete::find_phi_jvp(double *dphi_a, double *dphi_b,
                                  double *q_1_init, double *q_2_init,
-                                 double *w_a, double *w_b, double &single_partition)
+                                 double *w_a, double *w_b,
+                                 double *dw_a, double *dw_b,
+                                 double &single_partition, double &d_single_partition)
 {
     try
     {
         const int M    = sb->get_n_grid();
         const int N    = pc->get_n_segment();
         const int N_A  = pc->get_n_segment_a();
-        //const int N_B  = pc->get_n_segment_b();
         const double ds = pc->get_ds();
 
         double h_a[M];
         double h_b[M];
+        double phi_a[M], phi_b[M];
+
+        if (dq_1 == nullptr)
+        {
+            dq_1 = new double[M*N];
+            dq_2 = new double[M*N];
+        }
+        // the propagators are overwritten
+        is_stress_cached = false;
 
         for(int i=0; i<M; i++)
         {
@@ -161,54 +322,75 @@ void CpuPseudoDiscrete::find_phi(double *phi_a,  double *phi_b,
             #pragma omp section
             {
                 for(int i=0; i<M; i++)
+                {
                     q_1[i] = h_a[i]*q_1_init[i];
+                    dq_1[i] = -ds*dw_a[i]*q_1[i];
+                }
                 // diffusion of A segment
                 for(int n=1; n<N_A; n++)
-                    one_step(&q_1[(n-1)*M],&q_1[n*M],boltz_bond_a, h_a);
+                    one_step_jvp(&q_1[(n-1)*M],&dq_1[(n-1)*M],&q_1[n*M],&dq_1[n*M],boltz_bond_a, h_a, dw_a);
                 // diffusion of B from A segment
-                one_step(&q_1[(N_A-1)*M],&q_1[N_A*M],boltz_bond_ab,h_b);
+                one_step_jvp(&q_1[(N_A-1)*M],&dq_1[(N_A-1)*M],&q_1[N_A*M],&dq_1[N_A*M],boltz_bond_ab,h_b, dw_b);
                 // diffusion of B segment
                 for(int n=N_A+1; n<N; n++)
-                    one_step(&q_1[(n-1)*M],&q_1[n*M],boltz_bond_b, h_b);
+                    one_step_jvp(&q_1[(n-1)*M],&dq_1[(n-1)*M],&q_1[n*M],&dq_1[n*M],boltz_bond_b, h_b, dw_b);
             }
             #pragma omp section
             {
                 for(int i=0; i<M; i++)
+                {
                     q_2[i+(N-1)*M] = h_b[i]*q_2_init[i];
+                    dq_2[i+(N-1)*M] = -ds*dw_b[i]*q_2[i+(N-1)*M];
+                }
                 // diffusion of B segment
                 for(int n=N-1; n>N_A; n--)
-                    one_step(&q_2[n*M],&q_2[(n-1)*M],boltz_bond_b, h_b);
+                    one_step_jvp(&q_2[n*M],&dq_2[n*M],&q_2[(n-1)*M],&dq_2[(n-1)*M],boltz_bond_b, h_b, dw_b);
                 // diffusion of A from B segment
-                one_step(&q_2[N_A*M],&q_2[(N_A-1)*M],boltz_bond_ab,h_a);
+                one_step_jvp(&q_2[N_A*M],&dq_2[N_A*M],&q_2[(N_A-1)*M],&dq_2[(N_A-1)*M],boltz_bond_ab,h_a, dw_a);
                 // diffusion of A segment
                 for(int n=N_A-1; n>0; n--)
-                    one_step(&q_2[n*M],&q_2[(n-1)*M],boltz_bond_a, h_a);
+                    one_step_jvp(&q_2[n*M],&dq_2[n*M],&q_2[(n-1)*M],&dq_2[(n-1)*M],boltz_bond_a, h_a, dw_a);
             }
         }
-        // Compute segment concentration A
+        // Compute segment concentration A and its derivative
         for(int i=0; i<M; i++)
+        {
             phi_a[i] = q_1[i]*q_2[i];
+            dphi_a[i] = dq_1[i]*q_2[i] + q_1[i]*dq_2[i];
+        }
         for(int n=1; n<N_A; n++)
         {
             for(int i=0; i<M; i++)
+            {
                 phi_a[i] += q_1[i+n*M]*q_2[i+n*M];
+                dphi_a[i] += dq_1[i+n*M]*q_2[i+n*M] + q_1[i+n*M]*dq_2[i+n*M];
+            }
         }
-        // Compute segment concentration B
+        // Compute segment concentration B and its derivative
         for(int i=0; i<M; i++)
+        {
             phi_b[i] = q_1[i+N_A*M]*q_2[i+N_A*M];
+            dphi_b[i] = dq_1[i+N_A*M]*q_2[i+N_A*M] + q_1[i+N_A*M]*dq_2[i+N_A*M];
+        }
         for(int n=N_A+1; n<N; n++)
         {
             for(int i=0; i<M; i++)
+            {
                 phi_b[i] += q_1[i+n*M]*q_2[i+n*M];
+                dphi_b[i] += dq_1[i+n*M]*q_2[i+n*M] + q_1[i+n*M]*dq_2[i+n*M];
+            }
         }
-        // calculates the single chain partition function
+        // single chain partition function and its derivative
         single_partition = sb->inner_product(&q_1[(N-1)*M], q_1_init);
+        d_single_partition = sb->inner_product(&dq_1[(N-1)*M], q_1_init);
 
-        // normalize the concentration
+        // derivative of the normalized concentration, including 1/h
         for(int i=0; i<M; i++)
         {
-            phi_a[i] *= sb->get_volume()/h_a[i]/single_partition/N;
-            phi_b[i] *= sb->get_volume()/h_b[i]/single_partition/N;
+            dphi_a[i] = (dphi_a[i] + phi_a[i]*(ds*dw_a[i] - d_single_partition/single_partition))
+                *sb->get_volume()/h_a[i]/single_partition/N;
+            dphi_b[i] = (dphi_b[i] + phi_b[i]*(ds*dw_b[i] - d_single_partition/single_partition))
+                *sb->get_volume()/h_b[i]/single_partition/N;
         }
     }
     catch(std::exception& exc)
@@ -217,7 +399,8 @@ void CpuPseudoDiscrete::find_phi(double *phi_a,  double *phi_b,
     }
 }
 void CpuPseudoDiscrete::one_step(double *q_in, double *q_out,
-                                 double *boltz_bond, double *exp_dw)
+                                 double *boltz_bond, double *exp_dw,
+                                 std::complex<double> *k_q_in_out)
 {
     try
     {
@@ -226,10 +409,19 @@ void CpuPseudoDiscrete::one_step(double *q_in, double *q_out,
 
         std::complex<double> k_q_in[M_COMPLEX];
         // 3D fourier discrete transform, forward and inplace
-        fft->forward(q_in,k_q_in);
         // multiply e^(-k^2 ds/6) in fourier space, in all 3 directions
-        for(int i=0; i<M_COMPLEX; i++)
-            k_q_in[i] *= boltz_bond[i];
+        if (k_q_in_out != nullptr)
+        {
+            fft->forward(q_in,k_q_in_out);
+            for(int i=0; i<M_COMPLEX; i++)
+                k_q_in[i] = k_q_in_out[i]*boltz_bond[i];
+        }
+        else
+        {
+            fft->forward(q_in,k_q_in);
+            for(int i=0; i<M_COMPLEX; i++)
+                k_q_in[i] *= boltz_bond[i];
+        }
         // 3D fourier discrete transform, backword and inplace
         fft->backward(k_q_in,q_out);
         // normalization calculation and evaluate e^(-w*ds/2) in real space
@@ -241,6 +433,26 @@ void CpuPseudoDiscrete::one_step(double *q_in, double *q_out,
         throw_without_line_number(exc.what());
     }
 }
+void CpuPseudoDiscrete::one_step_jvp(double *q_in, double *dq_in,
+                                 double *q_out, double *dq_out,
+                                 double *boltz_bond, double *exp_dw, double *dw)
+{
+    try
+    {
+        const int M = sb->get_n_grid();
+        const double ds = pc->get_ds();
+
+        // bond propagation is linear, and derivative of e^(-w*ds) is -dw*ds*e^(-w*ds)
+        one_step(q_in, q_out, boltz_bond, exp_dw);
+        one_step(dq_in, dq_out, boltz_bond, exp_dw);
+        for(int i=0; i<M; i++)
+            dq_out[i] -= ds*dw[i]*q_out[i];
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
 void CpuPseudoDiscrete::get_partition(double *q_1_out, int n1, double *q_2_out, int n2)
 {
     // This method should be invoked after invoking find_phi().
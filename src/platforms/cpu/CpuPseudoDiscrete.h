@@ -5,6 +5,8 @@
 #ifndef CPU_PSEUDO_DISCRETE_H_
 #define CPU_PSEUDO_DISCRETE_H_
 
+#include <complex>
+#include <tuple>
 #include "SimulationBox.h"
 #include "PolymerChain.h"
 #include "Pseudo.h"
@@ -15,18 +17,39 @@ class CpuPseudoDiscrete : public Pseudo
 private:
     FFT *fft;
     double *q_1, *q_2;
+    double *dq_1, *dq_2; // derivatives of propagators, allocated by find_phi_jvp()
     double *boltz_bond_a, *boltz_bond_b, *boltz_bond_ab;
-    void one_step(double *q_in, double *q_out, double *boltz_bond, double *exp_dw);
+    // Fourier transforms of q_1 and q_2 kept for the stress caching, and weighted Fourier basis
+    std::complex<double> *k_q_1, *k_q_2;
+    double *fourier_basis;
+
+    // bond length and Boltzmann factor of the n-th bond (between n-1 and n)
+    std::tuple<double, double*> get_bond(int n);
+    // adds the contribution of a bond to dq_dg, k_q_1 and k_q_2 are the
+    // Fourier transforms of q_1 and q_2 at the ends of the bond
+    void add_bond_stress(std::array<double,6> &dq_dg, int n,
+                         std::complex<double> *k_q_1, std::complex<double> *k_q_2);
+    // if k_q_in_out is not NULL, the Fourier transform of q_in is stored
+    void one_step(double *q_in, double *q_out, double *boltz_bond, double *exp_dw,
+                  std::complex<double> *k_q_in_out=nullptr);
+    void one_step_jvp(double *q_in, double *dq_in, double *q_out, double *dq_out,
+                      double *boltz_bond, double *exp_dw, double *dw);
 public:
     CpuPseudoDiscrete(SimulationBox *sb, PolymerChain *pc, FFT *ff);
     ~CpuPseudoDiscrete();
 
     void update() override;
-    std::array<double,3> dq_dl() override;
+    std::array<double,6> dq_dmetric() override;
     void find_phi(
         double *phi_a,  double *phi_b,
         double *q_1_init, double *q_2_init,
         double *w_a, double *w_b, double &single_partition) override;
+    void find_phi_jvp(
+        double *dphi_a, double *dphi_b,
+        double *q_1_init, double *q_2_init,
+        double *w_a, double *w_b,
+        double *dw_a, double *dw_b,
+        double &single_partition, double &d_single_partition) override;
     void get_partition(double *q_1_out, int n1, double *q_2_out, int n2) override;
 };
 #endif
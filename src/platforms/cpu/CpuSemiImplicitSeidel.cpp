@@ -0,0 +1,30 @@
+#include "CpuSemiImplicitSeidel.h"
+
+CpuSemiImplicitSeidel::CpuSemiImplicitSeidel(
+    SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo, FFT *fft)
+    :SemiImplicitSeidel(sb, pc, pseudo)
+{
+    this->fft = fft;
+    this->k_r_plus   = new std::complex<double>[n_complex_grid];
+    this->k_dw_minus = new std::complex<double>[n_complex_grid];
+}
+CpuSemiImplicitSeidel::~CpuSemiImplicitSeidel()
+{
+    delete fft;
+    delete[] k_r_plus;
+    delete[] k_dw_minus;
+}
+void CpuSemiImplicitSeidel::fourier_update(double *r_plus, double *dw_minus, double *dw_plus)
+{
+    fft->forward(r_plus, k_r_plus);
+    for(int i=0; i<n_complex_grid; i++)
+        k_r_plus[i] *= kernel_plus[i];
+    if (dw_minus != nullptr)
+    {
+        fft->forward(dw_minus, k_dw_minus);
+        for(int i=0; i<n_complex_grid; i++)
+            k_r_plus[i] += kernel_coupling[i]*k_dw_minus[i];
+    }
+    fft->backward(k_r_plus, dw_plus);
+    is_kernel_changed = false;
+}
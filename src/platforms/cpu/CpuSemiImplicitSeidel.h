@@ -0,0 +1,25 @@
+/*-------------------------------------------------------------
+* This is a derived CpuSemiImplicitSeidel class
+*------------------------------------------------------------*/
+
+#ifndef CPU_SEMI_IMPLICIT_SEIDEL_H_
+#define CPU_SEMI_IMPLICIT_SEIDEL_H_
+
+#include <complex>
+#include "SimulationBox.h"
+#include "PolymerChain.h"
+#include "Pseudo.h"
+#include "SemiImplicitSeidel.h"
+#include "FFT.h"
+
+class CpuSemiImplicitSeidel : public SemiImplicitSeidel
+{
+private:
+    FFT *fft;
+    std::complex<double> *k_r_plus, *k_dw_minus;
+    void fourier_update(double *r_plus, double *dw_minus, double *dw_plus) override;
+public:
+    CpuSemiImplicitSeidel(SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo, FFT *fft);
+    ~CpuSemiImplicitSeidel();
+};
+#endif
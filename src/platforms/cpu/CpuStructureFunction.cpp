@@ -0,0 +1,20 @@
+#include "CpuStructureFunction.h"
+
+CpuStructureFunction::CpuStructureFunction(SimulationBox *sb, FFT *fft)
+    :StructureFunction(sb)
+{
+    this->fft = fft;
+    this->k_field = new std::complex<double>[n_complex_grid];
+}
+CpuStructureFunction::~CpuStructureFunction()
+{
+    delete fft;
+    delete[] k_field;
+}
+void CpuStructureFunction::compute_power_spectrum(double *field, double *power)
+{
+    const double M = static_cast<double>(sb->get_n_grid());
+    fft->forward(field, k_field);
+    for(int i=0; i<n_complex_grid; i++)
+        power[i] = std::norm(k_field[i])/(M*M);
+}
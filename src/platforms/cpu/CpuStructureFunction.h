@@ -0,0 +1,23 @@
+/*-------------------------------------------------------------
+* This is a derived CpuStructureFunction class
+*------------------------------------------------------------*/
+
+#ifndef CPU_STRUCTURE_FUNCTION_H_
+#define CPU_STRUCTURE_FUNCTION_H_
+
+#include <complex>
+#include "SimulationBox.h"
+#include "StructureFunction.h"
+#include "FFT.h"
+
+class CpuStructureFunction : public StructureFunction
+{
+private:
+    FFT *fft;
+    std::complex<double> *k_field;
+    void compute_power_spectrum(double *field, double *power) override;
+public:
+    CpuStructureFunction(SimulationBox *sb, FFT *fft);
+    ~CpuStructureFunction();
+};
+#endif
@@ -13,6 +13,9 @@
 #include "CpuPseudoContinuous.h"
 #include "CpuPseudoDiscrete.h"
 #include "CpuAndersonMixing.h"
+#include "CpuNewtonKrylov.h"
+#include "CpuSemiImplicitSeidel.h"
+#include "CpuStructureFunction.h"
 #include "MklFactory.h"
 
 PolymerChain* MklFactory::create_polymer_chain(
@@ -21,9 +24,9 @@ PolymerChain* MklFactory::create_polymer_chain(
     return new PolymerChain(f, NN, chi_n, model_name, epsilon);
 }
 SimulationBox* MklFactory::create_simulation_box(
-    std::vector<int> nx, std::vector<double> lx)
+    std::vector<int> nx, std::vector<double> lx, std::vector<double> angles)
 {
-    return new SimulationBox(nx, lx);
+    return new SimulationBox(nx, lx, angles);
 }
 Pseudo* MklFactory::create_pseudo(SimulationBox *sb, PolymerChain *pc)
 {
@@ -61,6 +64,52 @@ AndersonMixing* MklFactory::create_anderson_mixing(
     return new CpuAndersonMixing(
         n_var, max_hist, start_error, mix_min, mix_init);
 }
+NewtonKrylov* MklFactory::create_newton_krylov(
+    SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo,
+    int n_var, int max_hist, double start_error,
+    double mix_min, double mix_init)
+{
+    if (sb->get_dim() == 3)
+        return new CpuNewtonKrylov(sb, pc, pseudo,
+            new MklFFT3D({sb->get_nx(0),sb->get_nx(1),sb->get_nx(2)}),
+            n_var, max_hist, start_error, mix_min, mix_init);
+    else if (sb->get_dim() == 2)
+        return new CpuNewtonKrylov(sb, pc, pseudo,
+            new MklFFT2D({sb->get_nx(1),sb->get_nx(2)}),
+            n_var, max_hist, start_error, mix_min, mix_init);
+    else if (sb->get_dim() == 1)
+        return new CpuNewtonKrylov(sb, pc, pseudo,
+            new MklFFT1D(sb->get_nx(2)),
+            n_var, max_hist, start_error, mix_min, mix_init);
+    return NULL;
+}
+SemiImplicitSeidel* MklFactory::create_semi_implicit_seidel(
+    SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo)
+{
+    if (sb->get_dim() == 3)
+        return new CpuSemiImplicitSeidel(sb, pc, pseudo,
+            new MklFFT3D({sb->get_nx(0),sb->get_nx(1),sb->get_nx(2)}));
+    else if (sb->get_dim() == 2)
+        return new CpuSemiImplicitSeidel(sb, pc, pseudo,
+            new MklFFT2D({sb->get_nx(1),sb->get_nx(2)}));
+    else if (sb->get_dim() == 1)
+        return new CpuSemiImplicitSeidel(sb, pc, pseudo,
+            new MklFFT1D(sb->get_nx(2)));
+    return NULL;
+}
+StructureFunction* MklFactory::create_structure_function(SimulationBox *sb)
+{
+    if (sb->get_dim() == 3)
+        return new CpuStructureFunction(sb,
+            new MklFFT3D({sb->get_nx(0),sb->get_nx(1),sb->get_nx(2)}));
+    else if (sb->get_dim() == 2)
+        return new CpuStructureFunction(sb,
+            new MklFFT2D({sb->get_nx(1),sb->get_nx(2)}));
+    else if (sb->get_dim() == 1)
+        return new CpuStructureFunction(sb,
+            new MklFFT1D(sb->get_nx(2)));
+    return NULL;
+}
 void MklFactory::display_info()
 {
     std::cout << "cpu-mkl" << std::endl;
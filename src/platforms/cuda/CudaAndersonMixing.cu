@@ -82,6 +82,51 @@ void CudaAndersonMixing::reset_count()
         throw_without_line_number(exc.what());
     }
 }
+int CudaAndersonMixing::get_n_hist()
+{
+    return d_cb_w_out_hist->get_n_items();
+}
+void CudaAndersonMixing::get_hist(double *w_out_hist, double *w_deriv_hist, double *w_deriv_dots_hist)
+{
+    try
+    {
+        const int n_hist = get_n_hist();
+        for(int h=0; h<n_hist; h++)
+        {
+            gpu_error_check(cudaMemcpy(&w_out_hist[h*n_var], d_cb_w_out_hist->get_array(n_hist-1-h),
+                sizeof(double)*n_var, cudaMemcpyDeviceToHost));
+            gpu_error_check(cudaMemcpy(&w_deriv_hist[h*n_var], d_cb_w_deriv_hist->get_array(n_hist-1-h),
+                sizeof(double)*n_var, cudaMemcpyDeviceToHost));
+            double *w_deriv_dots = cb_w_deriv_dots->get_array(n_hist-1-h);
+            for(int i=0; i<max_hist+1; i++)
+                w_deriv_dots_hist[h*(max_hist+1)+i] = w_deriv_dots[i];
+        }
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+void CudaAndersonMixing::set_hist(int n_hist, double *w_out_hist, double *w_deriv_hist, double *w_deriv_dots_hist)
+{
+    try
+    {
+        // insert() copies the arrays from the host memory
+        d_cb_w_out_hist->reset();
+        d_cb_w_deriv_hist->reset();
+        cb_w_deriv_dots->reset();
+        for(int h=0; h<n_hist; h++)
+        {
+            d_cb_w_out_hist->insert(&w_out_hist[h*n_var]);
+            d_cb_w_deriv_hist->insert(&w_deriv_hist[h*n_var]);
+            cb_w_deriv_dots->insert(&w_deriv_dots_hist[h*(max_hist+1)]);
+        }
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
 
 void CudaAndersonMixing::caculate_new_fields(
     double *w,
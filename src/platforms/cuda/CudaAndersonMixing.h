@@ -35,5 +35,9 @@ public:
         double *w, double *w_out, double *w_deriv,
         double old_error_level, double error_level) override;
 
+    int get_n_hist() override;
+    void get_hist(double *w_out_hist, double *w_deriv_hist, double *w_deriv_dots_hist) override;
+    void set_hist(int n_hist, double *w_out_hist, double *w_deriv_hist, double *w_deriv_dots_hist) override;
+
 };
 #endif
@@ -19,6 +19,10 @@ void CudaCircularBuffer::reset()
     start = 0;
     n_items = 0;
 }
+int CudaCircularBuffer::get_n_items()
+{
+    return n_items;
+}
 void CudaCircularBuffer::insert(double* new_arr)
 {
     int i = (start+n_items)%length;
@@ -17,6 +17,7 @@ public:
     CudaCircularBuffer(int length, int width);
     ~CudaCircularBuffer();
     void reset();
+    int get_n_items();
     void insert(double* new_arr);
     double* get_array(int n);
 };
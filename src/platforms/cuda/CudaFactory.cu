@@ -13,6 +13,9 @@
 #include "CudaPseudoContinuous.h"
 #include "CudaPseudoDiscrete.h"
 #include "CudaAndersonMixing.h"
+#include "CudaNewtonKrylov.h"
+#include "CudaSemiImplicitSeidel.h"
+#include "CudaStructureFunction.h"
 #include "CudaFactory.h"
 
 PolymerChain* CudaFactory::create_polymer_chain(
@@ -21,9 +24,9 @@ PolymerChain* CudaFactory::create_polymer_chain(
     return new PolymerChain(f, NN, chi_n, model_name, epsilon);
 }
 SimulationBox* CudaFactory::create_simulation_box(
-    std::vector<int> nx, std::vector<double>  lx)
+    std::vector<int> nx, std::vector<double>  lx, std::vector<double> angles)
 {
-    return new CudaSimulationBox(nx, lx);
+    return new CudaSimulationBox(nx, lx, angles);
 }
 Pseudo* CudaFactory::create_pseudo(SimulationBox *sb, PolymerChain *pc)
 {
@@ -42,6 +45,23 @@ AndersonMixing* CudaFactory::create_anderson_mixing(
     return new CudaAndersonMixing(
         n_var, max_hist, start_error, mix_min, mix_init);
 }
+NewtonKrylov* CudaFactory::create_newton_krylov(
+    SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo,
+    int n_var, int max_hist, double start_error,
+    double mix_min, double mix_init)
+{
+    return new CudaNewtonKrylov(sb, pc, pseudo,
+        n_var, max_hist, start_error, mix_min, mix_init);
+}
+SemiImplicitSeidel* CudaFactory::create_semi_implicit_seidel(
+    SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo)
+{
+    return new CudaSemiImplicitSeidel(sb, pc, pseudo);
+}
+StructureFunction* CudaFactory::create_structure_function(SimulationBox *sb)
+{
+    return new CudaStructureFunction(sb);
+}
 void CudaFactory::display_info()
 {
     int device;
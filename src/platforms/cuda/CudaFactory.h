@@ -9,6 +9,9 @@
 #include "SimulationBox.h"
 #include "Pseudo.h"
 #include "AndersonMixing.h"
+#include "NewtonKrylov.h"
+#include "SemiImplicitSeidel.h"
+#include "StructureFunction.h"
 #include "AbstractFactory.h"
 
 class CudaFactory : public AbstractFactory
@@ -19,13 +22,22 @@ public :
         std::string model_name, double epsilon=1.0) override;
     SimulationBox* create_simulation_box(
         std::vector<int> nx,
-        std::vector<double> lx) override;
+        std::vector<double> lx,
+        std::vector<double> angles={}) override;
     Pseudo* create_pseudo(
         SimulationBox *sb,
         PolymerChain *pc) override;
     AndersonMixing* create_anderson_mixing(
         int n_var, int max_hist, double start_error,
         double mix_min, double mix_init) override;
+    NewtonKrylov* create_newton_krylov(
+        SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo,
+        int n_var, int max_hist, double start_error,
+        double mix_min, double mix_init) override;
+    SemiImplicitSeidel* create_semi_implicit_seidel(
+        SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo) override;
+    StructureFunction* create_structure_function(
+        SimulationBox *sb) override;
     void display_info() override;
 };
 #endif
@@ -0,0 +1,81 @@
+#define THRUST_IGNORE_DEPRECATED_CPP_DIALECT
+#define CUB_IGNORE_DEPRECATED_CPP_DIALECT
+
+#include "CudaNewtonKrylov.h"
+
+CudaNewtonKrylov::CudaNewtonKrylov(
+    SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo,
+    int n_var, int max_hist, double start_error, double mix_min, double mix_init)
+    :NewtonKrylov(sb, pc, pseudo, n_var, max_hist, start_error, mix_min, mix_init)
+{
+    try{
+        const int M = sb->get_n_grid();
+        const int M_COMPLEX = this->n_complex_grid;
+
+        // Create FFT plan
+        const int BATCH{1};
+        const int NRANK{sb->get_dim()};
+        int n_grid[NRANK];
+
+        if(sb->get_dim() == 3)
+        {
+            n_grid[0] = sb->get_nx(0);
+            n_grid[1] = sb->get_nx(1);
+            n_grid[2] = sb->get_nx(2);
+        }
+        else if(sb->get_dim() == 2)
+        {
+            n_grid[0] = sb->get_nx(1);
+            n_grid[1] = sb->get_nx(2);
+        }
+        else if(sb->get_dim() == 1)
+        {
+            n_grid[0] = sb->get_nx(2);
+        }
+        cufftPlanMany(&plan_for, NRANK, n_grid, NULL, 1, 0, NULL, 1, 0, CUFFT_D2Z,BATCH);
+        cufftPlanMany(&plan_bak, NRANK, n_grid, NULL, 1, 0, NULL, 1, 0, CUFFT_Z2D,BATCH);
+
+        // Memory allocation
+        gpu_error_check(cudaMalloc((void**)&d_r,          sizeof(double)*M));
+        gpu_error_check(cudaMalloc((void**)&d_k_r,        sizeof(ftsComplex)*M_COMPLEX));
+        gpu_error_check(cudaMalloc((void**)&d_rpa_kernel, sizeof(double)*M_COMPLEX));
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+CudaNewtonKrylov::~CudaNewtonKrylov()
+{
+    cufftDestroy(plan_for);
+    cufftDestroy(plan_bak);
+
+    cudaFree(d_r);
+    cudaFree(d_k_r);
+    cudaFree(d_rpa_kernel);
+}
+void CudaNewtonKrylov::apply_kernel(int n, double *r_in, double *r_out)
+{
+    try{
+        const int N_BLOCKS  = CudaCommon::get_instance().get_n_blocks();
+        const int N_THREADS = CudaCommon::get_instance().get_n_threads();
+        const int M = sb->get_n_grid();
+        const int M_COMPLEX = this->n_complex_grid;
+
+        // the kernel is copied every time since it is computed in host memory
+        gpu_error_check(cudaMemcpy(d_rpa_kernel, &rpa_kernel[n*M_COMPLEX], sizeof(double)*M_COMPLEX, cudaMemcpyHostToDevice));
+        gpu_error_check(cudaMemcpy(d_r, r_in, sizeof(double)*M, cudaMemcpyHostToDevice));
+
+        cufftExecD2Z(plan_for, d_r, d_k_r);
+        multi_complex_real<<<N_BLOCKS, N_THREADS>>>(d_k_r, d_rpa_kernel, M_COMPLEX);
+        cufftExecZ2D(plan_bak, d_k_r, d_r);
+        // normalization of FFT
+        lin_comb<<<N_BLOCKS, N_THREADS>>>(d_r, 1.0/static_cast<double>(M), d_r, 0.0, d_r, M);
+
+        gpu_error_check(cudaMemcpy(r_out, d_r, sizeof(double)*M, cudaMemcpyDeviceToHost));
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
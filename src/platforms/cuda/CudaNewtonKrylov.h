@@ -0,0 +1,27 @@
+/*-------------------------------------------------------------
+* This is a derived CudaNewtonKrylov class
+*------------------------------------------------------------*/
+
+#ifndef CUDA_NEWTON_KRYLOV_H_
+#define CUDA_NEWTON_KRYLOV_H_
+
+#include <cufft.h>
+#include "SimulationBox.h"
+#include "PolymerChain.h"
+#include "Pseudo.h"
+#include "NewtonKrylov.h"
+#include "CudaCommon.h"
+
+class CudaNewtonKrylov : public NewtonKrylov
+{
+private:
+    cufftHandle plan_for, plan_bak;
+    double *d_r, *d_rpa_kernel;
+    ftsComplex *d_k_r;
+    void apply_kernel(int n, double *r_in, double *r_out) override;
+public:
+    CudaNewtonKrylov(SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo,
+        int n_var, int max_hist, double start_error, double mix_min, double mix_init);
+    ~CudaNewtonKrylov();
+};
+#endif
@@ -57,6 +57,13 @@ CudaPseudoContinuous::CudaPseudoContinuous(
         gpu_error_check(cudaMalloc((void**)&d_phi_a, sizeof(double)*M));
         gpu_error_check(cudaMalloc((void**)&d_phi_b, sizeof(double)*M));
 
+        d_dq_1 = nullptr;
+        d_dq_2 = nullptr;
+        d_dw_a = nullptr;
+        d_dw_b = nullptr;
+        d_dphi_a = nullptr;
+        d_dphi_b = nullptr;
+
         gpu_error_check(cudaMalloc((void**)&d_boltz_bond_a,      sizeof(double)*M_COMPLEX));
         gpu_error_check(cudaMalloc((void**)&d_boltz_bond_b,      sizeof(double)*M_COMPLEX));
         gpu_error_check(cudaMalloc((void**)&d_boltz_bond_a_half, sizeof(double)*M_COMPLEX));
@@ -88,6 +95,13 @@ CudaPseudoContinuous::~CudaPseudoContinuous()
     cudaFree(d_phi_a);
     cudaFree(d_phi_b);
 
+    cudaFree(d_dq_1);
+    cudaFree(d_dq_2);
+    cudaFree(d_dw_a);
+    cudaFree(d_dw_b);
+    cudaFree(d_dphi_a);
+    cudaFree(d_dphi_b);
+
     cudaFree(d_boltz_bond_a);
     cudaFree(d_boltz_bond_b);
     cudaFree(d_boltz_bond_a_half);
@@ -108,10 +122,10 @@ void CudaPseudoContinuous::update()
         bond_length_a = eps*eps/(f*eps*eps + (1.0-f));
         bond_length_b = 1.0/(f*eps*eps + (1.0-f));
 
-        get_boltz_bond(boltz_bond_a,      bond_length_a,   sb->get_nx(), sb->get_dx(), pc->get_ds());
-        get_boltz_bond(boltz_bond_b,      bond_length_b,   sb->get_nx(), sb->get_dx(), pc->get_ds());
-        get_boltz_bond(boltz_bond_a_half, bond_length_a/2, sb->get_nx(), sb->get_dx(), pc->get_ds());
-        get_boltz_bond(boltz_bond_b_half, bond_length_b/2, sb->get_nx(), sb->get_dx(), pc->get_ds());
+        get_boltz_bond(boltz_bond_a,      bond_length_a,   sb->get_nx(), sb->get_recip_metric(), pc->get_ds());
+        get_boltz_bond(boltz_bond_b,      bond_length_b,   sb->get_nx(), sb->get_recip_metric(), pc->get_ds());
+        get_boltz_bond(boltz_bond_a_half, bond_length_a/2, sb->get_nx(), sb->get_recip_metric(), pc->get_ds());
+        get_boltz_bond(boltz_bond_b_half, bond_length_b/2, sb->get_nx(), sb->get_recip_metric(), pc->get_ds());
 
         gpu_error_check(cudaMemcpy(d_boltz_bond_a,      boltz_bond_a,      sizeof(double)*M_COMPLEX,cudaMemcpyHostToDevice));
         gpu_error_check(cudaMemcpy(d_boltz_bond_b,      boltz_bond_b,      sizeof(double)*M_COMPLEX,cudaMemcpyHostToDevice));
@@ -124,7 +138,7 @@ void CudaPseudoContinuous::update()
     }
 }
 
-std::array<double,3> CudaPseudoContinuous::dq_dl()
+std::array<double,6> CudaPseudoContinuous::dq_dmetric()
 {
     // This method should be invoked after invoking find_phi().
 
@@ -146,97 +160,64 @@ std::array<double,3> CudaPseudoContinuous::dq_dl()
         const double bond_length_a = eps*eps/(f*eps*eps + (1.0-f));
         const double bond_length_b = 1.0/(f*eps*eps + (1.0-f));
 
-        std::array<double,3> dq_dl;
+        // components (xx, yy, zz, xy, xz, yz) and their axes
+        const int axes[6][2] = {{0,0}, {1,1}, {2,2}, {0,1}, {0,2}, {1,2}};
+
+        std::array<double,6> dq_dg;
         double simpson_rule_coeff_a[N_A+1];
         double simpson_rule_coeff_b[N-N_A+1];
-        double fourier_basis_x[M_COMPLEX];
-        double fourier_basis_y[M_COMPLEX];
-        double fourier_basis_z[M_COMPLEX];
+        double *fourier_basis = new double[6*M_COMPLEX];
 
-        double *d_fourier_basis_x;
-        double *d_fourier_basis_y;
-        double *d_fourier_basis_z;
+        double *d_fourier_basis;
         double *d_q_in_2m, *d_q_multi, *d_stress_sum;
 
-        get_weighted_fourier_basis(fourier_basis_x, fourier_basis_y, fourier_basis_z, sb->get_nx(), sb->get_dx());
+        get_weighted_fourier_basis(fourier_basis, sb->get_nx());
 
-        gpu_error_check(cudaMalloc((void**)&d_fourier_basis_x, sizeof(double)*M_COMPLEX));
-        gpu_error_check(cudaMalloc((void**)&d_fourier_basis_y, sizeof(double)*M_COMPLEX));
-        gpu_error_check(cudaMalloc((void**)&d_fourier_basis_z, sizeof(double)*M_COMPLEX));
-        gpu_error_check(cudaMalloc((void**)&d_q_in_2m,         sizeof(double)*2*M));
-        gpu_error_check(cudaMalloc((void**)&d_q_multi,         sizeof(double)*M_COMPLEX));
-        gpu_error_check(cudaMalloc((void**)&d_stress_sum,      sizeof(double)*M_COMPLEX));
+        gpu_error_check(cudaMalloc((void**)&d_fourier_basis, sizeof(double)*6*M_COMPLEX));
+        gpu_error_check(cudaMalloc((void**)&d_q_in_2m,       sizeof(double)*2*M));
+        gpu_error_check(cudaMalloc((void**)&d_q_multi,       sizeof(double)*M_COMPLEX));
+        gpu_error_check(cudaMalloc((void**)&d_stress_sum,    sizeof(double)*M_COMPLEX));
 
-        gpu_error_check(cudaMemcpy(d_fourier_basis_x, fourier_basis_x, sizeof(double)*M_COMPLEX,cudaMemcpyHostToDevice));
-        gpu_error_check(cudaMemcpy(d_fourier_basis_y, fourier_basis_y, sizeof(double)*M_COMPLEX,cudaMemcpyHostToDevice));
-        gpu_error_check(cudaMemcpy(d_fourier_basis_z, fourier_basis_z, sizeof(double)*M_COMPLEX,cudaMemcpyHostToDevice));
+        gpu_error_check(cudaMemcpy(d_fourier_basis, fourier_basis, sizeof(double)*6*M_COMPLEX,cudaMemcpyHostToDevice));
 
         thrust::device_ptr<double> temp_gpu_ptr(d_stress_sum);
 
-        for(int i=0; i<3; i++)
-            dq_dl[i] = 0.0;
+        for(int c=0; c<6; c++)
+            dq_dg[c] = 0.0;
 
         SimpsonQuadrature::init_coeff(simpson_rule_coeff_a, N_A);
-        for(int n=0; n<=N_A; n++)
-        {
-            gpu_error_check(cudaMemcpy(&d_q_in_2m[0], &d_q_1[n*M],     sizeof(double)*M,cudaMemcpyDeviceToDevice));
-            gpu_error_check(cudaMemcpy(&d_q_in_2m[M], &d_q_2[(N-n)*M], sizeof(double)*M,cudaMemcpyDeviceToDevice));
-            cufftExecD2Z(plan_for, d_q_in_2m, d_k_q_in);
-
-            multi_complex_conjugate<<<N_BLOCKS, N_THREADS>>>(d_q_multi, &d_k_q_in[0], &d_k_q_in[M_COMPLEX], M_COMPLEX);
-            if ( DIM >= 3 )
-            {
-                multi_real<<<N_BLOCKS, N_THREADS>>>(d_stress_sum, d_q_multi, d_fourier_basis_x, bond_length_a, M_COMPLEX);
-                dq_dl[0] += simpson_rule_coeff_a[n]*thrust::reduce(temp_gpu_ptr, temp_gpu_ptr + M_COMPLEX);
-            }
-            if ( DIM >= 2 )
-            {
-                multi_real<<<N_BLOCKS, N_THREADS>>>(d_stress_sum, d_q_multi, d_fourier_basis_y, bond_length_a, M_COMPLEX);
-                dq_dl[1] += simpson_rule_coeff_a[n]*thrust::reduce(temp_gpu_ptr, temp_gpu_ptr + M_COMPLEX);
-            }
-            if ( DIM >= 1 )
-            {
-                multi_real<<<N_BLOCKS, N_THREADS>>>(d_stress_sum, d_q_multi, d_fourier_basis_z, bond_length_a, M_COMPLEX);
-                dq_dl[2] += simpson_rule_coeff_a[n]*thrust::reduce(temp_gpu_ptr, temp_gpu_ptr + M_COMPLEX);
-            }
-        }
-
         SimpsonQuadrature::init_coeff(simpson_rule_coeff_b, N-N_A);
-        for(int n=N_A; n<=N; n++)
+        for(int n=0; n<=N; n++)
         {
             gpu_error_check(cudaMemcpy(&d_q_in_2m[0], &d_q_1[n*M],     sizeof(double)*M,cudaMemcpyDeviceToDevice));
             gpu_error_check(cudaMemcpy(&d_q_in_2m[M], &d_q_2[(N-n)*M], sizeof(double)*M,cudaMemcpyDeviceToDevice));
             cufftExecD2Z(plan_for, d_q_in_2m, d_k_q_in);
 
+            // the junction is counted by both blocks
+            double coeff_a = (n <= N_A) ? simpson_rule_coeff_a[n]*bond_length_a : 0.0;
+            double coeff_b = (n >= N_A) ? simpson_rule_coeff_b[n-N_A]*bond_length_b : 0.0;
+
             multi_complex_conjugate<<<N_BLOCKS, N_THREADS>>>(d_q_multi, &d_k_q_in[0], &d_k_q_in[M_COMPLEX], M_COMPLEX);
-            if ( DIM >= 3 )
+            for(int c=0; c<6; c++)
             {
-                multi_real<<<N_BLOCKS, N_THREADS>>>(d_stress_sum, d_q_multi, d_fourier_basis_x, bond_length_b, M_COMPLEX);
-                dq_dl[0] += simpson_rule_coeff_b[n-N_A]*thrust::reduce(temp_gpu_ptr, temp_gpu_ptr + M_COMPLEX);
-            }
-            if ( DIM >= 2 )
-            {
-                multi_real<<<N_BLOCKS, N_THREADS>>>(d_stress_sum, d_q_multi, d_fourier_basis_y, bond_length_b, M_COMPLEX);
-                dq_dl[1] += simpson_rule_coeff_b[n-N_A]*thrust::reduce(temp_gpu_ptr, temp_gpu_ptr + M_COMPLEX);
-            }
-            if ( DIM >= 1 )
-            {
-                multi_real<<<N_BLOCKS, N_THREADS>>>(d_stress_sum, d_q_multi, d_fourier_basis_z, bond_length_b, M_COMPLEX);
-                dq_dl[2] += simpson_rule_coeff_b[n-N_A]*thrust::reduce(temp_gpu_ptr, temp_gpu_ptr + M_COMPLEX);
+                // only the axes of the simulation box
+                if (axes[c][0] < 3-DIM || axes[c][1] < 3-DIM)
+                    continue;
+                multi_real<<<N_BLOCKS, N_THREADS>>>(d_stress_sum, d_q_multi, &d_fourier_basis[c*M_COMPLEX], coeff_a+coeff_b, M_COMPLEX);
+                dq_dg[c] += thrust::reduce(temp_gpu_ptr, temp_gpu_ptr + M_COMPLEX);
             }
         }
 
-        for(int d=0; d<3; d++)
-            dq_dl[d] /= 3.0*sb->get_lx(d)*M*M*N/sb->get_volume();
+        for(int c=0; c<6; c++)
+            dq_dg[c] *= -sb->get_volume()/(6.0*M*M*N);
 
-        cudaFree(d_fourier_basis_x);
-        cudaFree(d_fourier_basis_y);
-        cudaFree(d_fourier_basis_z);
+        delete[] fourier_basis;
+        cudaFree(d_fourier_basis);
         cudaFree(d_q_in_2m);
         cudaFree(d_q_multi);
         cudaFree(d_stress_sum);
 
-        return dq_dl;
+        return dq_dg;
     }
     catch(std::exception& exc)
     {
@@ -375,6 +356,216 @@ void CudaPseudoContinuous::find_phi(double *phi_a,  double *phi_b,
     }
 }
 
+void CudaPseudoContinuous::calculate_dphi_one_type(
+    double *d_dphi, const int N_START, const int N_END)
+{
+    try
+    {
+        const int N_BLOCKS  = CudaCommon::get_instance().get_n_blocks();
+        const int N_THREADS = CudaCommon::get_instance().get_n_threads();
+
+        const int M = sb->get_n_grid();
+        const int N = pc->get_n_segment();
+        double simpson_rule_coeff[N_END-N_START+1];
+
+        SimpsonQuadrature::init_coeff(simpson_rule_coeff, N_END-N_START);
+
+        // Compute derivative of segment concentration
+        multi_real<<<N_BLOCKS, N_THREADS>>>(d_dphi, &d_dq_1[M*N_START], &d_q_2[M*(N-N_START)], simpson_rule_coeff[0], M);
+        add_multi_real<<<N_BLOCKS, N_THREADS>>>(d_dphi, &d_q_1[M*N_START], &d_dq_2[M*(N-N_START)], simpson_rule_coeff[0], M);
+        for(int n=N_START+1; n<=N_END; n++)
+        {
+            add_multi_real<<<N_BLOCKS, N_THREADS>>>(d_dphi, &d_dq_1[M*n], &d_q_2[M*(N-n)], simpson_rule_coeff[n-N_START], M);
+            add_multi_real<<<N_BLOCKS, N_THREADS>>>(d_dphi, &d_q_1[M*n], &d_dq_2[M*(N-n)], simpson_rule_coeff[n-N_START], M);
+        }
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+
+void CudaPseudoContinuous::find_phi_jvp(double *dphi_a, double *dphi_b,
+                                  double *q_1_init, double *q_2_init,
+                                  double *w_a, double *w_b,
+                                  double *dw_a, double *dw_b,
+                                  double &single_partition, double &d_single_partition)
+{
+    try{
+        const int N_BLOCKS  = CudaCommon::get_instance().get_n_blocks();
+        const int N_THREADS = CudaCommon::get_instance().get_n_threads();
+
+        const int M = sb->get_n_grid();
+        const int N = pc->get_n_segment();
+        const int N_A = pc->get_n_segment_a();
+        const int N_B = pc->get_n_segment_b();
+        const double ds = pc->get_ds();
+
+        double exp_dw_a[M];
+        double exp_dw_b[M];
+        double exp_dw_a_half[M];
+        double exp_dw_b_half[M];
+        double norm;
+
+        if (d_dq_1 == nullptr)
+        {
+            gpu_error_check(cudaMalloc((void**)&d_dq_1, sizeof(double)*M*(N+1)));
+            gpu_error_check(cudaMalloc((void**)&d_dq_2, sizeof(double)*M*(N+1)));
+            gpu_error_check(cudaMalloc((void**)&d_dw_a, sizeof(double)*M));
+            gpu_error_check(cudaMalloc((void**)&d_dw_b, sizeof(double)*M));
+            gpu_error_check(cudaMalloc((void**)&d_dphi_a, sizeof(double)*M));
+            gpu_error_check(cudaMalloc((void**)&d_dphi_b, sizeof(double)*M));
+        }
+
+        for(int i=0; i<M; i++)
+        {
+            exp_dw_a     [i] = exp(-w_a[i]*ds*0.5);
+            exp_dw_b     [i] = exp(-w_b[i]*ds*0.5);
+            exp_dw_a_half[i] = exp(-w_a[i]*ds*0.25);
+            exp_dw_b_half[i] = exp(-w_b[i]*ds*0.25);
+        }
+
+        // Copy array from host memory to device memory
+        gpu_error_check(cudaMemcpy(d_exp_dw_a, exp_dw_a, sizeof(double)*M,cudaMemcpyHostToDevice));
+        gpu_error_check(cudaMemcpy(d_exp_dw_b, exp_dw_b, sizeof(double)*M,cudaMemcpyHostToDevice));
+        gpu_error_check(cudaMemcpy(d_exp_dw_a_half, exp_dw_a_half, sizeof(double)*M,cudaMemcpyHostToDevice));
+        gpu_error_check(cudaMemcpy(d_exp_dw_b_half, exp_dw_b_half, sizeof(double)*M,cudaMemcpyHostToDevice));
+        gpu_error_check(cudaMemcpy(d_dw_a, dw_a, sizeof(double)*M,cudaMemcpyHostToDevice));
+        gpu_error_check(cudaMemcpy(d_dw_b, dw_b, sizeof(double)*M,cudaMemcpyHostToDevice));
+
+        gpu_error_check(cudaMemcpy(&d_q_1[0], q_1_init, sizeof(double)*M,
+                cudaMemcpyHostToDevice));
+        gpu_error_check(cudaMemcpy(&d_q_2[0], q_2_init, sizeof(double)*M,
+                cudaMemcpyHostToDevice));
+        gpu_error_check(cudaMemset(&d_dq_1[0], 0, sizeof(double)*M));
+        gpu_error_check(cudaMemset(&d_dq_2[0], 0, sizeof(double)*M));
+
+        for(int n=0; n<N; n++)
+        {
+            // q and dq along A-to-B direction
+            if(n < N_A)
+                one_step_jvp(
+                    &d_q_1[M*n], &d_dq_1[M*n], &d_q_1[M*(n+1)], &d_dq_1[M*(n+1)],
+                    d_boltz_bond_a, d_boltz_bond_a_half,
+                    d_exp_dw_a, d_exp_dw_a_half, d_dw_a);
+            else
+                one_step_jvp(
+                    &d_q_1[M*n], &d_dq_1[M*n], &d_q_1[M*(n+1)], &d_dq_1[M*(n+1)],
+                    d_boltz_bond_b, d_boltz_bond_b_half,
+                    d_exp_dw_b, d_exp_dw_b_half, d_dw_b);
+            // q^dagger and dq^dagger along B-to-A direction
+            if(n < N_B)
+                one_step_jvp(
+                    &d_q_2[M*n], &d_dq_2[M*n], &d_q_2[M*(n+1)], &d_dq_2[M*(n+1)],
+                    d_boltz_bond_b, d_boltz_bond_b_half,
+                    d_exp_dw_b, d_exp_dw_b_half, d_dw_b);
+            else
+                one_step_jvp(
+                    &d_q_2[M*n], &d_dq_2[M*n], &d_q_2[M*(n+1)], &d_dq_2[M*(n+1)],
+                    d_boltz_bond_a, d_boltz_bond_a_half,
+                    d_exp_dw_a, d_exp_dw_a_half, d_dw_a);
+        }
+
+        // calculates the total partition function and its derivative
+        single_partition = ((CudaSimulationBox *)sb)->inner_product_gpu(&d_q_1[M*N_A], &d_q_2[M*N_B]);
+        d_single_partition = ((CudaSimulationBox *)sb)->inner_product_gpu(&d_dq_1[M*N_A], &d_q_2[M*N_B])
+                           + ((CudaSimulationBox *)sb)->inner_product_gpu(&d_q_1[M*N_A], &d_dq_2[M*N_B]);
+
+        // segment concentrations and their derivatives
+        calculate_phi_one_type(d_phi_a, 0, N_A);
+        calculate_phi_one_type(d_phi_b, N_A, N);
+        calculate_dphi_one_type(d_dphi_a, 0, N_A);
+        calculate_dphi_one_type(d_dphi_b, N_A, N);
+
+        // derivative of the normalized concentration
+        norm = (sb->get_volume())/single_partition/N;
+        lin_comb<<<N_BLOCKS, N_THREADS>>>(d_dphi_a, norm, d_dphi_a, -norm*d_single_partition/single_partition, d_phi_a, M);
+        lin_comb<<<N_BLOCKS, N_THREADS>>>(d_dphi_b, norm, d_dphi_b, -norm*d_single_partition/single_partition, d_phi_b, M);
+
+        gpu_error_check(cudaMemcpy(dphi_a, d_dphi_a, sizeof(double)*M,cudaMemcpyDeviceToHost));
+        gpu_error_check(cudaMemcpy(dphi_b, d_dphi_b, sizeof(double)*M,cudaMemcpyDeviceToHost));
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+
+// Advance a partial partition function and its derivative simultaneously
+// with the same splitting as one_step(). q and dq share the FFT batch.
+void CudaPseudoContinuous::one_step_jvp(double *d_q_in,  double *d_dq_in,
+                                  double *d_q_out, double *d_dq_out,
+                                  double *d_boltz_bond, double *d_boltz_bond_half,
+                                  double *d_exp_dw,     double *d_exp_dw_half,
+                                  double *d_dw)
+{
+    try
+    {
+        const int N_BLOCKS  = CudaCommon::get_instance().get_n_blocks();
+        const int N_THREADS = CudaCommon::get_instance().get_n_threads();
+
+        const int M = sb->get_n_grid();
+        const int M_COMPLEX = this->n_complex_grid;
+        const double ds = pc->get_ds();
+
+        //-------------- step 1 ----------
+        // Evaluate e^(-w*ds/2) and its derivative in real space
+        multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step1[0], d_q_in, d_exp_dw, 1.0, M);
+        gpu_error_check(cudaMemcpy(&d_q_step1[M], d_dq_in, sizeof(double)*M, cudaMemcpyDeviceToDevice));
+        add_multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step1[M], d_dw, d_q_in, -0.5*ds, M);
+        multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step1[M], &d_q_step1[M], d_exp_dw, 1.0, M);
+
+        // Multiply e^(-k^2 ds/6) in fourier space
+        cufftExecD2Z(plan_for, d_q_step1, d_k_q_in);
+        multi_complex_real<<<N_BLOCKS, N_THREADS>>>(&d_k_q_in[0],         d_boltz_bond, M_COMPLEX);
+        multi_complex_real<<<N_BLOCKS, N_THREADS>>>(&d_k_q_in[M_COMPLEX], d_boltz_bond, M_COMPLEX);
+        cufftExecZ2D(plan_bak, d_k_q_in, d_q_step1);
+
+        // Evaluate e^(-w*ds/2) and its derivative in real space
+        multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step1[0], &d_q_step1[0], d_exp_dw, 1.0/((double)M), M);
+        multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step1[M], &d_q_step1[M], d_exp_dw, 1.0/((double)M), M);
+        add_multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step1[M], d_dw, &d_q_step1[0], -0.5*ds, M);
+
+        //-------------- step 2 ----------
+        // Evaluate e^(-w*ds/4) and its derivative in real space
+        multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step2[0], d_q_in, d_exp_dw_half, 1.0, M);
+        gpu_error_check(cudaMemcpy(&d_q_step2[M], d_dq_in, sizeof(double)*M, cudaMemcpyDeviceToDevice));
+        add_multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step2[M], d_dw, d_q_in, -0.25*ds, M);
+        multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step2[M], &d_q_step2[M], d_exp_dw_half, 1.0, M);
+
+        // Multiply e^(-k^2 ds/12) in fourier space
+        cufftExecD2Z(plan_for, d_q_step2, d_k_q_in);
+        multi_complex_real<<<N_BLOCKS, N_THREADS>>>(&d_k_q_in[0],         d_boltz_bond_half, M_COMPLEX);
+        multi_complex_real<<<N_BLOCKS, N_THREADS>>>(&d_k_q_in[M_COMPLEX], d_boltz_bond_half, M_COMPLEX);
+        cufftExecZ2D(plan_bak, d_k_q_in, d_q_step2);
+
+        // Evaluate e^(-w*ds/2) and its derivative in real space
+        lin_comb<<<N_BLOCKS, N_THREADS>>>(d_q_step2, 1.0/((double)M), d_q_step2, 0.0, d_q_step2, 2*M);
+        add_multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step2[M], d_dw, &d_q_step2[0], -0.5*ds, M);
+        multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step2[0], &d_q_step2[0], d_exp_dw, 1.0, M);
+        multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step2[M], &d_q_step2[M], d_exp_dw, 1.0, M);
+
+        // Multiply e^(-k^2 ds/12) in fourier space
+        cufftExecD2Z(plan_for, d_q_step2, d_k_q_in);
+        multi_complex_real<<<N_BLOCKS, N_THREADS>>>(&d_k_q_in[0],         d_boltz_bond_half, M_COMPLEX);
+        multi_complex_real<<<N_BLOCKS, N_THREADS>>>(&d_k_q_in[M_COMPLEX], d_boltz_bond_half, M_COMPLEX);
+        cufftExecZ2D(plan_bak, d_k_q_in, d_q_step2);
+
+        // Evaluate e^(-w*ds/4) and its derivative in real space
+        multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step2[0], &d_q_step2[0], d_exp_dw_half, 1.0/((double)M), M);
+        multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step2[M], &d_q_step2[M], d_exp_dw_half, 1.0/((double)M), M);
+        add_multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q_step2[M], d_dw, &d_q_step2[0], -0.25*ds, M);
+
+        //-------------- step 3 ----------
+        lin_comb<<<N_BLOCKS, N_THREADS>>>(d_q_out,  4.0/3.0, &d_q_step2[0], -1.0/3.0, &d_q_step1[0], M);
+        lin_comb<<<N_BLOCKS, N_THREADS>>>(d_dq_out, 4.0/3.0, &d_q_step2[M], -1.0/3.0, &d_q_step1[M], M);
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+
 // Advance two partial partition functions simultaneously using Richardson extrapolation.
 // Note that cufft doesn't fully utilize GPU cores unless n_grid is sufficiently large.
 // To increase GPU usage, FFT Batch is utilized.
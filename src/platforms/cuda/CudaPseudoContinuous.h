@@ -24,6 +24,11 @@ private:
     double *d_exp_dw_a, *d_exp_dw_a_half;
     double *d_exp_dw_b, *d_exp_dw_b_half;
     double *d_phi_a,  *d_phi_b;
+
+    // derivatives of propagators and concentrations, allocated by find_phi_jvp()
+    double *d_dq_1, *d_dq_2;
+    double *d_dw_a, *d_dw_b;
+    double *d_dphi_a, *d_dphi_b;
     
     double *d_boltz_bond_a, *d_boltz_bond_a_half;
     double *d_boltz_bond_b, *d_boltz_bond_b_half;
@@ -34,7 +39,12 @@ private:
                   double *d_boltz_bond_2, double *d_boltz_bond_2_half,
                   double *d_exp_dw_1, double *d_exp_dw_1_half,
                   double *d_exp_dw_2, double *d_exp_dw_2_half);
+    void one_step_jvp(double *d_q_in, double *d_dq_in,
+                      double *d_q_out, double *d_dq_out,
+                      double *d_boltz_bond, double *d_boltz_bond_half,
+                      double *d_exp_dw, double *d_exp_dw_half, double *d_dw);
     void calculate_phi_one_type(double *d_phi, const int N_START, const int N_END);
+    void calculate_dphi_one_type(double *d_dphi, const int N_START, const int N_END);
     void init_simpson_rule_coeff(double *coeff, const int N);
 public:
 
@@ -42,10 +52,15 @@ public:
     ~CudaPseudoContinuous();
 
     void update() override;
-    std::array<double,3> dq_dl() override;
+    std::array<double,6> dq_dmetric() override;
     void find_phi(double *phi_a,  double *phi_b,
                   double *q_1_init, double *q_2_init,
                   double *w_a, double *w_b, double &single_partition) override;
+    void find_phi_jvp(double *dphi_a, double *dphi_b,
+                      double *q_1_init, double *q_2_init,
+                      double *w_a, double *w_b,
+                      double *dw_a, double *dw_b,
+                      double &single_partition, double &d_single_partition) override;
     void get_partition(double *q_1_out, int n1, double *q_2_out, int n2) override;
 };
 
@@ -56,6 +56,12 @@ CudaPseudoDiscrete::CudaPseudoDiscrete(
         gpu_error_check(cudaMalloc((void**)&d_phi_a, sizeof(double)*M));
         gpu_error_check(cudaMalloc((void**)&d_phi_b, sizeof(double)*M));
 
+        d_dq = nullptr;
+        d_dw_a = nullptr;
+        d_dw_b = nullptr;
+        d_dphi_a = nullptr;
+        d_dphi_b = nullptr;
+
         update();
     }
     catch(std::exception& exc)
@@ -80,6 +86,12 @@ CudaPseudoDiscrete::~CudaPseudoDiscrete()
 
     cudaFree(d_phi_a);
     cudaFree(d_phi_b);
+
+    cudaFree(d_dq);
+    cudaFree(d_dw_a);
+    cudaFree(d_dw_b);
+    cudaFree(d_dphi_a);
+    cudaFree(d_dphi_b);
 }
 
 void CudaPseudoDiscrete::update()
@@ -97,9 +109,9 @@ void CudaPseudoDiscrete::update()
         bond_length_b = 1.0/(f*eps*eps + (1.0-f));
         bond_length_ab = 0.5*bond_length_a + 0.5*bond_length_b;
 
-        get_boltz_bond(boltz_bond_a,  bond_length_a,  sb->get_nx(), sb->get_dx(), pc->get_ds());
-        get_boltz_bond(boltz_bond_b,  bond_length_b,  sb->get_nx(), sb->get_dx(), pc->get_ds());
-        get_boltz_bond(boltz_bond_ab, bond_length_ab, sb->get_nx(), sb->get_dx(), pc->get_ds());
+        get_boltz_bond(boltz_bond_a,  bond_length_a,  sb->get_nx(), sb->get_recip_metric(), pc->get_ds());
+        get_boltz_bond(boltz_bond_b,  bond_length_b,  sb->get_nx(), sb->get_recip_metric(), pc->get_ds());
+        get_boltz_bond(boltz_bond_ab, bond_length_ab, sb->get_nx(), sb->get_recip_metric(), pc->get_ds());
 
         gpu_error_check(cudaMemcpy(d_boltz_bond_a,  boltz_bond_a,  sizeof(double)*M_COMPLEX,cudaMemcpyHostToDevice));
         gpu_error_check(cudaMemcpy(d_boltz_bond_b,  boltz_bond_b,  sizeof(double)*M_COMPLEX,cudaMemcpyHostToDevice));
@@ -111,7 +123,7 @@ void CudaPseudoDiscrete::update()
     }
 }
 
-std::array<double,3> CudaPseudoDiscrete::dq_dl()
+std::array<double,6> CudaPseudoDiscrete::dq_dmetric()
 {
     // This method should be invoked after invoking find_phi().
 
@@ -135,33 +147,28 @@ std::array<double,3> CudaPseudoDiscrete::dq_dl()
         const double bond_length_ab = 0.5*bond_length_a + 0.5*bond_length_b;
         double bond_length, *d_boltz_bond;
 
-        std::array<double,3> dq_dl;
-        double fourier_basis_x[M_COMPLEX];
-        double fourier_basis_y[M_COMPLEX];
-        double fourier_basis_z[M_COMPLEX];
+        // components (xx, yy, zz, xy, xz, yz) and their axes
+        const int axes[6][2] = {{0,0}, {1,1}, {2,2}, {0,1}, {0,2}, {1,2}};
+
+        std::array<double,6> dq_dg;
+        double *fourier_basis = new double[6*M_COMPLEX];
 
-        double *d_fourier_basis_x;
-        double *d_fourier_basis_y;
-        double *d_fourier_basis_z;
+        double *d_fourier_basis;
         double *d_q_in_2m, *d_q_multi, *d_stress_sum;
 
-        get_weighted_fourier_basis(fourier_basis_x, fourier_basis_y, fourier_basis_z, sb->get_nx(), sb->get_dx());
+        get_weighted_fourier_basis(fourier_basis, sb->get_nx());
 
-        gpu_error_check(cudaMalloc((void**)&d_fourier_basis_x, sizeof(double)*M_COMPLEX));
-        gpu_error_check(cudaMalloc((void**)&d_fourier_basis_y, sizeof(double)*M_COMPLEX));
-        gpu_error_check(cudaMalloc((void**)&d_fourier_basis_z, sizeof(double)*M_COMPLEX));
-        gpu_error_check(cudaMalloc((void**)&d_q_in_2m,         sizeof(double)*2*M));
-        gpu_error_check(cudaMalloc((void**)&d_q_multi,         sizeof(double)*M_COMPLEX));
-        gpu_error_check(cudaMalloc((void**)&d_stress_sum,      sizeof(double)*M_COMPLEX));
+        gpu_error_check(cudaMalloc((void**)&d_fourier_basis, sizeof(double)*6*M_COMPLEX));
+        gpu_error_check(cudaMalloc((void**)&d_q_in_2m,       sizeof(double)*2*M));
+        gpu_error_check(cudaMalloc((void**)&d_q_multi,       sizeof(double)*M_COMPLEX));
+        gpu_error_check(cudaMalloc((void**)&d_stress_sum,    sizeof(double)*M_COMPLEX));
 
-        gpu_error_check(cudaMemcpy(d_fourier_basis_x, fourier_basis_x, sizeof(double)*M_COMPLEX,cudaMemcpyHostToDevice));
-        gpu_error_check(cudaMemcpy(d_fourier_basis_y, fourier_basis_y, sizeof(double)*M_COMPLEX,cudaMemcpyHostToDevice));
-        gpu_error_check(cudaMemcpy(d_fourier_basis_z, fourier_basis_z, sizeof(double)*M_COMPLEX,cudaMemcpyHostToDevice));
+        gpu_error_check(cudaMemcpy(d_fourier_basis, fourier_basis, sizeof(double)*6*M_COMPLEX,cudaMemcpyHostToDevice));
 
         thrust::device_ptr<double> temp_gpu_ptr(d_stress_sum);
 
-        for(int i=0; i<3; i++)
-            dq_dl[i] = 0.0;
+        for(int c=0; c<6; c++)
+            dq_dg[c] = 0.0;
 
         // Bond between A segments
         for(int n=1; n<N; n++)
@@ -188,33 +195,25 @@ std::array<double,3> CudaPseudoDiscrete::dq_dl()
             multi_complex_conjugate<<<N_BLOCKS, N_THREADS>>>(d_q_multi, &d_k_q_in[0], &d_k_q_in[M_COMPLEX], M_COMPLEX);
             multi_real<<<N_BLOCKS, N_THREADS>>>(d_q_multi, d_q_multi, d_boltz_bond, bond_length, M_COMPLEX);
 
-            if ( DIM >= 3 )
+            for(int c=0; c<6; c++)
             {
-                multi_real<<<N_BLOCKS, N_THREADS>>>(d_stress_sum, d_q_multi, d_fourier_basis_x, 1.0,   M_COMPLEX);
-                dq_dl[0] += thrust::reduce(temp_gpu_ptr, temp_gpu_ptr + M_COMPLEX);
-            }
-            if ( DIM >= 2 )
-            {
-                multi_real<<<N_BLOCKS, N_THREADS>>>(d_stress_sum, d_q_multi, d_fourier_basis_y, 1.0,   M_COMPLEX);
-                dq_dl[1] += thrust::reduce(temp_gpu_ptr, temp_gpu_ptr + M_COMPLEX);
-            }
-            if ( DIM >= 1 )
-            {
-                multi_real<<<N_BLOCKS, N_THREADS>>>(d_stress_sum, d_q_multi, d_fourier_basis_z, 1.0,   M_COMPLEX);
-                dq_dl[2] += thrust::reduce(temp_gpu_ptr, temp_gpu_ptr + M_COMPLEX);
+                // only the axes of the simulation box
+                if (axes[c][0] < 3-DIM || axes[c][1] < 3-DIM)
+                    continue;
+                multi_real<<<N_BLOCKS, N_THREADS>>>(d_stress_sum, d_q_multi, &d_fourier_basis[c*M_COMPLEX], 1.0, M_COMPLEX);
+                dq_dg[c] += thrust::reduce(temp_gpu_ptr, temp_gpu_ptr + M_COMPLEX);
             }
         }
-        for(int d=0; d<3; d++)
-            dq_dl[d] /= 3.0*sb->get_lx(d)*M*M*N/sb->get_volume();
+        for(int c=0; c<6; c++)
+            dq_dg[c] *= -sb->get_volume()/(6.0*M*M*N);
 
-        cudaFree(d_fourier_basis_x);
-        cudaFree(d_fourier_basis_y);
-        cudaFree(d_fourier_basis_z);
+        delete[] fourier_basis;
+        cudaFree(d_fourier_basis);
         cudaFree(d_q_in_2m);
         cudaFree(d_q_multi);
         cudaFree(d_stress_sum);
 
-        return dq_dl;
+        return dq_dg;
     }
     catch(std::exception& exc)
     {
@@ -310,6 +309,148 @@ void CudaPseudoDiscrete::find_phi(double *phi_a,  double *phi_b,
     }
 }
 
+void CudaPseudoDiscrete::find_phi_jvp(double *dphi_a, double *dphi_b,
+                                  double *q_1_init, double *q_2_init,
+                                  double *w_a, double *w_b,
+                                  double *dw_a, double *dw_b,
+                                  double &single_partition, double &d_single_partition)
+{
+    try
+    {
+        const int N_BLOCKS  = CudaCommon::get_instance().get_n_blocks();
+        const int N_THREADS = CudaCommon::get_instance().get_n_threads();
+
+        const int M = sb->get_n_grid();
+        const int N = pc->get_n_segment();
+        const int N_A = pc->get_n_segment_a();
+        const int N_B = pc->get_n_segment_b();
+        const double ds = pc->get_ds();
+
+        double exp_dw_a[M];
+        double exp_dw_b[M];
+        double *d_boltz_bond_1, *d_boltz_bond_2;
+        double *d_exp_dw_1, *d_exp_dw_2;
+        double *d_dw_1, *d_dw_2;
+
+        if (d_dq == nullptr)
+        {
+            gpu_error_check(cudaMalloc((void**)&d_dq,     sizeof(double)*2*M*N));
+            gpu_error_check(cudaMalloc((void**)&d_dw_a,   sizeof(double)*M));
+            gpu_error_check(cudaMalloc((void**)&d_dw_b,   sizeof(double)*M));
+            gpu_error_check(cudaMalloc((void**)&d_dphi_a, sizeof(double)*M));
+            gpu_error_check(cudaMalloc((void**)&d_dphi_b, sizeof(double)*M));
+        }
+
+        for(int i=0; i<M; i++)
+        {
+            exp_dw_a[i] = exp(-w_a[i]*ds);
+            exp_dw_b[i] = exp(-w_b[i]*ds);
+        }
+
+        // Copy array from host memory to device memory
+        gpu_error_check(cudaMemcpy(d_exp_dw_a, exp_dw_a, sizeof(double)*M,cudaMemcpyHostToDevice));
+        gpu_error_check(cudaMemcpy(d_exp_dw_b, exp_dw_b, sizeof(double)*M,cudaMemcpyHostToDevice));
+        gpu_error_check(cudaMemcpy(d_dw_a, dw_a, sizeof(double)*M,cudaMemcpyHostToDevice));
+        gpu_error_check(cudaMemcpy(d_dw_b, dw_b, sizeof(double)*M,cudaMemcpyHostToDevice));
+
+        gpu_error_check(cudaMemcpy(&d_q[0], q_1_init, sizeof(double)*M, cudaMemcpyHostToDevice));
+        gpu_error_check(cudaMemcpy(&d_q[M], q_2_init, sizeof(double)*M, cudaMemcpyHostToDevice));
+
+        multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q[0], &d_q[0], d_exp_dw_a, 1.0, M);
+        multi_real<<<N_BLOCKS, N_THREADS>>>(&d_q[M], &d_q[M], d_exp_dw_b, 1.0, M);
+        multi_real<<<N_BLOCKS, N_THREADS>>>(&d_dq[0], &d_q[0], d_dw_a, -ds, M);
+        multi_real<<<N_BLOCKS, N_THREADS>>>(&d_dq[M], &d_q[M], d_dw_b, -ds, M);
+
+        for(int n=1; n<N; n++)
+        {
+            // bonds and fields along A-to-B direction
+            if(n < N_A)
+            {
+                d_boltz_bond_1 = d_boltz_bond_a;
+                d_exp_dw_1 = d_exp_dw_a;
+                d_dw_1 = d_dw_a;
+            }
+            else if(n == N_A)
+            {
+                d_boltz_bond_1 = d_boltz_bond_ab;
+                d_exp_dw_1 = d_exp_dw_b;
+                d_dw_1 = d_dw_b;
+            }
+            else
+            {
+                d_boltz_bond_1 = d_boltz_bond_b;
+                d_exp_dw_1 = d_exp_dw_b;
+                d_dw_1 = d_dw_b;
+            }
+            // bonds and fields along B-to-A direction
+            if(n < N_B)
+            {
+                d_boltz_bond_2 = d_boltz_bond_b;
+                d_exp_dw_2 = d_exp_dw_b;
+                d_dw_2 = d_dw_b;
+            }
+            else if(n == N_B)
+            {
+                d_boltz_bond_2 = d_boltz_bond_ab;
+                d_exp_dw_2 = d_exp_dw_a;
+                d_dw_2 = d_dw_a;
+            }
+            else
+            {
+                d_boltz_bond_2 = d_boltz_bond_a;
+                d_exp_dw_2 = d_exp_dw_a;
+                d_dw_2 = d_dw_a;
+            }
+
+            // bond propagation is linear, and derivative of e^(-w*ds) is -dw*ds*e^(-w*ds)
+            one_step(&d_q [2*M*(n-1)], &d_q [2*M*n], d_boltz_bond_1, d_boltz_bond_2, d_exp_dw_1, d_exp_dw_2);
+            one_step(&d_dq[2*M*(n-1)], &d_dq[2*M*n], d_boltz_bond_1, d_boltz_bond_2, d_exp_dw_1, d_exp_dw_2);
+            add_multi_real<<<N_BLOCKS, N_THREADS>>>(&d_dq[2*M*n],   d_dw_1, &d_q[2*M*n],   -ds, M);
+            add_multi_real<<<N_BLOCKS, N_THREADS>>>(&d_dq[2*M*n+M], d_dw_2, &d_q[2*M*n+M], -ds, M);
+        }
+
+        //calculates the total partition function and its derivative
+        //d_phi_a is used as a temporary array
+        gpu_error_check(cudaMemcpy(d_phi_a, q_2_init, sizeof(double)*M, cudaMemcpyHostToDevice));
+        single_partition = ((CudaSimulationBox *)sb)->inner_product_gpu(&d_q[2*M*(N-1)],d_phi_a);
+        d_single_partition = ((CudaSimulationBox *)sb)->inner_product_gpu(&d_dq[2*M*(N-1)],d_phi_a);
+
+        // Calculate segment density and its derivative
+        multi_real<<<N_BLOCKS, N_THREADS>>>(d_phi_a, &d_q[0], &d_q[2*M*(N-1)+M], 1.0, M);
+        multi_real<<<N_BLOCKS, N_THREADS>>>(d_dphi_a, &d_dq[0], &d_q[2*M*(N-1)+M], 1.0, M);
+        add_multi_real<<<N_BLOCKS, N_THREADS>>>(d_dphi_a, &d_q[0], &d_dq[2*M*(N-1)+M], 1.0, M);
+        for(int n=1; n<N_A; n++)
+        {
+            add_multi_real<<<N_BLOCKS, N_THREADS>>>(d_phi_a, &d_q[2*M*n], &d_q[2*M*(N-n-1)+M], 1.0, M);
+            add_multi_real<<<N_BLOCKS, N_THREADS>>>(d_dphi_a, &d_dq[2*M*n], &d_q[2*M*(N-n-1)+M], 1.0, M);
+            add_multi_real<<<N_BLOCKS, N_THREADS>>>(d_dphi_a, &d_q[2*M*n], &d_dq[2*M*(N-n-1)+M], 1.0, M);
+        }
+        multi_real<<<N_BLOCKS, N_THREADS>>>(d_phi_b, &d_q[2*M*N_A], &d_q[2*M*(N_B-1)+M], 1.0, M);
+        multi_real<<<N_BLOCKS, N_THREADS>>>(d_dphi_b, &d_dq[2*M*N_A], &d_q[2*M*(N_B-1)+M], 1.0, M);
+        add_multi_real<<<N_BLOCKS, N_THREADS>>>(d_dphi_b, &d_q[2*M*N_A], &d_dq[2*M*(N_B-1)+M], 1.0, M);
+        for(int n=N_A+1; n<N; n++)
+        {
+            add_multi_real<<<N_BLOCKS, N_THREADS>>>(d_phi_b, &d_q[2*M*n], &d_q[2*M*(N-n-1)+M], 1.0, M);
+            add_multi_real<<<N_BLOCKS, N_THREADS>>>(d_dphi_b, &d_dq[2*M*n], &d_q[2*M*(N-n-1)+M], 1.0, M);
+            add_multi_real<<<N_BLOCKS, N_THREADS>>>(d_dphi_b, &d_q[2*M*n], &d_dq[2*M*(N-n-1)+M], 1.0, M);
+        }
+
+        // derivative of the normalized concentration, including 1/exp_dw
+        add_multi_real<<<N_BLOCKS, N_THREADS>>>(d_dphi_a, d_phi_a, d_dw_a, ds, M);
+        add_multi_real<<<N_BLOCKS, N_THREADS>>>(d_dphi_b, d_phi_b, d_dw_b, ds, M);
+        lin_comb<<<N_BLOCKS, N_THREADS>>>(d_dphi_a, 1.0, d_dphi_a, -d_single_partition/single_partition, d_phi_a, M);
+        lin_comb<<<N_BLOCKS, N_THREADS>>>(d_dphi_b, 1.0, d_dphi_b, -d_single_partition/single_partition, d_phi_b, M);
+        divide_real<<<N_BLOCKS, N_THREADS>>>(d_dphi_a, d_dphi_a, d_exp_dw_a, (sb->get_volume())/single_partition/N, M);
+        divide_real<<<N_BLOCKS, N_THREADS>>>(d_dphi_b, d_dphi_b, d_exp_dw_b, (sb->get_volume())/single_partition/N, M);
+
+        gpu_error_check(cudaMemcpy(dphi_a, d_dphi_a, sizeof(double)*M,cudaMemcpyDeviceToHost));
+        gpu_error_check(cudaMemcpy(dphi_b, d_dphi_b, sizeof(double)*M,cudaMemcpyDeviceToHost));
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
 void CudaPseudoDiscrete::one_step(double *d_q_in,          double *d_q_out,
                                   double *d_boltz_bond_1, double *d_boltz_bond_2,
                                   double *d_exp_dw_1,      double *d_exp_dw_2)
@@ -34,6 +34,12 @@ private:
     double *d_boltz_bond_a, *d_boltz_bond_b, *d_boltz_bond_ab;
     double *d_phi_a, *d_exp_dw_a;
     double *d_phi_b, *d_exp_dw_b;
+
+    // derivatives of propagators and concentrations, allocated by find_phi_jvp()
+    // d_dq has the same layout as d_q
+    double *d_dq;
+    double *d_dw_a, *d_dw_b;
+    double *d_dphi_a, *d_dphi_b;
                  
     void one_step(double *d_q_in,         double *d_q_out,
                   double *d_boltz_bond_1, double *d_boltz_bond_2,
@@ -44,10 +50,15 @@ public:
     ~CudaPseudoDiscrete();
 
     void update() override;
-    std::array<double,3> dq_dl() override;
+    std::array<double,6> dq_dmetric() override;
     void find_phi(double *phi_a,  double *phi_b,
                   double *q_1_init, double *q_2_init,
                   double *w_a, double *w_b, double &single_partition) override;
+    void find_phi_jvp(double *dphi_a, double *dphi_b,
+                      double *q_1_init, double *q_2_init,
+                      double *w_a, double *w_b,
+                      double *dw_a, double *dw_b,
+                      double &single_partition, double &d_single_partition) override;
     void get_partition(double *q_1_out, int n1, double *q_2_out, int n2) override;
 };
 
@@ -0,0 +1,97 @@
+#define THRUST_IGNORE_DEPRECATED_CPP_DIALECT
+#define CUB_IGNORE_DEPRECATED_CPP_DIALECT
+
+#include "CudaSemiImplicitSeidel.h"
+
+CudaSemiImplicitSeidel::CudaSemiImplicitSeidel(
+    SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo)
+    :SemiImplicitSeidel(sb, pc, pseudo)
+{
+    try{
+        const int M = sb->get_n_grid();
+        const int M_COMPLEX = this->n_complex_grid;
+
+        // Create FFT plan
+        const int BATCH{1};
+        const int NRANK{sb->get_dim()};
+        int n_grid[NRANK];
+
+        if(sb->get_dim() == 3)
+        {
+            n_grid[0] = sb->get_nx(0);
+            n_grid[1] = sb->get_nx(1);
+            n_grid[2] = sb->get_nx(2);
+        }
+        else if(sb->get_dim() == 2)
+        {
+            n_grid[0] = sb->get_nx(1);
+            n_grid[1] = sb->get_nx(2);
+        }
+        else if(sb->get_dim() == 1)
+        {
+            n_grid[0] = sb->get_nx(2);
+        }
+        cufftPlanMany(&plan_for, NRANK, n_grid, NULL, 1, 0, NULL, 1, 0, CUFFT_D2Z,BATCH);
+        cufftPlanMany(&plan_bak, NRANK, n_grid, NULL, 1, 0, NULL, 1, 0, CUFFT_Z2D,BATCH);
+
+        // Memory allocation
+        gpu_error_check(cudaMalloc((void**)&d_r,               sizeof(double)*M));
+        gpu_error_check(cudaMalloc((void**)&d_k_r_plus,        sizeof(ftsComplex)*M_COMPLEX));
+        gpu_error_check(cudaMalloc((void**)&d_k_dw_minus,      sizeof(ftsComplex)*M_COMPLEX));
+        gpu_error_check(cudaMalloc((void**)&d_kernel_plus,     sizeof(double)*M_COMPLEX));
+        gpu_error_check(cudaMalloc((void**)&d_kernel_coupling, sizeof(double)*M_COMPLEX));
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+CudaSemiImplicitSeidel::~CudaSemiImplicitSeidel()
+{
+    cufftDestroy(plan_for);
+    cufftDestroy(plan_bak);
+
+    cudaFree(d_r);
+    cudaFree(d_k_r_plus);
+    cudaFree(d_k_dw_minus);
+    cudaFree(d_kernel_plus);
+    cudaFree(d_kernel_coupling);
+}
+void CudaSemiImplicitSeidel::fourier_update(double *r_plus, double *dw_minus, double *dw_plus)
+{
+    try{
+        const int N_BLOCKS  = CudaCommon::get_instance().get_n_blocks();
+        const int N_THREADS = CudaCommon::get_instance().get_n_threads();
+        const int M = sb->get_n_grid();
+        const int M_COMPLEX = this->n_complex_grid;
+
+        // the kernels are copied only when they are changed
+        if (is_kernel_changed)
+        {
+            gpu_error_check(cudaMemcpy(d_kernel_plus,     kernel_plus,     sizeof(double)*M_COMPLEX, cudaMemcpyHostToDevice));
+            gpu_error_check(cudaMemcpy(d_kernel_coupling, kernel_coupling, sizeof(double)*M_COMPLEX, cudaMemcpyHostToDevice));
+            is_kernel_changed = false;
+        }
+
+        gpu_error_check(cudaMemcpy(d_r, r_plus, sizeof(double)*M, cudaMemcpyHostToDevice));
+        cufftExecD2Z(plan_for, d_r, d_k_r_plus);
+        multi_complex_real<<<N_BLOCKS, N_THREADS>>>(d_k_r_plus, d_kernel_plus, M_COMPLEX);
+        if (dw_minus != nullptr)
+        {
+            gpu_error_check(cudaMemcpy(d_r, dw_minus, sizeof(double)*M, cudaMemcpyHostToDevice));
+            cufftExecD2Z(plan_for, d_r, d_k_dw_minus);
+            multi_complex_real<<<N_BLOCKS, N_THREADS>>>(d_k_dw_minus, d_kernel_coupling, M_COMPLEX);
+            // complex numbers are added as pairs of real numbers
+            lin_comb<<<N_BLOCKS, N_THREADS>>>((double*) d_k_r_plus, 1.0, (double*) d_k_r_plus, 1.0, (double*) d_k_dw_minus, 2*M_COMPLEX);
+        }
+        cufftExecZ2D(plan_bak, d_k_r_plus, d_r);
+        // normalization of FFT
+        lin_comb<<<N_BLOCKS, N_THREADS>>>(d_r, 1.0/static_cast<double>(M), d_r, 0.0, d_r, M);
+
+        gpu_error_check(cudaMemcpy(dw_plus, d_r, sizeof(double)*M, cudaMemcpyDeviceToHost));
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
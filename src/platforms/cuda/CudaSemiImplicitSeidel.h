@@ -0,0 +1,26 @@
+/*-------------------------------------------------------------
+* This is a derived CudaSemiImplicitSeidel class
+*------------------------------------------------------------*/
+
+#ifndef CUDA_SEMI_IMPLICIT_SEIDEL_H_
+#define CUDA_SEMI_IMPLICIT_SEIDEL_H_
+
+#include <cufft.h>
+#include "SimulationBox.h"
+#include "PolymerChain.h"
+#include "Pseudo.h"
+#include "SemiImplicitSeidel.h"
+#include "CudaCommon.h"
+
+class CudaSemiImplicitSeidel : public SemiImplicitSeidel
+{
+private:
+    cufftHandle plan_for, plan_bak;
+    double *d_r, *d_kernel_plus, *d_kernel_coupling;
+    ftsComplex *d_k_r_plus, *d_k_dw_minus;
+    void fourier_update(double *r_plus, double *dw_minus, double *dw_plus) override;
+public:
+    CudaSemiImplicitSeidel(SimulationBox *sb, PolymerChain *pc, Pseudo *pseudo);
+    ~CudaSemiImplicitSeidel();
+};
+#endif
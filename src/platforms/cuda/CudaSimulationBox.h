@@ -10,19 +10,13 @@
 
 class CudaSimulationBox : public SimulationBox
 {
-private:
-    double *sum, *d_sum;   // temporal storage for reduction in integral_gpu
-    double *d_multiple;    // temporal storage for mutiple_inner_product_gpu
-    double *d_dv; // dV for GPU
-    
-    void initialize();
 public:
-    CudaSimulationBox(std::vector<int> nx, std::vector<double> lx);
+    CudaSimulationBox(std::vector<int> nx, std::vector<double> lx, std::vector<double> angles={});
     ~CudaSimulationBox() override;
 
+    // the integral weight dv is uniform, and it is multiplied after the reduction
     double integral_gpu(double *d_g);
     double inner_product_gpu(double *d_g, double *d_h);
     double mutiple_inner_product_gpu(int n_comp, double *d_g, double *d_h);
-    void set_lx(std::vector<double> new_lx) override;
 };
 #endif
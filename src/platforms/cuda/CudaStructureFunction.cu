@@ -0,0 +1,73 @@
+#define THRUST_IGNORE_DEPRECATED_CPP_DIALECT
+#define CUB_IGNORE_DEPRECATED_CPP_DIALECT
+
+#include "CudaStructureFunction.h"
+
+CudaStructureFunction::CudaStructureFunction(SimulationBox *sb)
+    :StructureFunction(sb)
+{
+    try{
+        const int M = sb->get_n_grid();
+        const int M_COMPLEX = this->n_complex_grid;
+
+        // Create FFT plan
+        const int BATCH{1};
+        const int NRANK{sb->get_dim()};
+        int n_grid[NRANK];
+
+        if(sb->get_dim() == 3)
+        {
+            n_grid[0] = sb->get_nx(0);
+            n_grid[1] = sb->get_nx(1);
+            n_grid[2] = sb->get_nx(2);
+        }
+        else if(sb->get_dim() == 2)
+        {
+            n_grid[0] = sb->get_nx(1);
+            n_grid[1] = sb->get_nx(2);
+        }
+        else if(sb->get_dim() == 1)
+        {
+            n_grid[0] = sb->get_nx(2);
+        }
+        cufftPlanMany(&plan_for, NRANK, n_grid, NULL, 1, 0, NULL, 1, 0, CUFFT_D2Z,BATCH);
+
+        // Memory allocation
+        gpu_error_check(cudaMalloc((void**)&d_field,   sizeof(double)*M));
+        gpu_error_check(cudaMalloc((void**)&d_power,   sizeof(double)*M_COMPLEX));
+        gpu_error_check(cudaMalloc((void**)&d_k_field, sizeof(ftsComplex)*M_COMPLEX));
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
+CudaStructureFunction::~CudaStructureFunction()
+{
+    cufftDestroy(plan_for);
+
+    cudaFree(d_field);
+    cudaFree(d_power);
+    cudaFree(d_k_field);
+}
+void CudaStructureFunction::compute_power_spectrum(double *field, double *power)
+{
+    try{
+        const int N_BLOCKS  = CudaCommon::get_instance().get_n_blocks();
+        const int N_THREADS = CudaCommon::get_instance().get_n_threads();
+        const int M = sb->get_n_grid();
+        const int M_COMPLEX = this->n_complex_grid;
+
+        gpu_error_check(cudaMemcpy(d_field, field, sizeof(double)*M, cudaMemcpyHostToDevice));
+        cufftExecD2Z(plan_for, d_field, d_k_field);
+        // |psi(k)|^2, normalized by M^2
+        multi_complex_conjugate<<<N_BLOCKS, N_THREADS>>>(d_power, d_k_field, d_k_field, M_COMPLEX);
+        lin_comb<<<N_BLOCKS, N_THREADS>>>(d_power, 1.0/(static_cast<double>(M)*M), d_power, 0.0, d_power, M_COMPLEX);
+
+        gpu_error_check(cudaMemcpy(power, d_power, sizeof(double)*M_COMPLEX, cudaMemcpyDeviceToHost));
+    }
+    catch(std::exception& exc)
+    {
+        throw_without_line_number(exc.what());
+    }
+}
@@ -0,0 +1,24 @@
+/*-------------------------------------------------------------
+* This is a derived CudaStructureFunction class
+*------------------------------------------------------------*/
+
+#ifndef CUDA_STRUCTURE_FUNCTION_H_
+#define CUDA_STRUCTURE_FUNCTION_H_
+
+#include <cufft.h>
+#include "SimulationBox.h"
+#include "StructureFunction.h"
+#include "CudaCommon.h"
+
+class CudaStructureFunction : public StructureFunction
+{
+private:
+    cufftHandle plan_for;
+    double *d_field, *d_power;
+    ftsComplex *d_k_field;
+    void compute_power_spectrum(double *field, double *power) override;
+public:
+    CudaStructureFunction(SimulationBox *sb);
+    ~CudaStructureFunction();
+};
+#endif
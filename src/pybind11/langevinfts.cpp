@@ -9,6 +9,9 @@
 #include "SimulationBox.h"
 #include "Pseudo.h"
 #include "AndersonMixing.h"
+#include "NewtonKrylov.h"
+#include "SemiImplicitSeidel.h"
+#include "StructureFunction.h"
 #include "AbstractFactory.h"
 #include "PlatformSelector.h"
 
@@ -40,32 +43,70 @@ PYBIND11_MODULE(langevinfts, m)
         .def("get_lx", overload_cast_<int>()(&SimulationBox::get_lx))
         .def("get_dx", overload_cast_<>()(&SimulationBox::get_dx))
         .def("get_dx", overload_cast_<int>()(&SimulationBox::get_dx))
-        .def("get_dv", &SimulationBox::get_dv)
+        .def("get_dv", overload_cast_<>()(&SimulationBox::get_dv))
+        .def("get_dv", overload_cast_<int>()(&SimulationBox::get_dv))
         .def("get_n_grid", &SimulationBox::get_n_grid)
         .def("get_volume", &SimulationBox::get_volume)
+        .def("get_angles", &SimulationBox::get_angles)
+        .def("get_recip_metric", &SimulationBox::get_recip_metric)
+        .def("is_orthogonal", &SimulationBox::is_orthogonal)
         .def("set_lx", &SimulationBox::set_lx)
+        .def("set_angles", &SimulationBox::set_angles)
         .def("integral", overload_cast_<py::array_t<double>>()(&SimulationBox::integral))
         .def("inner_product", overload_cast_<py::array_t<double>,py::array_t<double>>()(&SimulationBox::inner_product))
         .def("multi_inner_product", overload_cast_<int,py::array_t<double>,py::array_t<double>>()(&SimulationBox::multi_inner_product))
+        .def("reduce_many", overload_cast_<std::vector<py::array_t<double>>,std::vector<std::vector<int>>>()(&SimulationBox::reduce_many))
         .def("zero_mean", overload_cast_<py::array_t<double>>()(&SimulationBox::zero_mean));
 
     py::class_<Pseudo>(m, "Pseudo")
         .def("update", &Pseudo::update)
         .def("find_phi", overload_cast_<py::array_t<double>, py::array_t<double>,
             py::array_t<double>, py::array_t<double>>()(&Pseudo::find_phi), py::return_value_policy::move)
+        .def("find_phi_jvp", overload_cast_<py::array_t<double>, py::array_t<double>,
+            py::array_t<double>, py::array_t<double>,
+            py::array_t<double>, py::array_t<double>>()(&Pseudo::find_phi_jvp), py::return_value_policy::move)
         .def("get_partition", overload_cast_<int, int>()(&Pseudo::get_partition), py::return_value_policy::move)
-        .def("dq_dl", &Pseudo::dq_dl);
+        .def("dq_dl", &Pseudo::dq_dl)
+        .def("dq_dangle", &Pseudo::dq_dangle)
+        .def("dq_dmetric", &Pseudo::dq_dmetric)
+        .def("set_stress_caching", &Pseudo::set_stress_caching)
+        .def("get_stress_caching", &Pseudo::get_stress_caching);
 
     py::class_<AndersonMixing>(m, "AndersonMixing")
         .def("reset_count", &AndersonMixing::reset_count)
+        .def("get_state", overload_cast_<>()(&AndersonMixing::get_state))
+        .def("set_state", &AndersonMixing::set_state)
         .def("caculate_new_fields",overload_cast_<py::array_t<double>, py::array_t<double>,
             py::array_t<double>, double, double>()(&AndersonMixing::caculate_new_fields));
 
+    py::class_<NewtonKrylov, AndersonMixing>(m, "NewtonKrylov")
+        .def("set_w_minus", overload_cast_<py::array_t<double>>()(&NewtonKrylov::set_w_minus));
+
+    py::class_<SemiImplicitSeidel>(m, "SemiImplicitSeidel")
+        .def("update_w_plus", overload_cast_<py::array_t<double>,
+            py::array_t<double>, py::array_t<double>, double>()(&SemiImplicitSeidel::update_w_plus))
+        .def("update_fields", overload_cast_<py::array_t<double>, py::array_t<double>,
+            py::array_t<double>, py::array_t<double>, py::object,
+            double, double>()(&SemiImplicitSeidel::update_fields));
+
+    py::class_<StructureFunction>(m, "StructureFunction")
+        .def("reset", &StructureFunction::reset)
+        .def("accumulate", overload_cast_<py::array_t<double>>()(&StructureFunction::accumulate))
+        .def("get_n_samples", &StructureFunction::get_n_samples)
+        .def("get_mean", overload_cast_<>()(&StructureFunction::get_mean))
+        .def("get_variance", overload_cast_<>()(&StructureFunction::get_variance))
+        .def("get_wave_number", overload_cast_<>()(&StructureFunction::get_wave_number))
+        .def("get_spherical_average", &StructureFunction::get_spherical_average);
+
     py::class_<AbstractFactory>(m, "AbstractFactory")
         .def("create_polymer_chain", &AbstractFactory::create_polymer_chain)
-        .def("create_simulation_box", &AbstractFactory::create_simulation_box)
+        .def("create_simulation_box", &AbstractFactory::create_simulation_box,
+            py::arg("nx"), py::arg("lx"), py::arg("angles")=std::vector<double>())
         .def("create_pseudo", &AbstractFactory::create_pseudo)
         .def("create_anderson_mixing", &AbstractFactory::create_anderson_mixing)
+        .def("create_newton_krylov", &AbstractFactory::create_newton_krylov)
+        .def("create_semi_implicit_seidel", &AbstractFactory::create_semi_implicit_seidel)
+        .def("create_structure_function", &AbstractFactory::create_structure_function)
         .def("display_info", &AbstractFactory::display_info);
 
     py::class_<PlatformSelector>(m, "PlatformSelector")
@@ -0,0 +1,63 @@
+import numpy as np
+
+# Box-altering move of field-theoretic simulation.
+# The box size is moved along the gradient of the Hamiltonian,
+#   dH/dL = -dlnQ/dL + dH_field/dL,
+# where the second term comes from the renormalized chi_n(L) = chi_n_eff/z_inf(L).
+# The stress is computed by pseudo.dq_dl() from the last find_phi() of the saddle
+# point iteration, without FFTs if stress caching was enabled for it, and the Boltzmann factors of the bonds are updated incrementally by pseudo.update().
+# The move is done in the log-strain, ln(L), so that the step is relative.
+#   mode = "volume"      : the volume is conserved (the mean of the log-strain
+#                          gradient is projected out)
+#   mode = "anisotropic" : all the axes are moved independently
+
+class BoxAlteringMove:
+    def __init__(self, sb, pc, pseudo, renormal=None, effective_chi_n=None,
+        mode="volume", step_size=0.01):
+        # renormal : Renormalization instance (see renormalization.py) or None,
+        # effective_chi_n is required if renormal is given
+        if mode not in ["volume", "anisotropic"]:
+            raise ValueError("Mode '%s' is not supported, choose among [volume, anisotropic]" % (mode))
+        if renormal is not None and effective_chi_n is None:
+            raise ValueError("'effective_chi_n' is required for the renormalized chi_n")
+        self.sb = sb
+        self.pc = pc
+        self.pseudo = pseudo
+        self.renormal = renormal
+        self.effective_chi_n = effective_chi_n
+        self.mode = mode
+        self.step_size = step_size
+
+    def set_chi_n(self):
+        # bare chi_n for the current box size
+        if self.renormal is not None:
+            z_inf, _ = self.renormal.get_z_inf(self.sb.get_lx())
+            self.pc.set_chi_n(self.effective_chi_n/z_inf)
+
+    def get_dh_dl(self, w_minus, Q):
+        # Q : single partition function of the last find_phi()
+        dim = self.sb.get_dim()
+        dlogQ_dl = np.array(self.pseudo.dq_dl())/Q
+        dh_dl = -dlogQ_dl
+        if self.renormal is not None:
+            z_inf, dz_inf_dl = self.renormal.get_z_inf(self.sb.get_lx())
+            chi_n = self.pc.get_chi_n()
+            dfield_dchin = 1/4 - self.sb.inner_product(w_minus,w_minus)/chi_n**2/self.sb.get_volume()
+            dh_dl += -dfield_dchin*chi_n/z_inf*np.array(dz_inf_dl)
+        return dh_dl[-dim:]
+
+    def move(self, w_minus, Q):
+        # returns the new box size
+        dim = self.sb.get_dim()
+        lx = np.array(self.sb.get_lx())[-dim:]
+        # gradient with respect to the log-strain
+        grad = self.get_dh_dl(w_minus, Q)*lx
+        if self.mode == "volume":
+            grad -= np.mean(grad)
+        new_lx = lx*np.exp(-self.step_size*grad)
+
+        # change box size, and update bond parameters and chi_n
+        self.sb.set_lx(list(new_lx))
+        self.pseudo.update()
+        self.set_chi_n()
+        return new_lx
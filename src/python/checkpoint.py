@@ -0,0 +1,169 @@
+import os
+import json
+import struct
+import numpy as np
+
+# Checkpoint of the full state of a simulation, for bit-for-bit restarts.
+# A checkpoint file consists of
+#   magic "LFTSCKPT", version (uint32), header size (uint64),
+#   JSON header : {"attributes":{...}, "arrays":{name: [dtype, shape, offset]}},
+#   arrays      : C-contiguous arrays, each aligned to 64 bytes,
+# so that the arrays can be memory-mapped without parsing.
+# The file is written to a temporary file in the same directory, which is
+# synchronized and renamed to the file name, so an interrupted write never
+# destroys the previous checkpoint.
+# save_langevin_checkpoint() stores the fields, the box size, chi_n, the
+# Langevin step, the state of the random number generator (np.random or a
+# np.random.Generator), the history of Anderson mixing (am.get_state()) and
+# the cached values of a Renormalization instance. Since phi_a, phi_b and Q
+# of the last saddle point are also stored, the run continues from the next
+# Langevin step without the initial saddle point iteration.
+
+_MAGIC = b"LFTSCKPT"
+_VERSION = 1
+_PREAMBLE = struct.Struct("<8sIQ")
+_ALIGNMENT = 64
+
+def _aligned(offset):
+    return (offset + _ALIGNMENT - 1)//_ALIGNMENT*_ALIGNMENT
+
+def _to_json(value):
+    # default of json.dump() for numpy arrays and scalars, also used by
+    # trajectory_writer.py and solution_cache.py
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError("%s is not serializable" % (type(value)))
+
+def save_checkpoint(file_name, arrays, attributes=None):
+    # arrays : {name: array}, attributes : {name: JSON serializable value}
+    arrays = {name: np.ascontiguousarray(value) for name, value in arrays.items()}
+    attributes = {} if attributes is None else attributes
+
+    # the offsets depend on the size of the header, which depends on the offsets
+    header_size = 0
+    while True:
+        table = {}
+        offset = _aligned(_PREAMBLE.size + header_size)
+        for name, value in arrays.items():
+            table[name] = [value.dtype.str, list(value.shape), offset]
+            offset = _aligned(offset + value.nbytes)
+        header = json.dumps({"attributes":attributes, "arrays":table}, default=_to_json).encode()
+        if len(header) <= header_size:
+            break
+        header_size = _aligned(len(header) + 256)
+    header = header.ljust(header_size)
+
+    tmp_name = file_name + ".tmp"
+    with open(tmp_name, "wb") as f:
+        f.write(_PREAMBLE.pack(_MAGIC, _VERSION, header_size))
+        f.write(header)
+        for name, value in arrays.items():
+            f.seek(table[name][2])
+            f.write(value.data)
+        f.truncate(offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_name, file_name)
+    # the rename itself
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(os.path.dirname(os.path.abspath(file_name)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+def load_checkpoint(file_name, mmap_mode="r"):
+    # returns ({name: array}, attributes). The arrays are memory-mapped unless mmap_mode is None.
+    with open(file_name, "rb") as f:
+        magic, version, header_size = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != _MAGIC:
+            raise ValueError("'%s' is not a checkpoint file" % (file_name))
+        if version > _VERSION:
+            raise ValueError("Version of '%s' (%d) is not supported" % (file_name, version))
+        header = json.loads(f.read(header_size).decode())
+        arrays = {}
+        for name, (dtype, shape, offset) in header["arrays"].items():
+            if mmap_mode is None or np.prod(shape) == 0:
+                f.seek(offset)
+                arrays[name] = np.fromfile(f, dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+            else:
+                arrays[name] = np.memmap(file_name, dtype=dtype, mode=mmap_mode, offset=offset, shape=tuple(shape))
+    return arrays, header["attributes"]
+
+#-------------- random number generators ------------
+def get_rng_state(rng):
+    # rng : np.random (the global RandomState), np.random.RandomState or np.random.Generator
+    if isinstance(rng, np.random.Generator):
+        return rng.bit_generator.state
+    return rng.get_state(legacy=False)
+
+def set_rng_state(rng, state):
+    if isinstance(rng, np.random.Generator):
+        rng.bit_generator.state = state
+    else:
+        rng.set_state(state)
+
+def _split_arrays(state, prefix, arrays):
+    # move the arrays in a nested dictionary to 'arrays', and leave their names
+    if isinstance(state, dict):
+        return {key: _split_arrays(value, prefix + "/" + key, arrays) for key, value in state.items()}
+    if isinstance(state, np.ndarray):
+        arrays[prefix] = state
+        return {"__array__":prefix}
+    return state
+
+def _join_arrays(state, arrays):
+    if isinstance(state, dict):
+        if "__array__" in state:
+            return np.array(arrays[state["__array__"]])
+        return {key: _join_arrays(value, arrays) for key, value in state.items()}
+    return state
+
+#-------------- Langevin FTS ------------
+def save_langevin_checkpoint(file_name, langevin_step, pc, sb, w_plus, w_minus,
+    phi_a=None, phi_b=None, Q=None, am=None, rng=np.random, renormal=None, attributes=None):
+    # attributes : other parameters of the run, JSON serializable
+    arrays = {"w_plus":w_plus, "w_minus":w_minus}
+    if phi_a is not None:
+        arrays.update({"phi_a":phi_a, "phi_b":phi_b})
+    state = {"langevin_step":langevin_step, "nx":sb.get_nx(), "lx":sb.get_lx(),
+        "chi_n":pc.get_chi_n(), "Q":Q, "attributes":{} if attributes is None else attributes}
+    if rng is not None:
+        state["rng"] = _split_arrays(get_rng_state(rng), "rng", arrays)
+    if am is not None:
+        state["am"] = _split_arrays(am.get_state(), "am", arrays)
+    if renormal is not None and renormal.lx is not None:
+        state["renormal"] = {"lx":renormal.lx, "z_inf":renormal.z_inf, "dz_inf_dl":renormal.dz_inf_dl}
+    save_checkpoint(file_name, arrays, state)
+
+def load_langevin_checkpoint(file_name, pc=None, sb=None, pseudo=None, am=None, rng=np.random, renormal=None):
+    # restores chi_n, lx, the random number generator, Anderson mixing and the
+    # renormalization of the given instances, and returns a dictionary of
+    # "langevin_step", "w_plus", "w_minus", "phi_a", "phi_b", "Q", "attributes".
+    # If lx is changed, pseudo.update() computes the Boltzmann factors again,
+    # so a run with box-altering moves continues to within rounding errors.
+    arrays, state = load_checkpoint(file_name)
+    if sb is not None:
+        if list(sb.get_nx()) != list(state["nx"]):
+            raise ValueError("Grid of the checkpoint %s and 'nx' %s must match" % (state["nx"], list(sb.get_nx())))
+        if list(sb.get_lx()) != list(state["lx"]):
+            sb.set_lx(state["lx"])
+            if pseudo is not None:
+                pseudo.update()
+    if pc is not None:
+        pc.set_chi_n(state["chi_n"])
+    if rng is not None and "rng" in state:
+        set_rng_state(rng, _join_arrays(state["rng"], arrays))
+    if am is not None and "am" in state:
+        am.set_state(_join_arrays(state["am"], arrays))
+    if renormal is not None and "renormal" in state:
+        renormal.lx = np.array(state["renormal"]["lx"])
+        renormal.z_inf = state["renormal"]["z_inf"]
+        renormal.dz_inf_dl = np.array(state["renormal"]["dz_inf_dl"])
+
+    result = {"langevin_step":state["langevin_step"], "Q":state["Q"], "attributes":state["attributes"]}
+    for name in ["w_plus", "w_minus", "phi_a", "phi_b"]:
+        result[name] = np.array(arrays[name]) if name in arrays else None
+    return result
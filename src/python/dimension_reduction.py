@@ -0,0 +1,90 @@
+import numpy as np
+from langevinfts import *
+from grid_sequencing import *
+
+# Dimensionality reduction of SCFT.
+# If the fields are uniform along some axes of the box (e.g., lamella and
+# cylinder in a 3D box), the saddle point is found in a 1D or 2D box made of
+# the other axes, and the results are broadcast back to the full grid. The
+# iteration is then continued on the full grid, which takes one iteration if
+# the reduction is valid and removes the remaining fluctuations otherwise.
+
+def find_uniform_axes(fields, nx, tolerance=1e-7):
+    # fields : array of shape [n_comp, prod(nx)]
+    axes = []
+    for axis in range(len(nx)):
+        is_uniform = True
+        for field in fields:
+            data = np.reshape(field, nx)
+            deviation = data - np.mean(data, axis=axis, keepdims=True)
+            if np.max(np.absolute(deviation)) > tolerance*max(1.0, np.max(np.absolute(data))):
+                is_uniform = False
+                break
+        if is_uniform:
+            axes.append(axis)
+    return axes
+
+def reduce_fields(fields, nx, axes):
+    # average along the uniform axes
+    return np.array([np.reshape(np.mean(np.reshape(field, nx), axis=tuple(axes)), -1) for field in fields])
+
+def broadcast_fields(fields, nx, axes):
+    # inverse of reduce_fields()
+    nx_keepdims = [1 if i in axes else n for i, n in enumerate(nx)]
+    return np.array([np.reshape(np.broadcast_to(np.reshape(field, nx_keepdims), nx), -1) for field in fields])
+
+def find_saddle_point_reduced_dimension(factory, pc, sb, pseudo, am, lx,
+    q1_init, q2_init, w, max_iter, tolerance, is_box_altering=True,
+    uniform_axes=None, uniform_tolerance=1e-7,
+    am_max_hist=20, am_start_error=1e-2, am_mix_min=0.1, am_mix_init=0.1,
+    verbose_level=1):
+
+    # sb, pseudo and am are the instances for the full grid. If uniform_axes is
+    # None, the axes along which w, q1_init and q2_init are uniform are detected.
+    dim = sb.get_dim()
+    nx = list(sb.get_nx())[-dim:]
+    lx = np.array(lx, dtype=np.float64)
+    if uniform_axes is None:
+        uniform_axes = find_uniform_axes(np.concatenate((w, [q1_init, q2_init])), nx, uniform_tolerance)
+    uniform_axes = sorted(uniform_axes)
+    # the reduced box is made of the other axes, which is valid only for orthogonal cells
+    if not sb.is_orthogonal():
+        uniform_axes = []
+    # keep at least one axis
+    if len(uniform_axes) == dim:
+        uniform_axes = uniform_axes[1:]
+    n_iters = []
+
+    if len(uniform_axes) > 0:
+        # reduced box
+        reduced_axes = [i for i in range(dim) if i not in uniform_axes]
+        nx_reduced = [nx[i] for i in reduced_axes]
+        sb_reduced = factory.create_simulation_box(nx_reduced, list(lx[reduced_axes]))
+        pseudo_reduced = factory.create_pseudo(sb_reduced, pc)
+        n_var = 2*sb_reduced.get_n_grid() + (sb_reduced.get_dim() if is_box_altering else 0)
+        am_reduced = factory.create_anderson_mixing(n_var,
+            am_max_hist, am_start_error, am_mix_min, am_mix_init)
+        w_reduced = reduce_fields(w, nx, uniform_axes)
+        q_reduced = reduce_fields([q1_init, q2_init], nx, uniform_axes)
+
+        if verbose_level >= 1:
+            print("---------- Reduced grid, nx: %s ----------" % (str(nx_reduced)))
+        _, _, _, _, lx_reduced, n_iter, _ = iterate_saddle_point(pc, sb_reduced, pseudo_reduced, am_reduced,
+            lx[reduced_axes], q_reduced[0], q_reduced[1], w_reduced, max_iter, tolerance,
+            is_box_altering, verbose_level)
+        n_iters.append(n_iter)
+
+        # broadcast to the full grid
+        w[:] = broadcast_fields(w_reduced, nx, uniform_axes)
+        lx[reduced_axes] = lx_reduced
+        sb.set_lx(list(lx))
+        pseudo.update()
+
+    # full grid
+    if verbose_level >= 1:
+        print("---------- Full grid, nx: %s ----------" % (str(nx)))
+    phi_a, phi_b, Q, energy_total, lx, n_iter, _ = iterate_saddle_point(pc, sb, pseudo, am, lx,
+        q1_init, q2_init, w, max_iter, tolerance, is_box_altering, verbose_level)
+    n_iters.append(n_iter)
+
+    return phi_a, phi_b, Q, energy_total, lx, n_iters
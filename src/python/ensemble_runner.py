@@ -0,0 +1,145 @@
+import os
+import numpy as np
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Ensemble of independent Langevin FTS trajectories on one node.
+# The trajectories share one parameter set (keyword arguments of
+# LangevinReplica, see langevin_replica.py) and differ in the random seeds.
+# The cores are partitioned into groups, and each group runs its trajectories
+# one after another in a worker process pinned to the cores of the group.
+# The OpenMP variables of the worker are set before langevinfts is imported,
+# so langevinfts must not be imported at the top level of this module.
+# The observables of all trajectories are gathered into single arrays, and
+# the means and standard errors are computed over the trajectories.
+
+# default observables, functions of a LangevinReplica
+def observable_hamiltonian(replica):
+    # Hamiltonian per chain, in units of kT
+    return replica.get_hamiltonian()/(np.sqrt(replica.langevin_nbar)*replica.sb.get_volume())
+def observable_w_minus_square(replica):
+    return replica.sb.inner_product(replica.w_minus, replica.w_minus)/replica.sb.get_volume()
+def observable_phi_minus_square(replica):
+    phi_minus = replica.phi_a - replica.phi_b
+    return replica.sb.inner_product(phi_minus, phi_minus)/replica.sb.get_volume()
+
+DEFAULT_OBSERVABLES = {
+    "hamiltonian" : observable_hamiltonian,
+    "w_minus_square" : observable_w_minus_square,
+    "phi_minus_square" : observable_phi_minus_square,
+}
+
+def get_available_cores():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count()))
+
+def partition_cores(n_groups, cores=None):
+    # contiguous blocks of cores, the first groups get one more core if not divisible
+    if cores is None:
+        cores = get_available_cores()
+    cores = list(cores)
+    n_groups = min(n_groups, len(cores))
+    size, remainder = divmod(len(cores), n_groups)
+    groups = []
+    start = 0
+    for g in range(n_groups):
+        end = start + size + (1 if g < remainder else 0)
+        groups.append(cores[start:end])
+        start = end
+    return groups
+
+def pin_to_cores(cores):
+    # the calling process and the OpenMP threads created later
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    os.environ["OMP_NUM_THREADS"] = str(len(cores))
+    os.environ["OMP_PLACES"] = ",".join(["{%d}" % (c) for c in cores])
+    os.environ["OMP_PROC_BIND"] = "close"
+    os.environ["MKL_NUM_THREADS"] = "1"  # always 1
+
+def create_factory(platform=None):
+    # in the worker after pinning, the first available platform by default
+    from langevinfts import PlatformSelector
+    if platform is None:
+        platform = PlatformSelector.avail_platforms()[0]
+    return PlatformSelector.create_factory(platform)
+
+def run_trajectories(platform, params, seeds, cores, n_steps, sample_interval, observables):
+    # worker, runs the trajectories of 'seeds' one after another
+    if cores is not None:
+        pin_to_cores(cores)
+    from langevin_replica import LangevinReplica
+
+    factory = create_factory(platform)
+    results = []
+    for seed in seeds:
+        replica = LangevinReplica(factory, seed=seed, **params)
+        samples = {name: [] for name in observables}
+        for step in range(1, n_steps+1):
+            replica.step()
+            if step % sample_interval == 0:
+                for name, func in observables.items():
+                    samples[name].append(func(replica))
+        results.append({name: np.array(value) for name, value in samples.items()})
+    return results
+
+class EnsembleRunner:
+    def __init__(self, params, seeds, n_steps, sample_interval=10, observables=None,
+        platform=None, cores=None, n_groups=None):
+        # params : keyword arguments of LangevinReplica except factory and seed
+        # observables : {name: function(replica)}, module-level functions
+        # (they are sent to the worker processes)
+        # n_groups : number of concurrent trajectories, min(len(seeds), number of cores) by default
+        self.params = dict(params)
+        self.seeds = list(seeds)
+        self.n_steps = n_steps
+        self.sample_interval = sample_interval
+        self.observables = DEFAULT_OBSERVABLES if observables is None else dict(observables)
+        self.platform = platform
+        if n_groups is None:
+            n_groups = len(self.seeds)
+        self.core_groups = partition_cores(min(n_groups, len(self.seeds)), cores)
+        self.results = None
+
+    def run(self):
+        n_groups = len(self.core_groups)
+        # seeds of each group, round-robin
+        seed_groups = [self.seeds[g::n_groups] for g in range(n_groups)]
+
+        # spawn, so that the workers import langevinfts after pinning
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=n_groups, mp_context=context) as executor:
+            futures = [executor.submit(run_trajectories, self.platform, self.params, seed_groups[g],
+                self.core_groups[g], self.n_steps, self.sample_interval, self.observables)
+                for g in range(n_groups)]
+            group_results = [future.result() for future in futures]
+
+        # in the order of seeds
+        trajectories = [None]*len(self.seeds)
+        for g in range(n_groups):
+            for i, result in enumerate(group_results[g]):
+                trajectories[g+i*n_groups] = result
+        self.results = self.aggregate(trajectories)
+        return self.results
+
+    def aggregate(self, trajectories):
+        # observable[trajectory, sample], and the mean and standard error of the
+        # time averages over the trajectories
+        n_traj = len(trajectories)
+        results = {"seeds": np.array(self.seeds),
+            "langevin_steps": np.arange(1, len(next(iter(trajectories[0].values())))+1)*self.sample_interval}
+        for name in self.observables:
+            data = np.array([trajectory[name] for trajectory in trajectories])
+            time_average = np.mean(data, axis=1)
+            results[name] = data
+            results[name + "_mean"] = np.mean(time_average)
+            results[name + "_error"] = np.std(time_average, ddof=1)/np.sqrt(n_traj) if n_traj > 1 else np.nan
+        return results
+
+    def save(self, file_name):
+        from scipy.io import savemat
+        mdic = dict(self.results)
+        mdic.update({"n_steps":self.n_steps, "sample_interval":self.sample_interval})
+        mdic.update({key: value for key, value in self.params.items() if value is not None})
+        savemat(file_name, mdic)
@@ -0,0 +1,33 @@
+import numpy as np
+from checkpoint import save_checkpoint, load_checkpoint
+
+# Input and output of fields for large grids, replacing savemat() and loadmat().
+# The file format is that of checkpoint.py: a JSON header followed by the
+# contiguous arrays aligned to 64 bytes. save_fields() takes the same
+# dictionary as savemat(); numpy arrays are stored in the binary part as they
+# are (without a copy), and the other values (numbers, strings, lists) in the
+# header. load_fields() maps the arrays of the file into memory, so a 1D
+# float64 field saved as (n_grid,) is passed to Pseudo.find_phi() or
+# AndersonMixing without being read or copied in advance. With the default
+# mmap_mode="c" (copy-on-write), the arrays can be modified in place, e.g.
+# w_plus by Anderson mixing, while the file is not changed.
+# fields_to_mat() converts a file for the Matlab tools in the 'tools' folder.
+
+def save_fields(file_name, mdic):
+    arrays = {key: value for key, value in mdic.items() if isinstance(value, np.ndarray)}
+    attributes = {key: value for key, value in mdic.items() if not isinstance(value, np.ndarray)}
+    save_checkpoint(file_name, arrays, attributes)
+
+def load_fields(file_name, mmap_mode="c"):
+    # dictionary of the arrays (memory-mapped unless mmap_mode is None) and the other values
+    arrays, attributes = load_checkpoint(file_name, mmap_mode)
+    mdic = dict(attributes)
+    mdic.update(arrays)
+    return mdic
+
+def fields_to_mat(file_name, mat_file_name=None):
+    from scipy.io import savemat
+    if mat_file_name is None:
+        mat_file_name = file_name.rsplit(".", 1)[0] + ".mat"
+    savemat(mat_file_name, load_fields(file_name, mmap_mode="r"))
+    return mat_file_name
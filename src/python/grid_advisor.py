@@ -0,0 +1,126 @@
+import time
+import itertools
+import numpy as np
+from langevinfts import *
+from resampling import *
+
+# FFT-friendly grid sizes.
+# FFT libraries have fast kernels only for small radices, and a size with a
+# large prime factor is transformed by Bluestein's algorithm, which costs a
+# few transforms of a power of two larger than twice the size. The grid sizes
+# near lx/resolution are ranked by a model of the FFT cost (or by measuring
+# find_phi()), and the fields can be resampled onto the chosen grid.
+
+# radices with fast kernels for each platform
+FFT_RADICES = {
+    "cpu-mkl" : (2,3,5,7,11,13),
+    "cuda"    : (2,3,5,7),
+}
+
+def prime_factors(n):
+    factors = []
+    p = 2
+    while p*p <= n:
+        while n % p == 0:
+            factors.append(p)
+            n //= p
+        p += 1
+    if n > 1:
+        factors.append(n)
+    return factors
+
+def is_smooth(n, radices=(2,3,5,7)):
+    return n >= 1 and all(p in radices for p in prime_factors(n))
+
+def smooth_sizes(n_min, n_max, radices=(2,3,5,7), even=False):
+    # smooth numbers in [n_min, n_max]
+    return [n for n in range(max(n_min,1), n_max+1)
+        if is_smooth(n, radices) and (not even or n % 2 == 0)]
+
+def fft_cost_1d(n, radices=(2,3,5,7)):
+    # n*log2(n) operations, the passes of odd radices are about 25% slower per
+    # operation than the radix-2 (radix-4, 8) passes
+    if n <= 1:
+        return 0.0
+    factors = prime_factors(n)
+    if all(p in radices for p in factors):
+        return float(n*sum(np.log2(p)*(1.0 if p == 2 else 1.25) for p in factors))
+    # Bluestein's algorithm, three transforms of a power of two >= 2n-1
+    m = 2**int(np.ceil(np.log2(2*n-1)))
+    return 3.0*fft_cost_1d(m, radices)
+
+def fft_cost(nx, radices=(2,3,5,7)):
+    # real-to-complex transform of the grid, the last axis is halved
+    nx = list(nx)
+    n_grid = np.prod(nx)
+    cost = 0.0
+    for i, n in enumerate(nx):
+        n_lines = n_grid//n
+        if i < len(nx)-1:
+            n_lines = n_lines//nx[-1]*(nx[-1]//2+1)
+            cost += n_lines*fft_cost_1d(n, radices)
+        else:
+            cost += n_lines*0.5*fft_cost_1d(n, radices)
+    return cost
+
+def propose_grids(lx, resolution, platform=None, n_candidates=5, max_ratio=1.25, even=True):
+    # lx : box size, resolution : target grid interval (as aN^(1/2) unit)
+    # For each axis, the smooth sizes from lx/resolution to max_ratio times of it
+    # are combined, and the n_candidates cheapest grids are returned as [(nx, cost), ...].
+    # Among the grids of similar cost, finer grids come first.
+    if resolution <= 0.0:
+        raise ValueError("resolution (%f) must be positive" % (resolution))
+    if max_ratio < 1.0:
+        raise ValueError("max_ratio (%f) must be >= 1.0" % (max_ratio))
+    if platform is None:
+        platform = PlatformSelector.avail_platforms()[0]
+    radices = FFT_RADICES.get(platform, (2,3,5,7))
+
+    sizes = []
+    for l in lx:
+        n_min = int(np.ceil(l/resolution - 1e-10))
+        candidates = smooth_sizes(n_min, int(np.ceil(n_min*max_ratio)), radices, even)
+        if len(candidates) == 0:
+            candidates = smooth_sizes(n_min, 2*n_min+2, radices, even)[:1]
+        sizes.append(candidates)
+
+    grids = [(list(nx), float(fft_cost(nx, radices))) for nx in itertools.product(*sizes)]
+    grids.sort(key=lambda x: (x[1], -np.prod(x[0])))
+    return grids[:n_candidates]
+
+def benchmark_grids(factory, pc, lx, grids, n_repeat=3, angles=None):
+    # grids : [nx, ...] or the output of propose_grids()
+    # Measures the time of find_phi() for each grid, returns [(nx, time), ...]
+    # sorted by time.
+    if angles is None:
+        angles = []
+    results = []
+    for nx in grids:
+        if isinstance(nx, tuple):
+            nx = nx[0]
+        sb = factory.create_simulation_box(list(nx), list(lx), angles)
+        pseudo = factory.create_pseudo(sb, pc)
+        q_init = np.ones(sb.get_n_grid(), dtype=np.float64)
+        w = np.zeros(sb.get_n_grid(), dtype=np.float64)
+        # warming up
+        pseudo.find_phi(q_init, q_init, w, w)
+        elapsed = []
+        for i in range(n_repeat):
+            time_start = time.perf_counter()
+            pseudo.find_phi(q_init, q_init, w, w)
+            elapsed.append(time.perf_counter() - time_start)
+        results.append((list(nx), min(elapsed)))
+    results.sort(key=lambda x: x[1])
+    return results
+
+def change_grid(factory, pc, sb, w, nx):
+    # Moves a run to a new grid of the same box.
+    # Returns new instances of SimulationBox and Pseudo, and w resampled onto nx.
+    dim = sb.get_dim()
+    nx_old = list(sb.get_nx())[-dim:]
+    if len(nx) != dim:
+        raise ValueError("Dimension of nx (%d) and the box (%d) must match" % (len(nx), dim))
+    new_sb = factory.create_simulation_box(list(nx), list(sb.get_lx())[-dim:], sb.get_angles())
+    new_pseudo = factory.create_pseudo(new_sb, pc)
+    new_w = resample_fields(w, nx_old, nx)
+    return new_sb, new_pseudo, new_w
@@ -0,0 +1,152 @@
+import numpy as np
+from langevinfts import *
+from resampling import *
+
+# Grid sequencing (multi-resolution) SCFT.
+# The saddle point is first found on coarse grids, and the fields are
+# prolonged to the next finer grid by Fourier zero-padding. Most of the
+# iterations are spent on the coarse grids, where find_phi() is 8 (or 64)
+# times cheaper in 3D, and only a few iterations are needed on the target grid.
+
+def grid_sequencing_levels(nx, min_nx=16, max_levels=3):
+    # Halve every even grid number that stays >= min_nx, coarsest first.
+    levels = [list(nx)]
+    while len(levels) < max_levels:
+        coarse = [n//2 if n % 2 == 0 and n//2 >= min_nx else n for n in levels[0]]
+        if coarse == levels[0]:
+            break
+        levels.insert(0, coarse)
+    return levels
+
+def iterate_saddle_point(pc, sb, pseudo, am, lx,
+    q1_init, q2_init, w, max_iter, tolerance, is_box_altering=True, verbose_level=1, callback=None):
+
+    # callback : function(scft_iter, energy_total, error_level) called at every
+    #            iteration, the iteration stops if it returns True
+    # The iteration is converged if the returned error_level is less than tolerance.
+    error_level = 1.0e20
+    energy_total = 1.0e20
+    lx = np.array(lx, dtype=np.float64)
+
+    # reset Anderson mixing module
+    am.reset_count()
+
+    # array for output fields
+    w_out = np.zeros([2, sb.get_n_grid()], dtype=np.float64)
+
+    for scft_iter in range(1,max_iter+1):
+        # for the given fields find the polymer statistics
+        phi_a, phi_b, Q = pseudo.find_phi(q1_init,q2_init,w[0],w[1])
+
+        # calculate output fields
+        xi = 0.5*(w[0]+w[1]-pc.get_chi_n())
+        w_out[0] = pc.get_chi_n()*phi_b + xi
+        w_out[1] = pc.get_chi_n()*phi_a + xi
+        sb.zero_mean(w_out[0])
+        sb.zero_mean(w_out[1])
+
+        # error_level measures the "relative distance" between the input and output fields
+        old_error_level = error_level
+        w_diff = w_out - w
+
+        # integrals for the energy, error level and mass error in one pass over the fields
+        ww_aa, ww_bb, ww_ab, int_w_a, int_w_b, diff_aa, diff_bb, int_phi_a, int_phi_b = sb.reduce_many(
+            [w[0], w[1], w_diff[0], w_diff[1], phi_a, phi_b],
+            [(0,0), (1,1), (0,1), (0,), (1,), (2,2), (3,3), (4,), (5,)])
+
+        # calculate the total energy, w_minus = (w_a-w_b)/2 and w_plus = (w_a+w_b)/2
+        energy_total  = -np.log(Q/sb.get_volume())
+        energy_total += (ww_aa - 2*ww_ab + ww_bb)/4/pc.get_chi_n()/sb.get_volume()
+        energy_total -= (int_w_a + int_w_b)/2/sb.get_volume()
+
+        multi_dot = (diff_aa + diff_bb)/(ww_aa + ww_bb + 1.0)
+        error_level = np.sqrt(multi_dot)
+
+        if (is_box_altering):
+            stress_array = np.array(pseudo.dq_dl()[-sb.get_dim():])/Q
+            error_level += np.sqrt(np.sum(stress_array**2))
+
+        if (verbose_level == 2 or
+            verbose_level == 1 and (error_level < tolerance or scft_iter == max_iter)):
+            mass_error = (int_phi_a + int_phi_b)/sb.get_volume() - 1.0
+            print("%8d %12.3E %15.7E %15.9f %15.7E" %
+                (scft_iter, mass_error, Q, energy_total, error_level), end=" ")
+            print("\t[", ",".join(["%10.7f" % (x) for x in lx]), "]")
+
+        # conditions to end the iteration
+        if error_level < tolerance:
+            break
+        if callback is not None and callback(scft_iter, energy_total, error_level):
+            break
+
+        # calculte new fields using simple and Anderson mixing
+        if (is_box_altering):
+            am_new  = np.concatenate((np.reshape(w,      2*sb.get_n_grid()), lx))
+            am_out  = np.concatenate((np.reshape(w_out,  2*sb.get_n_grid()), lx + stress_array))
+            am_diff = np.concatenate((np.reshape(w_diff, 2*sb.get_n_grid()), stress_array))
+            am.caculate_new_fields(am_new, am_out, am_diff, old_error_level, error_level)
+
+            # set box size and update bond parameters
+            w[0] = am_new[0:sb.get_n_grid()]
+            w[1] = am_new[sb.get_n_grid():2*sb.get_n_grid()]
+            lx = am_new[-sb.get_dim():]
+            sb.set_lx(lx)
+            pseudo.update()
+        else:
+            w_new = np.reshape(w, 2*sb.get_n_grid())
+            am.caculate_new_fields(w_new,
+                np.reshape(w_out,  2*sb.get_n_grid()),
+                np.reshape(w_diff, 2*sb.get_n_grid()),
+                old_error_level, error_level)
+            w[:] = np.reshape(w_new, [2, sb.get_n_grid()])
+
+    return phi_a, phi_b, Q, energy_total, lx, scft_iter, error_level
+
+def find_saddle_point_grid_sequencing(factory, pc, sb, pseudo, am, lx,
+    q1_init, q2_init, w, max_iter, tolerance, is_box_altering=True,
+    levels=None, coarse_tolerance=1e-4,
+    am_max_hist=20, am_start_error=1e-2, am_mix_min=0.1, am_mix_init=0.1,
+    verbose_level=1):
+
+    # sb, pseudo and am are the instances for the target grid, and w is
+    # defined on the target grid. w and the box size of sb are updated.
+    nx = list(sb.get_nx())[-sb.get_dim():]
+    if levels is None:
+        levels = grid_sequencing_levels(nx)
+    if list(levels[-1]) != nx:
+        raise ValueError("The last level (%s) must be the target grid (%s)" % (str(levels[-1]), str(nx)))
+
+    lx = np.array(lx, dtype=np.float64)
+    n_iters = []
+
+    # restrict the initial fields to the coarsest grid
+    w_level = resample_fields(w, nx, levels[0])
+    for level, nx_level in enumerate(levels[:-1]):
+        sb_level = factory.create_simulation_box(list(nx_level), list(lx), sb.get_angles())
+        pseudo_level = factory.create_pseudo(sb_level, pc)
+        n_var = 2*sb_level.get_n_grid() + (sb_level.get_dim() if is_box_altering else 0)
+        am_level = factory.create_anderson_mixing(n_var,
+            am_max_hist, am_start_error, am_mix_min, am_mix_init)
+        q_init = np.ones(sb_level.get_n_grid(), dtype=np.float64)
+
+        if verbose_level >= 1:
+            print("---------- Grid level %d, nx: %s ----------" % (level, str(nx_level)))
+        _, _, _, _, lx, n_iter, _ = iterate_saddle_point(pc, sb_level, pseudo_level, am_level, lx,
+            q_init, q_init, w_level, max_iter, max(tolerance, coarse_tolerance),
+            is_box_altering, verbose_level)
+        n_iters.append(n_iter)
+
+        # prolong the fields to the next grid
+        w_level = resample_fields(w_level, nx_level, levels[level+1])
+
+    # target grid
+    if verbose_level >= 1:
+        print("---------- Grid level %d, nx: %s ----------" % (len(levels)-1, str(nx)))
+    w[:] = w_level
+    sb.set_lx(list(lx))
+    pseudo.update()
+    phi_a, phi_b, Q, energy_total, lx, n_iter, _ = iterate_saddle_point(pc, sb, pseudo, am, lx,
+        q1_init, q2_init, w, max_iter, tolerance, is_box_altering, verbose_level)
+    n_iters.append(n_iter)
+
+    return phi_a, phi_b, Q, energy_total, lx, n_iters
@@ -0,0 +1,120 @@
+import numpy as np
+
+# Initial fields of the standard ordered phases for SCFT.
+# Every function returns w_a, a 1D array of n_grid with zero mean, which is
+# negative in the domains of A (the minority block of the spheres, cylinders
+# and networks). The fields are built by broadcasting 1D coordinates, and the
+# spheres and cylinders by placing a point at each center and smoothing it with
+# a periodic Gaussian in Fourier space, without loops over the grid points.
+# The unit cells fill the box n_cells times along each axis.
+#   lamella(sb, n_periods)            cos along an axis
+#   cylinder_hexagonal(sb, n_cells)   rectangular cell [sqrt(3),1] of the hexagonal lattice,
+#                                     the cylinders are along the first axis
+#   sphere_bcc(sb, n_cells), sphere_fcc(sb, n_cells)
+#   a15(sb, n_cells), sigma_phase(sb, n_cells)
+#   gyroid(sb, n_cells), double_diamond(sb, n_cells)
+#   spheres(sb, positions), cylinders(sb, positions)  for other arrangements
+# See examples/scft.
+
+# fractional positions in a unit cell
+BCC_POSITIONS = [[0,0,0],[1/2,1/2,1/2]]
+FCC_POSITIONS = [[0,0,0],[0,1/2,1/2],[1/2,0,1/2],[1/2,1/2,0]]
+A15_POSITIONS = [[0,0,0],[1/2,1/2,1/2],
+    [1/4,1/2,0],[3/4,1/2,0],[1/2,0,1/4],[1/2,0,3/4],[0,1/4,1/2],[0,3/4,1/2]]
+# [Ref: https://doi.org/10.3390/app2030654]
+SIGMA_POSITIONS = [[0.00,0.00,0.00],[0.50,0.50,0.50], #A
+    [0.40,0.40,0.00],[0.60,0.60,0.00],[0.10,0.90,0.50],[0.90,0.10,0.50], #B
+    [0.13,0.46,0.00],[0.46,0.13,0.00],[0.54,0.87,0.00],[0.87,0.54,0.00], #C
+    [0.04,0.63,0.50],[0.63,0.04,0.50],[0.37,0.96,0.50],[0.96,0.37,0.50], #C
+    [0.07,0.74,0.00],[0.74,0.07,0.00],[0.26,0.93,0.00],[0.93,0.26,0.00], #D
+    [0.24,0.43,0.50],[0.43,0.24,0.50],[0.57,0.76,0.50],[0.77,0.56,0.50], #D
+    [0.18,0.18,0.25],[0.82,0.82,0.25],[0.32,0.68,0.25],[0.68,0.32,0.25], #E
+    [0.18,0.18,0.75],[0.82,0.82,0.75],[0.32,0.68,0.75],[0.68,0.32,0.75]] #E
+HEXAGONAL_POSITIONS = [[0,0],[1/2,1/2]]
+
+def _zero_mean(sb, w):
+    w = np.ascontiguousarray(np.reshape(w, -1), dtype=np.float64)
+    sb.zero_mean(w)
+    return w
+
+def _coordinates(sb, n_cells=1):
+    # 2*pi*(fractional coordinates of the unit cells), shaped for broadcasting
+    nx = sb.get_nx()
+    n_cells = np.broadcast_to(n_cells, [3])
+    return [np.reshape(2*np.pi*n_cells[d]*np.arange(nx[d])/nx[d], [-1 if e == d else 1 for e in range(3)]) for d in range(3)]
+
+def _replicate(positions, n_cells):
+    # fractional positions of the unit cells in the box
+    positions = np.array(positions, dtype=np.float64)
+    n_cells = np.broadcast_to(n_cells, [positions.shape[1]])
+    shifts = np.stack(np.meshgrid(*[np.arange(n) for n in n_cells], indexing="ij"), axis=-1).reshape(-1, len(n_cells))
+    return np.reshape((positions[None,:,:] + shifts[:,None,:])/n_cells, [-1, len(n_cells)])
+
+def _gaussian_filter(w, sigma):
+    # periodic Gaussian of the width sigma (in grid units)
+    k_square = 0.0
+    for d, n in enumerate(w.shape):
+        k = 2*np.pi*(np.fft.rfftfreq(n) if d == w.ndim-1 else np.fft.fftfreq(n))
+        k_square = k_square + np.reshape(k**2, [-1 if e == d else 1 for e in range(w.ndim)])
+    return np.fft.irfftn(np.fft.rfftn(w)*np.exp(-0.5*sigma**2*k_square), w.shape)
+
+def spheres(sb, positions, sigma=None):
+    # positions : fractional positions [[x,y,z], ...] in the box
+    # sigma : width of the spheres in grid units, min(nx)/15 by default
+    nx = np.array(sb.get_nx())
+    if sigma is None:
+        sigma = np.min(nx[nx > 1])/15
+    index = np.round(np.array(positions)*nx).astype(np.int64) % nx
+    w = np.zeros(nx, dtype=np.float64)
+    np.add.at(w, tuple(index.T), -1/np.prod(sb.get_dx()))
+    return _zero_mean(sb, _gaussian_filter(w, sigma))
+
+def cylinders(sb, positions, sigma=None):
+    # positions : fractional positions [[y,z], ...] in the plane of the last two axes
+    positions = np.array(positions, dtype=np.float64)
+    nx = np.array(sb.get_nx())
+    if sigma is None:
+        sigma = np.min(nx[nx > 1])/15
+    index = np.round(positions*nx[1:]).astype(np.int64) % nx[1:]
+    w = np.zeros(nx[1:], dtype=np.float64)
+    np.add.at(w, tuple(index.T), -1/np.prod(sb.get_dx()))
+    w = _gaussian_filter(w, sigma)
+    return _zero_mean(sb, np.broadcast_to(w, nx))
+
+def lamella(sb, n_periods=1, axis=-1):
+    x = _coordinates(sb, n_periods)[axis]
+    return _zero_mean(sb, np.broadcast_to(np.cos(x), sb.get_nx()))
+
+def cylinder_hexagonal(sb, n_cells=1, sigma=None):
+    return cylinders(sb, _replicate(HEXAGONAL_POSITIONS, n_cells), sigma)
+
+def sphere_bcc(sb, n_cells=1, sigma=None):
+    return spheres(sb, _replicate(BCC_POSITIONS, n_cells), sigma)
+
+def sphere_fcc(sb, n_cells=1, sigma=None):
+    return spheres(sb, _replicate(FCC_POSITIONS, n_cells), sigma)
+
+def a15(sb, n_cells=1, sigma=None):
+    return spheres(sb, _replicate(A15_POSITIONS, n_cells), sigma)
+
+def sigma_phase(sb, n_cells=1, sigma=None):
+    return spheres(sb, _replicate(SIGMA_POSITIONS, n_cells), sigma)
+
+def gyroid(sb, n_cells=1):
+    # the first two harmonics of the double gyroid (Ia-3d), {211} and {220}
+    x, y, z = _coordinates(sb, n_cells)
+    c1 = np.sqrt(8.0/3.0)*(np.cos(x)*np.sin(y)*np.sin(2.0*z) +
+        np.cos(y)*np.sin(z)*np.sin(2.0*x) + np.cos(z)*np.sin(x)*np.sin(2.0*y))
+    c2 = np.sqrt(4.0/3.0)*(np.cos(2.0*x)*np.cos(2.0*y) +
+        np.cos(2.0*y)*np.cos(2.0*z) + np.cos(2.0*z)*np.cos(2.0*x))
+    return _zero_mean(sb, -0.3164*c1 + 0.1074*c2)
+
+def double_diamond(sb, n_cells=1, amplitude=0.3164):
+    # the two networks of the double diamond (Pn-3m) are at the extrema of the
+    # level-set function F of the Schwarz D surface, so w_a is lowest where F^2 is largest
+    x, y, z = _coordinates(sb, n_cells)
+    f = np.sin(x)*np.sin(y)*np.sin(z) + np.sin(x)*np.cos(y)*np.cos(z) \
+      + np.cos(x)*np.sin(y)*np.cos(z) + np.cos(x)*np.cos(y)*np.sin(z)
+    f_square = f*f
+    # standard deviation of w_a is the amplitude
+    return _zero_mean(sb, -amplitude*(f_square-np.mean(f_square))/np.std(f_square))
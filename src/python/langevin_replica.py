@@ -0,0 +1,128 @@
+import numpy as np
+from langevinfts import *
+from checkpoint import *
+
+# A Langevin FTS trajectory (replica) of AB diblock copolymer melt.
+# w_minus is updated by the predictor-corrector method of the examples in
+# examples/fts, and w_plus is found at the saddle point by Anderson mixing.
+# Each replica owns its PolymerChain, SimulationBox, Pseudo and
+# AndersonMixing instances and its own random number generator, so that
+# several replicas can be advanced concurrently by Python threads.
+# A replica created with checkpoint=file_name continues the run saved by
+# save_checkpoint() without the initial saddle point iteration.
+# The Hamiltonian in units of kT is
+#   H = sqrt(nbar)*[ -V*ln(Q/V) + int(w_minus^2/chi_n - w_plus) + V*chi_n/4 ].
+
+class LangevinReplica:
+    def __init__(self, factory, nx, lx, f, n_segment, chi_n, chain_model="Continuous", epsilon=1.0,
+        langevin_dt=0.8, langevin_nbar=1024, saddle_max_iter=100, saddle_tolerance=1e-4,
+        am_max_hist=20, am_start_error=8e-1, am_mix_min=0.1, am_mix_init=0.1,
+        seed=None, w_plus=None, w_minus=None, checkpoint=None):
+
+        # create instances
+        self.pc     = factory.create_polymer_chain(f, n_segment, chi_n, chain_model, epsilon)
+        self.sb     = factory.create_simulation_box(nx, lx)
+        self.pseudo = factory.create_pseudo(self.sb, self.pc)
+        self.am     = factory.create_anderson_mixing(self.sb.get_n_grid(),
+            am_max_hist, am_start_error, am_mix_min, am_mix_init)
+
+        self.langevin_dt = langevin_dt
+        self.langevin_nbar = langevin_nbar
+        self.saddle_max_iter = saddle_max_iter
+        self.saddle_tolerance = saddle_tolerance
+        self.rng = np.random.default_rng(seed)
+        self.langevin_step = 0
+
+        # standard deviation of normal noise
+        self.langevin_sigma = np.sqrt(2*langevin_dt*self.sb.get_n_grid()/
+            (self.sb.get_volume()*np.sqrt(langevin_nbar)))
+
+        # free end initial condition
+        self.q1_init = np.ones(self.sb.get_n_grid(), dtype=np.float64)
+        self.q2_init = np.ones(self.sb.get_n_grid(), dtype=np.float64)
+
+        if checkpoint is not None:
+            self.load_checkpoint(checkpoint)
+            return
+
+        # random initial fields unless given
+        if w_plus is None:
+            w_plus = self.rng.normal(0.0, self.langevin_sigma, self.sb.get_n_grid())
+        if w_minus is None:
+            w_minus = self.rng.normal(0.0, self.langevin_sigma, self.sb.get_n_grid())
+        self.w_plus  = np.array(w_plus,  dtype=np.float64)
+        self.w_minus = np.array(w_minus, dtype=np.float64)
+
+        # keep the level of field value
+        self.sb.zero_mean(self.w_plus)
+        self.phi_a, self.phi_b, self.Q, self.saddle_iter = self.find_saddle_point()
+
+    def find_saddle_point(self):
+        # w_plus at the saddle point for the current w_minus
+        sb = self.sb
+        error_level = 1e20
+        self.am.reset_count()
+        for saddle_iter in range(1,self.saddle_max_iter+1):
+            # for the given fields find the polymer statistics
+            phi_a, phi_b, Q = self.pseudo.find_phi(self.q1_init, self.q2_init,
+                self.w_plus+self.w_minus, self.w_plus-self.w_minus)
+
+            # calculate output fields
+            g_plus = phi_a + phi_b - 1.0
+            w_plus_out = self.w_plus + g_plus
+            sb.zero_mean(w_plus_out)
+
+            # error_level measures the "relative distance" between the input and output fields
+            old_error_level = error_level
+            error_level = np.sqrt(sb.inner_product(g_plus,g_plus)/sb.get_volume())
+
+            # conditions to end the iteration
+            if error_level < self.saddle_tolerance:
+                break
+
+            # calculte new fields using simple and Anderson mixing
+            self.am.caculate_new_fields(self.w_plus, w_plus_out, g_plus, old_error_level, error_level)
+        return phi_a, phi_b, Q, saddle_iter
+
+    def step(self):
+        # one Langevin step of w_minus, predictor-corrector method
+        chi_n = self.pc.get_chi_n()
+        normal_noise = self.rng.normal(0.0, self.langevin_sigma, self.sb.get_n_grid())
+
+        # predict step
+        w_minus_copy = self.w_minus.copy()
+        lambda1 = self.phi_a-self.phi_b + 2*self.w_minus/chi_n
+        self.w_minus += -lambda1*self.langevin_dt + normal_noise
+        self.phi_a, self.phi_b, self.Q, _ = self.find_saddle_point()
+
+        # correct step
+        lambda2 = self.phi_a-self.phi_b + 2*self.w_minus/chi_n
+        self.w_minus[:] = w_minus_copy - 0.5*(lambda1+lambda2)*self.langevin_dt + normal_noise
+        self.phi_a, self.phi_b, self.Q, self.saddle_iter = self.find_saddle_point()
+        self.langevin_step += 1
+
+    def run(self, n_steps):
+        for i in range(n_steps):
+            self.step()
+
+    def save_checkpoint(self, file_name):
+        save_langevin_checkpoint(file_name, self.langevin_step, self.pc, self.sb,
+            self.w_plus, self.w_minus, self.phi_a, self.phi_b, self.Q, self.am, self.rng,
+            attributes={"saddle_iter":self.saddle_iter})
+
+    def load_checkpoint(self, file_name):
+        state = load_langevin_checkpoint(file_name, self.pc, self.sb, self.pseudo, self.am, self.rng)
+        self.langevin_step = state["langevin_step"]
+        self.w_plus, self.w_minus = state["w_plus"], state["w_minus"]
+        self.phi_a, self.phi_b, self.Q = state["phi_a"], state["phi_b"], state["Q"]
+        self.saddle_iter = state["attributes"]["saddle_iter"]
+
+    def get_hamiltonian(self, chi_n=None):
+        # chi_n : evaluate H of the current fields at another chi_n
+        if chi_n is None:
+            chi_n = self.pc.get_chi_n()
+        sb = self.sb
+        ww_minus, int_w_plus = sb.reduce_many([self.w_minus, self.w_plus], [(0,0), (1,)])
+        hamiltonian  = -sb.get_volume()*np.log(self.Q/sb.get_volume())
+        hamiltonian += ww_minus/chi_n - int_w_plus + sb.get_volume()*chi_n/4
+        return np.sqrt(self.langevin_nbar)*hamiltonian
@@ -0,0 +1,90 @@
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+# Parallel tempering (replica exchange) of Langevin FTS over chi_n.
+# K replicas (see langevin_replica.py) run concurrently in Python threads;
+# Pseudo.find_phi() and AndersonMixing release the GIL, so the threads run in
+# parallel. Set OMP_NUM_THREADS to (number of cores)/K before importing
+# langevinfts to avoid oversubscription.
+# Every swap_interval steps, swaps between neighboring chi_n are attempted,
+# alternating the even and odd pairs. Only the chi_n labels are exchanged by
+# PolymerChain.set_chi_n(), and the fields stay in their replicas.
+# Since only the w_minus^2/chi_n term of the Hamiltonian depends on both chi_n
+# and the fields (w_plus at the saddle point does not depend on chi_n),
+# the swap of replicas i and j at chi_n_i and chi_n_j is accepted with
+#   min(1, exp(-sqrt(nbar)*(S_i-S_j)*(1/chi_n_j-1/chi_n_i))),  S = int(w_minus^2).
+
+def swap_log_probability(nbar, chi_n_i, chi_n_j, ww_minus_i, ww_minus_j):
+    # log of the Metropolis acceptance ratio, -(H_after - H_before)
+    return -np.sqrt(nbar)*(ww_minus_i-ww_minus_j)*(1.0/chi_n_j-1.0/chi_n_i)
+
+class ParallelTempering:
+    def __init__(self, replicas, chi_n_list, swap_interval=10, n_workers=None, seed=None):
+        # replicas : LangevinReplica instances with the same nbar and box,
+        # chi_n_list : chi_n of each replica at the start (in the order of replicas)
+        if len(replicas) != len(chi_n_list):
+            raise ValueError("The number of replicas (%d) and chi_n (%d) must match" % (len(replicas), len(chi_n_list)))
+        if len(replicas) < 2:
+            raise ValueError("At least two replicas are required")
+        self.replicas = replicas
+        self.chi_n_list = np.array(chi_n_list, dtype=np.float64)
+        self.swap_interval = swap_interval
+        self.n_workers = len(replicas) if n_workers is None else n_workers
+        self.rng = np.random.default_rng(seed)
+
+        # replica_of_label[k] : the replica at chi_n_list[k]
+        self.replica_of_label = np.arange(len(replicas))
+        for k, replica in enumerate(replicas):
+            replica.pc.set_chi_n(self.chi_n_list[k])
+
+        # statistics of the swaps between label k and k+1
+        self.n_attempts = np.zeros(len(replicas)-1, dtype=np.int64)
+        self.n_accepts  = np.zeros(len(replicas)-1, dtype=np.int64)
+        self.n_swap_rounds = 0
+
+    def get_chi_n_of_replicas(self):
+        chi_n = np.zeros(len(self.replicas))
+        chi_n[self.replica_of_label] = self.chi_n_list
+        return chi_n
+
+    def attempt_swaps(self):
+        # even pairs (0,1), (2,3), ... and odd pairs (1,2), (3,4), ... in turn
+        nbar = self.replicas[0].langevin_nbar
+        for k in range(self.n_swap_rounds % 2, len(self.replicas)-1, 2):
+            i = self.replica_of_label[k]
+            j = self.replica_of_label[k+1]
+            rep_i = self.replicas[i]
+            rep_j = self.replicas[j]
+            ww_minus_i = rep_i.sb.inner_product(rep_i.w_minus, rep_i.w_minus)
+            ww_minus_j = rep_j.sb.inner_product(rep_j.w_minus, rep_j.w_minus)
+            log_prob = swap_log_probability(nbar, self.chi_n_list[k], self.chi_n_list[k+1], ww_minus_i, ww_minus_j)
+            self.n_attempts[k] += 1
+            if log_prob >= 0.0 or self.rng.random() < np.exp(log_prob):
+                self.n_accepts[k] += 1
+                self.replica_of_label[k], self.replica_of_label[k+1] = j, i
+                rep_i.pc.set_chi_n(self.chi_n_list[k+1])
+                rep_j.pc.set_chi_n(self.chi_n_list[k])
+        self.n_swap_rounds += 1
+
+    def run(self, n_steps, callback=None):
+        # callback(pt, langevin_step) is invoked after every swap_interval steps
+        with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+            step = 0
+            while step < n_steps:
+                n = min(self.swap_interval, n_steps-step)
+                # run the replicas concurrently, and wait for all of them
+                for future in [executor.submit(replica.run, n) for replica in self.replicas]:
+                    future.result()
+                step += n
+                self.attempt_swaps()
+                if callback is not None:
+                    callback(self, step)
+
+    def get_acceptance_rates(self):
+        # acceptance rate of the swaps between chi_n_list[k] and chi_n_list[k+1]
+        return self.n_accepts/np.maximum(self.n_attempts, 1)
+
+    def print_acceptance_rates(self):
+        print("chi_n pair, attempts, acceptance rate")
+        for k, rate in enumerate(self.get_acceptance_rates()):
+            print("%10.4f %10.4f %8d %10.4f" % (self.chi_n_list[k], self.chi_n_list[k+1], self.n_attempts[k], rate))
@@ -0,0 +1,202 @@
+import numpy as np
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from ensemble_runner import partition_cores, pin_to_cores, create_factory
+from solution_cache import DEFAULT_SCALES
+
+# Parameter sweep of SCFT by continuation.
+# The path is a polyline through waypoints in (chi_n, f, epsilon), and it is
+# parameterized by the arc length s, in which each parameter is divided by its
+# scale (DEFAULT_SCALES of solution_cache.py, e.g., 1.0 for chi_n and 0.05 for f).
+# Starting from w_init at the first waypoint, each point starts from the fields
+# and lx extrapolated from the previous two converged points (secant predictor),
+#   x(s + ds) = x(s) + ds*(x(s) - x(s - ds_prev))/ds_prev.
+# The step ds is multiplied by sqrt(target_iter/n_iter), within [1/2, 2] and
+# [min_step, max_step], so the steps become longer where the solution changes
+# slowly. If a point does not converge in max_iter iterations, the step is
+# halved and the point is tried again, and the sweep stops if ds < min_step.
+# Every waypoint is a point of the sweep. chi_n is changed with
+# PolymerChain.set_chi_n(), while PolymerChain and Pseudo are created again if f or
+# epsilon is changed. Since N*f must be an integer, f is rounded to a multiple of 1/n_segment.
+# run_sweeps() runs several sweeps (branches, e.g., different phases or paths)
+# concurrently in worker processes pinned to groups of cores, like
+# ensemble_runner.py, so langevinfts must not be imported at the top level of this module.
+
+PARAMETERS = ["chi_n", "f", "epsilon"]
+
+class ParameterSweep:
+    def __init__(self, waypoints, n_segment, chain_model, nx, lx, w_init,
+        is_box_altering=True, step=0.5, min_step=0.01, max_step=4.0, target_iter=50,
+        max_iter=1000, tolerance=1e-7, scales=None,
+        am_max_hist=20, am_start_error=1e-2, am_mix_min=0.1, am_mix_init=0.1,
+        label=None, store_fields=False, verbose_level=1):
+        # waypoints : list of {"chi_n":..., "f":..., "epsilon":...}, the missing
+        #             parameters are the same as the previous waypoint (epsilon is 1.0 at first)
+        # w_init    : initial fields [2, n_grid] at the first waypoint
+        # store_fields : if True, the fields of every point are kept in the results
+        previous = {"epsilon":1.0}
+        self.waypoints = []
+        for waypoint in waypoints:
+            unknown = set(waypoint) - set(PARAMETERS)
+            if unknown:
+                raise ValueError("Unknown parameters of a waypoint: %s" % (sorted(unknown)))
+            previous = dict(previous, **waypoint)
+            if set(previous) != set(PARAMETERS):
+                raise ValueError("The first waypoint must have 'chi_n' and 'f'")
+            self.waypoints.append(np.array([previous[name] for name in PARAMETERS], dtype=np.float64))
+        if len(self.waypoints) < 1:
+            raise ValueError("At least one waypoint is required")
+        if not 0 < min_step <= step <= max_step:
+            raise ValueError("Steps must satisfy 0 < min_step (%g) <= step (%g) <= max_step (%g)" % (min_step, step, max_step))
+
+        self.n_segment = n_segment
+        self.chain_model = chain_model
+        self.nx = list(nx)
+        self.lx = np.array(lx, dtype=np.float64)
+        self.w_init = np.array(w_init, dtype=np.float64)
+        self.is_box_altering = is_box_altering
+        self.step = step
+        self.min_step = min_step
+        self.max_step = max_step
+        self.target_iter = target_iter
+        self.max_iter = max_iter
+        self.tolerance = tolerance
+        self.am_params = [am_max_hist, am_start_error, am_mix_min, am_mix_init]
+        self.label = label
+        self.store_fields = store_fields
+        self.verbose_level = verbose_level
+
+        all_scales = dict(DEFAULT_SCALES)
+        if scales is not None:
+            all_scales.update(scales)
+        self.scales = np.array([all_scales[name] for name in PARAMETERS], dtype=np.float64)
+
+        # arc length of the waypoints
+        lengths = [np.linalg.norm((b-a)/self.scales) for a, b in zip(self.waypoints[:-1], self.waypoints[1:])]
+        self.s_waypoints = np.concatenate([[0.0], np.cumsum(lengths)])
+
+    def get_parameters(self, s):
+        # (chi_n, f, epsilon) at the arc length s, f is rounded to a multiple of 1/n_segment
+        k = np.searchsorted(self.s_waypoints, s, side="right") - 1
+        k = int(np.clip(k, 0, len(self.waypoints)-2)) if len(self.waypoints) > 1 else 0
+        if len(self.waypoints) == 1 or self.s_waypoints[k+1] == self.s_waypoints[k]:
+            chi_n, f, epsilon = self.waypoints[k]
+        else:
+            t = (s - self.s_waypoints[k])/(self.s_waypoints[k+1] - self.s_waypoints[k])
+            chi_n, f, epsilon = (1-t)*self.waypoints[k] + t*self.waypoints[k+1]
+        return chi_n, np.round(f*self.n_segment)/self.n_segment, epsilon
+
+    def run(self, factory):
+        # returns {"label", "s", "chi_n", "f", "epsilon", "energy", "n_iter", "lx",
+        # "w" (fields of the last point, or of every point if store_fields), "completed"}
+        from grid_sequencing import iterate_saddle_point
+
+        sb = factory.create_simulation_box(self.nx, list(self.lx))
+        n_var = 2*sb.get_n_grid() + (sb.get_dim() if self.is_box_altering else 0)
+        am = factory.create_anderson_mixing(n_var, *self.am_params)
+        q_init = np.ones(sb.get_n_grid(), dtype=np.float64)
+        pc, pseudo = None, None
+
+        points = []     # (s, chi_n, f, epsilon, energy, n_iter, lx, w) of the converged points
+        s_end = self.s_waypoints[-1]
+        s = 0.0
+        s_last = None   # arc length of the last converged point
+        step = self.step
+        completed = True
+        while True:
+            chi_n, f, epsilon = self.get_parameters(s)
+            x = np.array([chi_n, f, epsilon])/self.scales
+
+            if points and np.array_equal(x, np.array(points[-1][1:4])/self.scales):
+                # the same parameters as the last point, since f is rounded
+                s_last = s
+            else:
+                # secant predictor, projected on the direction of the last step, or the last point
+                if len(points) >= 2:
+                    x_last = np.array(points[-1][1:4])/self.scales
+                    dx = x_last - np.array(points[-2][1:4])/self.scales
+                    ratio = np.dot(x - x_last, dx)/np.dot(dx, dx)
+                    w = points[-1][7] + ratio*(points[-1][7] - points[-2][7])
+                    lx = points[-1][6] + ratio*(points[-1][6] - points[-2][6])
+                    if np.any(lx <= 0.0):
+                        lx = points[-1][6].copy()
+                elif len(points) == 1:
+                    w, lx = points[-1][7].copy(), points[-1][6].copy()
+                else:
+                    w, lx = self.w_init.copy(), self.lx.copy()
+
+                if pc is None or f != pc.get_f() or epsilon != pc.get_epsilon():
+                    pseudo = None
+                    pc = factory.create_polymer_chain(f, self.n_segment, chi_n, self.chain_model, epsilon)
+                    pseudo = factory.create_pseudo(sb, pc)
+                pc.set_chi_n(chi_n)
+                sb.set_lx(list(lx))
+                pseudo.update()
+
+                _, _, _, energy, lx, n_iter, error_level = iterate_saddle_point(pc, sb, pseudo, am, lx,
+                    q_init, q_init, w, self.max_iter, self.tolerance, self.is_box_altering, 0)
+                converged = error_level < self.tolerance and np.isfinite(energy)
+
+                if self.verbose_level >= 1:
+                    print("%s s: %8.4f, chi_n: %8.4f, f: %6.4f, epsilon: %6.4f, iterations: %5d, energy: %15.9f, step: %7.4f%s" %
+                        ("" if self.label is None else "[%s]" % (self.label), s, chi_n, f, epsilon,
+                        n_iter, energy, step, "" if converged else " (not converged)"))
+
+                if converged:
+                    points.append((s, chi_n, f, epsilon, energy, n_iter, np.array(lx, dtype=np.float64), w.copy()))
+                    if not self.store_fields and len(points) > 2:
+                        points[-3] = points[-3][:7] + (None,)
+                    s_last = s
+                    step *= np.clip(np.sqrt(self.target_iter/max(n_iter, 1)), 0.5, 2.0)
+                    step = np.clip(step, self.min_step, self.max_step)
+                else:
+                    # try again from the last converged point with a shorter step
+                    step *= 0.5
+                    if not points or step < self.min_step:
+                        completed = False
+                        break
+
+            if s_last >= s_end:
+                break
+            # the next point, stopping at the next waypoint
+            s = min(s_last + step, self.s_waypoints[np.searchsorted(self.s_waypoints, s_last, side="right")])
+
+        results = {"label":self.label, "completed":completed}
+        for i, name in enumerate(["s", "chi_n", "f", "epsilon", "energy", "n_iter"]):
+            results[name] = np.array([point[i] for point in points])
+        results["lx"] = np.array([point[6] for point in points])
+        if self.store_fields:
+            results["w"] = np.array([point[7] for point in points])
+        elif points:
+            results["w"] = points[-1][7]
+        return results
+
+def run_sweep_group(platform, sweeps, cores):
+    # worker, runs the sweeps one after another
+    if cores is not None:
+        pin_to_cores(cores)
+    factory = create_factory(platform)
+    return [sweep.run(factory) for sweep in sweeps]
+
+def run_sweeps(sweeps, platform=None, cores=None, n_groups=None):
+    # runs the ParameterSweep instances concurrently, and returns their results in order
+    # platform : the first available platform by default
+    sweeps = list(sweeps)
+    if n_groups is None:
+        n_groups = len(sweeps)
+    core_groups = partition_cores(min(n_groups, len(sweeps)), cores)
+    n_groups = len(core_groups)
+    sweep_groups = [sweeps[g::n_groups] for g in range(n_groups)]
+
+    # spawn, so that the workers import langevinfts after pinning
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=n_groups, mp_context=context) as executor:
+        futures = [executor.submit(run_sweep_group, platform, sweep_groups[g], core_groups[g])
+            for g in range(n_groups)]
+        group_results = [future.result() for future in futures]
+
+    results = [None]*len(sweeps)
+    for g in range(n_groups):
+        for i, result in enumerate(group_results[g]):
+            results[g+i*n_groups] = result
+    return results
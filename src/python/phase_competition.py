@@ -0,0 +1,188 @@
+import queue
+import traceback
+import numpy as np
+import multiprocessing
+from ensemble_runner import partition_cores, pin_to_cores, create_factory
+
+# Competition of candidate phases at one set of parameters.
+# The candidates are solved concurrently by SCFT in worker processes pinned to
+# groups of cores (see ensemble_runner.py), and each worker reports the
+# free energy and the error level every report_interval iterations. The free
+# energy of a candidate is not lower than about (energy - error_level) once the
+# error level is below abandon_error, so a candidate is abandoned if
+#   energy - error_level > (lowest energy of the converged candidates) + margin.
+# The candidates are started in the given order, so those likely to win should
+# be given first. If there are more candidates than the groups of cores, the
+# others wait for a free group.
+# A candidate is a dictionary of
+#   "label"    : name of the phase, e.g., "Gyroid"
+#   "nx", "lx" : grid and initial box size
+#   "initial_field" : name of a function of initial_fields.py, e.g., "gyroid",
+#                     with "initial_field_options", e.g., {"n_cells":[2,3]},
+#                     so that w = [w_a, -w_a] is made in the worker, or
+#   "w_init"   : initial fields [2, n_grid]
+#   "is_box_altering" (optional) : True by default
+# langevinfts must not be imported at the top level of this module.
+
+def solve_candidate(platform, params, candidate, cores, report_queue, stop_event, report_interval):
+    # worker, runs the SCFT iteration of a candidate and puts the messages
+    # ("progress", label, (n_iter, energy, error_level)) and ("done", label, result) to report_queue
+    label = candidate["label"]
+    try:
+        if cores is not None:
+            pin_to_cores(cores)
+        from grid_sequencing import iterate_saddle_point
+        import initial_fields
+
+        factory = create_factory(platform)
+        is_box_altering = candidate.get("is_box_altering", True)
+        pc = factory.create_polymer_chain(params["f"], params["n_segment"], params["chi_n"],
+            params.get("chain_model", "Continuous"), params.get("epsilon", 1.0))
+        sb = factory.create_simulation_box(list(candidate["nx"]), list(candidate["lx"]))
+        pseudo = factory.create_pseudo(sb, pc)
+        n_var = 2*sb.get_n_grid() + (sb.get_dim() if is_box_altering else 0)
+        am = factory.create_anderson_mixing(n_var, params.get("am_max_hist", 20),
+            params.get("am_start_error", 1e-2), params.get("am_mix_min", 0.1), params.get("am_mix_init", 0.1))
+        q_init = np.ones(sb.get_n_grid(), dtype=np.float64)
+
+        if "w_init" in candidate:
+            w = np.array(candidate["w_init"], dtype=np.float64)
+        else:
+            w_a = getattr(initial_fields, candidate["initial_field"])(sb, **candidate.get("initial_field_options", {}))
+            w = np.array([w_a, -w_a])
+
+        last = {"stopped":False}
+        def callback(scft_iter, energy, error_level):
+            if scft_iter % report_interval == 0:
+                report_queue.put(("progress", label, (scft_iter, energy, error_level)))
+            last["stopped"] = stop_event.is_set()
+            return last["stopped"]
+
+        _, _, _, energy, lx, n_iter, error_level = iterate_saddle_point(pc, sb, pseudo, am, candidate["lx"],
+            q_init, q_init, w, params.get("max_iter", 2000), params.get("tolerance", 1e-7),
+            is_box_altering, 0, callback)
+        converged = error_level < params.get("tolerance", 1e-7)
+        result = {"energy":energy, "n_iter":n_iter, "lx":list(np.array(lx, dtype=np.float64)),
+            "error_level":None if converged else error_level,
+            "status":"converged" if converged else ("abandoned" if last["stopped"] else "not converged")}
+        if params.get("return_fields", False):
+            result["w"] = w
+        report_queue.put(("done", label, result))
+    except Exception:
+        report_queue.put(("done", label, {"status":"failed", "error":traceback.format_exc()}))
+
+class PhaseCompetition:
+    def __init__(self, params, candidates, platform=None, cores=None, n_groups=None,
+        abandon_error=1e-2, margin=1e-3, report_interval=10, verbose_level=1):
+        # params : {"f", "n_segment", "chi_n", "epsilon", "chain_model", "max_iter", "tolerance",
+        #           "am_max_hist", "am_start_error", "am_mix_min", "am_mix_init", "return_fields"}
+        # platform : the first available platform by default
+        # n_groups : number of concurrent candidates, min(len(candidates), number of cores) by default
+        labels = [candidate["label"] for candidate in candidates]
+        if len(set(labels)) != len(labels):
+            raise ValueError("Labels of the candidates must be unique: %s" % (labels))
+        self.params = dict(params)
+        self.candidates = [dict(candidate) for candidate in candidates]
+        self.platform = platform
+        if n_groups is None:
+            n_groups = len(self.candidates)
+        self.core_groups = partition_cores(min(n_groups, len(self.candidates)), cores)
+        self.abandon_error = abandon_error
+        self.margin = margin
+        self.report_interval = report_interval
+        self.verbose_level = verbose_level
+        self.results = None
+
+    def get_best_energy(self, phases):
+        energies = [phase["energy"] for phase in phases.values() if phase.get("status") == "converged"]
+        return min(energies) if energies else None
+
+    def is_hopeless(self, phase, best_energy):
+        # the energy bound of a running candidate is clearly above the best energy
+        if best_energy is None or phase.get("error_level") is None:
+            return False
+        return phase["error_level"] < self.abandon_error and \
+            phase["energy"] - phase["error_level"] > best_energy + self.margin
+
+    def run(self):
+        # returns {"phases":{label: {"status", "energy", "n_iter", "lx", "error_level"}},
+        #          "winner", "energy_gaps":{label: energy - energy of the winner}}
+        context = multiprocessing.get_context("spawn")
+        report_queue = context.Queue()
+        pending = list(self.candidates)
+        free_groups = list(self.core_groups)
+        running = {}    # label: (process, cores, stop_event)
+        phases = {candidate["label"]: {"status":"pending"} for candidate in self.candidates}
+
+        while pending or running:
+            # start the candidates on the free groups of cores
+            while pending and free_groups:
+                candidate = pending.pop(0)
+                cores = free_groups.pop(0)
+                stop_event = context.Event()
+                process = context.Process(target=solve_candidate, args=(self.platform, self.params,
+                    candidate, cores, report_queue, stop_event, self.report_interval), daemon=True)
+                process.start()
+                running[candidate["label"]] = (process, cores, stop_event)
+                phases[candidate["label"]] = {"status":"running"}
+
+            try:
+                kind, label, data = report_queue.get(timeout=1.0)
+            except queue.Empty:
+                # a worker that exited without a message, e.g., killed by a signal
+                for label, (process, cores, _) in list(running.items()):
+                    if not process.is_alive() and report_queue.empty():
+                        process.join()
+                        phases[label] = {"status":"failed", "error":"exit code %s" % (process.exitcode)}
+                        free_groups.append(cores)
+                        del running[label]
+                continue
+
+            if kind == "progress":
+                if label not in running:
+                    continue
+                n_iter, energy, error_level = data
+                phases[label].update({"n_iter":n_iter, "energy":energy, "error_level":error_level})
+                if self.verbose_level >= 2:
+                    print("%-10s iteration: %6d, energy: %15.9f, error level: %10.3e" % (label, n_iter, energy, error_level))
+            else:
+                process, cores, _ = running.pop(label)
+                process.join()
+                free_groups.append(cores)
+                phases[label] = data
+                if self.verbose_level >= 1:
+                    if data["status"] == "failed":
+                        print("%-10s failed\n%s" % (label, data["error"]))
+                    else:
+                        print("%-10s %-13s iterations: %6d, energy: %15.9f" % (label, data["status"], data["n_iter"], data["energy"]))
+
+            # abandon the running candidates whose energy bound is above the best energy
+            best_energy = self.get_best_energy(phases)
+            for label, (_, _, stop_event) in running.items():
+                if not stop_event.is_set() and self.is_hopeless(phases[label], best_energy):
+                    stop_event.set()
+                    if self.verbose_level >= 1:
+                        print("%-10s abandoning, energy: %15.9f, error level: %10.3e, best energy: %15.9f" %
+                            (label, phases[label]["energy"], phases[label]["error_level"], best_energy))
+
+        best_energy = self.get_best_energy(phases)
+        winner = None
+        energy_gaps = {}
+        if best_energy is not None:
+            winner = [label for label, phase in phases.items() if phase.get("status") == "converged" and phase["energy"] == best_energy][0]
+            energy_gaps = {label: phase["energy"] - best_energy for label, phase in phases.items() if "energy" in phase}
+        self.results = {"phases":phases, "winner":winner, "energy_gaps":energy_gaps}
+        return self.results
+
+    def report(self):
+        # the candidates in the order of energy
+        results = self.results
+        print("---------- Phase Competition ----------")
+        print("chi_n: %f, f: %f, N: %d" % (self.params["chi_n"], self.params["f"], self.params["n_segment"]))
+        for label in sorted(results["energy_gaps"], key=lambda label: results["energy_gaps"][label]):
+            phase = results["phases"][label]
+            print("%-10s %-13s energy: %15.9f, gap: %12.3e" % (label, phase["status"], phase["energy"], results["energy_gaps"][label]))
+        for label, phase in results["phases"].items():
+            if label not in results["energy_gaps"]:
+                print("%-10s %-13s" % (label, phase["status"]))
+        print("Winner: %s" % (results["winner"]))
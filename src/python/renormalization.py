@@ -0,0 +1,144 @@
+import functools
+import numpy as np
+import scipy.special as sp
+
+# Renormalization of the Flory-Huggins parameter for L-FTS.
+# The effective chi_n is related to the bare chi_n used in the simulation by
+#   effective_chi_n = z_inf*chi_n,
+# where z_inf depends on the grid interval through the ultraviolet cutoff.
+# The discrete chain model uses the sum of the bond probabilities
+# (tools/renormalization_discrete.m), and the continuous chain model uses
+# the RPA structure function of the athermal melt integrated over the first
+# Brillouin zone of the grid (tools/renormalization_rpa.m). Only the
+# conformationally symmetric chains in 3D are supported.
+# The results depend only on lx for given (nx, n_segment, nbar), so the
+# instances are cached, and the last evaluation is extrapolated to first
+# order if lx changes less than 'update_tolerance' (relative).
+
+def _check_box(lx, nx):
+    if len(lx) != 3 or len(nx) != 3:
+        raise ValueError("Renormalization requires 3D box, but lx and nx are %s and %s" % (str(list(lx)), str(list(nx))))
+
+def z_inf_discrete(lx, nx, n_segment, nbar, summax=100):
+    # returns z_inf and d(z_inf)/d(lx)
+    _check_box(lx, nx)
+    lx = np.array(lx, dtype=np.float64)
+    dx = lx/np.array(nx)
+    dv = np.prod(dx)
+    # cell volume * rho_0
+    vcellrho = n_segment*np.sqrt(nbar)*dv
+
+    # P_i, probability of the i-th bond ending in the same cell, product of three axes
+    i = np.arange(1, summax+1, dtype=np.float64)
+    alpha = np.array([d*np.sqrt(3*n_segment/(2*np.pi*i))*sp.erf(np.pi/d*np.sqrt(i/6/n_segment)) for d in dx])
+    p_i = np.prod(alpha, axis=0)
+    # contribution of i > summax is estimated using continuous chain
+    sum_p_i = np.sum(p_i) + np.power(3*n_segment/(2*np.pi),1.5)*dv*2/np.sqrt(0.5+summax)
+    z_inf = 1-(1+2*sum_p_i)/vcellrho
+
+    # d(z_inf)/dl, since dx*d(alpha)/d(dx) = alpha - exp(-i*pi^2/(6*dx^2*N))
+    sum_p_i = np.array([np.sum(np.exp(-i*np.pi**2/(6*dx[n]**2*n_segment))*p_i/alpha[n]) for n in range(3)])
+    dz_inf_dl = (1+2*sum_p_i)/vcellrho/lx
+
+    return z_inf, dz_inf_dl
+
+def _debye_g(f, x):
+    # kernel function for linear AB diblock, x = (k*R)^2/6
+    return 2*(f*x + np.expm1(-f*x))/x**2
+
+def structure_function_rpa_athermal(f, k_square):
+    # RPA structure function of AB diblock melt with chi_n = 0.0
+    x = k_square/6
+    g_a = _debye_g(f, x)
+    g_b = _debye_g(1-f, x)
+    g_t = _debye_g(1.0, x)
+    return (g_a*g_b - 0.25*(g_t-g_a-g_b)**2)/g_t
+
+def _gauss_legendre_panels(k_max, n_points=8):
+    # composite Gauss-Legendre quadrature on [0, k_max], the panels become
+    # wider geometrically from the origin, where the integrand varies rapidly
+    edges = [0.0]
+    width = min(0.5, k_max)
+    while edges[-1] + width < k_max*(1-1e-12):
+        edges.append(edges[-1] + width)
+        width *= 2
+    edges.append(k_max)
+    x, w = np.polynomial.legendre.leggauss(n_points)
+    nodes = []
+    weights = []
+    for a, b in zip(edges[:-1], edges[1:]):
+        nodes.append(0.5*(b-a)*x + 0.5*(b+a))
+        weights.append(0.5*(b-a)*w)
+    return np.concatenate(nodes), np.concatenate(weights)
+
+def z_inf_rpa(lx, nx, f, nbar, n_points=8):
+    # returns z_inf and d(z_inf)/d(lx)
+    _check_box(lx, nx)
+    lx = np.array(lx, dtype=np.float64)
+    k_max = np.pi*np.array(nx)/lx
+    quad = [_gauss_legendre_panels(k, n_points) for k in k_max]
+    factor = np.sqrt(nbar)*8*np.pi**3*f*(1-f)
+
+    # the integrand is even along each axis, 8 octants
+    k2 = [q[0]**2 for q in quad]
+    s_k = structure_function_rpa_athermal(f, k2[0][:,None,None] + k2[1][None,:,None] + k2[2][None,None,:])
+    integral = 8*np.einsum('i,j,k,ijk->', quad[0][1], quad[1][1], quad[2][1], s_k)
+    z_inf = 1 - integral/factor
+
+    # d(integral)/d(k_max) is the integral on the face of the zone, and d(k_max)/dl = -k_max/l
+    dz_inf_dl = np.zeros(3)
+    for n in range(3):
+        a, b = [m for m in range(3) if m != n]
+        s_face = structure_function_rpa_athermal(f, k_max[n]**2 + k2[a][:,None] + k2[b][None,:])
+        face = 8*np.einsum('i,j,ij->', quad[a][1], quad[b][1], s_face)
+        dz_inf_dl[n] = face*k_max[n]/lx[n]/factor
+
+    return z_inf, dz_inf_dl
+
+class Renormalization:
+    def __init__(self, nx, n_segment, nbar, chain_model="Discrete", f=0.5, summax=100, update_tolerance=1e-5):
+        # f is used only for the continuous chain model
+        self.nx = tuple(nx)
+        self.n_segment = n_segment
+        self.nbar = nbar
+        self.chain_model = chain_model.lower()
+        self.f = f
+        self.summax = summax
+        self.update_tolerance = update_tolerance
+        if self.chain_model not in ["discrete", "continuous"]:
+            raise ValueError("Chain model '%s' is not supported, choose among [Continuous, Discrete]" % (chain_model))
+        if len(self.nx) != 3:
+            raise ValueError("Renormalization requires 3D box, but nx is %s" % (str(list(nx))))
+        self.lx = None
+        self.z_inf = None
+        self.dz_inf_dl = None
+
+    def compute(self, lx):
+        # exact values for lx
+        if self.chain_model == "discrete":
+            return z_inf_discrete(lx, self.nx, self.n_segment, self.nbar, self.summax)
+        else:
+            return z_inf_rpa(lx, self.nx, self.f, self.nbar)
+
+    def get_z_inf(self, lx):
+        # returns z_inf and d(z_inf)/d(lx)
+        lx = np.array(lx, dtype=np.float64)[-3:]
+        if self.lx is not None:
+            dl = lx - self.lx
+            if np.max(np.absolute(dl)/self.lx) <= self.update_tolerance:
+                return self.z_inf + np.dot(self.dz_inf_dl, dl), self.dz_inf_dl.copy()
+        self.z_inf, self.dz_inf_dl = self.compute(lx)
+        self.lx = lx
+        return self.z_inf, self.dz_inf_dl.copy()
+
+    def get_bare_chi_n(self, effective_chi_n, lx):
+        z_inf, _ = self.get_z_inf(lx)
+        return effective_chi_n/z_inf
+
+@functools.lru_cache(maxsize=16)
+def _cached_renormalization(nx, n_segment, nbar, chain_model, f, summax, update_tolerance):
+    return Renormalization(nx, n_segment, nbar, chain_model, f, summax, update_tolerance)
+
+def get_renormalization(nx, n_segment, nbar, chain_model="Discrete", f=0.5, summax=100, update_tolerance=1e-5):
+    # shared instance for the same parameters
+    return _cached_renormalization(tuple(list(nx)[-3:]), n_segment, nbar, chain_model.lower(), f, summax, update_tolerance)
@@ -0,0 +1,59 @@
+import numpy as np
+
+# Spectral resampling of periodic fields.
+# The Fourier coefficients are copied to the new grid (zero-padding for
+# a finer grid, truncation for a coarser grid), so that a band-limited
+# field is interpolated exactly. The Nyquist mode of an even grid is split
+# into +k and -k when the grid is refined, and the two are merged when it is coarsened.
+
+def _resample_axis(data_k, n_in, n_out, axis):
+    # data_k : Fourier coefficients (normalized by n_in) along 'axis'
+    n_min = min(n_in, n_out)
+    shape = list(data_k.shape)
+    shape[axis] = n_out
+    new_k = np.zeros(shape, dtype=np.complex128)
+
+    def sl(idx):
+        s = [slice(None)]*data_k.ndim
+        s[axis] = idx
+        return tuple(s)
+
+    # modes with |k| < n_min/2
+    n_pos = (n_min+1)//2
+    new_k[sl(slice(0,n_pos))] = data_k[sl(slice(0,n_pos))]
+    if n_pos > 1:
+        new_k[sl(slice(n_out-n_pos+1,n_out))] = data_k[sl(slice(n_in-n_pos+1,n_in))]
+
+    # Nyquist mode of the smaller even grid
+    if n_min % 2 == 0 and n_min > 0:
+        h = n_min//2
+        if n_in == n_out:
+            new_k[sl(h)] = data_k[sl(h)]
+        elif n_in < n_out:
+            new_k[sl(h)]       = 0.5*data_k[sl(h)]
+            new_k[sl(n_out-h)] = 0.5*data_k[sl(h)]
+        else:
+            new_k[sl(h)] = data_k[sl(h)] + data_k[sl(n_in-h)]
+    return new_k
+
+def resample_field(field, nx_in, nx_out):
+    # field : real array whose size is prod(nx_in), returns a flattened array on nx_out
+    nx_in = list(nx_in)
+    nx_out = list(nx_out)
+    if len(nx_in) != len(nx_out):
+        raise ValueError("Dimensions of nx_in (%d) and nx_out (%d) must match" % (len(nx_in), len(nx_out)))
+    if np.size(field) != np.prod(nx_in):
+        raise ValueError("Size of field (%d) and prod(nx_in) (%d) must match" % (np.size(field), np.prod(nx_in)))
+
+    data = np.reshape(np.asarray(field, dtype=np.float64), nx_in)
+    for axis in range(len(nx_in)):
+        if nx_in[axis] == nx_out[axis]:
+            continue
+        data_k = np.fft.fft(data, axis=axis)/nx_in[axis]
+        data_k = _resample_axis(data_k, nx_in[axis], nx_out[axis], axis)
+        data = np.real(np.fft.ifft(data_k, axis=axis))*nx_out[axis]
+    return np.reshape(data, np.prod(nx_out))
+
+def resample_fields(fields, nx_in, nx_out):
+    # fields : array of shape [n_comp, prod(nx_in)], e.g., w = [w_a, w_b]
+    return np.array([resample_field(field, nx_in, nx_out) for field in fields])
@@ -0,0 +1,151 @@
+import numpy as np
+
+# Random phase approximation (RPA) of AB diblock copolymer melts, vectorized
+# over the parameters for screening before SCFT or L-FTS runs.
+# The wave number k is in units of 1/(a*N^(1/2)), a = sqrt(f*a_A^2 + (1-f)*a_B^2),
+# and the Debye functions g_ij(k) are those of Pseudo.get_debye_function(),
+# normalized so that g_aa(0) = f^2, g_ab(0) = f*(1-f), g_bb(0) = (1-f)^2.
+# The RPA structure function per chain is
+#   N/S(k) = F(k) - 2*chi_n,  F(k) = (g_aa + g_bb + 2*g_ab)/(g_aa*g_bb - g_ab^2),
+# so the disordered melt is unstable for chi_n > chi_n_s = min_k F(k)/2, at k = k*.
+# spinodal() finds the minimum of F(k) on a logarithmic grid of k for every
+# parameter set at once, and refines it by golden-section search.
+# The arguments f, chi_n, epsilon and n_segment are broadcast together. For the
+# discrete chain model, the numbers of A and B segments are round(n_segment*f)
+# and n_segment - round(n_segment*f).
+# estimate_phase() returns a mean-field phase from chi_n_s and the boundaries
+# in PHASE_BOUNDARIES for min(f, 1-f), and unit_cell_size() the size of the unit
+# cell whose first Bragg peak is at k*; both are meant for initial fields and
+# boxes (see initial_fields.py and phase_competition.py), not as a phase diagram.
+
+# the minority fraction below which each phase is estimated (intermediate segregation)
+PHASE_BOUNDARIES = [(0.21, "BCC"), (0.31, "Cylinder"), (0.345, "Gyroid"), (0.5, "Lamella")]
+# the first Bragg peak of each phase, |k*| = 2*pi*sqrt(h^2+k^2+l^2)/(lattice constant)
+_FIRST_PEAK = {"Lamella":1.0, "Cylinder":2.0/np.sqrt(3.0), "BCC":np.sqrt(2.0), "Gyroid":np.sqrt(6.0)}
+
+def bond_lengths(f, epsilon=1.0):
+    # squared statistical segment lengths of A and B in units of a^2
+    f = np.asarray(f, dtype=np.float64)
+    eps2 = np.asarray(epsilon, dtype=np.float64)**2
+    return eps2/(f*eps2 + (1.0-f)), 1.0/(f*eps2 + (1.0-f))
+
+def _debye_continuous(n, x):
+    # auto-correlation of a continuous block with n (=f or 1-f) and x (=k^2*b^2/6)
+    nx = n*x
+    small = nx < 1e-4
+    x_safe = np.where(small, 1.0, x)
+    return np.where(small, n*n*(1.0 - nx/3.0 + nx*nx/12.0), 2.0*(nx + np.expm1(-nx))/x_safe**2)
+
+def _end_continuous(n, x):
+    # end-to-segment correlation of a continuous block
+    nx = n*x
+    small = nx < 1e-4
+    x_safe = np.where(small, 1.0, x)
+    return np.where(small, n*(1.0 - nx/2.0 + nx*nx/6.0), -np.expm1(-nx)/x_safe)
+
+def _debye_discrete(n, t):
+    # auto-correlation of a discrete block with n segments and bond factor beta = exp(-t),
+    # n + 2*sum_{d=1}^{n-1} (n-d)*beta^d
+    one_minus_beta = -np.expm1(-t)
+    one_minus_beta_n = -np.expm1(-n*t)
+    small = n*t < 1e-4
+    denominator = np.where(small, 1.0, one_minus_beta)**2
+    series = n*n - t*(n*n*n - n)/3.0
+    return np.where(small, series, n + 2.0*np.exp(-t)*(n*one_minus_beta - one_minus_beta_n)/denominator)
+
+def _end_discrete(n, t):
+    # end-to-segment correlation of a discrete block, sum_{d=0}^{n-1} beta^d
+    small = t < 1e-10
+    return np.where(small, n - t*n*(n-1)/2.0, -np.expm1(-n*t)/np.where(small, 1.0, -np.expm1(-t)))
+
+def debye_functions(k, f, epsilon=1.0, n_segment=None, chain_model="Continuous"):
+    # returns g_aa, g_ab, g_bb, broadcast over k and the parameters
+    k2 = np.asarray(k, dtype=np.float64)**2
+    f = np.asarray(f, dtype=np.float64)
+    bond_length_a, bond_length_b = bond_lengths(f, epsilon)
+    x_a = k2*bond_length_a/6.0
+    x_b = k2*bond_length_b/6.0
+    if chain_model.lower() == "discrete":
+        if n_segment is None:
+            raise ValueError("n_segment is required for the discrete chain model")
+        n = np.asarray(n_segment, dtype=np.float64)
+        n_a = np.rint(n*f)
+        n_b = n - n_a
+        bond_length_ab = 0.5*bond_length_a + 0.5*bond_length_b
+        g_aa = _debye_discrete(n_a, x_a/n)/(n*n)
+        g_bb = _debye_discrete(n_b, x_b/n)/(n*n)
+        g_ab = np.exp(-k2*bond_length_ab/6.0/n)*_end_discrete(n_a, x_a/n)*_end_discrete(n_b, x_b/n)/(n*n)
+    elif chain_model.lower() == "continuous":
+        g_aa = _debye_continuous(f, x_a)
+        g_bb = _debye_continuous(1.0-f, x_b)
+        g_ab = _end_continuous(f, x_a)*_end_continuous(1.0-f, x_b)
+    else:
+        raise ValueError("%s is an invalid chain model. This must be 'Continuous' or 'Discrete'" % (chain_model))
+    return g_aa, g_ab, g_bb
+
+def inverse_structure_function_athermal(k, f, epsilon=1.0, n_segment=None, chain_model="Continuous"):
+    # F(k) = N/S(k) + 2*chi_n
+    g_aa, g_ab, g_bb = debye_functions(k, f, epsilon, n_segment, chain_model)
+    return (g_aa + g_bb + 2.0*g_ab)/(g_aa*g_bb - g_ab*g_ab)
+
+def structure_function_rpa(k, f, chi_n, epsilon=1.0, n_segment=None, chain_model="Continuous"):
+    # S(k)/N of the disordered melt, negative (unphysical) beyond the spinodal
+    return 1.0/(inverse_structure_function_athermal(k, f, epsilon, n_segment, chain_model) - 2.0*np.asarray(chi_n))
+
+def spinodal(f, epsilon=1.0, n_segment=None, chain_model="Continuous",
+    k_min=0.1, k_max=100.0, n_k=128, n_refine=60):
+    # returns chi_n_s and k*, broadcast over the parameters
+    is_discrete = chain_model.lower() == "discrete"
+    if is_discrete and n_segment is None:
+        raise ValueError("n_segment is required for the discrete chain model")
+    f, epsilon, n = np.broadcast_arrays(np.asarray(f, dtype=np.float64),
+        np.asarray(epsilon, dtype=np.float64), np.asarray(n_segment if is_discrete else 1.0, dtype=np.float64))
+    shape = f.shape
+    # parameters in the rows, k in the columns
+    f, epsilon, n = [np.reshape(x, [-1,1]) for x in [f, epsilon, n]]
+    def func(k):
+        return inverse_structure_function_athermal(k, f, epsilon, n if is_discrete else None, chain_model)
+
+    # grid search
+    k_grid = np.geomspace(k_min, k_max, n_k)
+    i_min = np.argmin(func(k_grid[None,:]), axis=1)
+    a = k_grid[np.maximum(i_min-1, 0)][:,None]
+    b = k_grid[np.minimum(i_min+1, n_k-1)][:,None]
+
+    # golden-section search in [a, b]
+    ratio = (np.sqrt(5.0)-1.0)/2.0
+    c = b - ratio*(b-a)
+    d = a + ratio*(b-a)
+    f_c, f_d = func(c), func(d)
+    for _ in range(n_refine):
+        # the minimum is in [a, d] if f(c) < f(d), otherwise in [c, b]
+        left = f_c < f_d
+        b = np.where(left, d, b)
+        a = np.where(left, a, c)
+        k_new = np.where(left, b - ratio*(b-a), a + ratio*(b-a))
+        f_new = func(k_new)
+        c, d, f_c, f_d = np.where(left, k_new, d), np.where(left, c, k_new), \
+            np.where(left, f_new, f_d), np.where(left, f_c, f_new)
+    k_star = 0.5*(a+b)
+    chi_n_s = 0.5*func(k_star)
+    return np.reshape(chi_n_s, shape), np.reshape(k_star, shape)
+
+def estimate_phase(f, chi_n, epsilon=1.0, n_segment=None, chain_model="Continuous"):
+    # array of "Disordered", "BCC", "Cylinder", "Gyroid" or "Lamella"; the minority
+    # block is A if f < 0.5, otherwise B (the fields of initial_fields.py are inverted)
+    chi_n_s, _ = spinodal(f, epsilon, n_segment, chain_model)
+    f_minor = np.minimum(f, 1.0-np.asarray(f))
+    f_minor, chi_n_s, chi_n = np.broadcast_arrays(f_minor, chi_n_s, np.asarray(chi_n, dtype=np.float64))
+    phase = np.full(f_minor.shape, "Disordered", dtype=object)
+    ordered = chi_n >= chi_n_s
+    lower = 0.0
+    for boundary, label in PHASE_BOUNDARIES:
+        phase[ordered & (f_minor >= lower) & (f_minor < boundary)] = label
+        lower = boundary
+    phase[ordered & (f_minor >= lower)] = PHASE_BOUNDARIES[-1][1]
+    return phase
+
+def unit_cell_size(phase, k_star):
+    # lattice constant (or period of Lamella) whose first Bragg peak is at k*;
+    # the rectangular cell of Cylinder in initial_fields.py is [sqrt(3), 1] times this
+    return 2.0*np.pi*_FIRST_PEAK[phase]/np.asarray(k_star)
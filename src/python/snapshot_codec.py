@@ -0,0 +1,126 @@
+import zlib
+import lzma
+import struct
+import numpy as np
+
+# Error-bounded lossy codec for field snapshots.
+# A field is quantized on the absolute grid q = round(x/(2*error_bound)), so
+# that |x - 2*error_bound*q| <= error_bound. The integers of a frame are stored
+# with an offset in 8 or 16 bits (bits), either as they are (key frame) or as
+# the differences from the previous frame (delta=True). Since the differences
+# are taken between the quantized integers, the error does not accumulate over
+# the frames. If the integers of a frame do not fit in the given bits, the
+# frame is stored in 16 or 32 bits. A key frame is stored every keyframe_interval
+# frames, and also when the differences do not fit in the given bits and
+# their range is larger than that of the frame itself.
+# The bytes of the integers are split into planes (the high bytes of the
+# smooth fields are mostly the same) and compressed by an entropy coder,
+# "zlib" (DEFLATE), "lzma", or None.
+# Decoding is one decompression and a few vectorized numpy operations.
+
+# frame header: key frame or not, bytes per integer, entropy coder, error bound, offset, size
+_HEADER = struct.Struct("<BBBxdqq")
+_ENTROPY_CODERS = {None:0, "zlib":1, "lzma":2}
+_UINT_TYPES = {1:np.uint8, 2:np.uint16, 4:np.uint32}
+
+def _compress(buffer, entropy_coder, level):
+    if entropy_coder == "zlib":
+        return zlib.compress(buffer, level)
+    elif entropy_coder == "lzma":
+        return lzma.compress(buffer, preset=level)
+    return buffer
+
+def _decompress(buffer, coder_id):
+    if coder_id == 1:
+        return zlib.decompress(buffer)
+    elif coder_id == 2:
+        return lzma.decompress(buffer)
+    return buffer
+
+class SnapshotEncoder:
+    def __init__(self, error_bound, bits=16, delta=False, keyframe_interval=100, entropy_coder="zlib", level=6):
+        if error_bound <= 0.0:
+            raise ValueError("error_bound (%g) must be positive" % (error_bound))
+        if bits not in [8, 16]:
+            raise ValueError("bits (%d) must be 8 or 16" % (bits))
+        if entropy_coder not in _ENTROPY_CODERS:
+            raise ValueError("Unknown entropy coder: '%s'" % (entropy_coder))
+        self.error_bound = error_bound
+        self.bits = bits
+        self.delta = delta
+        self.keyframe_interval = keyframe_interval
+        self.entropy_coder = entropy_coder
+        self.level = level
+        self.reset()
+
+    def reset(self):
+        # the next frame is a key frame
+        self.q_prev = None
+        self.n_frames = 0
+        self.n_wide_frames = 0   # number of frames stored in wider integers
+
+    def encode(self, field):
+        x = np.ravel(np.asarray(field, dtype=np.float64))
+        q = np.rint(x*(0.5/self.error_bound)).astype(np.int64)
+        max_value = 2**self.bits-1
+
+        # key frame or differences from the previous frame
+        values = q
+        is_key = True
+        if self.delta and self.q_prev is not None and self.q_prev.size == q.size \
+            and self.n_frames % self.keyframe_interval != 0:
+            dq = q - self.q_prev
+            if np.ptp(dq) <= max_value or np.ptp(dq) < np.ptp(q):
+                values = dq
+                is_key = False
+        offset = int(np.min(values))
+        values = values - offset
+        width = self.bits//8
+        while int(np.max(values)) > 2**(8*width)-1:
+            if width == 4:
+                raise ValueError("The range of the field is too large for error_bound (%g)" % (self.error_bound))
+            width *= 2
+        if width > self.bits//8:
+            self.n_wide_frames += 1
+
+        # byte planes, the lowest bytes first
+        planes = values.astype(_UINT_TYPES[width]).view(np.uint8).reshape(-1, width).T
+        payload = _compress(np.ascontiguousarray(planes).tobytes(), self.entropy_coder, self.level)
+
+        self.q_prev = q
+        self.n_frames += 1
+        return _HEADER.pack(is_key, width, _ENTROPY_CODERS[self.entropy_coder],
+            self.error_bound, offset, q.size) + payload
+
+class SnapshotDecoder:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.q_prev = None
+
+    def decode(self, buffer):
+        # returns the field as a 1D float64 array
+        is_key, width, coder_id, error_bound, offset, size = _HEADER.unpack_from(buffer)
+        planes = np.frombuffer(_decompress(buffer[_HEADER.size:], coder_id), dtype=np.uint8)
+        values = planes.reshape(width, size).T.copy().view(_UINT_TYPES[width]).ravel()
+        q = values.astype(np.int64) + offset
+        if not is_key:
+            if self.q_prev is None:
+                raise ValueError("A delta frame is given without the previous frame")
+            q += self.q_prev
+        self.q_prev = q
+        return q*(2.0*error_bound)
+
+def encode_snapshots(frames, error_bound, **kwargs):
+    # list of encoded frames, see SnapshotEncoder for the keyword arguments
+    encoder = SnapshotEncoder(error_bound, **kwargs)
+    return [encoder.encode(frame) for frame in frames]
+
+def decode_snapshots(buffers, shape=None):
+    # array [n_frames, *shape]
+    decoder = SnapshotDecoder()
+    frames = np.array([decoder.decode(buffer) for buffer in buffers])
+    if shape is not None:
+        frames = frames.reshape((len(buffers),) + tuple(shape))
+    return frames
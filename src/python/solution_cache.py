@@ -0,0 +1,140 @@
+import os
+import json
+import hashlib
+import numpy as np
+from field_io import save_fields, load_fields
+from checkpoint import _to_json
+from resampling import resample_fields
+
+# Persistent cache of converged SCFT solutions for warm starts.
+# An entry consists of the fields w = [w_a, w_b], lx, the free energy and the
+# number of iterations, and it is indexed by the phase label (e.g., "Gyroid")
+# and the parameters, e.g., {"f":0.36, "chi_n":20, "n_segment":100,
+# "epsilon":1.0, "chain_model":"Continuous"}. The fields of each entry are
+# stored in "<key>.lfts" (field_io.py) and the table of the entries in
+# "index.json" of the cache directory.
+# lookup() returns the nearest entry of the same phase, whose non-numeric
+# parameters (chain_model) are the same, with w resampled to the requested grid
+# (resampling.py). The distance is
+#   sqrt(sum(((p - p_entry)/scales[p])**2)) over the numeric parameters,
+# and an entry on the requested grid is preferred among those at the same distance.
+# The least recently used entries are removed if there are more than max_entries.
+# The index is read before and written after every change, so a directory can be
+# shared by successive runs (but not written by concurrent runs).
+
+DEFAULT_SCALES = {"f":0.05, "chi_n":1.0, "n_segment":10.0, "epsilon":0.1}
+
+class SolutionCache:
+    def __init__(self, directory, max_entries=100, scales=None):
+        # scales : {parameter: scale} of the distance, DEFAULT_SCALES by default,
+        #          the scale of the other numeric parameters is 1
+        if max_entries < 1:
+            raise ValueError("max_entries (%d) must be positive" % (max_entries))
+        self.directory = directory
+        self.max_entries = max_entries
+        self.scales = dict(DEFAULT_SCALES)
+        if scales is not None:
+            self.scales.update(scales)
+        os.makedirs(directory, exist_ok=True)
+
+    #-------------- index ------------
+    def _index_name(self):
+        return os.path.join(self.directory, "index.json")
+
+    def _read_index(self):
+        if not os.path.exists(self._index_name()):
+            return {"clock":0, "entries":{}}
+        with open(self._index_name()) as f:
+            return json.load(f)
+
+    def _write_index(self, index):
+        tmp_name = self._index_name() + ".tmp"
+        with open(tmp_name, "w") as f:
+            json.dump(index, f, default=_to_json, indent=1)
+        os.replace(tmp_name, self._index_name())
+
+    def _touch(self, index, key):
+        # the clock counts the accesses, so the order does not depend on the time resolution
+        index["clock"] += 1
+        index["entries"][key]["last_access"] = index["clock"]
+
+    #-------------- store and lookup ------------
+    def get_entries(self):
+        # list of the entries (without the fields), the most recently used first
+        entries = list(self._read_index()["entries"].values())
+        return sorted(entries, key=lambda entry: -entry["last_access"])
+
+    def __len__(self):
+        return len(self._read_index()["entries"])
+
+    def store(self, phase, params, nx, lx, w, energy, n_iter=None):
+        # w : array [2, prod(nx)], replaces the entry of the same phase, parameters and grid
+        nx = [int(n) for n in nx]
+        w = np.array(w, dtype=np.float64)
+        if w.ndim != 2 or w.shape[1] != np.prod(nx):
+            raise ValueError("Shape of w %s and [n_comp, prod(nx)] [n_comp, %d] must match" % (list(w.shape), np.prod(nx)))
+        params = json.loads(json.dumps(params, default=_to_json))
+        key = hashlib.sha1(json.dumps([phase, params, nx], sort_keys=True).encode()).hexdigest()[:16]
+
+        save_fields(os.path.join(self.directory, key + ".lfts"), {"w":w})
+        index = self._read_index()
+        index["entries"][key] = {"key":key, "phase":phase, "params":params, "nx":nx,
+            "lx":[float(x) for x in lx], "energy":float(energy),
+            "n_iter":None if n_iter is None else int(n_iter)}
+        self._touch(index, key)
+
+        # remove the least recently used entries
+        entries = sorted(index["entries"].values(), key=lambda entry: entry["last_access"])
+        for entry in entries[:max(len(entries)-self.max_entries, 0)]:
+            del index["entries"][entry["key"]]
+            file_name = os.path.join(self.directory, entry["key"] + ".lfts")
+            if os.path.exists(file_name):
+                os.remove(file_name)
+        self._write_index(index)
+        return key
+
+    def distance(self, params, entry_params):
+        # None if the non-numeric parameters differ or a parameter is missing
+        if set(params) != set(entry_params):
+            return None
+        distance = 0.0
+        for name, value in params.items():
+            if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+                distance += ((value - entry_params[name])/self.scales.get(name, 1.0))**2
+            elif value != entry_params[name]:
+                return None
+        return np.sqrt(distance)
+
+    def lookup(self, phase, params, nx, max_distance=np.inf):
+        # returns the nearest entry within max_distance as a dictionary of
+        # "w" (resampled to nx), "lx", "energy", "n_iter", "params", "nx", "distance", or None
+        nx = [int(n) for n in nx]
+        index = self._read_index()
+        best = None
+        for entry in index["entries"].values():
+            if entry["phase"] != phase or len(entry["nx"]) != len(nx):
+                continue
+            distance = self.distance(params, entry["params"])
+            if distance is None or distance > max_distance:
+                continue
+            rank = (distance, entry["nx"] != nx, -entry["last_access"])
+            if best is None or rank < best[0]:
+                best = (rank, entry)
+        if best is None:
+            return None
+        entry = best[1]
+
+        w = np.array(load_fields(os.path.join(self.directory, entry["key"] + ".lfts"), mmap_mode=None)["w"])
+        if entry["nx"] != nx:
+            w = resample_fields(w, entry["nx"], nx)
+        self._touch(index, entry["key"])
+        self._write_index(index)
+        return {"w":w, "lx":entry["lx"], "energy":entry["energy"], "n_iter":entry["n_iter"],
+            "params":entry["params"], "nx":entry["nx"], "distance":best[0][0]}
+
+    def clear(self):
+        for key in self._read_index()["entries"]:
+            file_name = os.path.join(self.directory, key + ".lfts")
+            if os.path.exists(file_name):
+                os.remove(file_name)
+        self._write_index({"clock":0, "entries":{}})
@@ -0,0 +1,111 @@
+import numpy as np
+from fractions import Fraction
+
+# Space group symmetry of periodic fields on a grid.
+# A symmetry operation maps a fractional coordinate x to R*x + t. The grid
+# points are partitioned into orbits under the operations, and a symmetric
+# field has a single value for each orbit (asymmetric unit). The reduced
+# basis is scaled by sqrt(orbit size), so that the plain dot product used by
+# Anderson mixing is equal to the dot product of the full fields.
+
+# generators in the standard setting of International Tables
+SPACE_GROUP_GENERATORS = {
+    "P4_2/mnm" : ["-x,-y,z", "-y+1/2,x+1/2,z+1/2", "-x+1/2,y+1/2,-z+1/2", "-x,-y,-z"],   # 136, Sigma
+    "Pm-3n"    : ["-x,-y,z", "-x,y,-z", "z,x,y", "y+1/2,x+1/2,-z+1/2", "-x,-y,-z"],      # 223, A15
+    "Im-3m"    : ["x+1/2,y+1/2,z+1/2", "-x,-y,z", "-x,y,-z", "z,x,y", "y,x,-z", "-x,-y,-z"], # 229, BCC
+    "Ia-3d"    : ["x+1/2,y+1/2,z+1/2", "-x+1/2,-y,z+1/2", "-x,y+1/2,-z+1/2",
+                  "z,x,y", "y+3/4,x+1/4,-z+1/4", "-x,-y,-z"],                             # 230, Gyroid
+}
+
+def parse_symmetry_operation(op, dim):
+    # op : string such as "-y+1/2,x+1/2,z+1/2", returns (R, t)
+    var_names = ["x","y","z"][:dim]
+    terms = op.replace(" ","").split(",")
+    if len(terms) != dim:
+        raise ValueError("Symmetry operation '%s' must have %d components" % (op, dim))
+    R = np.zeros([dim, dim], dtype=np.int64)
+    t = [Fraction(0)]*dim
+    for i, term in enumerate(terms):
+        # split into signed tokens
+        tokens = term.replace("-","+-").split("+")
+        for token in filter(None, tokens):
+            sign = -1 if token[0] == "-" else 1
+            token = token.lstrip("-")
+            if token in var_names:
+                R[i, var_names.index(token)] += sign
+            else:
+                try:
+                    t[i] += sign*Fraction(token)
+                except ValueError:
+                    raise ValueError("Invalid term '%s' in symmetry operation '%s'" % (token, op))
+    return R, tuple(x % 1 for x in t)
+
+def generate_group(generators, dim):
+    # closure of the generators, translations modulo 1
+    ops = [parse_symmetry_operation(g, dim) for g in generators]
+    identity = (np.identity(dim, dtype=np.int64), tuple([Fraction(0)]*dim))
+    group = {(identity[0].tobytes(), identity[1]): identity}
+    queue = [identity]
+    while queue:
+        R1, t1 = queue.pop()
+        for R2, t2 in ops:
+            # (R2,t2)*(R1,t1) : x -> R2*(R1*x + t1) + t2
+            R = R2 @ R1
+            t = tuple((sum(R2[i,j]*t1[j] for j in range(dim)) + t2[i]) % 1 for i in range(dim))
+            key = (R.tobytes(), t)
+            if key not in group:
+                group[key] = (R, t)
+                queue.append((R, t))
+    return list(group.values())
+
+class SpaceGroup:
+    def __init__(self, nx, name=None, operations=None):
+        # nx : grid numbers, name : a key of SPACE_GROUP_GENERATORS,
+        # operations : list of symmetry operation strings (generators)
+        self.nx = list(nx)
+        dim = len(self.nx)
+        if operations is None:
+            if name not in SPACE_GROUP_GENERATORS:
+                raise ValueError("Unknown space group '%s', choose among %s or give 'operations'" %
+                    (str(name), str(list(SPACE_GROUP_GENERATORS.keys()))))
+            if dim != 3:
+                raise ValueError("Space group '%s' requires a 3D grid" % (name))
+            operations = SPACE_GROUP_GENERATORS[name]
+        self.name = name
+        self.group = generate_group(operations, dim)
+
+        # images of the grid points for each operation
+        n_grid = np.prod(self.nx)
+        idx = np.array(np.unravel_index(np.arange(n_grid), self.nx))
+        orbit_min = np.arange(n_grid)
+        for R, t in self.group:
+            new_idx = np.zeros_like(idx)
+            for i in range(dim):
+                for j in range(dim):
+                    if R[i,j] != 0 and self.nx[i] != self.nx[j]:
+                        raise ValueError("Grid numbers %s are not compatible with the symmetry operations" % (str(self.nx)))
+                shift = t[i]*self.nx[i]
+                if shift.denominator != 1:
+                    raise ValueError("Grid number %d is not compatible with the translation %s" % (self.nx[i], str(t[i])))
+                new_idx[i] = (R[i] @ idx + int(shift)) % self.nx[i]
+            orbit_min = np.minimum(orbit_min, np.ravel_multi_index(new_idx, self.nx))
+
+        # grid points in the same orbit have the same minimum image
+        _, self.orbit_index, self.orbit_size = np.unique(orbit_min,
+            return_inverse=True, return_counts=True)
+        self.sqrt_size = np.sqrt(self.orbit_size)
+
+    def get_n_operations(self):
+        return len(self.group)
+    def get_n_reduced_basis(self):
+        return len(self.orbit_size)
+
+    def symmetrize(self, field):
+        # average over each orbit
+        mean = np.bincount(self.orbit_index, weights=np.reshape(field, -1))/self.orbit_size
+        return mean[self.orbit_index]
+    def to_reduced_basis(self, field):
+        mean = np.bincount(self.orbit_index, weights=np.reshape(field, -1))/self.orbit_size
+        return mean*self.sqrt_size
+    def from_reduced_basis(self, reduced):
+        return (reduced/self.sqrt_size)[self.orbit_index]
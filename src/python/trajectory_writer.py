@@ -0,0 +1,270 @@
+import os
+import json
+import zlib
+import queue
+import threading
+import numpy as np
+from snapshot_codec import *
+from checkpoint import _to_json
+
+# Asynchronous writer of field trajectories.
+# write() copies the fields into a bounded queue and returns immediately, and a
+# background thread appends them to the file, so the Langevin loop does not wait
+# for the disk unless the queue is full (max_queue_size frames are pending).
+# Every field is stored with the frames along the first axis, [n_frames, *shape],
+# together with the step number of each frame ("step").
+#   file_format="hdf5"   : one HDF5 file, one chunked and resizable dataset per
+#                          field (h5py is required). compression is "gzip" or "lzf".
+#   file_format="binary" : a directory with a raw binary file per field,
+#                          "<name>.bin", "header.json" with the fixed metadata,
+#                          and "index.bin", to which a record of the step and
+#                          the (offset, size) of the block of every field is
+#                          appended for each frame after its data are written.
+#                          compression is "zlib" (one compressed block per chunk),
+#                          "lossy" (one block per frame, encoded by SnapshotEncoder
+#                          of snapshot_codec.py with codec_options, e.g.
+#                          {"error_bound":1e-4, "bits":16, "delta":True}),
+#                          or None, in which case the files can be memory-mapped.
+# The frames are written in chunks of chunk_frames frames, and the last
+# incomplete chunk is written by flush() or close().
+# An exception raised in the background thread is raised again by every later
+# write(), flush() and close(), so that no frames are written after a gap.
+
+# markers in the queue
+_FLUSH = object()
+_CLOSE = object()
+
+class TrajectoryWriter:
+    def __init__(self, file_name, fields, file_format=None, dtype=np.float64,
+        compression=None, compression_level=4, chunk_frames=1, max_queue_size=4, attributes=None,
+        codec_options=None):
+        # fields : {name: shape of a frame}
+        # attributes : {name: value}, parameters of the simulation stored with the trajectory
+        if file_format is None:
+            file_format = "hdf5" if os.path.splitext(file_name)[1] in [".h5", ".hdf5"] else "binary"
+        if file_format not in ["hdf5", "binary"]:
+            raise ValueError("Unknown file format: '%s'" % (file_format))
+        if file_format == "binary" and compression not in [None, "zlib", "lossy"]:
+            raise ValueError("Unknown compression for binary format: '%s'" % (compression))
+        if file_format == "hdf5" and compression == "lossy":
+            raise ValueError("Lossy compression is available only for binary format")
+        if chunk_frames < 1:
+            raise ValueError("chunk_frames (%d) must be positive" % (chunk_frames))
+
+        self.file_name = file_name
+        self.file_format = file_format
+        self.dtype = np.dtype(dtype)
+        self.shapes = {name: tuple(np.atleast_1d(shape).tolist()) for name, shape in fields.items()}
+        self.compression = compression
+        self.compression_level = compression_level
+        self.chunk_frames = chunk_frames
+        self.attributes = {} if attributes is None else dict(attributes)
+        self.codec_options = {} if codec_options is None else dict(codec_options)
+        self.n_frames = 0   # number of frames written to the file
+
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.error = None
+        self.closed = False
+        if file_format == "hdf5":
+            self._open_hdf5()
+        else:
+            self._open_binary()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, step, **fields):
+        # copy the fields, and wait only if the queue is full
+        self._check_error()
+        if self.closed:
+            raise RuntimeError("The writer is closed")
+        if set(fields) != set(self.shapes):
+            raise ValueError("The fields %s must be given, but %s are given" % (sorted(self.shapes), sorted(fields)))
+        frame = {}
+        for name, value in fields.items():
+            value = np.asarray(value)
+            if value.size != np.prod(self.shapes[name]):
+                raise ValueError("Size of '%s' (%d) and its shape %s must match" % (name, value.size, self.shapes[name]))
+            frame[name] = np.array(value, dtype=self.dtype).reshape(self.shapes[name])
+        self.queue.put((step, frame))
+
+    def flush(self):
+        # wait until all pending frames are written
+        self._check_error()
+        if self.closed:
+            raise RuntimeError("The writer is closed")
+        self.queue.put((_FLUSH, None))
+        self.queue.join()
+        self._check_error()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.queue.put((_CLOSE, None))
+            self.thread.join()
+        self._check_error()
+
+    def _check_error(self):
+        if self.error is not None:
+            raise RuntimeError("Writing '%s' failed" % (self.file_name)) from self.error
+
+    #-------------- background thread ------------
+    def _run(self):
+        chunk = []
+        while True:
+            step, frame = self.queue.get()
+            try:
+                if step is _CLOSE or step is _FLUSH:
+                    if chunk and self.error is None:
+                        self._write_chunk(chunk)
+                    chunk = []
+                    if step is _CLOSE:
+                        if self.file_format == "hdf5":
+                            self.file.close()
+                        return
+                elif self.error is None:
+                    chunk.append((step, frame))
+                    if len(chunk) == self.chunk_frames:
+                        self._write_chunk(chunk)
+                        chunk = []
+            except Exception as exc:
+                # keep consuming the queue, so that write() does not wait forever
+                self.error = exc
+                chunk = []
+            finally:
+                self.queue.task_done()
+
+    def _write_chunk(self, chunk):
+        steps = np.array([step for step, _ in chunk], dtype=np.int64)
+        data = {name: np.stack([frame[name] for _, frame in chunk]) for name in self.shapes}
+        if self.file_format == "hdf5":
+            self._write_chunk_hdf5(steps, data)
+        else:
+            self._write_chunk_binary(steps, data)
+        self.n_frames += len(chunk)
+
+    #-------------- HDF5 ------------
+    def _open_hdf5(self):
+        import h5py
+        self.file = h5py.File(self.file_name, "w")
+        for key, value in self.attributes.items():
+            self.file.attrs[key] = value
+        options = {}
+        if self.compression is not None:
+            options["compression"] = self.compression
+            if self.compression == "gzip":
+                options["compression_opts"] = self.compression_level
+        for name, shape in self.shapes.items():
+            self.file.create_dataset(name, shape=(0,)+shape, maxshape=(None,)+shape,
+                chunks=(self.chunk_frames,)+shape, dtype=self.dtype, **options)
+        self.file.create_dataset("step", shape=(0,), maxshape=(None,), chunks=(max(self.chunk_frames, 64),), dtype=np.int64)
+
+    def _write_chunk_hdf5(self, steps, data):
+        n = self.n_frames + len(steps)
+        for name, value in list(data.items()) + [("step", steps)]:
+            self.file[name].resize(n, axis=0)
+            self.file[name][self.n_frames:n] = value
+        self.file.flush()
+
+    #-------------- raw binary ------------
+    def _open_binary(self):
+        os.makedirs(self.file_name, exist_ok=True)
+        self.index_dtype = _index_dtype(self.shapes)
+        if self.compression == "lossy":
+            self.encoders = {name: SnapshotEncoder(**self.codec_options) for name in self.shapes}
+        for name in self.shapes:
+            open(os.path.join(self.file_name, name + ".bin"), "wb").close()
+        open(os.path.join(self.file_name, "index.bin"), "wb").close()
+        self._write_header()
+
+    def _write_chunk_binary(self, steps, data):
+        index = np.zeros(len(steps), dtype=self.index_dtype)
+        index["step"] = steps
+        for name, value in data.items():
+            with open(os.path.join(self.file_name, name + ".bin"), "ab") as f:
+                offset = f.tell()
+                if self.compression == "lossy":
+                    # a block per frame
+                    for i, frame in enumerate(value):
+                        buffer = self.encoders[name].encode(frame)
+                        index[name][i] = [offset, len(buffer)]
+                        f.write(buffer)
+                        offset += len(buffer)
+                elif self.compression == "zlib":
+                    # a block per chunk
+                    buffer = zlib.compress(np.ascontiguousarray(value).tobytes(), self.compression_level)
+                    index[name] = [offset, len(buffer)]
+                    f.write(buffer)
+                else:
+                    buffer = np.ascontiguousarray(value).tobytes()
+                    size = len(buffer)//len(steps)
+                    index[name][:,0] = offset + size*np.arange(len(steps))
+                    index[name][:,1] = size
+                    f.write(buffer)
+        # the frames are counted only after their data are written
+        with open(os.path.join(self.file_name, "index.bin"), "ab") as f:
+            f.write(index.tobytes())
+
+    def _write_header(self):
+        header = {"dtype":self.dtype.str, "compression":self.compression,
+            "codec_options":self.codec_options,
+            "fields":{name: list(shape) for name, shape in self.shapes.items()},
+            "attributes":self.attributes}
+        tmp_name = os.path.join(self.file_name, "header.json.tmp")
+        with open(tmp_name, "w") as f:
+            json.dump(header, f, default=_to_json)
+        os.replace(tmp_name, os.path.join(self.file_name, "header.json"))
+
+def _index_dtype(names):
+    # a record of index.bin, the step and [offset, size] of the block of each field
+    return np.dtype([("step", "<i8")] + [(name, "<i8", (2,)) for name in names])
+
+def read_trajectory(file_name, names=None):
+    # returns {name: array [n_frames, *shape]}, "step" and the attributes in "attributes".
+    # the uncompressed fields of the binary format are memory-mapped.
+    if os.path.isdir(file_name):
+        with open(os.path.join(file_name, "header.json")) as f:
+            header = json.load(f)
+        # only the complete records, a record may be being appended
+        index_dtype = _index_dtype(header["fields"])
+        with open(os.path.join(file_name, "index.bin"), "rb") as f:
+            buffer = f.read()
+        n_frames = len(buffer)//index_dtype.itemsize
+        index = np.frombuffer(buffer[:n_frames*index_dtype.itemsize], dtype=index_dtype)
+        dtype = np.dtype(header["dtype"])
+        if names is None:
+            names = list(header["fields"])
+        data = {"step":index["step"].copy(), "attributes":header["attributes"]}
+        for name in names:
+            shape = (n_frames,) + tuple(header["fields"][name])
+            path = os.path.join(file_name, name + ".bin")
+            if header["compression"] is None:
+                data[name] = np.memmap(path, dtype=dtype, mode="r", shape=shape) if n_frames > 0 else np.zeros(shape, dtype)
+            else:
+                frames = []
+                decoder = SnapshotDecoder()
+                with open(path, "rb") as f:
+                    # the frames of a chunk share a zlib block
+                    blocks = index[name].tolist()
+                    blocks = [block for i, block in enumerate(blocks) if i == 0 or block != blocks[i-1]]
+                    for offset, size in blocks:
+                        f.seek(offset)
+                        if header["compression"] == "lossy":
+                            frames.append(decoder.decode(f.read(size)).astype(dtype))
+                        else:
+                            frames.append(np.frombuffer(zlib.decompress(f.read(size)), dtype=dtype))
+                data[name] = np.concatenate(frames).reshape(shape) if frames else np.zeros(shape, dtype)
+        return data
+    else:
+        import h5py
+        with h5py.File(file_name, "r") as f:
+            if names is None:
+                names = [name for name in f.keys() if name != "step"]
+            data = {name: f[name][()] for name in names + ["step"]}
+            data["attributes"] = dict(f.attrs)
+        return data
@@ -0,0 +1,122 @@
+import numpy as np
+from langevinfts import *
+
+# Variable-cell SCFT.
+# The fields and the box size are updated in the same iteration. The fields
+# are updated by Anderson mixing, and the box size by a quasi-Newton (BFGS)
+# step on the free energy, whose gradient with respect to the box size is
+#   dF/dL = -d ln(Q/V)/dL = -pseudo.dq_dl()/Q.
+# The inverse Hessian of the cell starts from a scaled identity, and is
+# updated with the secant pairs of the box moves. The fields and the stress
+# have their own convergence criteria.
+
+def update_inverse_hessian(h_inv, s, y):
+    # BFGS update, skipped if the curvature condition is not satisfied
+    sy = np.dot(s, y)
+    if sy <= 1e-12*np.linalg.norm(s)*np.linalg.norm(y):
+        return h_inv, False
+    rho = 1.0/sy
+    v = np.identity(len(s)) - rho*np.outer(s, y)
+    return v @ h_inv @ v.T + rho*np.outer(s, s), True
+
+def find_saddle_point_variable_cell(pc, sb, pseudo, am, lx,
+    q1_init, q2_init, w, max_iter, field_tolerance, stress_tolerance,
+    cell_error_ratio=1.0, max_cell_step=0.05, initial_hessian=1.0, reset_am=False,
+    verbose_level=1):
+
+    # am is an Anderson mixing instance for the fields only (2*n_grid).
+    # The box is moved while the field error is below cell_error_ratio times
+    # the stress error (and the stress is not converged), and a cell step is limited to max_cell_step*lx in each direction.
+    # initial_hessian : inverse Hessian of the free energy with respect to lx
+    # at the start, which is equivalent to 'lx += stress' of the mixing.
+    dim = sb.get_dim()
+    n_grid = sb.get_n_grid()
+    lx = np.array(lx, dtype=np.float64)[-dim:]
+
+    error_level = 1.0e20
+    energy_total = 1.0e20
+
+    # reset Anderson mixing module
+    am.reset_count()
+
+    # array for output fields
+    w_out = np.zeros([2, n_grid], dtype=np.float64)
+
+    # quasi-Newton state of the cell
+    h_inv = initial_hessian*np.identity(dim)
+    old_lx = None
+    old_gradient = None
+
+    for scft_iter in range(1,max_iter+1):
+        # for the given fields find the polymer statistics
+        phi_a, phi_b, Q = pseudo.find_phi(q1_init,q2_init,w[0],w[1])
+
+        # calculate output fields
+        xi = 0.5*(w[0]+w[1]-pc.get_chi_n())
+        w_out[0] = pc.get_chi_n()*phi_b + xi
+        w_out[1] = pc.get_chi_n()*phi_a + xi
+        sb.zero_mean(w_out[0])
+        sb.zero_mean(w_out[1])
+
+        # error_level measures the "relative distance" between the input and output fields
+        old_error_level = error_level
+        w_diff = w_out - w
+
+        # integrals for the energy, error level and mass error in one pass over the fields
+        ww_aa, ww_bb, ww_ab, int_w_a, int_w_b, diff_aa, diff_bb, int_phi_a, int_phi_b = sb.reduce_many(
+            [w[0], w[1], w_diff[0], w_diff[1], phi_a, phi_b],
+            [(0,0), (1,1), (0,1), (0,), (1,), (2,2), (3,3), (4,), (5,)])
+
+        # calculate the total energy, w_minus = (w_a-w_b)/2 and w_plus = (w_a+w_b)/2
+        energy_total  = -np.log(Q/sb.get_volume())
+        energy_total += (ww_aa - 2*ww_ab + ww_bb)/4/pc.get_chi_n()/sb.get_volume()
+        energy_total -= (int_w_a + int_w_b)/2/sb.get_volume()
+
+        error_level = np.sqrt((diff_aa + diff_bb)/(ww_aa + ww_bb + 1.0))
+
+        # gradient of the free energy with respect to the box size
+        stress_array = np.array(pseudo.dq_dl()[-dim:])/Q
+        gradient = -stress_array
+        stress_error = np.sqrt(np.sum(stress_array**2))
+
+        is_converged = error_level < field_tolerance and stress_error < stress_tolerance
+        if (verbose_level == 2 or
+            verbose_level == 1 and (is_converged or scft_iter == max_iter)):
+            mass_error = (int_phi_a + int_phi_b)/sb.get_volume() - 1.0
+            print("%8d %12.3E %15.7E %15.9f %15.7E %15.7E" %
+                (scft_iter, mass_error, Q, energy_total, error_level, stress_error), end=" ")
+            print("\t[", ",".join(["%10.7f" % (x) for x in lx]), "]")
+
+        # conditions to end the iteration
+        if is_converged:
+            break
+
+        # calculte new fields using simple and Anderson mixing
+        w_new = np.reshape(w, 2*n_grid)
+        am.caculate_new_fields(w_new,
+            np.reshape(w_out,  2*n_grid),
+            np.reshape(w_diff, 2*n_grid),
+            old_error_level, error_level)
+        w[:] = np.reshape(w_new, [2, n_grid])
+
+        # quasi-Newton step of the cell
+        if error_level < cell_error_ratio*stress_error and stress_error >= stress_tolerance:
+            if old_lx is not None:
+                h_inv, _ = update_inverse_hessian(h_inv, lx - old_lx, gradient - old_gradient)
+            step = -h_inv @ gradient
+            # the step is not a descent direction, restart from the identity
+            if np.dot(step, gradient) >= 0.0:
+                h_inv = initial_hessian*np.identity(dim)
+                step = -h_inv @ gradient
+            step /= max(1.0, np.max(np.absolute(step)/(max_cell_step*lx)))
+            old_lx = lx.copy()
+            old_gradient = gradient
+
+            # set box size and update bond parameters
+            lx = lx + step
+            sb.set_lx(list(lx))
+            pseudo.update()
+            if reset_am:
+                am.reset_count()
+
+    return phi_a, phi_b, Q, energy_total, lx, scft_iter
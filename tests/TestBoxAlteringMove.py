@@ -0,0 +1,95 @@
+import sys
+import numpy as np
+from langevinfts import *
+from renormalization import *
+from box_altering_move import *
+
+nx = [12,10,8]
+lx = [4.0,3.6,3.2]
+f = 0.4
+n_segment = 20
+chi_n = 15
+np.random.seed(5489)
+
+factory = PlatformSelector.create_factory(PlatformSelector.avail_platforms()[0])
+q1_init = np.ones(np.prod(nx), dtype=np.float64)
+q2_init = np.ones(np.prod(nx), dtype=np.float64)
+w_a = np.random.normal(0.0, 1.0, np.prod(nx))
+w_b = np.random.normal(0.0, 1.0, np.prod(nx))
+
+#-------------- Stress caching ------------
+print("Running stress caching")
+print("If error is less than 1.0e-10, it is ok!")
+pc = factory.create_polymer_chain(f, n_segment, chi_n, "Discrete", 1.3)
+sb = factory.create_simulation_box(nx, lx)
+pseudo = factory.create_pseudo(sb, pc)
+_, _, Q = pseudo.find_phi(q1_init, q2_init, w_a, w_b)
+dq_dl_answer = np.array(pseudo.dq_dl())
+pseudo.set_stress_caching(True)
+_, _, Q_cached = pseudo.find_phi(q1_init, q2_init, w_a, w_b)
+dq_dl = np.array(pseudo.dq_dl())
+error = max(np.max(np.absolute(dq_dl-dq_dl_answer)/np.absolute(dq_dl_answer)), abs(Q_cached-Q)/Q)
+print("dq_dl: ", dq_dl, dq_dl_answer)
+print("Stress Caching Error: ", error)
+if np.isnan(error) or error > 1e-10:
+    sys.exit(-1);
+
+#-------------- Incremental update of the Boltzmann factors ------------
+print("Running incremental update")
+print("If error is less than 1.0e-10, it is ok!")
+for chain_model in ["Discrete", "Continuous"]:
+    pc = factory.create_polymer_chain(f, n_segment, chi_n, chain_model, 1.3)
+    sb = factory.create_simulation_box(nx, lx)
+    pseudo = factory.create_pseudo(sb, pc)
+    new_lx = np.array(lx)
+    for i in range(20):
+        new_lx *= np.exp(np.random.uniform(-0.02, 0.02, 3))
+        sb.set_lx(list(new_lx))
+        pseudo.update()
+    _, _, Q = pseudo.find_phi(q1_init, q2_init, w_a, w_b)
+    dq_dl = np.array(pseudo.dq_dl())
+
+    sb_answer = factory.create_simulation_box(nx, list(new_lx))
+    pseudo_answer = factory.create_pseudo(sb_answer, pc)
+    _, _, Q_answer = pseudo_answer.find_phi(q1_init, q2_init, w_a, w_b)
+    dq_dl_answer = np.array(pseudo_answer.dq_dl())
+    error = max(np.max(np.absolute(dq_dl-dq_dl_answer)/np.absolute(dq_dl_answer)), abs(Q-Q_answer)/Q_answer)
+    print("%s chain, Incremental Update Error: " % (chain_model), error)
+    if np.isnan(error) or error > 1e-10:
+        sys.exit(-1);
+
+#-------------- Box-altering move ------------
+print("Running box-altering move")
+print("If error is less than 1.0e-10, it is ok!")
+effective_chi_n = 12.0
+nbar = 10000
+renormal = get_renormalization(nx, n_segment, nbar, "Discrete")
+z_inf, dz_inf_dl = renormal.get_z_inf(lx)
+pc = factory.create_polymer_chain(f, n_segment, effective_chi_n/z_inf, "Discrete", 1.0)
+sb = factory.create_simulation_box(nx, lx)
+pseudo = factory.create_pseudo(sb, pc)
+box_move = BoxAlteringMove(sb, pc, pseudo, renormal, effective_chi_n, mode="volume", step_size=0.01)
+
+w_minus = (w_a-w_b)/2
+volume = sb.get_volume()
+for i in range(5):
+    _, _, Q = pseudo.find_phi(q1_init, q2_init, w_a, w_b)
+    dh_dl = box_move.get_dh_dl(w_minus, Q)
+    old_lx = np.array(sb.get_lx())
+    new_lx = box_move.move(w_minus, Q)
+
+# volume is conserved and the box is moved against the projected gradient
+grad = dh_dl*old_lx
+grad -= np.mean(grad)
+expected_lx = old_lx*np.exp(-0.01*grad)
+error = max(abs(sb.get_volume()-volume)/volume, np.max(np.absolute(new_lx-expected_lx)))
+print("Lx: ", new_lx, "Volume: ", sb.get_volume(), volume)
+print("Box-Altering Move Error: ", error)
+if np.isnan(error) or error > 1e-10:
+    sys.exit(-1);
+
+# chi_n follows the box size
+error = abs(pc.get_chi_n() - effective_chi_n/z_inf_discrete(sb.get_lx(), nx, n_segment, nbar)[0])
+print("chi_n Error: ", error)
+if np.isnan(error) or error > 1e-6:
+    sys.exit(-1);
@@ -0,0 +1,76 @@
+import os
+import sys
+import tempfile
+import numpy as np
+from langevinfts import *
+from langevin_replica import *
+from checkpoint import *
+
+with tempfile.TemporaryDirectory() as tmp_dir:
+    file_name = os.path.join(tmp_dir, "checkpoint.lfts")
+
+    #-------------- Checkpoint file ------------
+    print("Running checkpoint file")
+    arrays = {"a":np.random.normal(0.0, 1.0, (5,7)), "b":np.arange(3, dtype=np.int32), "c":np.zeros((0,4))}
+    save_checkpoint(file_name, arrays, {"step":12, "name":"test"})
+    arrays_load, attributes = load_checkpoint(file_name)
+    print(attributes)
+    for name in arrays:
+        if arrays[name].dtype != arrays_load[name].dtype or not np.array_equal(arrays[name], arrays_load[name]):
+            sys.exit(-1);
+    if attributes != {"step":12, "name":"test"} or os.path.exists(file_name + ".tmp"):
+        sys.exit(-1);
+
+    #-------------- Anderson mixing ------------
+    print("Running Anderson mixing history")
+    factory = PlatformSelector.create_factory(PlatformSelector.avail_platforms()[0])
+    n_var = 50
+    def anderson_iteration(am, w, n_iter):
+        # w = cos(w) by the mixing
+        error_level = 1e20
+        for i in range(n_iter):
+            w_out = np.cos(w)
+            old_error_level, error_level = error_level, np.sqrt(np.mean((w_out-w)**2))
+            am.caculate_new_fields(w, w_out, w_out-w, old_error_level, error_level)
+    w1 = np.linspace(0.0, 1.0, n_var)
+    am1 = factory.create_anderson_mixing(n_var, 3, 1.0, 0.1, 0.1)
+    anderson_iteration(am1, w1, 6)
+    state = am1.get_state()
+    print("Number of histories: ", state["w_out_hist"].shape[0])
+    if state["w_out_hist"].shape != (4, n_var) or state["w_deriv_dots_hist"].shape != (4, 4):
+        sys.exit(-1);
+    w2 = w1.copy()
+    am2 = factory.create_anderson_mixing(n_var, 3, 1.0, 0.1, 0.1)
+    am2.set_state(state)
+    anderson_iteration(am1, w1, 3)
+    anderson_iteration(am2, w2, 3)
+    print("Anderson Mixing Error: ", np.max(np.absolute(w1-w2)))
+    if not np.array_equal(w1, w2):
+        sys.exit(-1);
+
+    #-------------- Restart of Langevin FTS ------------
+    print("Running restart of Langevin FTS")
+    params = {"nx":[16,16], "lx":[3.0,3.0], "f":0.5, "n_segment":16, "chi_n":12.0, "langevin_nbar":16}
+    replica = LangevinReplica(factory, seed=7, **params)
+    replica.run(3)
+    replica.save_checkpoint(file_name)
+    replica.run(3)
+
+    # restart without the initial saddle point iteration
+    replica_restart = LangevinReplica(factory, checkpoint=file_name, **params)
+    if replica_restart.langevin_step != 3:
+        sys.exit(-1);
+    replica_restart.run(3)
+    error = max(np.max(np.absolute(replica.w_minus-replica_restart.w_minus)),
+                np.max(np.absolute(replica.w_plus-replica_restart.w_plus)))
+    print("Restart Error: ", error)
+    if not (np.array_equal(replica.w_minus, replica_restart.w_minus) and np.array_equal(replica.w_plus, replica_restart.w_plus)):
+        sys.exit(-1);
+
+    # global random number generator of the examples
+    np.random.seed(3)
+    save_langevin_checkpoint(file_name, 0, replica.pc, replica.sb, replica.w_plus, replica.w_minus)
+    x = np.random.normal(0.0, 1.0, 5)
+    load_langevin_checkpoint(file_name, pc=replica.pc, sb=replica.sb)
+    if not np.array_equal(x, np.random.normal(0.0, 1.0, 5)):
+        sys.exit(-1);
@@ -0,0 +1,59 @@
+import sys
+import numpy as np
+from langevinfts import *
+from dimension_reduction import *
+
+#-------------- Uniform axes ------------
+print("Running dimensionality reduction")
+nx = [4,6,32]
+field = np.zeros(nx)
+for i in range(nx[2]):
+    field[:,:,i] = np.cos(2*np.pi*i/nx[2])
+field = np.reshape(field, [1, np.prod(nx)])
+axes = find_uniform_axes(field, nx)
+print("Uniform axes: ", axes)
+if axes != [0,1]:
+    sys.exit(-1);
+
+field_reduced = reduce_fields(field, nx, axes)
+error = np.max(np.absolute(broadcast_fields(field_reduced, nx, axes) - field))
+print("Broadcast Error: ", error)
+if(np.isnan(error) or error > 1e-10):
+    sys.exit(-1);
+
+#-------------- Lamella in a 3D box ------------
+max_scft_iter = 1000
+tolerance = 1e-8
+f = 0.4
+n_segment = 50
+chi_n = 20
+lx = [2.0,3.0,1.6]
+
+factory = PlatformSelector.create_factory(PlatformSelector.avail_platforms()[0])
+pc     = factory.create_polymer_chain(f, n_segment, chi_n, "Continuous", 1.0)
+sb     = factory.create_simulation_box(nx, lx)
+pseudo = factory.create_pseudo(sb, pc)
+am     = factory.create_anderson_mixing(2*np.prod(nx)+len(lx), 20, 1e-2, 0.1, 0.1)
+q1_init = np.ones(sb.get_n_grid(), dtype=np.float64)
+q2_init = np.ones(sb.get_n_grid(), dtype=np.float64)
+w = np.array([field[0], -field[0]])
+
+phi_a, phi_b, Q, energy_total, lx_out, n_iters = find_saddle_point_reduced_dimension(
+    factory, pc, sb, pseudo, am, lx, q1_init, q2_init, w,
+    max_scft_iter, tolerance, is_box_altering=True)
+print("Iterations: ", n_iters, "Box size: ", lx_out)
+if len(n_iters) != 2 or n_iters[1] > 5:
+    sys.exit(-1);
+
+# the same saddle point in a 1D box
+sb_1d     = factory.create_simulation_box([nx[2]], [lx[2]])
+pseudo_1d = factory.create_pseudo(sb_1d, pc)
+am_1d     = factory.create_anderson_mixing(2*nx[2]+1, 20, 1e-2, 0.1, 0.1)
+w_1d = np.array([field[0,0:nx[2]], -field[0,0:nx[2]]])
+_, _, _, energy_1d, lx_1d, _, _ = iterate_saddle_point(pc, sb_1d, pseudo_1d, am_1d, [lx[2]],
+    np.ones(nx[2]), np.ones(nx[2]), w_1d, max_scft_iter, tolerance, True)
+
+error = np.abs(energy_total-energy_1d)
+print("Energy Difference: ", error)
+if(np.isnan(error) or error > 1e-7):
+    sys.exit(-1);
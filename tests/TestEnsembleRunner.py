@@ -0,0 +1,40 @@
+import sys
+import numpy as np
+from langevinfts import *
+from langevin_replica import *
+from ensemble_runner import *
+
+# the worker processes import this file again
+if __name__ == "__main__":
+    #-------------- Core partition ------------
+    print("Running core partition")
+    groups = partition_cores(3, cores=range(8))
+    print("Groups: ", groups)
+    if groups != [[0,1,2],[3,4,5],[6,7]]:
+        sys.exit(-1);
+    if partition_cores(4, cores=[0,1]) != [[0],[1]]:
+        sys.exit(-1);
+
+    #-------------- Ensemble of trajectories ------------
+    print("Running ensemble of trajectories")
+    print("If error is less than 1.0e-10, it is ok!")
+    platform = PlatformSelector.avail_platforms()[0]
+    params = {"nx":[16,16], "lx":[3.0,3.0], "f":0.5, "n_segment":16, "chi_n":12.0, "langevin_nbar":16}
+    seeds = [11, 12, 13]
+    runner = EnsembleRunner(params, seeds, n_steps=6, sample_interval=2, platform=platform)
+    results = runner.run()
+    print("Hamiltonian: ", results["hamiltonian_mean"], "+-", results["hamiltonian_error"])
+    if results["hamiltonian"].shape != (3,3) or list(results["langevin_steps"]) != [2,4,6]:
+        sys.exit(-1);
+
+    # same as a trajectory in this process
+    factory = PlatformSelector.create_factory(platform)
+    replica = LangevinReplica(factory, seed=seeds[2], **params)
+    hamiltonian = []
+    for step in range(6):
+        replica.step()
+        hamiltonian.append(observable_hamiltonian(replica))
+    error = np.max(np.absolute(np.array(hamiltonian[1::2]) - results["hamiltonian"][2]))
+    print("Trajectory Error: ", error)
+    if np.isnan(error) or error > 1e-10:
+        sys.exit(-1);
@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+import numpy as np
+from langevinfts import *
+from field_io import *
+
+nx = [16,12,8]
+lx = [4.0,3.0,2.0]
+factory = PlatformSelector.create_factory(PlatformSelector.avail_platforms()[0])
+pc = factory.create_polymer_chain(0.375, 16, 15.0, "Discrete", 1.0)
+sb = factory.create_simulation_box(nx, lx)
+pseudo = factory.create_pseudo(sb, pc)
+am = factory.create_anderson_mixing(sb.get_n_grid(), 10, 1.0, 0.1, 0.1)
+
+np.random.seed(5489)
+w_a = np.random.normal(0.0, 1.0, sb.get_n_grid())
+w_b = np.random.normal(0.0, 1.0, sb.get_n_grid())
+q_init = np.ones(sb.get_n_grid(), dtype=np.float64)
+
+with tempfile.TemporaryDirectory() as tmp_dir:
+    file_name = os.path.join(tmp_dir, "fields.lfts")
+    mdic = {"dim":sb.get_dim(), "nx":sb.get_nx(), "lx":sb.get_lx(), "chi_n":pc.get_chi_n(),
+        "chain_model":pc.get_model_name(), "w_a":w_a, "w_b":w_b}
+    save_fields(file_name, mdic)
+
+    input_data = load_fields(file_name)
+    print({key: value for key, value in input_data.items() if not isinstance(value, np.ndarray)})
+    if input_data["nx"] != nx or input_data["chain_model"] != pc.get_model_name() or input_data["chi_n"] != 15.0:
+        sys.exit(-1);
+    if not isinstance(input_data["w_a"], np.memmap) or input_data["w_a"].shape != (sb.get_n_grid(),):
+        sys.exit(-1);
+
+    # the mapped arrays are given to find_phi
+    phi_a, phi_b, Q = pseudo.find_phi(q_init, q_init, w_a, w_b)
+    phi_a_mmap, phi_b_mmap, Q_mmap = pseudo.find_phi(q_init, q_init, input_data["w_a"], input_data["w_b"])
+    error = max(np.max(np.absolute(phi_a-phi_a_mmap)), np.absolute(Q-Q_mmap))
+    print("find_phi Error: ", error)
+    if error != 0.0:
+        sys.exit(-1);
+
+    # modified in place (copy-on-write), but the file is not changed
+    w = input_data["w_a"]
+    w_copy = w_a.copy()
+    am.caculate_new_fields(w, w+1.0, np.ones(sb.get_n_grid()), 1.0, 1.0)
+    am.reset_count()
+    am.caculate_new_fields(w_copy, w_copy+1.0, np.ones(sb.get_n_grid()), 1.0, 1.0)
+    error = np.max(np.absolute(w - w_copy))
+    print("In-place Error: ", error)
+    if error > 1e-14 or not np.array_equal(load_fields(file_name)["w_a"], w_a):
+        sys.exit(-1);
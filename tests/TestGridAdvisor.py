@@ -0,0 +1,59 @@
+import sys
+import numpy as np
+from langevinfts import *
+from grid_advisor import *
+
+#-------------- Smooth sizes ------------
+print("Running grid advisor")
+if prime_factors(360) != [2,2,2,3,3,5] or prime_factors(97) != [97]:
+    sys.exit(-1);
+if not is_smooth(5040) or is_smooth(22) or not is_smooth(22, FFT_RADICES["cpu-mkl"]):
+    sys.exit(-1);
+if smooth_sizes(55, 65, even=True) != [56, 60, 64]:
+    sys.exit(-1);
+
+# a large prime factor costs more than the neighbouring smooth sizes
+print("FFT cost model: ", [fft_cost([n,n,n]) for n in [60,61,64,67]])
+if fft_cost([61,61,61]) < 2*fft_cost([64,64,64]) or fft_cost([67,67,67]) < 2*fft_cost([64,64,64]):
+    sys.exit(-1);
+
+# proposed grids are smooth, fine enough, and sorted by the cost
+lx = [4.0,3.1,2.3]
+resolution = 0.09
+grids = propose_grids(lx, resolution, platform="cuda", n_candidates=4)
+print("Proposed grids: ", grids)
+if len(grids) != 4:
+    sys.exit(-1);
+for i, (nx, cost) in enumerate(grids):
+    for n, l in zip(nx, lx):
+        if not is_smooth(n) or n % 2 != 0 or l/n > resolution:
+            sys.exit(-1);
+    if i > 0 and cost < grids[i-1][1]:
+        sys.exit(-1);
+
+#-------------- Benchmark and resampling ------------
+factory = PlatformSelector.create_factory(PlatformSelector.avail_platforms()[0])
+pc = factory.create_polymer_chain(0.4, 20, 15, "Continuous", 1.0)
+results = benchmark_grids(factory, pc, [4.0,3.0], [[32,24],[31,23]], n_repeat=2)
+print("Benchmark: ", results)
+if len(results) != 2 or results[0][1] > results[1][1] or results[0][1] <= 0.0:
+    sys.exit(-1);
+
+# move a band-limited field to a new grid
+nx = [15,12]
+sb = factory.create_simulation_box(nx, [4.0,3.0])
+x = [np.arange(n)/n for n in nx]
+xx, yy = np.meshgrid(*x, indexing='ij')
+w = np.array([np.reshape(np.cos(2*np.pi*xx) + 0.3*np.sin(2*np.pi*(xx+2*yy)), -1)]*2)
+new_sb, new_pseudo, new_w = change_grid(factory, pc, sb, w, [16,12])
+x = [np.arange(n)/n for n in [16,12]]
+xx, yy = np.meshgrid(*x, indexing='ij')
+w_answer = np.reshape(np.cos(2*np.pi*xx) + 0.3*np.sin(2*np.pi*(xx+2*yy)), -1)
+error = np.max(np.absolute(new_w - w_answer))
+print("Resampling Error: ", error)
+if(np.isnan(error) or error > 1e-10 or new_sb.get_n_grid() != 16*12):
+    sys.exit(-1);
+q_init = np.ones(new_sb.get_n_grid(), dtype=np.float64)
+phi_a, phi_b, Q = new_pseudo.find_phi(q_init, q_init, new_w[0], new_w[1])
+if not np.isfinite(Q):
+    sys.exit(-1);
@@ -0,0 +1,74 @@
+import sys
+import numpy as np
+from langevinfts import *
+from resampling import *
+from grid_sequencing import *
+
+#-------------- Spectral resampling ------------
+print("Running spectral resampling")
+print("If error is less than 1.0e-10, it is ok!")
+nx_coarse = [8,6,5]
+nx_fine = [16,12,10]
+x = [np.arange(n)/n for n in nx_coarse]
+xx, yy, zz = np.meshgrid(*x, indexing='ij')
+field = np.cos(2*np.pi*xx) + 0.5*np.sin(2*np.pi*(yy+2*zz)) + 0.2*np.cos(2*np.pi*(3*xx-yy))
+x = [np.arange(n)/n for n in nx_fine]
+xx, yy, zz = np.meshgrid(*x, indexing='ij')
+field_answer = np.cos(2*np.pi*xx) + 0.5*np.sin(2*np.pi*(yy+2*zz)) + 0.2*np.cos(2*np.pi*(3*xx-yy))
+
+# prolongation of a band-limited field is exact
+field_fine = resample_field(field, nx_coarse, nx_fine)
+error = np.max(np.absolute(field_fine - np.reshape(field_answer, np.prod(nx_fine))))
+print("Prolongation Error: ", error)
+if(np.isnan(error) or error > 1e-10):
+    sys.exit(-1);
+
+# restriction recovers the coarse field
+field_coarse = resample_field(field_fine, nx_fine, nx_coarse)
+error = np.max(np.absolute(field_coarse - np.reshape(field, np.prod(nx_coarse))))
+print("Restriction Error: ", error)
+if(np.isnan(error) or error > 1e-10):
+    sys.exit(-1);
+
+# level schedule
+levels = grid_sequencing_levels([64,48,30], min_nx=16, max_levels=3)
+print("Levels: ", levels)
+if levels != [[16,24,30],[32,24,30],[64,48,30]]:
+    sys.exit(-1);
+
+#-------------- Grid sequencing SCFT ------------
+print("Running grid sequencing SCFT")
+max_scft_iter = 1000
+tolerance = 1e-8
+f = 0.4
+n_segment = 50
+chi_n = 15
+nx = [64]
+lx = [4.0]
+
+factory = PlatformSelector.create_factory(PlatformSelector.avail_platforms()[0])
+pc = factory.create_polymer_chain(f, n_segment, chi_n, "Continuous", 1.0)
+
+energies = []
+for levels in [[nx], [[16],[32],nx]]:
+    sb     = factory.create_simulation_box(nx, lx)
+    pseudo = factory.create_pseudo(sb, pc)
+    am     = factory.create_anderson_mixing(2*np.prod(nx)+len(lx), 20, 1e-2, 0.1, 0.1)
+    q1_init = np.ones(sb.get_n_grid(), dtype=np.float64)
+    q2_init = np.ones(sb.get_n_grid(), dtype=np.float64)
+    w = np.zeros([2, sb.get_n_grid()], dtype=np.float64)
+    w[0] =  np.cos(2*np.pi*np.arange(nx[0])/nx[0])
+    w[1] = -np.cos(2*np.pi*np.arange(nx[0])/nx[0])
+
+    phi_a, phi_b, Q, energy_total, lx_out, n_iters = find_saddle_point_grid_sequencing(
+        factory, pc, sb, pseudo, am, lx, q1_init, q2_init, w,
+        max_scft_iter, tolerance, is_box_altering=True, levels=levels)
+    print("Levels: ", levels, "Iterations: ", n_iters)
+    if n_iters[-1] == max_scft_iter:
+        sys.exit(-1);
+    energies.append(energy_total)
+
+error = np.abs(energies[0]-energies[1])
+print("Energy Difference: ", error)
+if(np.isnan(error) or error > 1e-7):
+    sys.exit(-1);
@@ -0,0 +1,47 @@
+import sys
+import numpy as np
+from langevinfts import *
+from space_group import *
+from initial_fields import *
+
+factory = PlatformSelector.create_factory(PlatformSelector.avail_platforms()[0])
+
+#-------------- Space group symmetry ------------
+print("If error is less than 1.0e-10, it is ok!")
+nx = [16,16,16]
+sb = factory.create_simulation_box(nx, [4.0,4.0,4.0])
+for name, w_a, group in [("Gyroid", gyroid(sb), "Ia-3d"), ("BCC", sphere_bcc(sb), "Im-3m"),
+                         ("A15", a15(sb), "Pm-3n"), ("BCC 2x2x2", sphere_bcc(sb, n_cells=2), "Im-3m")]:
+    space_group = SpaceGroup(nx, group)
+    error = max(np.max(np.absolute(space_group.symmetrize(w_a) - w_a)), np.absolute(np.mean(w_a)))
+    print("%-10s Symmetrize Error: %.3e" % (name, error))
+    if w_a.shape != (sb.get_n_grid(),) or np.isnan(error) or error > 1e-10:
+        sys.exit(-1);
+
+# A domains are at the centers of the spheres and the networks
+w_a = np.reshape(sphere_fcc(sb), nx)
+if not (w_a[0,0,0] < np.min(w_a)+1e-10 and w_a[0,8,8] < np.min(w_a)+1e-10 and w_a[8,8,8] > 0.0):
+    sys.exit(-1);
+w_a = np.reshape(double_diamond(sb), nx)
+if not (w_a[2,2,2] < np.min(w_a)+1e-10 and w_a[0,0,0] > 0.0 and abs(np.std(w_a)-0.3164) < 1e-10):
+    sys.exit(-1);
+
+#-------------- Lamella and cylinders ------------
+nx = [8,12,20]
+sb = factory.create_simulation_box(nx, [2.0,3.0,5.0])
+w_a = np.reshape(lamella(sb, n_periods=2), nx)
+error = np.max(np.absolute(w_a - np.cos(4*np.pi*np.arange(nx[2])/nx[2])))
+print("Lamella Error: ", error)
+if np.isnan(error) or error > 1e-10:
+    sys.exit(-1);
+w_a = np.reshape(cylinder_hexagonal(sb, n_cells=[1,2]), nx)
+error = max(np.max(np.absolute(w_a - w_a[0])), np.absolute(np.mean(w_a)))
+print("Cylinder Error: ", error)
+if np.isnan(error) or error > 1e-10 or w_a[0,0,0] > np.min(w_a)+1e-10 or w_a[0,6,5] > np.min(w_a)+1e-10:
+    sys.exit(-1);
+
+# 2D box
+sb = factory.create_simulation_box([12,20], [3.0,5.0])
+w_a = cylinder_hexagonal(sb)
+if w_a.shape != (sb.get_n_grid(),) or np.absolute(np.mean(w_a)) > 1e-10:
+    sys.exit(-1);
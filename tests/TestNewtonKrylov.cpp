@@ -0,0 +1,155 @@
+#include <cstdlib>
+#include <iostream>
+#include <iomanip>
+#include <cmath>
+#include <string>
+#include <array>
+
+#include "Exception.h"
+#include "PolymerChain.h"
+#include "SimulationBox.h"
+#include "Pseudo.h"
+#include "NewtonKrylov.h"
+#include "AbstractFactory.h"
+#include "PlatformSelector.h"
+
+int main()
+{
+    try
+    {
+        // math constatns
+        const double PI = 3.14159265358979323846;
+
+        // QQ = total partition function
+        double QQ;
+        // error_level = variable to check convergence of the iteration
+        double error_level, old_error_level;
+        // input and output fields, xi is temporary storage for pressures
+        double *w, *w_out, *w_diff;  // n_comp * MM
+        double *xi;
+        // initial value of q, q_dagger
+        double *q1_init, *q2_init;
+        // segment concentration
+        double *phia, *phib;
+
+        // -------------- initialize ------------
+        int max_scft_iter = 200;
+        double tolerance = 1e-9;
+
+        double f = 0.3;
+        int n_segment = 50;
+        double chi_n = 25.0;
+        std::vector<int> nx = {263};
+        std::vector<double> lx = {4.0};
+
+        int nk_n_var = 2*nx[0];  // A and B
+        int nk_max_krylov = 20;
+        double nk_start_error = 1e-1;
+        double nk_mix_min = 0.1;
+        double nk_mix_init = 0.1;
+
+        std::vector<std::string> chain_models = {"Continuous", "Discrete"};
+
+        // choose platform
+        std::vector<std::string> avail_platforms = PlatformSelector::avail_platforms();
+        for(std::string platform : avail_platforms){
+            for(std::string chain_model : chain_models){
+                AbstractFactory *factory = PlatformSelector::create_factory(platform);
+                factory->display_info();
+
+                // create instances and assign to the variables of base classs for the dynamic binding
+                SimulationBox *sb  = factory->create_simulation_box(nx, lx);
+                PolymerChain *pc   = factory->create_polymer_chain(f, n_segment, chi_n, chain_model, 1.0);
+                Pseudo *pseudo     = factory->create_pseudo(sb, pc);
+                NewtonKrylov *nk   = factory->create_newton_krylov(sb, pc, pseudo,
+                                    nk_n_var, nk_max_krylov, nk_start_error, nk_mix_min, nk_mix_init);
+                const int M = sb->get_n_grid();
+
+                //-------------- allocate array ------------
+                w       = new double[M*2];
+                w_out   = new double[M*2];
+                w_diff  = new double[M*2];
+                xi      = new double[M];
+                phia    = new double[M];
+                phib    = new double[M];
+                q1_init = new double[M];
+                q2_init = new double[M];
+
+                //-------------- setup fields ------------
+                for(int i=0; i<M; i++)
+                {
+                    phia[i] = cos(2.0*PI*i/4.68)*0.1;
+                    phib[i] = 1.0 - phia[i];
+                    w[i]   = pc->get_chi_n()*phib[i];
+                    w[i+M] = pc->get_chi_n()*phia[i];
+                    q1_init[i] = 1.0;
+                    q2_init[i] = 1.0;
+                }
+                // keep the level of field value
+                sb->zero_mean(&w[0]);
+                sb->zero_mean(&w[M]);
+
+                error_level = 1.0e20;
+
+                //------------------ run ----------------------
+                std::cout<< "---------- Run (" << chain_model << ") ----------" << std::endl;
+                std::cout<< "iteration, total_partition, error_level" << std::endl;
+                int iter;
+                for(iter=0; iter<max_scft_iter; iter++)
+                {
+                    // for the given fields find the polymer statistics
+                    pseudo->find_phi(phia, phib, q1_init, q2_init, &w[0], &w[M], QQ);
+
+                    for(int i=0; i<M; i++)
+                    {
+                        xi[i] = 0.5*(w[i]+w[i+M]-pc->get_chi_n());
+                        w_out[i]   = pc->get_chi_n()*phib[i] + xi[i];
+                        w_out[i+M] = pc->get_chi_n()*phia[i] + xi[i];
+                    }
+                    sb->zero_mean(&w_out[0]);
+                    sb->zero_mean(&w_out[M]);
+
+                    old_error_level = error_level;
+                    for(int i=0; i<2*M; i++)
+                        w_diff[i] = w_out[i]- w[i];
+                    error_level = sqrt(sb->multi_inner_product(2,w_diff,w_diff)/
+                                    (sb->multi_inner_product(2,w,w)+1.0));
+
+                    std::cout<< std::setw(8) << iter;
+                    std::cout<< std::setw(17) << std::setprecision(7) << std::scientific << QQ;
+                    std::cout<< std::setw(15) << std::setprecision(3) << std::scientific << error_level << std::endl;
+
+                    // conditions to end the iteration
+                    if(error_level < tolerance) break;
+                    // calculte new fields using Newton-Krylov method
+                    nk->caculate_new_fields(w, w_out, w_diff, old_error_level, error_level);
+                }
+
+                //------------- finalize -------------
+                delete[] w;
+                delete[] w_out;
+                delete[] w_diff;
+                delete[] xi;
+                delete[] phia;
+                delete[] phib;
+                delete[] q1_init;
+                delete[] q2_init;
+
+                delete nk;
+                delete pseudo;
+                delete pc;
+                delete sb;
+                delete factory;
+
+                if (std::isnan(error_level) || error_level >= tolerance)
+                    return -1;
+            }
+        }
+        return 0;
+    }
+    catch(std::exception& exc)
+    {
+        std::cout << exc.what() << std::endl;
+        return -1;
+    }
+}
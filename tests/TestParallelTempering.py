@@ -0,0 +1,51 @@
+import sys
+import numpy as np
+from langevinfts import *
+from langevin_replica import *
+from parallel_tempering import *
+
+nx = [16,16]
+lx = [3.0,3.0]
+nbar = 16
+chi_n_list = [10.0, 10.5, 11.0]
+
+factory = PlatformSelector.create_factory(PlatformSelector.avail_platforms()[0])
+replicas = [LangevinReplica(factory, nx, lx, 0.5, 16, chi_n, langevin_nbar=nbar, seed=i)
+    for i, chi_n in enumerate(chi_n_list)]
+
+#-------------- Acceptance ratio of a swap ------------
+print("Running acceptance ratio of a swap")
+print("If error is less than 1.0e-8, it is ok!")
+rep_i, rep_j = replicas[0], replicas[1]
+h_before = rep_i.get_hamiltonian(chi_n_list[0]) + rep_j.get_hamiltonian(chi_n_list[1])
+h_after  = rep_i.get_hamiltonian(chi_n_list[1]) + rep_j.get_hamiltonian(chi_n_list[0])
+log_prob = swap_log_probability(nbar, chi_n_list[0], chi_n_list[1],
+    rep_i.sb.inner_product(rep_i.w_minus, rep_i.w_minus),
+    rep_j.sb.inner_product(rep_j.w_minus, rep_j.w_minus))
+error = abs(log_prob + (h_after - h_before))/abs(h_after - h_before)
+print("log(P): ", log_prob, -(h_after - h_before))
+print("Swap Error: ", error)
+if np.isnan(error) or error > 1e-8:
+    sys.exit(-1);
+
+#-------------- Replica exchange ------------
+print("Running replica exchange")
+w_minus_list = [replica.w_minus for replica in replicas]
+pt = ParallelTempering(replicas, chi_n_list, swap_interval=2, seed=5489)
+pt.run(20)
+pt.print_acceptance_rates()
+
+# fields stay in their replicas, and chi_n labels are exchanged
+chi_n_of_replicas = pt.get_chi_n_of_replicas()
+print("chi_n of replicas: ", chi_n_of_replicas)
+for k, replica in enumerate(replicas):
+    if replica.w_minus is not w_minus_list[k] or replica.langevin_step != 20:
+        sys.exit(-1);
+    if replica.pc.get_chi_n() != chi_n_of_replicas[k]:
+        sys.exit(-1);
+if sorted(chi_n_of_replicas) != chi_n_list:
+    sys.exit(-1);
+# 10 rounds alternating the even (1 pair) and odd (1 pair) pairs
+rates = pt.get_acceptance_rates()
+if list(pt.n_attempts) != [5,5] or np.any(rates < 0.0) or np.any(rates > 1.0) or np.sum(pt.n_accepts) == 0:
+    sys.exit(-1);
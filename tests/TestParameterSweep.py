@@ -0,0 +1,75 @@
+import sys
+import numpy as np
+from langevinfts import *
+from grid_sequencing import *
+from parameter_sweep import *
+
+# the worker processes import this file again
+if __name__ == "__main__":
+    platform = PlatformSelector.avail_platforms()[0]
+    factory = PlatformSelector.create_factory(platform)
+    n_segment = 50
+    nx = [48]
+    lx = [4.0]
+    w_a = 5.0*np.cos(2*np.pi*np.arange(nx[0])/nx[0])
+    w_init = np.array([w_a, -w_a])
+
+    #-------------- Path ------------
+    sweep = ParameterSweep([{"chi_n":12.0, "f":0.5}, {"chi_n":16.0}, {"f":0.4, "epsilon":1.5}],
+        n_segment, "Continuous", nx, lx, w_init, tolerance=1e-8, verbose_level=0)
+    print("Waypoints: ", sweep.s_waypoints)
+    if np.max(np.absolute(sweep.s_waypoints - [0.0, 4.0, 4.0+np.sqrt(2.0**2+5.0**2)])) > 1e-12:
+        sys.exit(-1);
+    chi_n, f, epsilon = sweep.get_parameters(4.0 + 0.52*np.sqrt(29.0))
+    print("Parameters: ", chi_n, f, epsilon)
+    if chi_n != 16.0 or f != 0.44 or abs(epsilon - 1.26) > 1e-12:
+        sys.exit(-1);
+
+    #-------------- Continuation ------------
+    print("Running parameter sweep")
+    print("If error is less than 1.0e-6, it is ok!")
+    results = sweep.run(factory)
+    print("chi_n: ", results["chi_n"])
+    print("f: ", results["f"])
+    print("Iterations: ", results["n_iter"])
+    if not results["completed"] or list(results["chi_n"][[0,-1]]) != [12.0, 16.0] or results["f"][-1] != 0.4:
+        sys.exit(-1);
+    if not np.any(results["s"] == 4.0) or np.any(np.diff(results["s"]) <= 0.0):
+        sys.exit(-1);
+
+    # the last point from the initial fields
+    pc = factory.create_polymer_chain(0.4, n_segment, 16.0, "Continuous", 1.5)
+    sb = factory.create_simulation_box(nx, lx)
+    pseudo = factory.create_pseudo(sb, pc)
+    am = factory.create_anderson_mixing(2*sb.get_n_grid()+1, 20, 1e-2, 0.1, 0.1)
+    q_init = np.ones(sb.get_n_grid(), dtype=np.float64)
+    w = w_init.copy()
+    _, _, _, energy, lx_answer, n_iter, _ = iterate_saddle_point(pc, sb, pseudo, am, lx,
+        q_init, q_init, w, 1000, 1e-8, True, 0)
+    error = max(abs(energy - results["energy"][-1]), abs(lx_answer[0] - results["lx"][-1,0]))
+    print("Energy Error: ", error)
+    print("Iterations from the initial fields: ", n_iter, ", mean iterations of the sweep: ", np.mean(results["n_iter"][1:]))
+    if np.isnan(error) or error > 1e-6 or np.mean(results["n_iter"][1:]) > n_iter/3:
+        sys.exit(-1);
+
+    # converged at the last allowed iteration
+    sb.set_lx(list(lx))
+    pseudo.update()
+    w = w_init.copy()
+    _, _, _, _, _, n_iter_last, error_level = iterate_saddle_point(pc, sb, pseudo, am, lx,
+        q_init, q_init, w, n_iter, 1e-8, True, 0)
+    print("Iterations: ", n_iter_last, ", Error level: ", error_level)
+    if n_iter_last != n_iter or not error_level < 1e-8:
+        sys.exit(-1);
+
+    #-------------- Parallel branches ------------
+    print("Running parallel branches")
+    sweeps = [ParameterSweep([{"chi_n":12.0, "f":f}, {"chi_n":14.0}], n_segment, "Continuous",
+        nx, lx, w_init, tolerance=1e-8, label="f=%g" % (f), verbose_level=0) for f in [0.5, 0.44, 0.4]]
+    branch_results = run_sweeps(sweeps, platform=platform, n_groups=2)
+    for sweep, result in zip(sweeps, branch_results):
+        energy = sweep.run(factory)["energy"]
+        error = np.max(np.absolute(energy - result["energy"]))
+        print(result["label"], "points: ", len(result["s"]), "Error: ", error)
+        if len(energy) != len(result["energy"]) or np.isnan(error) or error > 1e-8:
+            sys.exit(-1);
@@ -0,0 +1,49 @@
+import sys
+import numpy as np
+from phase_competition import *
+
+# the worker processes import this file again
+if __name__ == "__main__":
+    params = {"f":0.3, "n_segment":50, "chi_n":20.0, "tolerance":1e-8}
+    candidates = [
+        {"label":"Cylinder", "nx":[24,14], "lx":[1.7*np.sqrt(3),1.7], "initial_field":"cylinder_hexagonal"},
+        {"label":"Lamella", "nx":[32], "lx":[3.5], "initial_field":"lamella"},
+        {"label":"Disordered", "nx":[8], "lx":[3.5], "w_init":np.zeros([2,8])},
+        {"label":"Unknown", "nx":[8], "lx":[3.5], "initial_field":"unknown_phase"}]
+
+    #-------------- Energy bound ------------
+    competition = PhaseCompetition(params, candidates, abandon_error=1e-2, margin=1e-3)
+    if competition.is_hopeless({"energy":-0.30, "error_level":2e-2}, -0.4) or \
+        competition.is_hopeless({"energy":-0.395, "error_level":5e-3}, -0.4) or \
+        not competition.is_hopeless({"energy":-0.30, "error_level":5e-3}, -0.4):
+        sys.exit(-1);
+
+    #-------------- All candidates to the end ------------
+    print("Running phase competition without abandonment")
+    competition = PhaseCompetition(params, candidates, abandon_error=0.0)
+    full = competition.run()
+    competition.report()
+    if full["winner"] != "Cylinder" or full["phases"]["Unknown"]["status"] != "failed":
+        sys.exit(-1);
+    if [full["phases"][label]["status"] for label in ["Cylinder", "Lamella", "Disordered"]] != ["converged"]*3:
+        sys.exit(-1);
+
+    #-------------- Early abandonment ------------
+    # one candidate at a time, Lamella is abandoned after Cylinder is converged
+    print("Running phase competition with abandonment")
+    competition = PhaseCompetition(params, candidates, n_groups=1, report_interval=5)
+    results = competition.run()
+    competition.report()
+    lamella = results["phases"]["Lamella"]
+    print("Lamella iterations: ", lamella["n_iter"], "/", full["phases"]["Lamella"]["n_iter"])
+    if results["winner"] != "Cylinder" or lamella["status"] != "abandoned" or \
+        lamella["n_iter"] >= full["phases"]["Lamella"]["n_iter"]:
+        sys.exit(-1);
+    error = abs(results["phases"]["Cylinder"]["energy"] - full["phases"]["Cylinder"]["energy"])
+    print("Energy Error: ", error)
+    if np.isnan(error) or error > 1e-10:
+        sys.exit(-1);
+    gap = full["energy_gaps"]["Lamella"]
+    if not results["energy_gaps"]["Lamella"] > gap - lamella["error_level"] or \
+        abs(results["energy_gaps"]["Disordered"] - 0.397869899) > 1e-6:
+        sys.exit(-1);
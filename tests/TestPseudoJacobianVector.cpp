@@ -0,0 +1,98 @@
+#include <cstdlib>
+#include <iostream>
+#include <iomanip>
+#include <cmath>
+#include <string>
+#include <array>
+#include <algorithm>
+
+#include "Exception.h"
+#include "PolymerChain.h"
+#include "SimulationBox.h"
+#include "Pseudo.h"
+#include "AbstractFactory.h"
+#include "PlatformSelector.h"
+
+int main()
+{
+    try
+    {
+        // compare find_phi_jvp() with central finite difference of find_phi()
+        const double eps = 1e-5;
+        const double tolerance = 1e-6;
+
+        double f = 0.4;
+        int n_segment = 10;
+        double chi_n = 20.0;
+        std::vector<int> nx = {5,4,3};
+        std::vector<double> lx = {4.0,3.0,2.0};
+
+        std::vector<std::string> chain_models = {"Continuous", "Discrete"};
+
+        // choose platform
+        std::vector<std::string> avail_platforms = PlatformSelector::avail_platforms();
+        for(std::string platform : avail_platforms){
+            for(std::string chain_model : chain_models){
+                AbstractFactory *factory = PlatformSelector::create_factory(platform);
+                factory->display_info();
+
+                SimulationBox *sb  = factory->create_simulation_box(nx, lx);
+                PolymerChain *pc   = factory->create_polymer_chain(f, n_segment, chi_n, chain_model, 1.0);
+                Pseudo *pseudo     = factory->create_pseudo(sb, pc);
+                const int M = sb->get_n_grid();
+
+                double w_a[M], w_b[M], dw_a[M], dw_b[M];
+                double w_a_p[M], w_b_p[M], w_a_m[M], w_b_m[M];
+                double phi_a_p[M], phi_b_p[M], phi_a_m[M], phi_b_m[M];
+                double dphi_a[M], dphi_b[M];
+                double q1_init[M], q2_init[M];
+                double QQ, dQQ, QQ_p, QQ_m;
+
+                for(int i=0; i<M; i++)
+                {
+                    w_a[i]  = 0.5*sin(0.7*i) + 0.3*cos(1.3*i);
+                    w_b[i]  = 0.4*cos(0.9*i) - 0.2*sin(2.1*i);
+                    dw_a[i] = cos(1.7*i);
+                    dw_b[i] = sin(0.5*i) + 0.3;
+                    q1_init[i] = 1.0;
+                    q2_init[i] = 1.0;
+
+                    w_a_p[i] = w_a[i] + eps*dw_a[i];
+                    w_b_p[i] = w_b[i] + eps*dw_b[i];
+                    w_a_m[i] = w_a[i] - eps*dw_a[i];
+                    w_b_m[i] = w_b[i] - eps*dw_b[i];
+                }
+
+                pseudo->find_phi(phi_a_p, phi_b_p, q1_init, q2_init, w_a_p, w_b_p, QQ_p);
+                pseudo->find_phi(phi_a_m, phi_b_m, q1_init, q2_init, w_a_m, w_b_m, QQ_m);
+                pseudo->find_phi_jvp(dphi_a, dphi_b, q1_init, q2_init, w_a, w_b, dw_a, dw_b, QQ, dQQ);
+
+                double error = std::abs(dQQ - (QQ_p-QQ_m)/(2*eps))/std::abs(dQQ);
+                double max_dphi = 0.0;
+                for(int i=0; i<M; i++)
+                    max_dphi = std::max({max_dphi, std::abs(dphi_a[i]), std::abs(dphi_b[i])});
+                for(int i=0; i<M; i++)
+                {
+                    error = std::max(error, std::abs(dphi_a[i] - (phi_a_p[i]-phi_a_m[i])/(2*eps))/max_dphi);
+                    error = std::max(error, std::abs(dphi_b[i] - (phi_b_p[i]-phi_b_m[i])/(2*eps))/max_dphi);
+                }
+                std::cout<< chain_model << ", dQ: " << std::setprecision(10) << dQQ;
+                std::cout<< ", relative error: " << std::setprecision(3) << std::scientific << error << std::endl;
+
+                delete pseudo;
+                delete pc;
+                delete sb;
+                delete factory;
+
+                if (!std::isfinite(error) || error > tolerance)
+                    return -1;
+            }
+        }
+        return 0;
+    }
+    catch(std::exception& exc)
+    {
+        std::cout << exc.what() << std::endl;
+        return -1;
+    }
+}
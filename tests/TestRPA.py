@@ -0,0 +1,91 @@
+import sys
+import time
+import numpy as np
+from rpa import *
+
+#-------------- Debye functions ------------
+print("Running Debye functions")
+print("If error is less than 1.0e-10, it is ok!")
+
+# discrete chain, explicit sum over pairs of segments
+n_segment, f, epsilon = 8, 0.375, 1.5
+n_a = int(round(n_segment*f))
+bond_length_a, bond_length_b = bond_lengths(f, epsilon)
+# squared bond lengths between the segments i and i+1, and the distance from the first segment
+bonds = np.array([bond_length_a]*(n_a-1) + [0.5*bond_length_a+0.5*bond_length_b] + [bond_length_b]*(n_segment-n_a-1))
+r2 = np.concatenate([[0.0], np.cumsum(bonds)])
+is_a = np.arange(n_segment) < n_a
+for k in [1e-4, 0.5, 3.0, 20.0]:
+    correlation = np.exp(-k*k/6.0/n_segment*np.absolute(r2[:,None] - r2[None,:]))
+    g_answer = [np.sum(correlation[np.ix_(is_a, is_a)]), np.sum(correlation[np.ix_(is_a, ~is_a)]),
+        np.sum(correlation[np.ix_(~is_a, ~is_a)])]
+    g = debye_functions(k, f, epsilon, n_segment, "Discrete")
+    error = np.max(np.absolute(np.array(g)*n_segment**2 - g_answer)/np.array(g_answer))
+    print("k: %g, Discrete Error: %g" % (k, error))
+    if np.isnan(error) or error > 1e-10:
+        sys.exit(-1);
+
+# continuous chain at k = 0, and the limit of the discrete chain
+g = debye_functions(np.array([0.0, 1e-3]), 0.3, 1.0)
+error = np.max(np.absolute(np.array(g) - np.array([[0.09], [0.21], [0.49]])))
+print("k = 0 Error: ", error)
+if np.isnan(error) or error > 1e-6:
+    sys.exit(-1);
+k = np.linspace(0.1, 10.0, 50)
+error = np.max(np.absolute(np.array(debye_functions(k, 0.3, 1.2, 4000, "Discrete")) - np.array(debye_functions(k, 0.3, 1.2))))
+print("Discrete to Continuous Error: ", error)
+if np.isnan(error) or error > 1e-3:
+    sys.exit(-1);
+
+#-------------- Spinodal ------------
+print("Running spinodal")
+# [Ref: L. Leibler, Macromolecules 1980, 13, 1602], chi_n_s = 10.495 and k*R_g = 1.946
+chi_n_s, k_star = spinodal(0.5)
+print("chi_n_s: ", chi_n_s, "k*R_g: ", k_star/np.sqrt(6.0))
+if abs(chi_n_s - 10.495) > 1e-3 or abs(k_star/np.sqrt(6.0) - 1.946) > 1e-3:
+    sys.exit(-1);
+
+# the same as a fine scan of k, for each set of parameters
+f_list = np.array([0.15, 0.3, 0.5, 0.7])
+epsilon_list = np.array([0.7, 1.0, 1.5, 2.0])
+for chain_model, n_segment in [("Continuous", None), ("Discrete", 40)]:
+    chi_n_s, k_star = spinodal(f_list[:,None], epsilon_list[None,:], n_segment, chain_model)
+    if chi_n_s.shape != (4,4):
+        sys.exit(-1);
+    k = np.linspace(1.0, 12.0, 110001)
+    for i, f in enumerate(f_list):
+        for j, epsilon in enumerate(epsilon_list):
+            F = inverse_structure_function_athermal(k, f, epsilon, n_segment, chain_model)
+            error = max(abs(chi_n_s[i,j] - np.min(F)/2), abs(k_star[i,j] - k[np.argmin(F)])*1e-3)
+            if np.isnan(error) or error > 1e-7:
+                print(chain_model, f, epsilon, "Spinodal Error: ", error)
+                sys.exit(-1);
+
+# structure function is positive below the spinodal and diverges at k*
+chi_n_s, k_star = spinodal(0.3, 1.5)
+s_k = structure_function_rpa(np.linspace(0.1, 20.0, 200), 0.3, chi_n_s*(1-1e-6), 1.5)
+print("S(k*)/N near spinodal: ", np.max(s_k))
+if np.any(s_k <= 0.0) or np.max(s_k) < 1e3:
+    sys.exit(-1);
+
+# a grid of 10,000 parameter sets
+f_grid, epsilon_grid = np.meshgrid(np.linspace(0.05, 0.95, 100), np.linspace(0.5, 2.0, 100))
+time_start = time.time()
+chi_n_s, k_star = spinodal(f_grid, epsilon_grid)
+print("Time for 10,000 points: ", time.time() - time_start)
+# symmetric under exchange of A and B with epsilon -> 1/epsilon
+chi_n_s_swap, k_star_swap = spinodal(1.0-f_grid, 1.0/epsilon_grid)
+error = np.max(np.absolute(chi_n_s - chi_n_s_swap)/chi_n_s)
+print("Symmetry Error: ", error)
+if np.isnan(error) or error > 1e-10:
+    sys.exit(-1);
+
+#-------------- Mean-field estimates ------------
+phase = estimate_phase([0.5, 0.5, 0.4, 0.33, 0.25, 0.2, 0.8], [10.0, 12.0, 20.0, 20.0, 25.0, 30.0, 30.0])
+print("Phases: ", phase)
+if list(phase) != ["Disordered", "Lamella", "Lamella", "Gyroid", "Cylinder", "BCC", "BCC"]:
+    sys.exit(-1);
+chi_n_s, k_star = spinodal(0.5)
+if abs(unit_cell_size("Lamella", k_star) - 2*np.pi/k_star) > 1e-12 or \
+    abs(unit_cell_size("Gyroid", k_star) - 2*np.pi*np.sqrt(6.0)/k_star) > 1e-12:
+    sys.exit(-1);
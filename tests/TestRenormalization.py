@@ -0,0 +1,79 @@
+import sys
+import numpy as np
+import scipy.special as sp
+from scipy import integrate
+from renormalization import *
+
+#-------------- Discrete chain ------------
+print("Running renormalization of discrete chain")
+lx = [4.46,4.3,4.6]
+nx = [40,40,40]
+n_segment = 90
+nbar = 10000
+
+# reference, sum of the bond probabilities term by term
+dx = np.array(lx)/np.array(nx)
+sum_p_i = 0.0
+for i in range(1,101):
+    p_i = 1.0
+    for d in dx:
+        p_i *= d*np.sqrt(3*n_segment/(2*np.pi*i))*sp.erf(np.pi/d*np.sqrt(i/6/n_segment))
+    sum_p_i += p_i
+sum_p_i += np.power(3*n_segment/(2*np.pi),1.5)*np.prod(dx)*2/np.sqrt(0.5+100)
+z_inf_answer = 1-(1+2*sum_p_i)/(n_segment*np.sqrt(nbar)*np.prod(dx))
+
+z_inf, dz_inf_dl = z_inf_discrete(lx, nx, n_segment, nbar)
+print("z_inf: ", z_inf, z_inf_answer)
+if np.isnan(z_inf) or abs(z_inf-z_inf_answer) > 1e-12:
+    sys.exit(-1);
+
+# finite differences
+def check_derivative(func, lx, dz_inf_dl):
+    eps = 1e-6
+    error = 0.0
+    for n in range(3):
+        lx_p = list(lx); lx_p[n] += eps
+        lx_m = list(lx); lx_m[n] -= eps
+        fd = (func(lx_p)[0]-func(lx_m)[0])/(2*eps)
+        error = max(error, abs(fd-dz_inf_dl[n])/abs(dz_inf_dl[n]))
+    return error
+error = check_derivative(lambda l: z_inf_discrete(l, nx, n_segment, nbar), lx, dz_inf_dl)
+print("Relative error of dz_inf_dl: ", error)
+if np.isnan(error) or error > 1e-6:
+    sys.exit(-1);
+
+#-------------- Continuous chain (RPA) ------------
+print("Running renormalization of continuous chain")
+f = 0.4
+nbar = 1024
+lx = [2.0,2.0,2.0]
+nx = [4,4,4]
+k_max = 2*np.pi
+integral, _ = integrate.tplquad(lambda z, y, x: structure_function_rpa_athermal(f, x*x+y*y+z*z),
+    0, k_max, 0, k_max, 0, k_max, epsabs=1e-10, epsrel=1e-10)
+z_inf_answer = 1 - 8*integral/(np.sqrt(nbar)*8*np.pi**3*f*(1-f))
+z_inf, dz_inf_dl = z_inf_rpa(lx, nx, f, nbar)
+print("z_inf: ", z_inf, z_inf_answer)
+if np.isnan(z_inf) or abs(z_inf-z_inf_answer) > 1e-9:
+    sys.exit(-1);
+
+lx = [4.46,4.3,4.6]
+nx = [40,40,40]
+z_inf, dz_inf_dl = z_inf_rpa(lx, nx, f, nbar)
+error = check_derivative(lambda l: z_inf_rpa(l, nx, f, nbar), lx, dz_inf_dl)
+print("Relative error of dz_inf_dl: ", error)
+if np.isnan(error) or error > 1e-5:
+    sys.exit(-1);
+
+#-------------- Cache ------------
+renormal = get_renormalization(nx, n_segment, nbar, "Continuous", f)
+if renormal is not get_renormalization(nx, n_segment, nbar, "continuous", f):
+    sys.exit(-1);
+z_inf, dz_inf_dl = renormal.get_z_inf(lx)
+# a small change of lx is extrapolated to first order
+lx_new = np.array(lx)*(1+5e-6)
+z_inf_new, _ = renormal.get_z_inf(lx_new)
+error = abs(z_inf_new - z_inf_rpa(lx_new, nx, f, nbar)[0])
+print("Error of the extrapolated z_inf: ", error)
+if np.isnan(error) or error > 1e-9:
+    sys.exit(-1);
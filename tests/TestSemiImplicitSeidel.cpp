@@ -0,0 +1,119 @@
+#include <cstdlib>
+#include <iostream>
+#include <iomanip>
+#include <cmath>
+#include <string>
+#include <array>
+
+#include "Exception.h"
+#include "PolymerChain.h"
+#include "SimulationBox.h"
+#include "Pseudo.h"
+#include "SemiImplicitSeidel.h"
+#include "AbstractFactory.h"
+#include "PlatformSelector.h"
+
+int main()
+{
+    try
+    {
+        // math constatns
+        const double PI = 3.14159265358979323846;
+
+        double QQ, error_level;
+        int max_iter = 50;
+        double tolerance = 1e-8;
+
+        double f = 0.4;
+        int n_segment = 40;
+        double chi_n = 15.0;
+        double lambda_plus = 100.0;
+        double lambda_minus = 1.0;
+        std::vector<int> nx = {32,24};
+        std::vector<double> lx = {4.0,3.5};
+
+        std::vector<std::string> chain_models = {"Continuous", "Discrete"};
+
+        // choose platform
+        std::vector<std::string> avail_platforms = PlatformSelector::avail_platforms();
+        for(std::string platform : avail_platforms){
+            for(std::string chain_model : chain_models){
+                AbstractFactory *factory = PlatformSelector::create_factory(platform);
+                factory->display_info();
+
+                SimulationBox *sb  = factory->create_simulation_box(nx, lx);
+                PolymerChain *pc   = factory->create_polymer_chain(f, n_segment, chi_n, chain_model, 1.3);
+                Pseudo *pseudo     = factory->create_pseudo(sb, pc);
+                SemiImplicitSeidel *sis = factory->create_semi_implicit_seidel(sb, pc, pseudo);
+                const int M = sb->get_n_grid();
+
+                double w_plus[M], w_minus[M], w_a[M], w_b[M];
+                double phi_a[M], phi_b[M], q1_init[M], q2_init[M];
+
+                for(int i=0; i<M; i++)
+                {
+                    w_plus[i] = 0.0;
+                    w_minus[i] = 3.0*cos(2.0*PI*(i/nx[1])/nx[0]) + sin(2.0*PI*2*(i%nx[1])/nx[1]);
+                    q1_init[i] = 1.0;
+                    q2_init[i] = 1.0;
+                }
+
+                // relax w_plus for fixed w_minus, and then once again after changing the box size
+                for(int run=0; run<2; run++)
+                {
+                    if (run == 1)
+                    {
+                        sb->set_lx({4.4, 3.2});
+                        pseudo->update();
+                    }
+                    int iter;
+                    for(iter=0; iter<max_iter; iter++)
+                    {
+                        for(int i=0; i<M; i++)
+                        {
+                            w_a[i] = w_plus[i] + w_minus[i];
+                            w_b[i] = w_plus[i] - w_minus[i];
+                        }
+                        pseudo->find_phi(phi_a, phi_b, q1_init, q2_init, w_a, w_b, QQ);
+                        error_level = 0.0;
+                        for(int i=0; i<M; i++)
+                            error_level += pow(phi_a[i] + phi_b[i] - 1.0, 2);
+                        error_level = sqrt(error_level/M);
+                        if(error_level < tolerance) break;
+                        sis->update_w_plus(w_plus, phi_a, phi_b, lambda_plus);
+                    }
+                    std::cout<< chain_model << ", iteration: " << iter;
+                    std::cout<< ", error_level: " << std::setprecision(3) << std::scientific << error_level << std::endl;
+                    if (!std::isfinite(error_level) || error_level >= tolerance)
+                        return -1;
+                }
+
+                // a few relaxation steps of both fields without noise
+                for(int step=0; step<10; step++)
+                {
+                    for(int i=0; i<M; i++)
+                    {
+                        w_a[i] = w_plus[i] + w_minus[i];
+                        w_b[i] = w_plus[i] - w_minus[i];
+                    }
+                    pseudo->find_phi(phi_a, phi_b, q1_init, q2_init, w_a, w_b, QQ);
+                    sis->update_fields(w_plus, w_minus, phi_a, phi_b, nullptr, lambda_plus, lambda_minus);
+                }
+                if (!std::isfinite(QQ))
+                    return -1;
+
+                delete sis;
+                delete pseudo;
+                delete pc;
+                delete sb;
+                delete factory;
+            }
+        }
+        return 0;
+    }
+    catch(std::exception& exc)
+    {
+        std::cout << exc.what() << std::endl;
+        return -1;
+    }
+}
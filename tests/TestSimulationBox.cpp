@@ -1,5 +1,6 @@
 #include <iostream>
 #include <cmath>
+#include <vector>
 #include "SimulationBox.h"
 
 int main()
@@ -38,6 +39,41 @@ int main()
             return -1;
         if( std::abs(sum_w) > 1e-7)
             return -1;
+
+        // reductions of a large grid, compared with sums in long double
+        SimulationBox sb_large({48,40,36}, {4.8,4.0,3.6});
+        const int M = sb_large.get_n_grid();
+        std::vector<double> g_large(M), h_large(M);
+        long double sum_g{0.0}, sum_gh{0.0};
+        for(int i=0; i<M; i++)
+        {
+            g_large[i] = 1.0 + 1e-3*sin(0.37*i);
+            h_large[i] = 2.0 + cos(0.11*i);
+            sum_g  += (long double) g_large[i];
+            sum_gh += (long double) g_large[i]*h_large[i];
+        }
+        double error_integral = std::abs(sb_large.integral(g_large.data())/(sb_large.get_dv()*sum_g) - 1.0);
+        double error_inner = std::abs(sb_large.inner_product(g_large.data(), h_large.data())/(sb_large.get_dv()*sum_gh) - 1.0);
+        std::cout<< "relative errors of integral and inner product: " << error_integral << " " << error_inner << std::endl;
+        if (error_integral > 1e-14 || error_inner > 1e-14)
+            return -1;
+
+        // all of them in one pass
+        std::vector<double> results = sb_large.reduce_many(
+            std::vector<double*>{g_large.data(), h_large.data()},
+            std::vector<std::array<int,2>>{{0,-1},{0,1},{1,1}});
+        double error_many = std::abs(results[0]-sb_large.integral(g_large.data()))
+                          + std::abs(results[1]-sb_large.inner_product(g_large.data(), h_large.data()))
+                          + std::abs(results[2]-sb_large.inner_product(h_large.data(), h_large.data()));
+        std::cout<< "error of reduce_many: " << error_many << std::endl;
+        if (error_many > 1e-10)
+            return -1;
+
+        sb_large.zero_mean(g_large.data());
+        double mean_g = sb_large.integral(g_large.data())/sb_large.get_volume();
+        std::cout<< "mean after zero_mean: " << mean_g << std::endl;
+        if( std::abs(mean_g) > 1e-14)
+            return -1;
         return 0;
     }
     catch(std::exception& exc)
@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+from snapshot_codec import *
+from trajectory_writer import *
+
+# fields of a Langevin trajectory, slowly changing frames
+np.random.seed(5489)
+nx = [32,32,16]
+n_frames = 6
+k2 = np.sum(np.meshgrid(*[np.fft.fftfreq(n)**2 for n in nx], indexing="ij"), axis=0)
+w_minus = [np.fft.ifftn(np.fft.fftn(np.random.normal(0.0, 1.0, nx))*np.exp(-100*k2)).real*5]
+for i in range(1, n_frames):
+    w_minus.append(w_minus[-1] + np.random.normal(0.0, 0.002, nx))
+w_minus = np.array(w_minus)
+raw_size = w_minus.nbytes
+
+error_bound = 1e-4
+for bits, delta, entropy_coder in [(16, False, "zlib"), (16, True, "zlib"), (8, True, "zlib"), (16, True, "lzma"), (8, False, None)]:
+    print("Running bits: %d, delta: %s, entropy coder: %s" % (bits, delta, entropy_coder))
+    encoder = SnapshotEncoder(error_bound, bits=bits, delta=delta, entropy_coder=entropy_coder)
+    buffers = [encoder.encode(frame) for frame in w_minus]
+    time_start = time.time()
+    decoded = decode_snapshots(buffers, nx)
+    time_duration = time.time() - time_start
+    error = np.max(np.absolute(decoded - w_minus))
+    ratio = raw_size/sum([len(buffer) for buffer in buffers])
+    print("Error: %.3e, compression ratio: %.2f, wide frames: %d, decoding: %.3f s" %
+        (error, ratio, encoder.n_wide_frames, time_duration))
+    if np.isnan(error) or error > error_bound*(1+1e-8) or decoded.shape != w_minus.shape:
+        sys.exit(-1);
+    if entropy_coder is not None and ratio < 3.0:
+        sys.exit(-1);
+
+# key frames
+buffers = encode_snapshots(w_minus, error_bound, delta=True, keyframe_interval=2)
+if [buffer[0] for buffer in buffers] != [1,0,1,0,1,0]:
+    sys.exit(-1);
+# a delta frame cannot be decoded alone
+try:
+    SnapshotDecoder().decode(buffers[1])
+    sys.exit(-1);
+except ValueError as exc:
+    print("Expected error: ", exc)
+
+# trajectory writer
+print("Running trajectory writer")
+with tempfile.TemporaryDirectory() as tmp_dir:
+    file_name = os.path.join(tmp_dir, "traj")
+    with TrajectoryWriter(file_name, {"w_minus":nx}, compression="lossy", chunk_frames=4,
+        codec_options={"error_bound":error_bound, "bits":16, "delta":True}) as writer:
+        for i in range(n_frames):
+            writer.write(i, w_minus=w_minus[i])
+    data = read_trajectory(file_name)
+    error = np.max(np.absolute(data["w_minus"] - w_minus))
+    print("Error: %.3e" % (error))
+    if np.isnan(error) or error > error_bound*(1+1e-8) or data["w_minus"].shape != w_minus.shape:
+        sys.exit(-1);
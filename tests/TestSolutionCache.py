@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+import numpy as np
+from solution_cache import *
+
+def lamella(nx, n_periods, amplitude):
+    x = np.arange(np.prod(nx))/np.prod(nx)
+    w_a = amplitude*np.cos(2*np.pi*n_periods*x)
+    return np.array([w_a, -w_a])
+
+params = {"f":0.5, "chi_n":15.0, "n_segment":64, "epsilon":1.0, "chain_model":"Discrete"}
+
+with tempfile.TemporaryDirectory() as tmp_dir:
+    cache = SolutionCache(os.path.join(tmp_dir, "cache"), max_entries=3)
+    if cache.lookup("Lamella", params, [32]) is not None:
+        sys.exit(-1);
+
+    for chi_n in [12.0, 15.0, 18.0]:
+        cache.store("Lamella", dict(params, chi_n=chi_n), [32], [4.0], lamella([32], 2, chi_n), -0.1*chi_n, 50)
+    cache.store("Gyroid", params, [32], [3.3], lamella([32], 1, 1.0), -0.2, 100)
+    print([(entry["phase"], entry["params"]["chi_n"]) for entry in cache.get_entries()])
+
+    # the least recently used entry (chi_n = 12) is removed
+    if len(cache) != 3 or len(os.listdir(cache.directory)) != 4:
+        sys.exit(-1);
+
+    # nearest entry, resampled to a finer grid
+    result = SolutionCache(cache.directory).lookup("Lamella", dict(params, chi_n=16.0), [48])
+    print(result["params"], result["nx"], result["distance"])
+    if result["params"]["chi_n"] != 15.0 or result["nx"] != [32] or result["lx"] != [4.0]:
+        sys.exit(-1);
+    error = np.max(np.absolute(result["w"] - lamella([48], 2, 15.0)))
+    print("Resampling Error: ", error)
+    if result["w"].shape != (2,48) or error > 1e-12 or result["n_iter"] != 50:
+        sys.exit(-1);
+
+    # the entry on the requested grid is preferred at the same distance,
+    # and chi_n = 18, which has not been used since it was stored, is removed
+    cache.store("Lamella", dict(params, chi_n=15.0), [48], [4.0], lamella([48], 2, 15.0), -1.5, 10)
+    if cache.lookup("Lamella", dict(params, chi_n=15.0), [48])["nx"] != [48]:
+        sys.exit(-1);
+    if cache.lookup("Lamella", dict(params, chi_n=18.0), [32], max_distance=1.0) is not None:
+        sys.exit(-1);
+
+    # chain model and max_distance
+    if cache.lookup("Lamella", dict(params, chain_model="Continuous"), [32]) is not None:
+        sys.exit(-1);
+    if cache.lookup("Lamella", dict(params, chi_n=30.0), [32], max_distance=5.0) is not None:
+        sys.exit(-1);
+
+    # then the Gyroid entry is removed
+    cache.store("Lamella", dict(params, chi_n=20.0), [32], [4.0], lamella([32], 2, 20.0), -2.0, 40)
+    entries = [(entry["phase"], entry["params"]["chi_n"]) for entry in cache.get_entries()]
+    print(entries)
+    if sorted(entries) != [("Lamella", 15.0), ("Lamella", 15.0), ("Lamella", 20.0)]:
+        sys.exit(-1);
+
+    cache.clear()
+    if len(cache) != 0 or os.listdir(cache.directory) != ["index.json"]:
+        sys.exit(-1);
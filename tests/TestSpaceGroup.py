@@ -0,0 +1,59 @@
+import sys
+import numpy as np
+from space_group import *
+
+#-------------- Group orders ------------
+print("Running space group")
+for name, nx, n_op in [("P4_2/mnm",[16,16,8],16), ("Pm-3n",[16,16,16],48),
+                       ("Im-3m",[16,16,16],96), ("Ia-3d",[16,16,16],96)]:
+    space_group = SpaceGroup(nx, name)
+    print("%-10s operations: %3d, reduced basis: %5d / %5d" %
+        (name, space_group.get_n_operations(), space_group.get_n_reduced_basis(), np.prod(nx)))
+    if space_group.get_n_operations() != n_op:
+        sys.exit(-1);
+
+#-------------- Gyroid field is invariant ------------
+print("If error is less than 1.0e-10, it is ok!")
+nx = [16,16,16]
+x = [2*np.pi*np.arange(n)/n for n in nx]
+xx, yy, zz = np.meshgrid(*x, indexing='ij')
+c1 = np.sqrt(8.0/3.0)*(np.cos(xx)*np.sin(yy)*np.sin(2.0*zz) +
+    np.cos(yy)*np.sin(zz)*np.sin(2.0*xx)+np.cos(zz)*np.sin(xx)*np.sin(2.0*yy))
+c2 = np.sqrt(4.0/3.0)*(np.cos(2.0*xx)*np.cos(2.0*yy)+
+    np.cos(2.0*yy)*np.cos(2.0*zz)+np.cos(2.0*zz)*np.cos(2.0*xx))
+w = np.reshape(-0.3164*c1 +0.1074*c2, np.prod(nx))
+
+space_group = SpaceGroup(nx, "Ia-3d")
+error = np.max(np.absolute(space_group.symmetrize(w) - w))
+print("Symmetrize Error: ", error)
+if(np.isnan(error) or error > 1e-10):
+    sys.exit(-1);
+
+#-------------- Reduced basis ------------
+np.random.seed(1)
+w = space_group.symmetrize(np.random.normal(0.0, 1.0, np.prod(nx)))
+v = space_group.symmetrize(np.random.normal(0.0, 1.0, np.prod(nx)))
+w_reduced = space_group.to_reduced_basis(w)
+v_reduced = space_group.to_reduced_basis(v)
+error = np.max(np.absolute(space_group.from_reduced_basis(w_reduced) - w))
+print("Reduced Basis Error: ", error)
+if(np.isnan(error) or error > 1e-10):
+    sys.exit(-1);
+error = np.absolute(np.dot(w_reduced, v_reduced) - np.dot(w, v))
+print("Dot Product Error: ", error)
+if(np.isnan(error) or error > 1e-10):
+    sys.exit(-1);
+
+#-------------- Custom operations in 2D ------------
+space_group = SpaceGroup([8,8], operations=["-x,-y", "-y,x", "y,x"])
+print("p4mm operations: %d, reduced basis: %d" %
+    (space_group.get_n_operations(), space_group.get_n_reduced_basis()))
+if space_group.get_n_operations() != 8 or space_group.get_n_reduced_basis() != 15:
+    sys.exit(-1);
+
+#-------------- Incompatible grid ------------
+try:
+    SpaceGroup([16,16,12], "Pm-3n")
+    sys.exit(-1);
+except ValueError as exc:
+    print(exc)
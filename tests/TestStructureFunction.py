@@ -0,0 +1,69 @@
+import sys
+import numpy as np
+from langevinfts import *
+
+print("Running structure function")
+print("If error is less than 1.0e-10, it is ok!")
+np.random.seed(5489)
+factory = PlatformSelector.create_factory(PlatformSelector.avail_platforms()[0])
+n_samples = 7
+
+for nx, lx in [([8,6,5], [2.0,1.5,1.8]), ([10,8], [3.0,2.0])]:
+    sb = factory.create_simulation_box(nx, lx)
+    sf = factory.create_structure_function(sb)
+    nx_complex = nx[:-1] + [nx[-1]//2+1]
+
+    # reference, numpy FFT and statistics over the samples
+    power = []
+    for i in range(n_samples):
+        field = np.random.normal(0.0, 1.0, np.prod(nx))
+        sf.accumulate(field)
+        power.append(np.absolute(np.fft.rfftn(np.reshape(field, nx))/np.prod(nx))**2)
+    power = np.array(power)
+    mean = np.reshape(sf.get_mean(), nx_complex)
+    variance = np.reshape(sf.get_variance(), nx_complex)
+    error = max(np.max(np.absolute(mean - np.mean(power, axis=0))),
+                np.max(np.absolute(variance - np.var(power, axis=0, ddof=1))))
+    print("nx: ", nx, "Mean and Variance Error: ", error)
+    if np.isnan(error) or error > 1e-10 or sf.get_n_samples() != n_samples:
+        sys.exit(-1);
+
+    # wave numbers
+    m = np.meshgrid(*[np.fft.fftfreq(n, 1.0/n) for n in nx[:-1]], np.arange(nx[-1]//2+1), indexing='ij')
+    k = 2*np.pi*np.sqrt(sum([(m[d]/lx[d])**2 for d in range(len(nx))]))
+    error = np.max(np.absolute(np.reshape(sf.get_wave_number(), nx_complex) - k))
+    print("Wave Number Error: ", error)
+    if np.isnan(error) or error > 1e-10:
+        sys.exit(-1);
+
+    # spherical average over the full (not halved) Fourier grid
+    bin_width = 2*np.pi/max(lx)
+    m_full = np.meshgrid(*[np.fft.fftfreq(n, 1.0/n) for n in nx], indexing='ij')
+    k_full = 2*np.pi*np.sqrt(sum([(m_full[d]/lx[d])**2 for d in range(len(nx))]))
+    # mean on the full grid from the Hermitian symmetry
+    mean_full = np.zeros(nx)
+    idx = np.array(np.meshgrid(*[np.arange(n) for n in nx], indexing='ij'))
+    last = idx[-1]
+    conj = tuple([(-idx[d]) % nx[d] for d in range(len(nx))])
+    direct = tuple([idx[d] for d in range(len(nx))])
+    is_direct = last <= nx[-1]//2
+    mean_full[is_direct] = mean[tuple([d[is_direct] for d in direct])]
+    mean_full[~is_direct] = mean[tuple([d[~is_direct] for d in conj])]
+    bins = (k_full/bin_width).astype(int)
+    mask = k_full > 0
+    counts = np.bincount(bins[mask])
+    sf_bins = np.bincount(bins[mask], weights=mean_full[mask])
+    k_bins = np.bincount(bins[mask], weights=k_full[mask])
+    nonzero = counts > 0
+    k_answer, sf_answer, counts_answer = k_bins[nonzero]/counts[nonzero], sf_bins[nonzero]/counts[nonzero], counts[nonzero]
+
+    k_avg, sf_avg, var_avg, counts_avg = sf.get_spherical_average(bin_width)
+    error = max(np.max(np.absolute(np.array(k_avg) - k_answer)), np.max(np.absolute(np.array(sf_avg) - sf_answer)))
+    print("Spherical Average Error: ", error)
+    if np.isnan(error) or error > 1e-10 or list(counts_avg) != list(counts_answer):
+        sys.exit(-1);
+
+    # reset
+    sf.reset()
+    if sf.get_n_samples() != 0 or np.max(np.absolute(sf.get_mean())) != 0.0:
+        sys.exit(-1);
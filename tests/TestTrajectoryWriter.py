@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+import numpy as np
+from trajectory_writer import *
+
+np.random.seed(5489)
+nx = [8,6,5]
+n_frames = 7
+w_minus = np.random.normal(0.0, 1.0, (n_frames, np.prod(nx)))
+phi_a = np.random.uniform(0.0, 1.0, (n_frames, np.prod(nx)))
+
+formats = [("binary", None), ("binary", "zlib")]
+try:
+    import h5py
+    formats += [("hdf5", None), ("hdf5", "gzip")]
+except ImportError:
+    print("h5py is not found, HDF5 is not tested")
+
+with tempfile.TemporaryDirectory() as tmp_dir:
+    for file_format, compression in formats:
+        print("Running %s, compression: %s" % (file_format, compression))
+        file_name = os.path.join(tmp_dir, "traj_%s_%s" % (file_format, compression))
+        writer = TrajectoryWriter(file_name, {"w_minus":nx, "phi_a":nx}, file_format=file_format,
+            compression=compression, chunk_frames=3, max_queue_size=2, attributes={"chi_n":12.0})
+        for i in range(n_frames):
+            field = w_minus[i].copy()
+            writer.write(10*(i+1), w_minus=field, phi_a=phi_a[i])
+            # the fields are copied
+            field[:] = 0.0
+            if i == 3:
+                writer.flush()
+                if read_trajectory(file_name)["step"].tolist() != [10,20,30,40]:
+                    sys.exit(-1);
+        writer.close()
+
+        data = read_trajectory(file_name)
+        error = max(np.max(np.absolute(data["w_minus"].reshape(n_frames,-1) - w_minus)),
+                    np.max(np.absolute(data["phi_a"].reshape(n_frames,-1) - phi_a)))
+        print("Shape: ", data["w_minus"].shape, ", Error: ", error)
+        if data["w_minus"].shape != (n_frames,)+tuple(nx) or error != 0.0:
+            sys.exit(-1);
+        if data["step"].tolist() != [10*(i+1) for i in range(n_frames)] or data["attributes"]["chi_n"] != 12.0:
+            sys.exit(-1);
+        # a record being appended to the index is not read
+        if file_format == "binary":
+            with open(os.path.join(file_name, "index.bin"), "ab") as f:
+                f.write(bytes(5))
+            if read_trajectory(file_name)["step"].tolist() != [10*(i+1) for i in range(n_frames)]:
+                sys.exit(-1);
+
+    # errors of the background thread are raised in the caller
+    print("Running error report")
+    writer = TrajectoryWriter(os.path.join(tmp_dir, "traj_error"), {"w_minus":nx})
+    writer.write(1, w_minus=w_minus[0])
+    writer.flush()
+    writer.file_name = os.path.join(tmp_dir, "not_exist", "traj")
+    writer.write(2, w_minus=w_minus[1])
+    try:
+        writer.flush()
+        sys.exit(-1);
+    except RuntimeError as exc:
+        print("Expected error: ", exc)
+    # the error is kept, and the later frames are not written
+    for method in [lambda: writer.write(3, w_minus=w_minus[2]), writer.flush, writer.close, writer.flush]:
+        try:
+            method()
+            sys.exit(-1);
+        except RuntimeError as exc:
+            print("Expected error: ", exc)
+
+    # a closed writer
+    writer = TrajectoryWriter(os.path.join(tmp_dir, "traj_closed"), {"w_minus":nx})
+    writer.close()
+    try:
+        writer.flush()
+        sys.exit(-1);
+    except RuntimeError as exc:
+        print("Expected error: ", exc)
@@ -0,0 +1,120 @@
+#include <cstdlib>
+#include <iostream>
+#include <iomanip>
+#include <cmath>
+#include <string>
+#include <array>
+#include <vector>
+#include <algorithm>
+
+#include "Exception.h"
+#include "PolymerChain.h"
+#include "SimulationBox.h"
+#include "Pseudo.h"
+#include "AbstractFactory.h"
+#include "PlatformSelector.h"
+
+int main()
+{
+    try
+    {
+        // compare dq_dl() and dq_dangle() of a non-orthogonal cell with
+        // central finite differences, dq_dl = V*d(Q/V)/dl
+        const double eps = 1e-5;
+        const double tolerance = 1e-3;
+
+        double f = 0.4;
+        int n_segment = 20;
+        double chi_n = 15.0;
+        std::vector<int> nx = {6,5,4};
+        std::vector<double> lx = {3.0,2.5,2.0};
+        std::vector<double> angles = {80.0,100.0,70.0};
+
+        std::vector<std::string> chain_models = {"Continuous", "Discrete"};
+
+        // choose platform
+        std::vector<std::string> avail_platforms = PlatformSelector::avail_platforms();
+        for(std::string platform : avail_platforms){
+            for(std::string chain_model : chain_models){
+                AbstractFactory *factory = PlatformSelector::create_factory(platform);
+                factory->display_info();
+
+                SimulationBox *sb  = factory->create_simulation_box(nx, lx, angles);
+                PolymerChain *pc   = factory->create_polymer_chain(f, n_segment, chi_n, chain_model, 1.3);
+                Pseudo *pseudo     = factory->create_pseudo(sb, pc);
+                const int M = sb->get_n_grid();
+
+                double w_a[M], w_b[M], phi_a[M], phi_b[M];
+                double q1_init[M], q2_init[M];
+                double QQ;
+
+                for(int i=0; i<M; i++)
+                {
+                    w_a[i] = 0.5*sin(0.7*i) + 0.3*cos(1.3*i);
+                    w_b[i] = 0.4*cos(0.9*i) - 0.2*sin(2.1*i);
+                    q1_init[i] = 1.0;
+                    q2_init[i] = 1.0;
+                }
+
+                // Q/V for the given cell
+                auto q_per_volume = [&](std::vector<double> new_lx, std::vector<double> new_angles) -> double
+                {
+                    sb->set_lx(new_lx);
+                    sb->set_angles(new_angles);
+                    pseudo->update();
+                    pseudo->find_phi(phi_a, phi_b, q1_init, q2_init, w_a, w_b, QQ);
+                    return QQ/sb->get_volume();
+                };
+
+                q_per_volume(lx, angles);
+                const double volume = sb->get_volume();
+                std::array<double,3> dq_dl = pseudo->dq_dl();
+                std::vector<double> dq_dangle = pseudo->dq_dangle();
+
+                std::vector<double> derivative, fd_derivative;
+                for(int d=0; d<3; d++)
+                {
+                    std::vector<double> lx_p = lx, lx_m = lx;
+                    lx_p[d] += eps;
+                    lx_m[d] -= eps;
+                    derivative.push_back(dq_dl[d]);
+                    fd_derivative.push_back(volume*(q_per_volume(lx_p, angles)-q_per_volume(lx_m, angles))/(2*eps));
+                }
+                for(int d=0; d<3; d++)
+                {
+                    std::vector<double> angles_p = angles, angles_m = angles;
+                    angles_p[d] += eps;
+                    angles_m[d] -= eps;
+                    derivative.push_back(dq_dangle[d]);
+                    fd_derivative.push_back(volume*(q_per_volume(lx, angles_p)-q_per_volume(lx, angles_m))/(2*eps));
+                }
+
+                double max_derivative = 0.0;
+                for(size_t i=0; i<derivative.size(); i++)
+                    max_derivative = std::max(max_derivative, std::abs(derivative[i]));
+                double error = 0.0;
+                for(size_t i=0; i<derivative.size(); i++)
+                {
+                    std::cout << std::setw(16) << derivative[i] << std::setw(16) << fd_derivative[i] << std::endl;
+                    error = std::max(error, std::abs(derivative[i]-fd_derivative[i])/max_derivative);
+                }
+                std::cout<< chain_model << ", volume: " << volume;
+                std::cout<< ", relative error: " << std::setprecision(3) << std::scientific << error << std::endl;
+
+                delete pseudo;
+                delete pc;
+                delete sb;
+                delete factory;
+
+                if (!std::isfinite(error) || error > tolerance)
+                    return -1;
+            }
+        }
+        return 0;
+    }
+    catch(std::exception& exc)
+    {
+        std::cout << exc.what() << std::endl;
+        return -1;
+    }
+}
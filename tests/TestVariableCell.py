@@ -0,0 +1,73 @@
+import sys
+import numpy as np
+import scipy.optimize
+from langevinfts import *
+from grid_sequencing import *
+from variable_cell_scft import *
+
+#-------------- BFGS update ------------
+print("Running BFGS update of the inverse Hessian")
+print("If error is less than 1.0e-10, it is ok!")
+np.random.seed(5489)
+s = np.random.normal(0.0, 1.0, 3)
+y = s + 0.1*np.random.normal(0.0, 1.0, 3)
+h_inv, is_updated = update_inverse_hessian(np.identity(3), s, y)
+# secant equation and symmetry
+error = max(np.max(np.absolute(h_inv @ y - s)), np.max(np.absolute(h_inv - h_inv.T)))
+print("Secant Error: ", error)
+if np.isnan(error) or error > 1e-10 or not is_updated:
+    sys.exit(-1);
+# negative curvature is skipped
+_, is_updated = update_inverse_hessian(np.identity(3), s, -y)
+if is_updated:
+    sys.exit(-1);
+
+#-------------- Variable-cell SCFT ------------
+print("Running variable-cell SCFT")
+print("If error is less than 1.0e-6, it is ok!")
+max_scft_iter = 2000
+tolerance = 1e-8
+f = 0.3
+n_segment = 100
+chi_n = 25
+epsilon = 2.0
+nx = [32]
+lx = [3.4]
+
+factory = PlatformSelector.create_factory(PlatformSelector.avail_platforms()[0])
+pc = factory.create_polymer_chain(f, n_segment, chi_n, "Continuous", epsilon)
+q1_init = np.ones(np.prod(nx), dtype=np.float64)
+q2_init = np.ones(np.prod(nx), dtype=np.float64)
+def initial_fields():
+    w = np.zeros([2, np.prod(nx)], dtype=np.float64)
+    w[0] =  np.cos(2*np.pi*np.arange(nx[0])/nx[0])
+    w[1] = -np.cos(2*np.pi*np.arange(nx[0])/nx[0])
+    return w
+
+# fields and box size in the same iteration
+sb     = factory.create_simulation_box(nx, lx)
+pseudo = factory.create_pseudo(sb, pc)
+am     = factory.create_anderson_mixing(2*np.prod(nx), 20, 1e-1, 0.1, 0.1)
+w = initial_fields()
+_, _, Q, energy, lx_vc, n_iter_vc = find_saddle_point_variable_cell(pc, sb, pseudo, am, lx,
+    q1_init, q2_init, w, max_scft_iter, tolerance, tolerance)
+
+# reference, root finding of the stress over converged fields
+n_iter_root = 0
+def stress(l):
+    global n_iter_root
+    sb.set_lx(list(l))
+    pseudo.update()
+    w = initial_fields()
+    _, _, Q, _, _, n_iter, _ = iterate_saddle_point(pc, sb, pseudo, am, l,
+        q1_init, q2_init, w, max_scft_iter, tolerance, False, 0)
+    n_iter_root += n_iter
+    return np.array(pseudo.dq_dl()[-1:])/Q
+res = scipy.optimize.root(stress, lx, tol=1e-10)
+
+error = np.max(np.absolute(lx_vc - res.x))
+print("Lx: ", lx_vc, res.x)
+print("Iterations: ", n_iter_vc, n_iter_root)
+print("Box Size Error: ", error)
+if np.isnan(error) or error > 1e-6 or n_iter_vc >= n_iter_root:
+    sys.exit(-1);
@@ -3,9 +3,9 @@
 
 import plotly.graph_objects as go
 import numpy as np
-import scipy.io as sio
+from field_io import *
 
-mdic = sio.loadmat("fields_002000.mat", squeeze_me=True)
+mdic = load_fields("fields_002000.lfts")
 nx = mdic['nx']
 lx = mdic['lx']
 phi_a = mdic['phi_a']